@@ -11,14 +11,93 @@ import shutil
 import tarfile
 import logging
 import threading
-import subprocess
+
+from multiprocessing.pool import ThreadPool
 
 from T0.ConditionUpload import upload
 
 from WMCore.DAOFactory import DAOFactory
 
+# late payload watermark lags this many seconds behind the
+# query time, covers files inserted by transactions that
+# were not committed yet when we looked
+lateConditionsOverlap = 600
+
+
+class DropboxSessions(object):
+    """
+    _DropboxSessions_
+
+    Signed in ConditionsUploader sessions, one per dropbox
+    host, shared by all payload uploads of a polling cycle.
+    The uploads run in parallel, each upload thread uses
+    its own connection with the token of the session.
 
-def uploadConditions(username, password, serviceProxy):
+    A failed sign in is retried by the next payload for the
+    host, up to maxSignInAttempts times per polling cycle.
+
+    """
+    def __init__(self, username, password, urlTemplate = upload.defaultUrlTemplate,
+                 maxSignInAttempts = 3):
+        """
+        _init_
+
+        """
+        self.username = username
+        self.password = password
+        self.urlTemplate = urlTemplate
+        self.maxSignInAttempts = maxSignInAttempts
+        self.sessions = {}
+        self.signInFailures = {}
+        self.lock = threading.Lock()
+
+        return
+
+    def getSession(self, hostname):
+        """
+        _getSession_
+
+        Return the session for the dropbox host, signing in
+        on first use. Returns None if the sign in failed or
+        there were too many failed sign ins for the host.
+
+        """
+        with self.lock:
+            if hostname not in self.sessions:
+
+                failures = self.signInFailures.get(hostname, 0)
+                if failures >= self.maxSignInAttempts:
+                    return None
+
+                dropBox = upload.ConditionsUploader(hostname = hostname, urlTemplate = self.urlTemplate)
+                if not dropBox.signIn(self.username, self.password):
+                    failures += 1
+                    self.signInFailures[hostname] = failures
+                    logging.error("Could not sign in to dropbox at %s (attempt %d of %d)" % (hostname, failures,
+                                                                                              self.maxSignInAttempts))
+                    return None
+
+                self.sessions[hostname] = dropBox
+
+            return self.sessions[hostname]
+
+    def signOut(self):
+        """
+        _signOut_
+
+        Sign out of all sessions
+
+        """
+        with self.lock:
+            for dropBox in self.sessions.values():
+                dropBox.signOut()
+            self.sessions = {}
+            self.signInFailures = {}
+
+        return
+
+def uploadConditions(username, password, serviceProxy, payloadCache, maxWorkers = 4, watermark = None,
+                     urlTemplate = upload.defaultUrlTemplate, deadline = None):
     """
     _uploadConditions_
 
@@ -37,8 +116,47 @@ def uploadConditions(username, password, serviceProxy):
     end time (either from the EoR record or based
     on the insertion time of the last streamer file).
 
+    Payloads are uploaded concurrently by up to maxWorkers
+    threads, sharing one dropbox session per host. Input
+    files are staged through the payload cache.
+
+    Late arriving payloads for finished runs are only looked
+    for in files inserted since the watermark. Returns the
+    watermark to be used in the next polling cycle and whether
+    all runs were looked at.
+
+    Once the deadline is reached no further runs are looked at,
+    they are picked up again in the next polling cycle (files
+    that were not uploaded keep the watermark back).
+
     """
     logging.debug("uploadConditions()")
+
+    dropboxSessions = DropboxSessions(username, password, urlTemplate)
+    uploadPool = ThreadPool(max(maxWorkers, 1))
+
+    try:
+        (watermark, complete) = uploadConditionFiles(uploadPool, dropboxSessions, payloadCache,
+                                                     username, password, serviceProxy, watermark,
+                                                     deadline = deadline)
+    finally:
+        uploadPool.close()
+        uploadPool.join()
+        dropboxSessions.signOut()
+
+    payloadCache.purge()
+
+    return (watermark, complete)
+
+def uploadConditionFiles(uploadPool, dropboxSessions, payloadCache, username, password, serviceProxy, watermark = None,
+                         deadline = None):
+    """
+    _uploadConditionFiles_
+
+    Does the work for uploadConditions, returns the watermark
+    and whether all runs were looked at before the deadline
+
+    """
     myThread = threading.currentThread()
 
     daoFactory = DAOFactory(package = "T0.WMBS",
@@ -53,12 +171,19 @@ def uploadConditions(username, password, serviceProxy):
     isPromptCalibrationFinishedDAO = daoFactory(classname = "ConditionUpload.IsPromptCalibrationFinished")
     markPromptCalibrationFinishedDAO = daoFactory(classname = "ConditionUpload.MarkPromptCalibrationFinished")
 
-    # look at all runs which are finished with conditions uploads
+    # look at runs which are finished with conditions uploads
     # check for late arriving payloads and upload them
-    conditions = getConditionsDAO.execute(finished = True, transaction = False)
+    queryTime = int(time.time())
+    conditions = getConditionsDAO.execute(finished = True, insertTime = watermark, transaction = False)
 
+    complete = True
     for (index, run) in enumerate(sorted(conditions.keys()), 1):
 
+        if deadline != None and index > 1 and time.time() > deadline:
+            logging.info("Deferring late payload uploads of %d runs to the next cycle" % (len(conditions) - index + 1))
+            complete = False
+            break
+
         dropboxHost = conditions[run]['dropboxHost']
         validationMode = conditions[run]['validationMode']
 
@@ -67,7 +192,8 @@ def uploadConditions(username, password, serviceProxy):
             if len(uploadableFiles) > 0:
 
                 uploadedFiles = uploadToDropbox(uploadableFiles, dropboxHost, validationMode,
-                                                username, password, serviceProxy)
+                                                username, password, serviceProxy,
+                                                uploadPool, dropboxSessions, payloadCache)
 
                 if len(uploadedFiles) > 0:
 
@@ -87,7 +213,6 @@ def uploadConditions(username, password, serviceProxy):
                     else:
                         myThread.transaction.commit()
 
-
     # check for pathological runs with no express data that will never
     # create conditions for upload and set them to finished
     finishPCLforEmptyExpressDAO.execute(transaction = False)
@@ -98,6 +223,11 @@ def uploadConditions(username, password, serviceProxy):
 
     for (index, run) in enumerate(sorted(conditions.keys()), 1):
 
+        if deadline != None and index > 1 and time.time() > deadline:
+            logging.info("Deferring condition uploads of %d runs to the next cycle" % (len(conditions) - index + 1))
+            complete = False
+            break
+
         advanceToNextRun = True
 
         timeout = conditions[run]['condUploadTimeout']
@@ -109,7 +239,8 @@ def uploadConditions(username, password, serviceProxy):
             if len(uploadableFiles) > 0:
 
                 uploadedFiles = uploadToDropbox(uploadableFiles, dropboxHost, validationMode,
-                                                username, password, serviceProxy)
+                                                username, password, serviceProxy,
+                                                uploadPool, dropboxSessions, payloadCache)
 
                 if len(uploadedFiles) > 0:
 
@@ -156,23 +287,216 @@ def uploadConditions(username, password, serviceProxy):
             if time.time() < stopTime + timeout:
                 break
 
+    return (getLateConditionsWatermark(queryTime), complete)
+
+def queueConditions(uploadQueue, watermark = None):
+    """
+    _queueConditions_
+
+    Called by Tier0Feeder in every polling cycle instead of
+    uploadConditions if a persistent upload queue is used.
+
+    Same logic as uploadConditions, but payloads are only added
+    to the upload queue. The upload and the completion of the
+    uploaded files is done by processUploadQueue in a separate
+    thread. The pending payloads in the queue are taken into
+    account to decide whether a run/stream PCL is finished,
+    which keeps the run order and timeout handling.
+
+    Late arriving payloads are looked for as in uploadConditions,
+    returns the watermark to be used in the next polling cycle.
+
+    """
+    logging.debug("queueConditions()")
+    myThread = threading.currentThread()
+
+    daoFactory = DAOFactory(package = "T0.WMBS",
+                            logger = logging,
+                            dbinterface = myThread.dbi)
+
+    getConditionsDAO = daoFactory(classname = "ConditionUpload.GetConditions")
+    finishPCLforEmptyExpressDAO = daoFactory(classname = "ConditionUpload.FinishPCLforEmptyExpress")
+    isPromptCalibrationFinishedDAO = daoFactory(classname = "ConditionUpload.IsPromptCalibrationFinished")
+    markPromptCalibrationFinishedDAO = daoFactory(classname = "ConditionUpload.MarkPromptCalibrationFinished")
+
+    # look at runs which are finished with conditions uploads
+    # check for late arriving payloads and queue them
+    queryTime = int(time.time())
+    conditions = getConditionsDAO.execute(finished = True, insertTime = watermark, transaction = False)
+
+    for run in sorted(conditions.keys()):
+        for streamid, uploadableFiles in conditions[run]['streams'].items():
+            if len(uploadableFiles) > 0:
+                queueRunStream(uploadQueue, run, streamid, conditions[run], uploadableFiles)
+
+    # check for pathological runs with no express data that will never
+    # create conditions for upload and set them to finished
+    finishPCLforEmptyExpressDAO.execute(transaction = False)
+
+    # look at all runs not completely finished with condition uploads
+    # return acquired (to be uploaded) files for them
+    conditions = getConditionsDAO.execute(finished = False, transaction = False)
+
+    pendingRunStreams = uploadQueue.getPendingRunStreams()
+
+    for (index, run) in enumerate(sorted(conditions.keys()), 1):
+
+        timeout = conditions[run]['condUploadTimeout']
+
+        for streamid, uploadableFiles in conditions[run]['streams'].items():
+
+            if len(uploadableFiles) > 0:
+                queueRunStream(uploadQueue, run, streamid, conditions[run], uploadableFiles)
+
+            elif streamid not in pendingRunStreams.get(run, {}):
+                # nothing left to upload, check if all files for run/stream
+                # uploaded (that means only complete files for same number
+                # of subscriptions as number of producers)
+                markPromptCalibrationFinishedDAO.execute(run, streamid, transaction = False)
+
+            else:
+                logging.debug("Run %d stream %d has %d payloads queued for upload (%d failed before)" %
+                              (run, streamid,
+                               pendingRunStreams[run][streamid]['pending'],
+                               pendingRunStreams[run][streamid]['failed']))
+
+        # check if all streams for run finished
+        advanceToNextRun = isPromptCalibrationFinishedDAO.execute(run, transaction = False)
+
+        # check for timeout, but only if there is a next run
+        if not advanceToNextRun and index < len(conditions.keys()):
+
+            getRunStopTimeDAO = daoFactory(classname = "ConditionUpload.GetRunStopTime")
+            stopTime = getRunStopTimeDAO.execute(run, transaction = False)
+
+            if time.time() < stopTime + timeout:
+                break
+
+    # queued files stay acquired until uploaded, they
+    # keep the watermark from advancing past them
+    return getLateConditionsWatermark(queryTime)
+
+def getLateConditionsWatermark(queryTime):
+    """
+    _getLateConditionsWatermark_
+
+    Determine the insert time from which on the next polling
+    cycle needs to look for late arriving payloads. That's the
+    oldest still acquired file, of any run (the run of a file
+    acquired earlier can have finished since), or, if there are
+    none, the query time minus some overlap for not yet
+    committed inserts.
+
+    Called after the uploads, so uploaded files don't count.
+
+    """
+    myThread = threading.currentThread()
+
+    daoFactory = DAOFactory(package = "T0.WMBS",
+                            logger = logging,
+                            dbinterface = myThread.dbi)
+
+    getOldestAcquiredInsertTimeDAO = daoFactory(classname = "ConditionUpload.GetOldestAcquiredInsertTime")
+    oldestInsertTime = getOldestAcquiredInsertTimeDAO.execute(transaction = False)
+
+    watermark = queryTime - lateConditionsOverlap
+    if oldestInsertTime != None:
+        watermark = min(watermark, oldestInsertTime)
+
+    return watermark
+
+def queueRunStream(uploadQueue, run, streamid, runConditions, uploadableFiles):
+    """
+    _queueRunStream_
+
+    Queue the payloads of a run/stream for upload,
+    files without output are completed right away.
+
+    """
+    completeFiles, filesDict = sortConditionFiles(uploadableFiles)
+
+    if len(completeFiles) > 0:
+        completeConditionFiles(completeFiles)
+
+    payloads = {}
+    for filenamePrefix in filesDict.keys():
+        payloads[filenamePrefix] = [ filesDict[filenamePrefix]['db'],
+                                     filesDict[filenamePrefix]['txt'] ]
+
+    if len(payloads) > 0:
+        uploadQueue.enqueue(run, streamid, runConditions['dropboxHost'],
+                            runConditions['validationMode'], payloads)
+
     return
 
-def uploadToDropbox(condFiles, dropboxHost, validationMode,
-                    username, password, serviceProxy):
+def processUploadQueue(uploadQueue, payloadCache, username, password, serviceProxy, maxWorkers = 4,
+                       urlTemplate = upload.defaultUrlTemplate):
     """
-    _uploadToDropbox_
+    _processUploadQueue_
 
-    Upload a number of files to the Dropbox
+    Called by the ConditionUploadPoller in every polling cycle
 
-    The files are on AFS and are both sqlite and metadata.
-    They also contain both the regular destination and the
-    validation destionation, depending on the value of the
-    passed in validationMode parameter one needs to be
-    filtered out.
+    Upload the payloads due for upload from the queue, complete
+    the files of uploaded payloads and reschedule failed ones.
+
+    """
+    logging.debug("processUploadQueue()")
+
+    payloads = uploadQueue.getDuePayloads()
+
+    if len(payloads) == 0:
+        uploadQueue.purge()
+        payloadCache.purge()
+        return
+
+    dropboxSessions = DropboxSessions(username, password, urlTemplate)
+    uploadPool = ThreadPool(max(maxWorkers, 1))
+
+    try:
+
+        results = []
+        for payload in payloads:
+            (sqliteFile, metaFile) = payload['files']
+            results.append( uploadPool.apply_async(uploadPayload,
+                                                   (payload['name'], sqliteFile, metaFile,
+                                                    payload['dropboxHost'], payload['validationMode'],
+                                                    username, password,
+                                                    serviceProxy, dropboxSessions, payloadCache)) )
+
+        for (payload, result) in zip(payloads, results):
+
+            try:
+                uploadedFiles = result.get()
+            except:
+                logging.exception("Something went wrong with a payload upload...")
+                uploadedFiles = []
+
+            if len(uploadedFiles) > 0:
+                # complete first, completion is idempotent, so
+                # a crash before markDone only causes a re-upload
+                completeConditionFiles(uploadedFiles)
+                uploadQueue.markDone(payload)
+            else:
+                delay = uploadQueue.markFailed(payload, "upload failed")
+                logging.error("Upload of payload %s for run %d failed %d times, retrying in %d seconds" %
+                              (payload['name'], payload['run'], payload['attempts'] + 1, delay))
+
+    finally:
+        uploadPool.close()
+        uploadPool.join()
+        dropboxSessions.signOut()
+
+    return
+
+def sortConditionFiles(condFiles):
+    """
+    _sortConditionFiles_
+
+    Split condition files into files without output, which
+    can be completed right away, and payloads (dictionary
+    of payload name to sqlite and metadata file)
 
     """
-    # sort files
     completeFiles = []
     filesDict = {}
     for condFile in condFiles:
@@ -184,71 +508,121 @@ def uploadToDropbox(condFiles, dropboxHost, validationMode,
                 filesDict[filenamePrefix] = {}
             filesDict[filenamePrefix][filenameExt] = condFile
 
+    return completeFiles, filesDict
+
+def completeConditionFiles(condFiles):
+    """
+    _completeConditionFiles_
+
+    Mark condition files as complete
+
+    """
+    myThread = threading.currentThread()
+
+    daoFactory = DAOFactory(package = "T0.WMBS",
+                            logger = logging,
+                            dbinterface = myThread.dbi)
+
+    completeFilesDAO = daoFactory(classname = "ConditionUpload.CompleteFiles")
+
+    bindVarList = []
+    for condFile in condFiles:
+        bindVarList.append( { 'FILEID' : condFile['fileid'],
+                              'SUBSCRIPTION' : condFile['subscription'] } )
+
+    # need a transaction here so we don't have files in
+    # state acquired and complete at the same time
+    try:
+        myThread.transaction.begin()
+        completeFilesDAO.execute(bindVarList, conn = myThread.transaction.conn, transaction = True)
+    except:
+        myThread.transaction.rollback()
+        raise
+    else:
+        myThread.transaction.commit()
+
+    return
+
+def uploadToDropbox(condFiles, dropboxHost, validationMode,
+                    username, password, serviceProxy,
+                    uploadPool, dropboxSessions, payloadCache):
+    """
+    _uploadToDropbox_
+
+    Upload a number of files to the Dropbox, the payloads
+    are uploaded in parallel by the threads of the pool.
+
+    The files are on AFS and are both sqlite and metadata.
+    They also contain both the regular destination and the
+    validation destionation, depending on the value of the
+    passed in validationMode parameter one needs to be
+    filtered out.
+
+    """
+    # sort files
+    completeFiles, filesDict = sortConditionFiles(condFiles)
+
+    results = []
     for filenamePrefix in filesDict.keys():
 
         sqliteFile = filesDict[filenamePrefix]['db']
         metaFile = filesDict[filenamePrefix]['txt']
 
-        completeFiles.extend( uploadPayload(filenamePrefix, sqliteFile, metaFile,
-                                            dropboxHost, validationMode,
-                                            username, password,
-                                            serviceProxy) )
+        results.append( uploadPool.apply_async(uploadPayload,
+                                               (filenamePrefix, sqliteFile, metaFile,
+                                                dropboxHost, validationMode,
+                                                username, password,
+                                                serviceProxy, dropboxSessions, payloadCache)) )
+
+    # collect per payload results, a failing payload
+    # does not affect the others
+    for result in results:
+        try:
+            completeFiles.extend(result.get())
+        except:
+            logging.exception("Something went wrong with a payload upload...")
 
     return completeFiles
 
-def uploadPayload(filenamePrefix, sqliteFile, metaFile, dropboxHost, validationMode, username, password, serviceProxy):
+def uploadPayload(filenamePrefix, sqliteFile, metaFile, dropboxHost, validationMode, username, password, serviceProxy, dropboxSessions, payloadCache):
     """
     _uploadPayload_
 
     Upload a single payload consisting of a sqlite
     file and a metadata file to the dropbox.
+
+    The files are staged through the payload cache,
+    so a retry does not need to copy them again.
+
+    Runs in a thread of the upload pool, so it only
+    uses files specific to the payload.
     
     """
     completeFiles = []
     files2delete = []
-    inputCopied = True
 
     filenameDB = filenamePrefix + ".db"
     filenameTXT = filenamePrefix + ".txt"
     filenameTAR = filenamePrefix + ".tar.bz2"
 
-    eosPrefix = "root://eoscms//eos/cms"
-    sqliteFile['pfn'] = eosPrefix + sqliteFile['lfn']
-    metaFile['pfn'] = eosPrefix + metaFile['lfn']
-
-    command = "export X509_USER_PROXY=%s\n" % serviceProxy
-    command += "env KRB5CCNAME=/tmp/bla xrdcp -s -f %s %s" % (sqliteFile['pfn'], filenameDB)
-    p = subprocess.Popen(command, shell = True,
-                         stdout=subprocess.PIPE,
-                         stderr=subprocess.STDOUT)
-    output = p.communicate()[0]
-    if p.returncode > 0:
-        logging.error("Failure during copy from EOS: %s" % output)
+    cachedFiles = payloadCache.stage([ sqliteFile, metaFile ])
+    inputCopied = sqliteFile['lfn'] in cachedFiles and metaFile['lfn'] in cachedFiles
+    if not inputCopied:
         logging.error("  ==> Upload failed for payload %s" % filenamePrefix)
-        inputCopied = False
-    else:
-        files2delete.append(filenameDB)
-
-    command = "export X509_USER_PROXY=%s\n" % serviceProxy
-    command += "env KRB5CCNAME=/tmp/bla xrdcp -s -f %s %s" % (metaFile['pfn'], filenameTXT)
-    p = subprocess.Popen(command, shell = True,
-                         stdout=subprocess.PIPE,
-                         stderr=subprocess.STDOUT)
-    output = p.communicate()[0]
-    if p.returncode > 0:
-        logging.error("Failure during copy from EOS: %s" % output)
-        logging.error("  ==> Upload failed for payload %s" % filenamePrefix)
-        inputCopied = False
-    else:
-        files2delete.append(filenameTXT)
 
     # select the right destination db depending
     # on whether we are in validation mode
+    # (working copies, the cache is read-only,
+    # so no links as the copies are chmod'ed)
     if inputCopied:
-        fin = open(filenameTXT)
+        shutil.copyfile(cachedFiles[sqliteFile['lfn']], filenameDB)
+        files2delete.append(filenameDB)
+
+        fin = open(cachedFiles[metaFile['lfn']])
         lines = fin.readlines()
         fin.close()
         fout = open(filenameTXT, 'w')
+        files2delete.append(filenameTXT)
         if validationMode:
             fout.writelines( [ line.replace('prepMetaData ', '', 1) for line in lines if 'prodMetaData ' not in line] )
         else:
@@ -270,20 +644,18 @@ def uploadPayload(filenamePrefix, sqliteFile, metaFile, dropboxHost, validationM
             logging.info("  ==> Upload skipped for payload %s" % filenamePrefix)
         else:
             # needed by the PCL monitoring to know whether we uploaded to prod or validation
-            command = "export X509_USER_PROXY=%s\n" % serviceProxy
-            command += "env KRB5CCNAME=/tmp/bla xrdcp -s -f %s %s" % (filenameTXT, metaFile['pfn'] + ".uploaded")
-            p = subprocess.Popen(command, shell = True,
-                                 stdin=subprocess.PIPE,
-                                 stdout=subprocess.PIPE,
-                                 stderr=subprocess.STDOUT)
-            output = p.communicate()[0]
-            if p.returncode > 0:
-                logging.error("Failure during copy of .uploaded file to EOS: %s" % output)
+            error = payloadCache.transfer.put(filenameTXT, metaFile['lfn'] + ".uploaded")
+            if error != None:
+                logging.error("Failure during copy of .uploaded file to EOS: %s" % error)
                 logging.error("  ==> Upload failed for payload %s" % filenamePrefix)
             else:
                 uploadStatus = True
                 try:
-                    upload.uploadTier0Files([filenameDB], username, password)
+                    dropBox = dropboxSessions.getSession(upload.getDestHostnameFromMetaData(filenameTXT))
+                    if dropBox == None:
+                        uploadStatus = False
+                    else:
+                        upload.uploadTier0File(dropBox, filenameDB, temporaryFile = filenameTAR)
                 except:
                     logging.exception("Something went wrong with the Dropbox upload...")
                     uploadStatus = False
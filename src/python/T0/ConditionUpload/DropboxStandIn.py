@@ -0,0 +1,306 @@
+"""
+_DropboxStandIn_
+
+Local stand-in for the conditions upload service (Dropbox),
+used to load test the PCL upload without the real service.
+
+Implements the endpoints used by upload.ConditionsUploader
+
+  token                  - sign in, returns a token
+  getUploadScriptVersion - checkForUpdates, version of the upload script
+  getUploadScript        - checkForUpdates, the upload script itself
+  uploadFile             - upload of a payload tarball
+  logout                 - sign out
+
+with configurable latency and failure injection. The hostname
+of the service is part of the URL, use getUrlTemplate() as
+urlTemplate for the ConditionsUploader.
+
+"""
+import os
+import json
+import time
+import uuid
+import random
+import tarfile
+import logging
+import threading
+import cStringIO
+import cgi
+
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+from SocketServer import ThreadingMixIn
+
+from T0.ConditionUpload import upload
+
+
+class DropboxStandInServer(ThreadingMixIn, HTTPServer):
+    """
+    _DropboxStandInServer_
+
+    Threaded HTTP server, each request in its own thread
+
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class DropboxStandInHandler(BaseHTTPRequestHandler):
+    """
+    _DropboxStandInHandler_
+
+    Passes all requests on to the DropboxStandIn
+
+    """
+    def do_GET(self):
+        self.server.standIn.handle(self)
+
+    def do_POST(self):
+        # curl waits for this before sending larger bodies
+        if self.headers.getheader('expect', '').lower() == "100-continue":
+            self.wfile.write("HTTP/1.1 100 Continue\r\n\r\n")
+        self.server.standIn.handle(self)
+
+    def log_message(self, format, *args):
+        logging.debug("DropboxStandIn: %s" % (format % args))
+
+
+class DropboxStandIn(object):
+    """
+    _DropboxStandIn_
+
+    Every request is delayed by latency plus a random jitter
+    (uniform between 0 and latencyJitter seconds). Requests
+    fail with errorCode at errorRate, uploads are accepted
+    but reported as failed by the service at rejectRate.
+
+    If uploadDir is set, uploaded tarballs are kept there.
+
+    """
+    def __init__(self, port = 0, latency = 0.0, latencyJitter = 0.0,
+                 errorRate = 0.0, errorCode = 500, rejectRate = 0.0,
+                 uploadDir = None, scriptVersion = upload.__version__, seed = None):
+        """
+        _init_
+
+        """
+        self.port = port
+        self.latency = latency
+        self.latencyJitter = latencyJitter
+        self.errorRate = errorRate
+        self.errorCode = errorCode
+        self.rejectRate = rejectRate
+        self.uploadDir = uploadDir
+        self.scriptVersion = scriptVersion
+
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+        self.tokens = {}
+        self.stats = { 'requests' : {},
+                       'errors' : 0,
+                       'uploads' : 0,
+                       'rejected' : 0,
+                       'bytes' : 0 }
+
+        self.server = None
+        self.thread = None
+
+        return
+
+    def start(self):
+        """
+        _start_
+
+        Start serving in a background thread
+
+        """
+        self.server = DropboxStandInServer(("127.0.0.1", self.port), DropboxStandInHandler)
+        self.server.standIn = self
+        self.port = self.server.server_address[1]
+
+        self.thread = threading.Thread(target = self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+        logging.info("DropboxStandIn listening on port %d" % self.port)
+
+        return
+
+    def stop(self):
+        """
+        _stop_
+
+        """
+        if self.server != None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.thread.join()
+            self.server = None
+
+        return
+
+    def getUrlTemplate(self):
+        """
+        _getUrlTemplate_
+
+        URL template to use instead of upload.defaultUrlTemplate
+
+        """
+        return "http://127.0.0.1:%d/%%s/cmsDbUpload/" % self.port
+
+    def handle(self, request):
+        """
+        _handle_
+
+        Dispatch a request to the endpoint
+
+        """
+        path = request.path.split('?', 1)[0].rstrip('/')
+        endpoint = path.rsplit('/', 1)[-1]
+
+        with self.lock:
+            self.stats['requests'][endpoint] = self.stats['requests'].get(endpoint, 0) + 1
+            delay = self.latency + self.random.uniform(0, self.latencyJitter)
+            injectError = self.random.random() < self.errorRate
+            injectReject = self.random.random() < self.rejectRate
+            if injectError:
+                self.stats['errors'] += 1
+
+        if delay > 0:
+            time.sleep(delay)
+
+        # consume the request body, unless the upload parses it
+        if request.command == "POST" and (endpoint != "uploadFile" or injectError):
+            request.rfile.read(int(request.headers.getheader('content-length', 0)))
+
+        if injectError:
+            return self.respond(request, self.errorCode, "injected failure")
+
+        if endpoint == "token":
+            return self.getToken(request)
+        elif endpoint == "getUploadScriptVersion":
+            return self.respond(request, 200, str(self.scriptVersion))
+        elif endpoint == "getUploadScript":
+            return self.respond(request, 200, "")
+        elif endpoint == "uploadFile":
+            return self.uploadFile(request, injectReject)
+        elif endpoint == "logout":
+            return self.respond(request, 200, json.dumps( { 'status' : 0 } ))
+
+        return self.respond(request, 404, "unknown endpoint %s" % endpoint)
+
+    def respond(self, request, code, body):
+        """
+        _respond_
+
+        """
+        request.send_response(code)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+        return
+
+    def getCredentials(self, request):
+        """
+        _getCredentials_
+
+        Decode the basic authentication header
+
+        """
+        authorization = request.headers.getheader('authorization')
+        if authorization == None or not authorization.startswith("Basic "):
+            return None, None
+
+        try:
+            (username, password) = authorization[6:].decode('base64').split(':', 1)
+        except:
+            return None, None
+
+        return username, password
+
+    def getToken(self, request):
+        """
+        _getToken_
+
+        Any username and password is accepted
+
+        """
+        (username, password) = self.getCredentials(request)
+        if not username or not password:
+            return self.respond(request, 401, json.dumps( { 'error' : "missing credentials" } ))
+
+        token = uuid.uuid4().hex
+        with self.lock:
+            self.tokens[token] = username
+
+        return self.respond(request, 200, json.dumps( { 'token' : token } ))
+
+    def uploadFile(self, request, injectReject):
+        """
+        _uploadFile_
+
+        Check the uploaded tarball contains data.db and
+        metadata.txt and report the destination tags.
+
+        """
+        form = cgi.FieldStorage(fp = request.rfile, headers = request.headers,
+                                environ = { 'REQUEST_METHOD' : 'POST',
+                                            'CONTENT_TYPE' : request.headers.getheader('content-type') })
+
+        # the token is sent as username
+        (token, password) = self.getCredentials(request)
+        with self.lock:
+            validToken = token in self.tokens
+        if not validToken:
+            return self.respond(request, 401, json.dumps( { 'error' : "not signed in" } ))
+
+        if 'uploadedFile' not in form or 'fileName' not in form:
+            return self.respond(request, 400, json.dumps( { 'error' : "missing upload" } ))
+
+        fileName = form.getfirst('fileName')
+        data = form['uploadedFile'].value
+
+        try:
+            tarFile = tarfile.open(mode = 'r:*', fileobj = cStringIO.StringIO(data))
+            names = tarFile.getnames()
+            metadata = json.loads(tarFile.extractfile('metadata.txt').read())
+            tarFile.close()
+            if 'data.db' not in names:
+                raise RuntimeError("no data.db in upload")
+            tags = metadata['destinationTags'].keys()
+        except Exception as ex:
+            return self.respond(request, 400, json.dumps( { 'error' : "bad upload: %s" % str(ex) } ))
+
+        if self.uploadDir != None:
+            with open(os.path.join(self.uploadDir, "%s.tar.bz2" % fileName), 'wb') as f:
+                f.write(data)
+
+        with self.lock:
+            self.stats['uploads'] += 1
+            self.stats['bytes'] += len(data)
+            if injectReject:
+                self.stats['rejected'] += 1
+
+        itemStatus = {}
+        for tag in tags:
+            if injectReject:
+                itemStatus[tag] = { 'status' : 'failed', 'info' : "injected failure" }
+            else:
+                itemStatus[tag] = { 'status' : 'ok', 'info' : "" }
+
+        return self.respond(request, 200, json.dumps( { 'status' : 0,
+                                                        'upload' : { 'itemStatus' : itemStatus } } ))
+
+    def getStats(self):
+        """
+        _getStats_
+
+        """
+        with self.lock:
+            stats = dict(self.stats)
+            stats['requests'] = dict(self.stats['requests'])
+
+        return stats
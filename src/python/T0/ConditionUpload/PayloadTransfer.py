@@ -0,0 +1,269 @@
+"""
+_PayloadTransfer_
+
+Transfer backends to stage PCL payloads from and write
+upload records to EOS, plus a local cache of staged payloads.
+
+Backends implement
+
+  stage(lfns, targetDir) - copy the files to targetDir (using the
+                           lfn basename), returns the lfns that failed
+  put(localFile, lfn) - copy a local file to storage, returns an
+                        error message or None on success
+
+"""
+import os
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+import subprocess
+
+
+class XRootDTransfer(object):
+    """
+    _XRootDTransfer_
+
+    Transfers to and from EOS with xrdcp, staging
+    multiple files in a single xrdcp invocation.
+
+    The command can be replaced by an xrdcp compatible
+    substitute, like xrdcpLocal for benchmarks.
+
+    """
+    def __init__(self, serviceProxy = None, pfnPrefix = "root://eoscms//eos/cms", command = "xrdcp"):
+        """
+        _init_
+
+        """
+        self.serviceProxy = serviceProxy
+        self.pfnPrefix = pfnPrefix
+        self.command = command
+
+        self.environment = dict(os.environ)
+        self.environment['KRB5CCNAME'] = "/tmp/bla"
+        if serviceProxy != None:
+            self.environment['X509_USER_PROXY'] = serviceProxy
+
+        return
+
+    def xrdcp(self, sources, target):
+        """
+        _xrdcp_
+
+        Run xrdcp, return error output or None
+
+        """
+        p = subprocess.Popen([ self.command, "-s", "-f" ] + sources + [ target ],
+                             env = self.environment,
+                             stdin = subprocess.PIPE,
+                             stdout = subprocess.PIPE,
+                             stderr = subprocess.STDOUT)
+        output = p.communicate()[0]
+        if p.returncode > 0:
+            return output
+
+        return None
+
+    def stage(self, lfns, targetDir):
+        """
+        _stage_
+
+        """
+        if len(lfns) == 0:
+            return []
+
+        # xrdcp copies multiple sources into a directory
+        targetDir = targetDir.rstrip("/") + "/"
+        error = self.xrdcp([ self.pfnPrefix + lfn for lfn in lfns ], targetDir)
+        if error != None:
+            logging.error("Failure during copy from EOS: %s" % error)
+
+        failed = []
+        for lfn in lfns:
+            if not os.path.isfile(os.path.join(targetDir, os.path.basename(lfn))):
+                failed.append(lfn)
+
+        return failed
+
+    def put(self, localFile, lfn):
+        """
+        _put_
+
+        """
+        return self.xrdcp([ localFile ], self.pfnPrefix + lfn)
+
+
+class LocalTransfer(object):
+    """
+    _LocalTransfer_
+
+    Transfers from and to a local directory that
+    stands in for EOS, used for testing.
+
+    """
+    def __init__(self, baseDir):
+        """
+        _init_
+
+        """
+        self.baseDir = baseDir
+
+        return
+
+    def stage(self, lfns, targetDir):
+        """
+        _stage_
+
+        """
+        failed = []
+        for lfn in lfns:
+            try:
+                shutil.copyfile(self.baseDir + lfn,
+                                os.path.join(targetDir, os.path.basename(lfn)))
+            except (IOError, OSError) as ex:
+                logging.error("Failure during local copy of %s: %s" % (lfn, str(ex)))
+                failed.append(lfn)
+
+        return failed
+
+    def put(self, localFile, lfn):
+        """
+        _put_
+
+        """
+        try:
+            targetDir = os.path.dirname(self.baseDir + lfn)
+            if not os.path.isdir(targetDir):
+                os.makedirs(targetDir)
+            shutil.copyfile(localFile, self.baseDir + lfn)
+        except (IOError, OSError) as ex:
+            return str(ex)
+
+        return None
+
+
+class PayloadCache(object):
+    """
+    _PayloadCache_
+
+    Local cache of staged payload files, content addressed
+    by LFN and file size, so retries don't copy them again.
+    Entries are used read-only, callers need to copy
+    them before modifying them (or their permissions).
+
+    """
+    def __init__(self, cacheDir, transfer, maxAge = 7 * 24 * 3600):
+        """
+        _init_
+
+        """
+        self.cacheDir = cacheDir
+        self.transfer = transfer
+        self.maxAge = maxAge
+
+        if not os.path.isdir(self.cacheDir):
+            os.makedirs(self.cacheDir)
+
+        return
+
+    def getPath(self, condFile):
+        """
+        _getPath_
+
+        Cache location for a file
+
+        """
+        key = hashlib.sha1("%s:%s" % (condFile['lfn'], condFile.get('filesize'))).hexdigest()
+        return os.path.join(self.cacheDir, key[:2], key)
+
+    def isCached(self, condFile):
+        """
+        _isCached_
+
+        """
+        path = self.getPath(condFile)
+        if not os.path.isfile(path):
+            return False
+        if condFile.get('filesize') and os.path.getsize(path) != condFile['filesize']:
+            return False
+
+        return True
+
+    def stage(self, condFiles):
+        """
+        _stage_
+
+        Make sure the files are in the cache, staging
+        the missing ones in one go. Returns a dictionary
+        of lfn to cache location for the available files.
+
+        """
+        missing = [ condFile for condFile in condFiles if not self.isCached(condFile) ]
+
+        if len(missing) > 0:
+
+            stagingDir = tempfile.mkdtemp(dir = self.cacheDir)
+            try:
+                self.transfer.stage([ condFile['lfn'] for condFile in missing ], stagingDir)
+
+                for condFile in missing:
+                    stagedFile = os.path.join(stagingDir, os.path.basename(condFile['lfn']))
+                    if not os.path.isfile(stagedFile):
+                        continue
+                    if condFile.get('filesize') and os.path.getsize(stagedFile) != condFile['filesize']:
+                        logging.error("Staged file %s has wrong size, ignoring it" % condFile['lfn'])
+                        continue
+                    path = self.getPath(condFile)
+                    if not os.path.isdir(os.path.dirname(path)):
+                        try:
+                            os.makedirs(os.path.dirname(path))
+                        except OSError:
+                            # created in parallel
+                            pass
+                    os.rename(stagedFile, path)
+            finally:
+                shutil.rmtree(stagingDir, ignore_errors = True)
+
+        cachedFiles = {}
+        for condFile in condFiles:
+            if self.isCached(condFile):
+                cachedFiles[condFile['lfn']] = self.getPath(condFile)
+
+        return cachedFiles
+
+    def purge(self):
+        """
+        _purge_
+
+        Remove cache entries older than maxAge
+
+        """
+        now = time.time()
+        for (dirpath, dirnames, filenames) in os.walk(self.cacheDir):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    if now - os.path.getmtime(path) > self.maxAge:
+                        os.remove(path)
+                except OSError:
+                    pass
+
+        return
+
+def getPayloadCache(cacheDir, serviceProxy = None, backend = "xrootd", localBaseDir = None):
+    """
+    _getPayloadCache_
+
+    Create the payload cache with the configured backend
+
+    """
+    if backend == "xrootd":
+        transfer = XRootDTransfer(serviceProxy)
+    elif backend == "local":
+        transfer = LocalTransfer(localBaseDir)
+    else:
+        raise RuntimeError("Unknown payload transfer backend %s" % backend)
+
+    return PayloadCache(cacheDir, transfer)
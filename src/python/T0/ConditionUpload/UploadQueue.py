@@ -0,0 +1,206 @@
+"""
+_UploadQueue_
+
+Persistent queue of PCL payloads waiting for upload to the
+Dropbox, kept in a sqlite database on local disk.
+
+The Tier0Feeder only adds payloads to the queue, the upload
+itself is done by a separate worker thread that retries failed
+uploads with exponential backoff. The state of the queue is
+used by the Tier0Feeder to decide about PCL completion.
+
+"""
+import json
+import time
+import sqlite3
+
+
+class UploadQueue(object):
+    """
+    _UploadQueue_
+
+    Every method uses its own sqlite connection, so the queue can
+    be used from different threads (and survives restarts).
+
+    """
+    def __init__(self, path, retryDelay = 300, maxRetryDelay = 4 * 3600):
+        """
+        _init_
+
+        """
+        self.path = path
+        self.retryDelay = retryDelay
+        self.maxRetryDelay = maxRetryDelay
+
+        conn = self.connect()
+        try:
+            conn.execute("""CREATE TABLE IF NOT EXISTS payload (
+                              name            TEXT    NOT NULL,
+                              run             INTEGER NOT NULL,
+                              streamid        INTEGER NOT NULL,
+                              dropbox_host    TEXT,
+                              validation_mode INTEGER NOT NULL,
+                              files           TEXT    NOT NULL,
+                              done            INTEGER DEFAULT 0 NOT NULL,
+                              attempts        INTEGER DEFAULT 0 NOT NULL,
+                              next_attempt    INTEGER DEFAULT 0 NOT NULL,
+                              last_error      TEXT,
+                              insert_time     INTEGER NOT NULL,
+                              done_time       INTEGER,
+                              PRIMARY KEY (run, streamid, name)
+                            )""")
+            conn.commit()
+        finally:
+            conn.close()
+
+        return
+
+    def connect(self):
+        """
+        _connect_
+
+        """
+        return sqlite3.connect(self.path, timeout = 60)
+
+    def enqueue(self, run, streamid, dropboxHost, validationMode, payloads):
+        """
+        _enqueue_
+
+        Add payloads (dictionary of payload name to list of
+        files) for a run/stream. Payloads already in the queue
+        are ignored, which makes enqueuing idempotent.
+
+        """
+        binds = []
+        for name, files in payloads.items():
+            binds.append( ( name, run, streamid, dropboxHost, int(validationMode),
+                            json.dumps(files), int(time.time()) ) )
+
+        conn = self.connect()
+        try:
+            conn.executemany("""INSERT OR IGNORE INTO payload
+                                (name, run, streamid, dropbox_host, validation_mode, files, insert_time)
+                                VALUES (?, ?, ?, ?, ?, ?, ?)""", binds)
+            conn.commit()
+        finally:
+            conn.close()
+
+        return
+
+    def getDuePayloads(self, limit = 100):
+        """
+        _getDuePayloads_
+
+        Return payloads due for (another) upload attempt,
+        oldest runs first.
+
+        """
+        conn = self.connect()
+        try:
+            results = conn.execute("""SELECT name, run, streamid, dropbox_host, validation_mode, files, attempts
+                                      FROM payload
+                                      WHERE done = 0
+                                      AND next_attempt <= ?
+                                      ORDER BY run, next_attempt
+                                      LIMIT ?""", (int(time.time()), limit)).fetchall()
+        finally:
+            conn.close()
+
+        payloads = []
+        for result in results:
+            payloads.append( { 'name' : result[0],
+                               'run' : result[1],
+                               'streamid' : result[2],
+                               'dropboxHost' : result[3],
+                               'validationMode' : bool(result[4]),
+                               'files' : json.loads(result[5]),
+                               'attempts' : result[6] } )
+
+        return payloads
+
+    def markDone(self, payload):
+        """
+        _markDone_
+
+        """
+        conn = self.connect()
+        try:
+            conn.execute("""UPDATE payload
+                            SET done = 1,
+                                done_time = ?
+                            WHERE run = ? AND streamid = ? AND name = ?""",
+                         (int(time.time()), payload['run'], payload['streamid'], payload['name']))
+            conn.commit()
+        finally:
+            conn.close()
+
+        return
+
+    def markFailed(self, payload, error = None):
+        """
+        _markFailed_
+
+        Schedule the next attempt with exponential backoff
+
+        """
+        delay = min(self.retryDelay * 2 ** payload['attempts'], self.maxRetryDelay)
+
+        conn = self.connect()
+        try:
+            conn.execute("""UPDATE payload
+                            SET attempts = attempts + 1,
+                                next_attempt = ?,
+                                last_error = ?
+                            WHERE run = ? AND streamid = ? AND name = ?""",
+                         (int(time.time()) + delay, error,
+                          payload['run'], payload['streamid'], payload['name']))
+            conn.commit()
+        finally:
+            conn.close()
+
+        return delay
+
+    def getPendingRunStreams(self):
+        """
+        _getPendingRunStreams_
+
+        Return number of not yet uploaded payloads
+        and of those how many failed before, per
+        run and stream.
+
+        """
+        conn = self.connect()
+        try:
+            results = conn.execute("""SELECT run, streamid, COUNT(*), SUM(MIN(attempts, 1))
+                                      FROM payload
+                                      WHERE done = 0
+                                      GROUP BY run, streamid""").fetchall()
+        finally:
+            conn.close()
+
+        pending = {}
+        for (run, streamid, count, failed) in results:
+            if run not in pending:
+                pending[run] = {}
+            pending[run][streamid] = { 'pending' : count,
+                                       'failed' : failed }
+
+        return pending
+
+    def purge(self, age = 7 * 24 * 3600):
+        """
+        _purge_
+
+        Remove payloads uploaded longer ago than age
+
+        """
+        conn = self.connect()
+        try:
+            conn.execute("""DELETE FROM payload
+                            WHERE done = 1
+                            AND done_time < ?""", (int(time.time()) - age,))
+            conn.commit()
+        finally:
+            conn.close()
+
+        return
@@ -24,12 +24,18 @@ import errno
 import sqlite3
 import json
 import tempfile
+import threading
+import bz2
+import zlib
 
 defaultBackend = 'online'
 defaultHostname = 'cms-conddb-prod.cern.ch'
 defaultHostnamePrep = 'cms-conddb-dev.cern.ch'
 defaultUrlTemplate = 'https://%s/cmsDbUpload/'
 defaultTemporaryFile = 'upload.tar.bz2'
+defaultCodec = 'bz2'
+defaultCompressLevel = 9
+defaultSpoolThreshold = 64 * 1024 * 1024
 defaultNetrcHost = 'Dropbox'
 defaultWorkflow = 'offline'
 
@@ -408,7 +414,12 @@ class HTTP(object):
 
                     if files is not None:
                         for (key, fileName) in files.items():
-                            finalData[key] = (self.curl.FORM_FILE, fileName)
+                            # (name, data) tuples are sent from memory
+                            if isinstance(fileName, tuple):
+                                finalData[key] = (self.curl.FORM_BUFFER, fileName[0],
+                                                  self.curl.FORM_BUFFERPTR, fileName[1])
+                            else:
+                                finalData[key] = (self.curl.FORM_FILE, fileName)
                     self.curl.setopt( self.curl.HTTPPOST, finalData.items() )
 
                 self.curl.setopt(pycurl.VERBOSE, 0)
@@ -442,8 +453,98 @@ def addToTarFile(tarFile, fileobj, arcname):
     tarInfo.uname = tarInfo.gname = 'root'
     tarFile.addfile(tarInfo, fileobj)
 
+def addBufferToTarFile(tarFile, data, arcname):
+    tarInfo = tarfile.TarInfo(arcname)
+    tarInfo.size = len(data)
+    tarInfo.mode = 0o400
+    tarInfo.uid = tarInfo.gid = tarInfo.mtime = 0
+    tarInfo.uname = tarInfo.gname = 'root'
+    tarFile.addfile(tarInfo, cStringIO.StringIO(data))
+
+class PayloadSpool(object):
+    '''File-like object the payload tarball is streamed into.
+
+    Compresses and hashes the data in a single pass. The compressed
+    output is kept in memory up to spoolThreshold bytes, above that
+    it is moved to temporaryFile on disk.
+    '''
+
+    codecs = ('bz2', 'gz')
+
+    def __init__(self, temporaryFile = defaultTemporaryFile, codec = defaultCodec,
+                 compressLevel = defaultCompressLevel, spoolThreshold = defaultSpoolThreshold):
+        if codec == 'bz2':
+            self.compressor = bz2.BZ2Compressor(compressLevel)
+        elif codec == 'gz':
+            # gzip container without file name and time stamp
+            self.compressor = zlib.compressobj(compressLevel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        else:
+            raise Exception('Unknown compression codec %s, supported are %s' % (codec, ', '.join(self.codecs)))
+
+        self.temporaryFile = temporaryFile
+        self.spoolThreshold = spoolThreshold
+        self.buffer = cStringIO.StringIO()
+        self.file = None
+        self.fileName = None
+        self.hash = hashlib.sha1()
+        self.size = 0
+
+    def write(self, data):
+        self._spool(self.compressor.compress(data))
+
+    def close(self):
+        '''Flushes the compressor, the spooled data stays available.
+        '''
+        if self.compressor is not None:
+            self._spool(self.compressor.flush())
+            self.compressor = None
+        if self.file is not None:
+            self.file.close()
+
+    def _spool(self, data):
+        if not data:
+            return
+
+        self.hash.update(data)
+        self.size += len(data)
+
+        if self.file is None and self.size > self.spoolThreshold:
+            self.file = open(self.temporaryFile, 'wb')
+            self.file.write(self.buffer.getvalue())
+            self.buffer = None
+
+        if self.file is not None:
+            self.file.write(data)
+        else:
+            self.buffer.write(data)
+
+    def hexdigest(self):
+        return self.hash.hexdigest()
+
+    def getUpload(self, name):
+        '''Returns what to pass as file to HTTP.query, either a file
+        on disk called name or a (name, data) tuple from memory.
+        '''
+        if self.buffer is not None:
+            return (name, self.buffer.getvalue())
+
+        os.rename(self.temporaryFile, name)
+        self.fileName = name
+        return name
+
+    def cleanup(self):
+        if self.fileName is not None:
+            os.unlink(self.fileName)
+        elif self.file is not None and os.path.exists(self.temporaryFile):
+            os.unlink(self.temporaryFile)
+        self.buffer = None
+
 class ConditionsUploader(object):
     '''Upload conditions to the CMS conditions uploader service.
+
+    Can be shared by several threads. Sign in is done once, each
+    thread uploads through its own curl handle (a curl handle can
+    only be used by one thread at a time) with the session token.
     '''
 
     def __init__(self, hostname = defaultHostname, urlTemplate = defaultUrlTemplate):
@@ -452,6 +553,25 @@ class ConditionsUploader(object):
         self.userName = None
         self.http = HTTP()
         self.http.setBaseUrl(self.urlTemplate % hostname)
+        # protects sign in and the handle used for it
+        self.lock = threading.Lock()
+        self.threadHTTP = threading.local()
+
+
+    def getHTTP(self):
+        '''Returns the curl handle of the calling thread, with
+        the current base URL and session token.
+        '''
+
+        http = getattr(self.threadHTTP, 'http', None)
+        if http is None:
+            http = HTTP()
+            self.threadHTTP.http = http
+
+        http.setBaseUrl(self.urlTemplate % self.hostname)
+        http.token = self.http.token
+
+        return http
 
 
     def signIn(self, username, password):
@@ -460,7 +580,8 @@ class ConditionsUploader(object):
 
         logging.info('%s: Signing in user %s ...', self.hostname, username)
         try:
-            self.token = self.http.getToken(username, password)
+            with self.lock:
+                self.token = self.http.getToken(username, password)
         except Exception as e:
             logging.error("Caught exception when trying to get token for user %s from %s: %s" % (username, self.hostname, str(e)) )
             return False
@@ -517,11 +638,16 @@ class ConditionsUploader(object):
 
         return destDb
 
-    def uploadFile(self, filename, backend = defaultBackend, temporaryFile = defaultTemporaryFile):
+    def uploadFile(self, filename, backend = defaultBackend, temporaryFile = defaultTemporaryFile,
+                   codec = defaultCodec, compressLevel = defaultCompressLevel,
+                   spoolThreshold = defaultSpoolThreshold):
         '''Uploads a file to the dropBox.
 
         The filename can be without extension, with .db or with .txt extension.
         It will be stripped and then both .db and .txt files are used.
+
+        The tarball is compressed and hashed while it is written, small ones
+        are kept in memory, larger ones are spooled to temporaryFile.
         '''
 
         basepath = filename.rsplit('.db', 1)[0].rsplit('.txt', 1)[0]
@@ -529,9 +655,10 @@ class ConditionsUploader(object):
 
         logging.debug('%s: %s: extracting destDB from MetaData ...', self.hostname, basename)
         destDb = self.getDestDbFromMetaData('%s.txt' %basepath)
-        if 'prep' in destDb:
-            self.hostname = defaultHostnamePrep
-            self.http.setBaseUrl(self.urlTemplate % self.hostname)
+        if 'prep' in destDb and self.hostname != defaultHostnamePrep:
+            with self.lock:
+                self.hostname = defaultHostnamePrep
+                self.http.setBaseUrl(self.urlTemplate % self.hostname)
             logging.info('%s: %s: redirecting upload to %s service as needed for Prep DB',  self.hostname, basename, self.hostname)
         # make sure we are logged in:
         if not self.userName:
@@ -541,61 +668,51 @@ class ConditionsUploader(object):
         logging.debug('%s: %s: found destDB "%s" from MetaData, destHost updated as needed', self.hostname, basename, destDb)
 
         logging.debug('%s: %s: Creating tar file for upload ...', self.hostname, basename)
+        spool = PayloadSpool(temporaryFile, codec, compressLevel, spoolThreshold)
         try:
-            tarFile = tarfile.open(temporaryFile, 'w:bz2')
+            tarFile = tarfile.open(mode = 'w|', fileobj = spool)
 
             with open('%s.db' % basepath, 'rb') as data:
                 addToTarFile(tarFile, data, 'data.db')
         except Exception as e:
+            spool.cleanup()
             msg = 'Error when creating tar file. \n'
             msg += 'Please check that you have write access to the directory you are running,\n'
             msg += 'and that you have enough space on this disk (df -h .)\n'
             logging.error(msg)
             raise Exception(msg)
 
-        with tempfile.NamedTemporaryFile() as metadata:
-            with open('%s.txt' % basepath, 'rb') as originalMetadata:
-                json.dump(json.load(originalMetadata), metadata, sort_keys = True, indent = 4)
+        with open('%s.txt' % basepath, 'rb') as originalMetadata:
+            metadata = json.dumps(json.load(originalMetadata), sort_keys = True, indent = 4)
 
-            metadata.seek(0)
-            addToTarFile(tarFile, metadata, 'metadata.txt')
+        addBufferToTarFile(tarFile, metadata, 'metadata.txt')
 
         tarFile.close()
+        spool.close()
 
-        logging.debug('%s: %s: Calculating hash...', self.hostname, basename)
-
-        fileHash = hashlib.sha1()
-        with open(temporaryFile, 'rb') as f:
-            while True:
-                data = f.read(4 * 1024 * 1024)
-                if not data:
-                    break
-                fileHash.update(data)
-
-        fileHash = fileHash.hexdigest()
-        fileInfo = os.stat(temporaryFile)
-        fileSize = fileInfo.st_size
+        fileHash = spool.hexdigest()
+        fileSize = spool.size
 
         logging.debug('%s: %s: Hash: %s', self.hostname, basename, fileHash)
 
         logging.info('%s: %s: Uploading file (%s, size %s) to the %s backend...', self.hostname, basename, fileHash, fileSize, backend)
-        os.rename(temporaryFile, fileHash)
         try:
-            ret = self.http.query('uploadFile',
-                              {
-                                'backend': backend,
-                                'fileName': basename,
-                                'userName': self.userName,
-                              },
-                              files = {
-                                        'uploadedFile': fileHash,
-                                      }
-                              )
+            uploadedFile = spool.getUpload(fileHash)
+            ret = self.getHTTP().query('uploadFile',
+                                  {
+                                    'backend': backend,
+                                    'fileName': basename,
+                                    'userName': self.userName,
+                                  },
+                                  files = {
+                                            'uploadedFile': uploadedFile,
+                                          }
+                                  )
         except Exception as e:
             logging.error('Error from uploading: %s' % str(e))
             ret = json.dumps( { "status": -1, "upload" : { 'itemStatus' : { basename : {'status':'failed', 'info':str(e)}}}, "error" : str(e)} )
 
-        os.unlink(fileHash)
+        spool.cleanup()
 
         statusInfo = json.loads(ret)['upload']
         logging.debug( 'upload returned: %s', statusInfo )
@@ -716,6 +833,50 @@ def uploadAllFiles(options, arguments):
 
     return results
 
+def getDestHostnameFromMetaData(filename):
+    '''Returns the dropBox hostname to use for a file,
+    based on the destination database in its metadata.
+    '''
+
+    basepath = filename.rsplit('.db', 1)[0].rsplit('.txt', 1)[0]
+
+    with open('%s.txt' % basepath, 'r') as jFile:
+        md = json.load( jFile )
+
+    if 'oracle://cms_orcoff_prep' in md['destinationDatabase']:
+        return defaultHostnamePrep
+
+    return defaultHostname
+
+def uploadTier0File(dropBox, filename, temporaryFile = defaultTemporaryFile, **uploadArgs):
+    '''Uploads a single file coming from Tier0 with an already
+    signed in dropBox, ignoring errors related to the upload/content.
+
+    Additional arguments (codec, compressLevel, spoolThreshold)
+    are passed on to ConditionsUploader.uploadFile.
+    '''
+
+    try:
+        result = dropBox.uploadFile(filename, temporaryFile = temporaryFile, **uploadArgs)
+    except HTTPError as e:
+        if e.code == 400:
+            # 400 Bad Request: This is an exception related to the upload
+            # being wrong for some reason (e.g. duplicated file).
+            # Since for Tier0 this is not an issue, continue
+            logging.error('Got HTTP Exception 400 Bad Request for %s: Upload-related, skipping. Message: %s', filename, e)
+            return
+
+        # In any other case, re-raise.
+        raise
+
+    #-toDo: add a flag to say if we should retry or not. So far, all retries are done server-side (Tier-0),
+    #       if we flag as failed any retry would not help and would result in the same error (e.g.
+    #       when a file with an identical hash is uploaded again)
+    #-review(2015-09-25): get feedback from tests at Tier-0 (action: AP)
+
+    if not result: # dropbox reported an error when uploading, do not retry.
+        logging.error('Error from dropbox, upload-related, skipping.')
+
 def uploadTier0Files(filenames, username, password, cookieFileName = None):
     '''Uploads a bunch of files coming from Tier0.
     This has the following requirements:
@@ -729,27 +890,7 @@ def uploadTier0Files(filenames, username, password, cookieFileName = None):
     dropBox.signIn(username, password)
 
     for filename in filenames:
-        try:
-            result = dropBox.uploadFile(filename)
-        except HTTPError as e:
-            if e.code == 400:
-                # 400 Bad Request: This is an exception related to the upload
-                # being wrong for some reason (e.g. duplicated file).
-                # Since for Tier0 this is not an issue, continue
-                logging.error('Got HTTP Exception 400 Bad Request for %s: Upload-related, skipping. Message: %s', (filename, e) )
-                continue
-
-            # In any other case, re-raise.
-            raise
-
-        #-toDo: add a flag to say if we should retry or not. So far, all retries are done server-side (Tier-0),
-        #       if we flag as failed any retry would not help and would result in the same error (e.g.
-        #       when a file with an identical hash is uploaded again)
-        #-review(2015-09-25): get feedback from tests at Tier-0 (action: AP)
-
-        if not result: # dropbox reported an error when uploading, do not retry.
-            logging.error('Error from dropbox, upload-related, skipping.')
-            continue
+        uploadTier0File(dropBox, filename)
 
     dropBox.signOut()
 
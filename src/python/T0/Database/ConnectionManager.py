@@ -0,0 +1,428 @@
+"""
+_ConnectionManager_
+
+Access to the external databases used by the Tier0Feeder.
+
+Every database gets a ManagedDBInterface, which behaves like a
+WMCore DBInterface but
+
+  - creates its engine with a configurable connection pool size
+  - sets a statement (call) timeout on every Oracle connection
+  - on connection errors and timeouts drops the pooled connections
+    and fails fast until a retry delay (exponential backoff) is over
+  - optionally only connects on first use, so a component restart
+    does not wait for the connections (a startup health check
+    connects and pings all databases in background threads, the
+    caller waits for it before the first use to still fail fast
+    on a database that can't be reached)
+
+Calls can also be run in worker threads of the database, so
+stages waiting on one database don't block work on another. As the
+APIs usually mix queries to an external database and T0AST, every
+call in a worker thread gets its own T0AST DBInterface (myThread.dbi
+with its own Transaction), connected through the DBFactory of the
+calling thread, so it shares the connection pool but no state with
+the calling thread.
+
+"""
+import time
+import logging
+import threading
+
+from multiprocessing.pool import ThreadPool
+
+from sqlalchemy import create_engine, event
+
+from WMCore.Database.DBCore import DBInterface
+from WMCore.Database.DBFactory import DBFactory
+from WMCore.Database.Transaction import Transaction
+
+
+# error messages that mean the connection is unusable
+connectionErrors = [ "ORA-03113", "ORA-03114", "ORA-03135", "ORA-03156",
+                     "ORA-12170", "ORA-12514", "ORA-12528", "ORA-12537",
+                     "ORA-12541", "ORA-12543", "ORA-12547", "ORA-25408",
+                     "DPI-1067", "DPI-1080", "not connected",
+                     "unable to open database file" ]
+
+# DBInterface attributes passed through by ManagedDBInterface
+dbInterfaceAttributes = [ "engine", "logger", "maxBindsPerQuery", "connection",
+                          "buildbinds", "executebinds", "executemanybinds" ]
+
+
+class DatabaseUnavailable(Exception):
+    """
+    _DatabaseUnavailable_
+
+    Raised while waiting to reconnect after connection errors
+
+    """
+    pass
+
+
+def isConnectionError(ex):
+    """
+    _isConnectionError_
+
+    """
+    if getattr(ex, "connection_invalidated", False):
+        return True
+
+    message = str(ex)
+    for error in connectionErrors:
+        if error in message:
+            return True
+
+    return False
+
+def createEngine(connectUrl, poolSize = None, maxOverflow = None, statementTimeout = None):
+    """
+    _createEngine_
+
+    Connect with DBFactory, engines are shared by connect URL.
+
+    With a pool size the engine is created here and not shared,
+    DBFactory would merge the pool parameters into its class wide
+    engine defaults and so apply them to all later engines.
+
+    """
+    if poolSize != None and not connectUrl.startswith("sqlite"):
+        engine = create_engine(connectUrl, pool_size = poolSize,
+                               max_overflow = maxOverflow or 0)
+        dbInterface = DBInterface(logging, engine)
+    else:
+        dbInterface = DBFactory(logging, dburl = connectUrl, options = {}).connect()
+
+    if statementTimeout != None and connectUrl.startswith("oracle"):
+
+        def setCallTimeout(dbapiConnection, connectionRecord = None):
+            dbapiConnection.callTimeout = int(statementTimeout * 1000)
+
+        event.listen(dbInterface.engine, "connect", setCallTimeout)
+
+    return dbInterface
+
+
+class ManagedDBInterface(object):
+    """
+    _ManagedDBInterface_
+
+    DBInterface with reconnect backoff, the other DBInterface
+    attributes are the ones of the (connected) DBInterface
+
+    """
+    def __init__(self, name, dbInterface, retryDelay = 10, maxRetryDelay = 300, connector = None):
+        """
+        _init_
+
+        Without a dbInterface, connector is called
+        on first use to create it
+
+        """
+        self.name = name
+        self.dbInterface = dbInterface
+        self.connector = connector
+        self.retryDelay = retryDelay
+        self.maxRetryDelay = maxRetryDelay
+
+        self.failures = 0
+        self.nextAttempt = 0
+        self.lock = threading.Lock()
+        self.connectLock = threading.Lock()
+
+        return
+
+    def __getattr__(self, name):
+        """
+        _getattr_
+
+        Only DBInterface attributes connect, anything else
+        (hasattr checks, copy and pickle lookups) does not
+
+        """
+        if name not in dbInterfaceAttributes:
+            raise AttributeError("%s object has no attribute %s" % (self.__class__.__name__, name))
+
+        return getattr(self.getConnectedInterface(), name)
+
+    def isConnected(self):
+        """
+        _isConnected_
+
+        """
+        return self.dbInterface != None
+
+    def getConnectedInterface(self):
+        """
+        _getConnectedInterface_
+
+        The DBInterface, connects if not done yet
+
+        """
+        if self.dbInterface == None:
+            with self.connectLock:
+                if self.dbInterface == None:
+                    startTime = time.time()
+                    self.dbInterface = self.connector()
+                    logging.debug("Connected to %s database in %.2f s" % (self.name, time.time() - startTime))
+
+        return self.dbInterface
+
+    def isAvailable(self):
+        """
+        _isAvailable_
+
+        """
+        return time.time() >= self.nextAttempt
+
+    def processData(self, sqlstmt, binds = {}, conn = None,
+                    transaction = False, returnCursor = False):
+        """
+        _processData_
+
+        """
+        if not self.isAvailable():
+            raise DatabaseUnavailable("%s database unavailable, next attempt in %d s" % (self.name, self.nextAttempt - time.time()))
+
+        try:
+            result = self.getConnectedInterface().processData(sqlstmt, binds, conn = conn,
+                                                              transaction = transaction,
+                                                              returnCursor = returnCursor)
+        except Exception as ex:
+            if isConnectionError(ex):
+                self.markFailed(ex)
+            raise
+
+        if self.failures > 0:
+            with self.lock:
+                logging.info("%s database reconnected after %d failures" % (self.name, self.failures))
+                self.failures = 0
+                self.nextAttempt = 0
+
+        return result
+
+    def markFailed(self, ex):
+        """
+        _markFailed_
+
+        Drop pooled connections and back off
+
+        """
+        with self.lock:
+            self.failures += 1
+            delay = min(self.retryDelay * 2 ** (self.failures - 1), self.maxRetryDelay)
+            self.nextAttempt = time.time() + delay
+
+        logging.error("Connection problem with %s database, retrying in %d s: %s" % (self.name, delay, str(ex)))
+
+        engine = getattr(self.dbInterface, "engine", None)
+        if engine != None:
+            try:
+                engine.dispose()
+            except:
+                logging.exception("Can't drop connections of %s database" % self.name)
+
+        return
+
+    def checkHealth(self):
+        """
+        _checkHealth_
+
+        Ping the database (unless backing off),
+        returns whether it is usable
+
+        """
+        if not self.isAvailable():
+            return False
+
+        try:
+            dialectName = self.getConnectedInterface().engine.dialect.name
+        except Exception as ex:
+            self.markFailed(ex)
+            return False
+
+        if dialectName == "oracle":
+            sql = "SELECT 1 FROM DUAL"
+        else:
+            sql = "SELECT 1"
+
+        try:
+            self.processData(sql, {}, transaction = False)
+        except:
+            logging.exception("Health check of %s database failed" % self.name)
+            return False
+
+        return True
+
+
+class ConnectionManager(object):
+    """
+    _ConnectionManager_
+
+    Managed DBInterfaces and worker threads per database
+
+    """
+    def __init__(self, retryDelay = 10, maxRetryDelay = 300, dbiWrapper = None):
+        """
+        _init_
+
+        dbiWrapper is applied to the T0AST DBInterface
+        of every call in a worker thread (if given)
+
+        """
+        self.retryDelay = retryDelay
+        self.maxRetryDelay = maxRetryDelay
+        self.dbiWrapper = dbiWrapper
+
+        self.dbInterfaces = {}
+        self.workerPools = {}
+        self.workers = {}
+        self.healthCheck = None
+
+        return
+
+    def addDatabase(self, name, connectUrl, poolSize = None, maxOverflow = None,
+                    statementTimeout = None, workers = 1, lazy = False):
+        """
+        _addDatabase_
+
+        Connect a database, returns the ManagedDBInterface. With
+        lazy the connection is only made on first use.
+
+        """
+        def connector():
+            return createEngine(connectUrl, poolSize = poolSize, maxOverflow = maxOverflow,
+                                statementTimeout = statementTimeout)
+
+        dbInterface = None
+        if not lazy:
+            dbInterface = connector()
+
+        self.dbInterfaces[name] = ManagedDBInterface(name, dbInterface,
+                                                     retryDelay = self.retryDelay,
+                                                     maxRetryDelay = self.maxRetryDelay,
+                                                     connector = connector)
+        self.workers[name] = workers
+
+        return self.dbInterfaces[name]
+
+    def getDBInterface(self, name):
+        """
+        _getDBInterface_
+
+        """
+        return self.dbInterfaces[name]
+
+    def getWorkerPool(self, name):
+        """
+        _getWorkerPool_
+
+        Worker threads are started on first use
+
+        """
+        if name not in self.workerPools:
+            self.workerPools[name] = ThreadPool(max(self.workers.get(name, 1), 1))
+
+        return self.workerPools[name]
+
+    def submit(self, name, func, *args, **kwargs):
+        """
+        _submit_
+
+        Run func in a worker thread of the database, returns an
+        AsyncResult. The worker thread connects to T0AST with the
+        DBFactory of the calling thread, without one it uses the
+        T0AST DBInterface of the calling thread.
+
+        """
+        callingThread = threading.currentThread()
+        dbFactory = getattr(callingThread, "dbFactory", None)
+        dbi = getattr(callingThread, "dbi", None)
+
+        def runInWorker():
+            myThread = threading.currentThread()
+            myThread.logger = logging.getLogger()
+            if dbFactory != None:
+                myThread.dbi = dbFactory.connect()
+            else:
+                myThread.dbi = dbi
+            if self.dbiWrapper != None:
+                myThread.dbi = self.dbiWrapper(myThread.dbi)
+            myThread.transaction = Transaction(myThread.dbi)
+            return func(*args, **kwargs)
+
+        return self.getWorkerPool(name).apply_async(runInWorker)
+
+    def checkHealth(self):
+        """
+        _checkHealth_
+
+        Health of all managed databases, keyed by name
+
+        """
+        health = {}
+        for name, dbInterface in self.dbInterfaces.items():
+            health[name] = dbInterface.checkHealth()
+
+        return health
+
+    def startHealthCheck(self):
+        """
+        _startHealthCheck_
+
+        Check the health of all managed databases in background
+        threads (one per database), waitHealthCheck gets the result
+
+        """
+        names = sorted(self.dbInterfaces.keys())
+        if len(names) == 0:
+            return
+
+        checkPool = ThreadPool(len(names))
+        results = {}
+        for name in names:
+            results[name] = checkPool.apply_async(self.dbInterfaces[name].checkHealth)
+        checkPool.close()
+
+        self.healthCheck = (checkPool, results)
+
+        return
+
+    def waitHealthCheck(self):
+        """
+        _waitHealthCheck_
+
+        Wait for the health check started by startHealthCheck,
+        returns the names of the databases that are not usable
+
+        """
+        if self.healthCheck == None:
+            return []
+
+        (checkPool, results) = self.healthCheck
+        self.healthCheck = None
+
+        failed = []
+        for name in sorted(results.keys()):
+            if not results[name].get():
+                failed.append(name)
+        checkPool.join()
+
+        return failed
+
+    def close(self):
+        """
+        _close_
+
+        Stop the worker and health check threads
+
+        """
+        for workerPool in self.workerPools.values():
+            workerPool.terminate()
+        self.workerPools = {}
+
+        if self.healthCheck != None:
+            self.healthCheck[0].terminate()
+            self.healthCheck = None
+
+        return
@@ -13,6 +13,8 @@ from WMCore.JobSplitting.JobFactory import JobFactory
 from WMCore.DAOFactory import DAOFactory
 from WMCore.Services.UUIDLib import makeUUID
 
+from T0.JobSplitting.ResourcePolicy import ResourcePolicy
+
 class AlcaHarvest(JobFactory):
     """
     _AlcaHarvest_
@@ -24,6 +26,10 @@ class AlcaHarvest(JobFactory):
     the runs stop time plus timeout, issue a job for all available files,
     then issue another job at the end of processing.
 
+    If the lumisPerJob parameter is specified (multi-step harvesting), the
+    files are split into several jobs instead, each covering a lumi range
+    of at most lumisPerJob lumis.
+
     """
     def algorithm(self, *args, **kwargs):
         """
@@ -34,6 +40,12 @@ class AlcaHarvest(JobFactory):
         run = kwargs['runNumber']
         alcapromptdataset = kwargs['alcapromptdataset']
         timeout = kwargs['timeout']
+        self.lumisPerJob = kwargs.get('lumisPerJob', None)
+        self.chunkSize = kwargs.get('chunkSize', 10000)
+
+        # SiPixelAli harvesting is slow, give it more cores
+        self.resourcePolicy = ResourcePolicy(kwargs.get('resources', {}),
+                                             fixedCores = { 'PromptCalibProdSiPixelAli' : 4 })
 
         myThread = threading.currentThread()
 
@@ -58,7 +70,7 @@ class AlcaHarvest(JobFactory):
 
                     if stopTime + timeout < time.time():
 
-                        self.createJob(self.getInputFilesForJob(), alcapromptdataset)
+                        self.createJobs(self.getInputFilesForJob(), alcapromptdataset)
 
         else:
 
@@ -67,7 +79,7 @@ class AlcaHarvest(JobFactory):
 
             if availableFile:
 
-                self.createJob(self.getInputFilesForJob(), alcapromptdataset)
+                self.createJobs(self.getInputFilesForJob(), alcapromptdataset)
 
         return
 
@@ -76,28 +88,58 @@ class AlcaHarvest(JobFactory):
         _getInputFilesForJob_
 
         Just get all files in the fileset
-        and the needed metadata
+        and the needed metadata, streamed
+        from the database in chunks
 
         """
         getAllFilesDAO = self.daoFactory(classname = "Subscriptions.GetAllFiles")
-        return getAllFilesDAO.execute(self.subscription["id"])
+        return getAllFilesDAO.execute(self.subscription["id"], chunkSize = self.chunkSize)
 
-    def createJob(self, fileList, alcapromptdataset):
+    def createJobs(self, fileList, alcapromptdataset):
         """
-        _createJob_
+        _createJobs_
 
-        Create an alcaharvest job
+        Create alcaharvest jobs, a single one normally or
+        one per lumi range for multi-step harvesting.
+        The file list is ordered by lumi, files without
+        lumi information all go into one job.
 
         """
         self.newGroup()
 
+        haveJob = False
+        firstLumi = None
+        for (fileid, lfn, locations, lumi) in fileList:
+
+            if not haveJob:
+                newJob = True
+            elif not self.lumisPerJob:
+                newJob = False
+            elif lumi == None or firstLumi == None:
+                newJob = lumi != firstLumi
+            else:
+                newJob = lumi >= firstLumi + self.lumisPerJob
+
+            if newJob:
+                haveJob = True
+                firstLumi = lumi
+                self.createJob(alcapromptdataset)
+
+            f = File(id = fileid, lfn = lfn)
+            f.setLocation(locations, immediateSave = False)
+            self.currentJob.addFile(f)
+
+        return
+
+    def createJob(self, alcapromptdataset):
+        """
+        _createJob_
+
+        Create an alcaharvest job
+
+        """
         self.newJob(name = "%s-%s" % (self.jobNamePrefix, makeUUID()))
 
-        if alcapromptdataset == "PromptCalibProdSiPixelAli":
-            self.currentJob.addBaggageParameter("numberOfCores", 4)
+        self.resourcePolicy.applyToJob(self.currentJob, label = alcapromptdataset)
 
-        for fileInfo in fileList:
-            f = File(id = fileInfo['id'],
-                     lfn = fileInfo['lfn'])
-            f.setLocation(fileInfo['location'], immediateSave = False)
-            self.currentJob.addFile(f)
+        return
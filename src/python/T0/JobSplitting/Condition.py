@@ -29,13 +29,15 @@ class Condition(JobFactory):
 
         We just look at available files, process the information,
         store it in a different T0AST table and then mark the
-        files as complete.
+        files as acquired (in the transaction of the caller).
 
-        Some other component will pick up from the info we wrote.
+        Some other component will pick up from the info we wrote
+        and mark the files as complete after the upload.
 
         """
         run = kwargs['runNumber']
         stream = kwargs['streamName']
+        chunkSize = kwargs.get('chunkSize', 1000)
 
         myThread = threading.currentThread()
         daoFactory = DAOFactory(package = "T0.WMBS",
@@ -50,15 +52,48 @@ class Condition(JobFactory):
         if len(availableFiles) == 0:
             return
 
-        bindVarList = []
+        subscription = self.subscription["id"]
+
+        getPromptCalibrationFilesDAO = daoFactory(classname = "JobSplitting.GetPromptCalibrationFiles")
+        knownFiles = getPromptCalibrationFilesDAO.execute(subscription)
+
+        # files already recorded only need to be acquired
+        newFiles = []
+        knownAvailableFiles = []
         for availableFile in availableFiles:
-            bindVarList.append( { 'SUBSCRIPTION' : self.subscription["id"],
-                                  'FILEID' : availableFile['id'],
-                                  'RUN_ID' : run,
-                                  'STREAM' : stream } )
-
-        if len(bindVarList) > 0:
-            insertPromptCalibrationFileDAO = daoFactory(classname = "JobSplitting.InsertPromptCalibrationFile")
-            insertPromptCalibrationFileDAO.execute(bindVarList)
+            if availableFile['id'] in knownFiles:
+                knownAvailableFiles.append(availableFile['id'])
+            else:
+                newFiles.append(availableFile['id'])
+
+        insertPromptCalibrationFileDAO = daoFactory(classname = "JobSplitting.InsertPromptCalibrationFile")
+        acquirePromptCalibrationFileDAO = daoFactory(classname = "JobSplitting.AcquirePromptCalibrationFile")
+
+        # use the transaction of the caller if there is one
+        conn = None
+        transaction = False
+        if getattr(myThread, "transaction", None) != None and myThread.transaction.transaction != None:
+            conn = myThread.transaction.conn
+            transaction = True
+
+        for i in range(0, len(newFiles), chunkSize):
+            bindVarList = []
+            for fileid in newFiles[i:i+chunkSize]:
+                bindVarList.append( { 'SUBSCRIPTION' : subscription,
+                                      'FILEID' : fileid,
+                                      'RUN_ID' : run,
+                                      'STREAM' : stream } )
+            insertPromptCalibrationFileDAO.execute(bindVarList,
+                                                   conn = conn,
+                                                   transaction = transaction)
+
+        for i in range(0, len(knownAvailableFiles), chunkSize):
+            bindVarList = []
+            for fileid in knownAvailableFiles[i:i+chunkSize]:
+                bindVarList.append( { 'SUBSCRIPTION' : subscription,
+                                      'FILEID' : fileid } )
+            acquirePromptCalibrationFileDAO.execute(bindVarList,
+                                                    conn = conn,
+                                                    transaction = transaction)
 
         return
@@ -4,6 +4,7 @@ _Express_
 Splitting algorithm for express processing.
 """
 
+import time
 import logging
 import threading
 
@@ -13,6 +14,7 @@ from WMCore.JobSplitting.JobFactory import JobFactory
 from WMCore.DAOFactory import DAOFactory
 from WMCore.Services.UUIDLib import makeUUID
 
+from T0.JobSplitting.ResourcePolicy import ResourcePolicy
 
 class Express(JobFactory):
     """
@@ -32,6 +34,8 @@ class Express(JobFactory):
         self.maxInputRate = kwargs['maxInputRate']
         self.maxInputEvents = kwargs['maxInputEvents']
 
+        self.resourcePolicy = ResourcePolicy(kwargs.get('resources', {}))
+
         self.createdGroup = False
         
         timePerEvent, sizePerEvent, memoryRequirement = \
@@ -44,6 +48,16 @@ class Express(JobFactory):
 
         # keep for later
         self.insertSplitLumisDAO = daoFactory(classname = "JobSplitting.InsertSplitLumis")
+        self.updateSubscriptionMetricsDAO = daoFactory(classname = "JobSplitting.UpdateSubscriptionMetrics")
+        self.insertExpressJobTimeDAO = daoFactory(classname = "JobSplitting.InsertExpressJobTime")
+
+        # split lumis and over-rate streamers are collected over
+        # the whole splitter pass and written out all at once
+        self.splitLumis = []
+        self.failedStreamers = []
+        self.failedLumis = 0
+        self.failedEvents = 0
+        self.jobLumis = set()
 
         # data discovery
         getFilesDAO = daoFactory(classname = "Subscriptions.GetAvailableExpressFiles")
@@ -64,6 +78,27 @@ class Express(JobFactory):
 
         self.defineJobs(streamersByLumi, timePerEvent, sizePerEvent, memoryRequirement)
 
+        if len(self.failedStreamers) > 0:
+            self.markFailed(self.failedStreamers)
+            self.updateSubscriptionMetricsDAO.execute(binds = { 'SUB' : self.subscription["id"],
+                                                                'LUMIS' : self.failedLumis,
+                                                                'FILES' : len(self.failedStreamers),
+                                                                'EVENTS' : self.failedEvents,
+                                                                'TIME' : int(time.time()) })
+
+        if len(self.splitLumis) > 0:
+            self.insertSplitLumisDAO.execute(binds = self.splitLumis)
+
+        # job creation time per lumi, for latency monitoring
+        if len(self.jobLumis) > 0:
+            jobTime = int(time.time())
+            binds = []
+            for lumi in self.jobLumis:
+                binds.append( { 'SUB' : self.subscription["id"],
+                                'LUMI' : lumi,
+                                'TIME' : jobTime } )
+            self.insertExpressJobTimeDAO.execute(binds = binds)
+
         return
 
 
@@ -76,8 +111,6 @@ class Express(JobFactory):
         """
         logging.debug("defineJobs(): Running...")
 
-        splitLumis = []
-
         for lumi in sorted(streamersByLumi.keys()):
 
             lumiStreamerList = streamersByLumi[lumi]
@@ -91,7 +124,11 @@ class Express(JobFactory):
 
             # check if we are over the max allowed rate
             if lumiEventsTotal > self.maxInputRate:
-                self.markFailed(lumiStreamerList)
+                logging.info("Lumi %d over max rate (%d events), failing %d streamers" % (lumi, lumiEventsTotal,
+                                                                                        len(lumiStreamerList)))
+                self.failedStreamers.extend(lumiStreamerList)
+                self.failedLumis += 1
+                self.failedEvents += lumiEventsTotal
                 continue
 
             createdJobs = 0
@@ -127,11 +164,8 @@ class Express(JobFactory):
                 createdJobs += 1
 
             if createdJobs > 1:
-                splitLumis.append( { 'SUB' : self.subscription["id"],
-                                     'LUMI' : lumi, 'NFILES' : nFiles } )
-
-        if len(splitLumis) > 0:
-            self.insertSplitLumisDAO.execute(binds = splitLumis)
+                self.splitLumis.append( { 'SUB' : self.subscription["id"],
+                                          'LUMI' : lumi, 'NFILES' : nFiles } )
 
         return
 
@@ -155,6 +189,10 @@ class Express(JobFactory):
                      lfn = streamer['lfn'])
             f.setLocation(streamer['location'], immediateSave = False)
             self.currentJob.addFile(f)
+            self.jobLumis.add(streamer['lumi'])
+
+        numberOfCores = self.resourcePolicy.applyToJob(self.currentJob,
+                                                       inputSize = jobSize)
 
         # job time based on
         #   - 5 min initialization (twice)
@@ -168,7 +206,8 @@ class Express(JobFactory):
         jobTime = 600 + jobSize/500000 + jobEvents*timePerEvent + (jobEvents*sizePerEvent*2)/5000000
         self.currentJob.addResourceEstimates(jobTime = min(jobTime, 47*3600),
                                              disk = min(jobSize/1024 + jobEvents*sizePerEvent, 20000000),
-                                             memory = memoryRequirement)
+                                             memory = self.resourcePolicy.getMemory(numberOfCores,
+                                                                                    memoryRequirement))
 
         return
 
@@ -177,7 +216,7 @@ class Express(JobFactory):
         """
         _markFailed_
 
-        mark all streamers as failed
+        mark all streamers as failed (single bulk operation)
         """
         fileList = []
         for streamer in streamerList:
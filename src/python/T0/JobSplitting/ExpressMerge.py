@@ -14,6 +14,7 @@ from WMCore.JobSplitting.JobFactory import JobFactory
 from WMCore.DAOFactory import DAOFactory
 from WMCore.Services.UUIDLib import makeUUID
 
+from T0.JobSplitting.ResourcePolicy import ResourcePolicy
 
 class ExpressMerge(JobFactory):
     """
@@ -35,6 +36,9 @@ class ExpressMerge(JobFactory):
         self.maxLatency = kwargs['maxLatency']
         self.currentTime = time.time()
 
+        self.resourcePolicy = ResourcePolicy(kwargs.get('resources', {}),
+                                             memory = 1000)
+
         self.createdGroup = False
 
         myThread = threading.currentThread()
@@ -178,6 +182,9 @@ class ExpressMerge(JobFactory):
             f.setLocation(fileInfo['location'], immediateSave = False)
             self.currentJob.addFile(f)
 
+        numberOfCores = self.resourcePolicy.applyToJob(self.currentJob,
+                                                       inputSize = jobSize+largestFile)
+
         # job time based on
         #   - 5 min initialization
         #   - 5MB/s merge speed
@@ -189,6 +196,6 @@ class ExpressMerge(JobFactory):
         jobTime = 300 + (jobSize*3)/5000000
         self.currentJob.addResourceEstimates(jobTime = jobTime,
                                              disk = (jobSize+largestFile)/1024,
-                                             memory = 1000)
+                                             memory = self.resourcePolicy.getMemory(numberOfCores))
 
         return
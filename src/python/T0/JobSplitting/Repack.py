@@ -14,6 +14,7 @@ from WMCore.JobSplitting.JobFactory import JobFactory
 from WMCore.DAOFactory import DAOFactory
 from WMCore.Services.UUIDLib import makeUUID
 
+from T0.JobSplitting.ResourcePolicy import ResourcePolicy
 
 class Repack(JobFactory):
     """
@@ -36,6 +37,10 @@ class Repack(JobFactory):
         self.maxInputFiles = kwargs['maxInputFiles']
         self.maxLatency = kwargs['maxLatency']
 
+        # allow large (single lumi) repack to use multiple cores
+        self.resourcePolicy = ResourcePolicy(kwargs.get('resources', {}),
+                                             sizePerCore = 20*1000*1000*1000)
+
         self.currentTime = time.time()
 
         self.createdGroup = False
@@ -51,6 +56,10 @@ class Repack(JobFactory):
         # keep for later
         self.insertSplitLumisDAO = daoFactory(classname = "JobSplitting.InsertSplitLumis")
 
+        # split lumis are collected over the whole
+        # splitter pass and written out all at once
+        self.splitLumis = []
+
         # data discovery
         getAvailableFilesDAO = daoFactory(classname = "Subscriptions.GetAvailableRepackFiles")
         availableFiles = getAvailableFilesDAO.execute(self.subscription["id"])
@@ -138,6 +147,9 @@ class Repack(JobFactory):
             fileset.load()
             self.defineJobs(filesByLumi, not fileset.open, memoryRequirement)
 
+        if len(self.splitLumis) > 0:
+            self.insertSplitLumisDAO.execute(binds = self.splitLumis)
+
         return
 
     def getDataAge(self, filesByLumi):
@@ -167,8 +179,6 @@ class Repack(JobFactory):
         jobEventsTotal = 0
         jobStreamerList = []
 
-        splitLumis = []
-
         for lumi in sorted(streamersByLumi.keys()):
 
             lumiStreamerList = streamersByLumi[lumi]
@@ -231,8 +241,8 @@ class Repack(JobFactory):
                     createdJobs += 1
 
                 if createdJobs > 1:
-                    splitLumis.append( { 'SUB' : self.subscription["id"],
-                                         'LUMI' : lumi, 'NFILES' : nFiles } )
+                    self.splitLumis.append( { 'SUB' : self.subscription["id"],
+                                              'LUMI' : lumi, 'NFILES' : nFiles } )
 
             # lumi is smaller than split limits
             # check if it can be combined with previous lumi(s)
@@ -276,9 +286,6 @@ class Repack(JobFactory):
         if len(jobStreamerList) > 0 and forceClose:
             self.createJob(jobStreamerList, jobEventsTotal, jobSizeTotal, memoryRequirement)
 
-        if len(splitLumis) > 0:
-            self.insertSplitLumisDAO.execute(binds = splitLumis)
-
         return
 
 
@@ -301,10 +308,8 @@ class Repack(JobFactory):
             f.setLocation(streamer['location'], immediateSave = False)
             self.currentJob.addFile(f)
 
-        # allow large (single lumi) repack to use multiple cores
-        numberOfCores = 1 + (int)((jobSize+largestFile)/(20*1000*1000*1000))
-        if numberOfCores > 1:
-            self.currentJob.addBaggageParameter("numberOfCores", numberOfCores)
+        numberOfCores = self.resourcePolicy.applyToJob(self.currentJob,
+                                                       inputSize = jobSize+largestFile)
 
         # job time based on
         #  - 5 min initialization
@@ -317,6 +322,7 @@ class Repack(JobFactory):
         jobTime = 300 + jobSize/1500000 + (jobSize*2)/5000000
         self.currentJob.addResourceEstimates(jobTime = jobTime,
                                              disk = jobSize/1024,
-                                             memory = memoryRequirement)
+                                             memory = self.resourcePolicy.getMemory(numberOfCores,
+                                                                                    memoryRequirement))
 
         return
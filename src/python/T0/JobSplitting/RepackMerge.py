@@ -14,6 +14,7 @@ from WMCore.JobSplitting.JobFactory import JobFactory
 from WMCore.DAOFactory import DAOFactory
 from WMCore.Services.UUIDLib import makeUUID
 
+from T0.JobSplitting.ResourcePolicy import ResourcePolicy
 
 class RepackMerge(JobFactory):
     """
@@ -38,6 +39,11 @@ class RepackMerge(JobFactory):
         self.maxOverSize = kwargs['maxOverSize']
         self.maxLatency = kwargs['maxLatency']
 
+        # allow large (single lumi) repackmerge to use multiple cores
+        self.resourcePolicy = ResourcePolicy(kwargs.get('resources', {}),
+                                             sizePerCore = 20*1000*1000*1000,
+                                             memory = 1000)
+
         # catch configuration errors
         if self.maxOverSize > self.maxEdmSize:
             self.maxOverSize = self.maxEdmSize
@@ -325,10 +331,8 @@ class RepackMerge(JobFactory):
         if errorDataset:
             self.currentJob.addBaggageParameter("useErrorDataset", True)
 
-        # allow large (single lumi) repackmerge to use multiple cores
-        numberOfCores = 1 + (int)((jobSize+largestFile)/(20*1000*1000*1000))
-        if numberOfCores > 1:
-            self.currentJob.addBaggageParameter("numberOfCores", numberOfCores)
+        numberOfCores = self.resourcePolicy.applyToJob(self.currentJob,
+                                                       inputSize = jobSize+largestFile)
 
         # job time based on
         #  - 5 min initialization
@@ -341,6 +345,6 @@ class RepackMerge(JobFactory):
         jobTime = 300 + (jobSize*3)/5000000
         self.currentJob.addResourceEstimates(jobTime = jobTime,
                                              disk = (jobSize+largestFile)/1024,
-                                             memory = 1000)
+                                             memory = self.resourcePolicy.getMemory(numberOfCores))
 
         return
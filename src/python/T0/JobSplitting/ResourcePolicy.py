@@ -0,0 +1,114 @@
+"""
+_ResourcePolicy_
+
+Core and memory allocation for jobs created by the T0 splitters.
+
+The policy is configured per job type from the Tier0 configuration
+(Repack and Express stream sections) and passed to the splitters as
+part of the splitting parameters. It is a plain dictionary with the
+following (all optional) keys:
+
+  sizePerCore - input size (in bytes) handled by a single core, jobs
+                with larger input get additional cores
+  slotShapes - list of allowed core counts for multicore jobs, a
+               multicore job is rounded up to the next allowed shape
+               or down to the largest one if there is none
+  maxCores - upper limit on the number of cores for a job, with slot
+             shapes only the shapes up to maxCores are used
+  fixedCores - dictionary mapping a label (alcapromptdataset for
+               AlcaHarvest) to a fixed number of cores
+  memory - base memory requirement in MB
+  memoryPerCore - additional memory in MB for every core above one
+
+"""
+
+
+class ResourcePolicy(object):
+    """
+    _ResourcePolicy_
+
+    Decide on number of cores and memory requirement of a job
+
+    """
+    def __init__(self, settings = None, sizePerCore = None,
+                 fixedCores = None, memory = None):
+        """
+        _init_
+
+        The keyword arguments are the defaults for the job type,
+        they are overwritten by the passed in settings.
+
+        """
+        if settings == None:
+            settings = {}
+
+        self.sizePerCore = settings.get('sizePerCore', sizePerCore)
+        self.slotShapes = sorted(settings.get('slotShapes', []))
+        self.maxCores = settings.get('maxCores', None)
+        self.fixedCores = settings.get('fixedCores', fixedCores or {})
+        self.memory = settings.get('memory', memory)
+        self.memoryPerCore = settings.get('memoryPerCore', 0)
+
+        return
+
+    def getNumberOfCores(self, inputSize = 0, label = None):
+        """
+        _getNumberOfCores_
+
+        Number of cores for a job, based on either a fixed
+        assignment for the label or the job input size.
+
+        """
+        if label in self.fixedCores:
+            numberOfCores = self.fixedCores[label]
+        elif self.sizePerCore:
+            numberOfCores = 1 + int(inputSize / self.sizePerCore)
+        else:
+            numberOfCores = 1
+
+        slotShapes = self.slotShapes
+        if self.maxCores != None:
+            slotShapes = [ x for x in slotShapes if x <= self.maxCores ]
+
+        # pack multicore jobs into the configured slot shapes,
+        # jobs above the largest shape get the largest shape
+        if numberOfCores > 1 and len(slotShapes) > 0:
+            fittingShapes = [ x for x in slotShapes if x >= numberOfCores ]
+            if len(fittingShapes) > 0:
+                numberOfCores = fittingShapes[0]
+            else:
+                numberOfCores = slotShapes[-1]
+        elif self.maxCores != None:
+            numberOfCores = min(numberOfCores, self.maxCores)
+
+        return max(numberOfCores, 1)
+
+    def getMemory(self, numberOfCores = 1, defaultMemory = None):
+        """
+        _getMemory_
+
+        Memory requirement for a job using the given number of cores.
+        The default memory is used if the policy does not define one.
+
+        """
+        memory = self.memory
+        if memory == None:
+            memory = defaultMemory
+        if memory == None:
+            return None
+
+        return memory + (numberOfCores - 1) * self.memoryPerCore
+
+    def applyToJob(self, job, inputSize = 0, label = None):
+        """
+        _applyToJob_
+
+        Set the number of cores for a job (only multicore
+        jobs get it set explicitely) and return it.
+
+        """
+        numberOfCores = self.getNumberOfCores(inputSize, label)
+        if numberOfCores > 1:
+            job.addBaggageParameter("numberOfCores", numberOfCores)
+
+        return numberOfCores
@@ -0,0 +1,164 @@
+"""
+_CycleStages_
+
+Stages of a Tier0Feeder cycle that can wait, run after the latency
+critical stages (run configuration, Express release, lumi closing,
+streamer feeding and fileset closing) in priority order.
+
+Stages can have a soft time budget. A budgeted stage gets a deadline
+(absolute time, also limited by the cycle budget) and stops working
+when it is reached, after finishing the current unit of work, and
+continues from there in the next cycle. What is done is kept in
+T0AST, so that is the checkpoint. A stage that stopped at its
+deadline with work left counts as deferred, a stage that ran longer
+than its budget counts as overrun. Without configured budgets stages
+get no deadline.
+
+A failing stage fails the cycle, the stages after it are not run.
+
+"""
+import time
+import logging
+
+
+class CycleStages(object):
+    """
+    _CycleStages_
+
+    """
+    def __init__(self, budgets = None, cycleBudget = None):
+        """
+        _init_
+
+        budgets are the soft time budgets per stage name in seconds,
+        cycleBudget limits the deadlines to that many seconds after
+        the cycle started
+
+        """
+        self.budgets = budgets or {}
+        self.cycleBudget = cycleBudget
+
+        self.stages = []
+        self.metrics = {}
+
+        return
+
+    def addStage(self, name, priority, func, budgeted = False, leaderOnly = True):
+        """
+        _addStage_
+
+        Lower priority values run first. Budgeted stage functions
+        need to accept a deadline argument (None for no deadline)
+        and return False if they stopped at the deadline with
+        work left.
+
+        """
+        self.stages.append( { 'name' : name,
+                              'priority' : priority,
+                              'func' : func,
+                              'budgeted' : budgeted,
+                              'leaderOnly' : leaderOnly } )
+        self.stages.sort(key = lambda x: x['priority'])
+
+        self.metrics[name] = { 'runs' : 0,
+                               'failures' : 0,
+                               'seconds' : 0.0,
+                               'maxSeconds' : 0.0,
+                               'deferred' : 0,
+                               'overruns' : 0,
+                               'overrunSeconds' : 0.0 }
+
+        return
+
+    def getDeadline(self, name, startTime, cycleStart):
+        """
+        _getDeadline_
+
+        """
+        deadline = None
+
+        budget = self.budgets.get(name)
+        if budget != None:
+            deadline = startTime + budget
+
+        if self.cycleBudget != None:
+            if deadline == None:
+                deadline = cycleStart + self.cycleBudget
+            else:
+                deadline = min(deadline, cycleStart + self.cycleBudget)
+
+        return deadline
+
+    def run(self, cycleStart, leader = True, renewFunc = None):
+        """
+        _run_
+
+        Run the stages in priority order, a failing
+        stage is recorded and its error raised
+
+        renewFunc is called before every stage (sharded workers
+        renew their leases there) and returns whether this worker
+        is (still) the leader, it replaces leader if given
+
+        """
+        for stage in self.stages:
+
+            if renewFunc != None:
+                leader = renewFunc()
+
+            if stage['leaderOnly'] and not leader:
+                continue
+
+            name = stage['name']
+            metrics = self.metrics[name]
+
+            startTime = time.time()
+
+            deadline = None
+            if stage['budgeted']:
+                deadline = self.getDeadline(name, startTime, cycleStart)
+
+            complete = None
+            try:
+                if stage['budgeted']:
+                    complete = stage['func'](deadline)
+                else:
+                    stage['func']()
+            except:
+                metrics['runs'] += 1
+                metrics['failures'] += 1
+                logging.error("Tier0Feeder stage %s failed" % name)
+                raise
+
+            endTime = time.time()
+            duration = endTime - startTime
+
+            metrics['runs'] += 1
+            metrics['seconds'] += duration
+            metrics['maxSeconds'] = max(metrics['maxSeconds'], duration)
+
+            if complete == False:
+                metrics['deferred'] += 1
+                logging.info("Tier0Feeder stage %s used up its time budget, continuing next cycle" % name)
+
+            budget = self.budgets.get(name)
+            if budget != None and duration > budget:
+                metrics['overruns'] += 1
+                metrics['overrunSeconds'] += duration - budget
+                logging.warning("Tier0Feeder stage %s took %.1f s, over its budget of %.1f s (%d overruns since startup)" %
+                                (name, duration, budget, metrics['overruns']))
+
+        return
+
+    def getMetrics(self):
+        """
+        _getMetrics_
+
+        Totals per stage since startup
+
+        """
+        metrics = {}
+        for name, stageMetrics in self.metrics.items():
+            metrics[name] = dict(stageMetrics)
+
+        return metrics
@@ -0,0 +1,139 @@
+"""
+_PollScheduler_
+
+Adaptive poll interval for the Tier0Feeder.
+
+The worker thread wakes up every check interval (a few seconds) and
+asks the scheduler whether a cycle is due. A cycle is due once the
+current poll interval passed since the last cycle started, or right
+away if the wakeup trigger fired (new data signalled by the
+StorageManager).
+
+The stages of a cycle record what they found (new runs, closed
+lumis, streamers feed). After a cycle with activity the interval is
+shortened, after an idle cycle it is lengthened, always staying
+between the configured minimum and maximum.
+
+"""
+import time
+import logging
+import threading
+
+
+class PollScheduler(object):
+    """
+    _PollScheduler_
+
+    """
+    def __init__(self, pollInterval, minInterval = None, maxInterval = None,
+                 speedupFactor = 0.5, slowdownFactor = 1.5, wakeupTrigger = None):
+        """
+        _init_
+
+        Interval bounds default to the poll interval
+
+        """
+        if minInterval == None:
+            minInterval = pollInterval
+        if maxInterval == None:
+            maxInterval = pollInterval
+
+        self.minInterval = minInterval
+        self.maxInterval = maxInterval
+        self.speedupFactor = speedupFactor
+        self.slowdownFactor = slowdownFactor
+        self.wakeupTrigger = wakeupTrigger
+
+        self.interval = min(max(pollInterval, minInterval), maxInterval)
+        self.lastCycle = None
+
+        self.activity = {}
+        self.lock = threading.Lock()
+
+        return
+
+    def recordActivity(self, name, count):
+        """
+        _recordActivity_
+
+        Called by the cycle stages, can be called from
+        the database worker threads as well
+
+        """
+        if count > 0:
+            with self.lock:
+                self.activity[name] = self.activity.get(name, 0) + count
+
+        return
+
+    def isDue(self, currentTime = None):
+        """
+        _isDue_
+
+        Whether a cycle should run now
+
+        """
+        if currentTime == None:
+            currentTime = time.time()
+
+        if self.lastCycle == None:
+            return True
+
+        if self.wakeupTrigger != None:
+            try:
+                if self.wakeupTrigger.check():
+                    logging.debug("Tier0Feeder woken up by %s" % self.wakeupTrigger.name)
+                    return True
+            except:
+                logging.exception("Can't check %s wakeup trigger" % self.wakeupTrigger.name)
+
+        return currentTime >= self.lastCycle + self.interval
+
+    def startCycle(self, currentTime = None):
+        """
+        _startCycle_
+
+        """
+        if currentTime == None:
+            currentTime = time.time()
+
+        self.lastCycle = currentTime
+
+        with self.lock:
+            self.activity = {}
+
+        return
+
+    def endCycle(self):
+        """
+        _endCycle_
+
+        Adapt the interval to the activity of the cycle,
+        returns the new interval
+
+        """
+        with self.lock:
+            activity = dict(self.activity)
+
+        interval = self.interval
+        if len(activity) > 0:
+            interval = max(interval * self.speedupFactor, self.minInterval)
+        else:
+            interval = min(interval * self.slowdownFactor, self.maxInterval)
+
+        if interval != self.interval:
+            logging.debug("Tier0Feeder poll interval now %.1f s, last cycle activity: %s" % (interval,
+                                                                                          ", ".join([ "%s %d" % x for x in sorted(activity.items()) ]) or "none"))
+        self.interval = interval
+
+        return interval
+
+    def close(self):
+        """
+        _close_
+
+        """
+        if self.wakeupTrigger != None:
+            self.wakeupTrigger.close()
+
+        return
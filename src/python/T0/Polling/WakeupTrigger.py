@@ -0,0 +1,262 @@
+"""
+_WakeupTrigger_
+
+External triggers that wake up the Tier0Feeder before its poll
+interval is over, usually when the StorageManager has new data.
+
+Triggers implement
+
+  check() - returns whether the trigger fired since the last check
+  close() - release resources
+
+  file     - fires when the modification time of a file changes
+             (touched by the StorageManager or an operator)
+  socket   - fires when a datagram arrives on a UNIX socket
+             (e.g. echo new | socat - UNIX-SENDTO:/path/to/socket),
+             the socket is shared by all feeder workers of a component
+  database - fires when new streamers show up in T0AST
+             (the StorageManager inserts them directly)
+
+"""
+import os
+import socket
+import logging
+import threading
+
+from WMCore.DAOFactory import DAOFactory
+
+
+class FileTrigger(object):
+    """
+    _FileTrigger_
+
+    """
+    name = "file"
+
+    def __init__(self, path):
+        """
+        _init_
+
+        """
+        self.path = path
+        self.mtime = self.getModificationTime()
+
+        return
+
+    def getModificationTime(self):
+        """
+        _getModificationTime_
+
+        """
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def check(self):
+        """
+        _check_
+
+        """
+        mtime = self.getModificationTime()
+        if mtime == self.mtime:
+            return False
+
+        self.mtime = mtime
+
+        return mtime != None
+
+    def close(self):
+        """
+        _close_
+
+        """
+        return
+
+
+class SocketTrigger(object):
+    """
+    _SocketTrigger_
+
+    Non-blocking UNIX datagram socket, all pending messages are
+    read on poll. One per path and process, the feeder workers
+    check it through their own SocketTriggerListener.
+
+    """
+    def __init__(self, path):
+        """
+        _init_
+
+        """
+        self.path = path
+        self.fired = 0
+        self.listeners = 0
+        self.lock = threading.Lock()
+
+        if os.path.exists(path):
+            os.unlink(path)
+
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.socket.bind(path)
+        self.socket.setblocking(0)
+
+        return
+
+    def poll(self):
+        """
+        _poll_
+
+        Read all pending messages, returns
+        how often the trigger fired so far
+
+        """
+        with self.lock:
+            received = False
+            while True:
+                try:
+                    self.socket.recv(4096)
+                except socket.error:
+                    break
+                received = True
+
+            if received:
+                self.fired += 1
+
+            return self.fired
+
+    def close(self):
+        """
+        _close_
+
+        """
+        self.socket.close()
+
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+        return
+
+
+# socket triggers by path, shared by the feeder workers
+socketTriggers = {}
+socketTriggersLock = threading.Lock()
+
+class SocketTriggerListener(object):
+    """
+    _SocketTriggerListener_
+
+    Fires when the shared socket trigger fired since the
+    last check, the socket is closed with its last listener
+
+    """
+    name = "socket"
+
+    def __init__(self, path):
+        """
+        _init_
+
+        """
+        with socketTriggersLock:
+            if path not in socketTriggers:
+                socketTriggers[path] = SocketTrigger(path)
+            self.trigger = socketTriggers[path]
+            self.trigger.listeners += 1
+
+        self.fired = self.trigger.fired
+
+        return
+
+    def check(self):
+        """
+        _check_
+
+        """
+        fired = self.trigger.poll()
+        if fired == self.fired:
+            return False
+
+        self.fired = fired
+
+        return True
+
+    def close(self):
+        """
+        _close_
+
+        """
+        if self.trigger == None:
+            return
+
+        with socketTriggersLock:
+            self.trigger.listeners -= 1
+            if self.trigger.listeners == 0:
+                del socketTriggers[self.trigger.path]
+                self.trigger.close()
+        self.trigger = None
+
+        return
+
+
+class DatabaseTrigger(object):
+    """
+    _DatabaseTrigger_
+
+    Compares the highest streamer id in T0AST (primary
+    key lookup) with the one seen on the last check
+
+    """
+    name = "database"
+
+    def __init__(self):
+        """
+        _init_
+
+        """
+        self.maxStreamerId = None
+
+        return
+
+    def check(self):
+        """
+        _check_
+
+        """
+        myThread = threading.currentThread()
+
+        daoFactory = DAOFactory(package = "T0.WMBS",
+                                logger = logging,
+                                dbinterface = myThread.dbi)
+
+        getMaxStreamerIdDAO = daoFactory(classname = "Tier0Feeder.GetMaxStreamerId")
+        maxStreamerId = getMaxStreamerIdDAO.execute(transaction = False)
+
+        fired = self.maxStreamerId != None and maxStreamerId != self.maxStreamerId
+        self.maxStreamerId = maxStreamerId
+
+        return fired
+
+    def close(self):
+        """
+        _close_
+
+        """
+        return
+
+
+def getWakeupTrigger(backend, path = None):
+    """
+    _getWakeupTrigger_
+
+    Create the configured wakeup trigger
+
+    """
+    if backend == "file":
+        return FileTrigger(path)
+    elif backend == "socket":
+        return SocketTriggerListener(path)
+    elif backend == "database":
+        return DatabaseTrigger()
+
+    raise RuntimeError("Unknown wakeup trigger %s" % backend)
@@ -0,0 +1,142 @@
+"""
+_T0RequestDBWriter_
+
+RequestDBWriter with bulk operations for the Tier0 workflow monitoring.
+
+insertGenericRequest and updateRequestStatus need one or two HTTP
+requests per workflow. The bulk versions below use one _bulk_docs
+request (plus one _all_docs request to read the current documents for
+status updates) and return the outcome per document, so that only the
+successful workflows are marked in workflow_monitoring.
+
+"""
+import time
+
+from WMCore.Database.CMSCouch import Document
+from WMCore.Services.RequestDB.RequestDBWriter import RequestDBWriter
+
+# same as the updaterequest update handler of the T0Request couchapp
+allowedStates = [ "new", "Closed", "Merge", "AlcaSkim", "Harvesting",
+                  "Processing Done", "completed", "normal-archived" ]
+
+def isAllowedTransition(oldStatus, newStatus):
+    """
+    _isAllowedTransition_
+
+    Same rules as the updaterequest update handler
+    of the T0Request couchapp
+
+    """
+    if oldStatus == None:
+        return True
+    if oldStatus == "completed" and newStatus != "normal-archived":
+        return False
+    if oldStatus == "normal-archived":
+        return False
+    if oldStatus == newStatus:
+        return False
+
+    return True
+
+def getBulkResult(result, conflict):
+    """
+    _getBulkResult_
+
+    OK for a written document, conflict for an
+    update conflict, the couch error otherwise
+
+    """
+    if 'error' not in result:
+        return "OK"
+    if result['error'] == "conflict":
+        return conflict
+
+    return "%s: %s" % (result['error'], result.get('reason', ""))
+
+
+class T0RequestDBWriter(RequestDBWriter):
+    """
+    _T0RequestDBWriter_
+
+    """
+    def bulkCommit(self, docs):
+        """
+        _bulkCommit_
+
+        Write the documents in one _bulk_docs request, returns
+        the per document results. Not using the couch queue
+        since it commits on its own when it gets too large.
+
+        """
+        return self.couchDB.post("/%s/_bulk_docs/" % self.couchDB.name,
+                                 { 'docs' : docs })
+
+    def insertGenericRequests(self, docs):
+        """
+        _insertGenericRequests_
+
+        Insert request documents with status new, returns
+        a dictionary of request name to OK (inserted),
+        EXISTS (already in couch) or the couch error.
+
+        """
+        results = {}
+        if len(docs) == 0:
+            return results
+
+        transition = { "Status" : "new",
+                       "UpdateTime" : int(time.time()) }
+
+        bulkDocs = []
+        for doc in docs:
+            doc = Document(doc["RequestName"], doc)
+            doc["RequestStatus"] = "new"
+            doc["RequestTransition"] = [ transition ]
+            bulkDocs.append(doc)
+
+        for result in self.bulkCommit(bulkDocs):
+            results[result['id']] = getBulkResult(result, "EXISTS")
+
+        return results
+
+    def updateRequestsStatus(self, requests, status):
+        """
+        _updateRequestsStatus_
+
+        Change the status of the requests, returns a dictionary
+        of request name to OK (updated), NOCHANGE (transition not
+        allowed, usually the status was already set) or an error.
+
+        """
+        results = {}
+        if len(requests) == 0:
+            return results
+
+        if status not in allowedStates:
+            raise RuntimeError("Request status %s not allowed" % status)
+
+        transition = { "Status" : status,
+                       "UpdateTime" : int(time.time()) }
+
+        response = self.couchDB.allDocs(options = { "include_docs" : True },
+                                        keys = list(requests))
+
+        bulkDocs = []
+        for row in response['rows']:
+            doc = row.get('doc')
+            if doc == None:
+                results[row['key']] = row.get('error', "deleted")
+            elif not isAllowedTransition(doc.get("RequestStatus"), status):
+                results[row['key']] = "NOCHANGE"
+            else:
+                doc["RequestStatus"] = status
+                doc.setdefault("RequestTransition", []).append(transition)
+                bulkDocs.append(doc)
+
+        if len(bulkDocs) > 0:
+            # a conflict means the document changed since
+            # we read it, the update is retried next time
+            for result in self.bulkCommit(bulkDocs):
+                results[result['id']] = getBulkResult(result, "conflict")
+
+        return results
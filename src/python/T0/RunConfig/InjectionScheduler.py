@@ -0,0 +1,177 @@
+"""
+_InjectionScheduler_
+
+Decides when Express and Repack workflows can be marked as injected.
+
+Instead of checking every run/stream each cycle, only injection
+candidates are evaluated. A run/stream becomes a candidate when it
+is configured (without streamer notifications) or when its fileset
+is closed. After a restart the candidates are seeded from T0AST once.
+
+A candidate stays until all its workflows are marked as injected.
+Bulk run/streams whose primary datasets are not released for
+PromptReco yet can't be marked before the release, which can be
+hours later. They are set aside and only evaluated again once
+PromptReco is released for their run, or every recheckInterval
+seconds in case the release was done by someone else.
+
+With a run/stream filter only the run/streams it accepts become
+candidates (the ones owned by a sharded feeder worker).
+
+"""
+import time
+import logging
+import threading
+
+from WMCore.DAOFactory import DAOFactory
+
+
+class InjectionScheduler(object):
+    """
+    _InjectionScheduler_
+
+    Keeps the injection candidates and the ones
+    waiting for PromptReco release
+
+    """
+    def __init__(self, streamerNotification = False, runStreamFilter = None, recheckInterval = 600):
+        """
+        _init_
+
+        runStreamFilter takes and returns a list of (run, stream) tuples
+
+        """
+        self.streamerNotification = streamerNotification
+        self.runStreamFilter = runStreamFilter
+        self.recheckInterval = recheckInterval
+
+        self.candidates = None
+        self.waitingForRelease = {}
+        self.lastRecheck = time.time()
+
+        return
+
+    def filterRunStreams(self, runStreams):
+        """
+        _filterRunStreams_
+
+        """
+        if self.runStreamFilter == None:
+            return runStreams
+
+        return self.runStreamFilter(runStreams)
+
+    def reset(self):
+        """
+        _reset_
+
+        Seed the candidates from T0AST again on the next evaluation
+
+        """
+        self.candidates = None
+        self.waitingForRelease = {}
+
+        return
+
+    def getDAOFactory(self):
+        """
+        _getDAOFactory_
+
+        """
+        myThread = threading.currentThread()
+
+        return DAOFactory(package = "T0.WMBS",
+                          logger = logging,
+                          dbinterface = myThread.dbi)
+
+    def addRunStreams(self, runStreams):
+        """
+        _addRunStreams_
+
+        Only needed once the candidates are seeded, before
+        that the seeding query will pick up the run/streams
+
+        """
+        if self.candidates != None:
+            self.candidates.update(self.filterRunStreams(runStreams))
+
+        return
+
+    def addReleasedRuns(self, runs):
+        """
+        _addReleasedRuns_
+
+        PromptReco was released for the runs, their run/streams
+        waiting for the release are candidates again
+
+        """
+        if self.candidates == None:
+            return
+
+        for run in runs:
+            self.candidates.update(self.waitingForRelease.pop(run, set()))
+
+        return
+
+    def getWaitingForRelease(self):
+        """
+        _getWaitingForRelease_
+
+        Run/streams waiting for PromptReco release
+
+        """
+        runStreams = []
+        for waiting in self.waitingForRelease.values():
+            runStreams.extend(waiting)
+
+        return sorted(runStreams)
+
+    def markWorkflowsInjected(self, currentTime = None):
+        """
+        _markWorkflowsInjected_
+
+        Evaluate the candidates, mark the workflows that can
+        be marked as injected and return the run/streams that
+        have all their workflows injected now as a list of
+        (run, stream) tuples
+
+        """
+        if currentTime == None:
+            currentTime = time.time()
+
+        daoFactory = self.getDAOFactory()
+
+        if self.candidates == None:
+            getInjectionCandidatesDAO = daoFactory(classname = "Tier0Feeder.GetInjectionCandidates")
+            runStreams = getInjectionCandidatesDAO.execute(self.streamerNotification, transaction = False)
+            self.candidates = set(self.filterRunStreams(runStreams))
+            self.waitingForRelease = {}
+            self.lastRecheck = currentTime
+            logging.info("Seeded %d run/streams as injection candidates" % len(self.candidates))
+
+        if currentTime >= self.lastRecheck + self.recheckInterval:
+            self.addReleasedRuns(list(self.waitingForRelease.keys()))
+            self.lastRecheck = currentTime
+
+        if len(self.candidates) == 0:
+            return []
+
+        markWorkflowsInjectedDAO = daoFactory(classname = "Tier0Feeder.MarkWorkflowsInjected")
+        findUnreleasedRunStreamsDAO = daoFactory(classname = "Tier0Feeder.FindUnreleasedRunStreams")
+
+        pending = set(markWorkflowsInjectedDAO.execute(self.streamerNotification,
+                                                       candidates = sorted(self.candidates),
+                                                       transaction = False))
+
+        injected = self.candidates - pending
+        for run, stream in sorted(injected):
+            logging.debug("Marked workflows for run %d and stream %s as injected" % (run, stream))
+
+        unreleased = set(findUnreleasedRunStreamsDAO.execute(sorted(pending), transaction = False))
+        for run, stream in sorted(unreleased):
+            logging.debug("Workflows for run %d and stream %s wait for PromptReco release" % (run, stream))
+            self.waitingForRelease.setdefault(run, set()).add( (run, stream) )
+
+        self.candidates = pending - unreleased
+
+        return sorted(injected)
@@ -10,16 +10,15 @@ import time
 
 from WMCore.DAOFactory import DAOFactory
 
-from WMCore.WorkQueue.WMBSHelper import WMBSHelper
-from WMCore.WMBS.Fileset import Fileset
-
 from T0.RunConfig.Tier0Config import retrieveDatasetConfig
 from T0.RunConfig.Tier0Config import addRepackConfig
 from T0.RunConfig.Tier0Config import deleteStreamConfig
 
-from T0.WMSpec.StdSpecs.Repack import RepackWorkloadFactory
-from T0.WMSpec.StdSpecs.Express import ExpressWorkloadFactory
-from WMCore.WMSpec.StdSpecs.PromptReco import PromptRecoWorkloadFactory
+#
+# WMBSHelper, Fileset and the spec factories pull in most of WMCore
+# (WorkQueue, WMSpec, WMBS), they are imported on first use to keep
+# the component startup short
+#
 
 def extractConfigParameter(configParameter, era, run):
     """
@@ -535,6 +534,8 @@ def configureRunStream(tier0Config, run, stream, specDirectory, dqmUploadProxy):
 
             specArguments['BlockCloseDelay'] = streamConfig.Repack.BlockCloseDelay
 
+            specArguments['JobResources'] = getattr(streamConfig.Repack, "JobResources", {})
+
         elif streamConfig.ProcessingStyle == "Express":
 
             taskName = "Express"
@@ -598,6 +599,9 @@ def configureRunStream(tier0Config, run, stream, specDirectory, dqmUploadProxy):
 
             specArguments['BlockCloseDelay'] = streamConfig.Express.BlockCloseDelay
 
+            specArguments['JobResources'] = getattr(streamConfig.Express, "JobResources", {})
+            specArguments['AlcaHarvestLumisPerJob'] = getattr(streamConfig.Express, "AlcaHarvestLumisPerJob", None)
+
         if streamConfig.ProcessingStyle in [ 'Bulk', 'Express' ]:
 
             specArguments['RunNumber'] = run
@@ -609,11 +613,13 @@ def configureRunStream(tier0Config, run, stream, specDirectory, dqmUploadProxy):
             specArguments['SiteBlacklist'] = []
 
         if streamConfig.ProcessingStyle == "Bulk":
+            from T0.WMSpec.StdSpecs.Repack import RepackWorkloadFactory
             factory = RepackWorkloadFactory()
             wmSpec = factory.factoryWorkloadConstruction(workflowName, specArguments)
             for subscription in subscriptions:
                 wmSpec.setSubscriptionInformation(**subscription)
         elif streamConfig.ProcessingStyle == "Express":
+            from T0.WMSpec.StdSpecs.Express import ExpressWorkloadFactory
             factory = ExpressWorkloadFactory()
             wmSpec = factory.factoryWorkloadConstruction(workflowName, specArguments)
             for subscription in subscriptions:
@@ -629,8 +635,10 @@ def configureRunStream(tier0Config, run, stream, specDirectory, dqmUploadProxy):
                                               softTimeout = 604800, #7 days, effectively disabled
                                               gracePeriod = 3600)
 
+            from WMCore.WorkQueue.WMBSHelper import WMBSHelper
             wmbsHelper = WMBSHelper(wmSpec, taskName, cachepath = specDirectory)
 
+        from WMCore.WMBS.Fileset import Fileset
         filesetName = "Run%d_Stream%s" % (run, stream)
         fileset = Fileset(filesetName)
 
@@ -686,7 +694,7 @@ def configureRunStream(tier0Config, run, stream, specDirectory, dqmUploadProxy):
         pass
     return
 
-def releasePromptReco(tier0Config, specDirectory, dqmUploadProxy):
+def releasePromptReco(tier0Config, specDirectory, dqmUploadProxy, deadline = None):
     """
     _releasePromptReco_
 
@@ -698,6 +706,10 @@ def releasePromptReco(tier0Config, specDirectory, dqmUploadProxy):
     Create workflows and subscriptions for the processing
     of runs/datasets.
 
+    Runs are released one by one, if the deadline is reached the
+    remaining runs are left for the next call. Returns whether
+    all runs were released and the list of released runs.
+
     """
     logging.debug("releasePromptReco()")
     myThread = threading.currentThread()
@@ -732,8 +744,14 @@ def releasePromptReco(tier0Config, specDirectory, dqmUploadProxy):
         datasetConfig = retrieveDatasetConfig(tier0Config, dataset)
         datasetDelays[dataset] = (datasetConfig.RecoDelay, datasetConfig.RecoDelayOffset)
 
+    releasedRuns = []
+
     recoRelease = findRecoReleaseDAO.execute(datasetDelays, transaction = False)
-    for run in sorted(recoRelease.keys()):
+    for (index, run) in enumerate(sorted(recoRelease.keys())):
+
+        if deadline != None and index > 0 and time.time() > deadline:
+            logging.info("Deferring PromptReco release of %d runs to the next cycle" % (len(recoRelease) - index))
+            return (False, releasedRuns)
 
         # for creating PromptReco specs
         recoSpecs = {}
@@ -1006,6 +1024,7 @@ def releasePromptReco(tier0Config, specDirectory, dqmUploadProxy):
                 specArguments['SiteBlacklist'] = []
                 specArguments['TrustSitelists'] = "True"
 
+                from WMCore.WMSpec.StdSpecs.PromptReco import PromptRecoWorkloadFactory
                 factory = PromptRecoWorkloadFactory()
                 wmSpec = factory.factoryWorkloadConstruction(workflowName, specArguments)
                 for subscription in subscriptions:
@@ -1020,6 +1039,7 @@ def releasePromptReco(tier0Config, specDirectory, dqmUploadProxy):
                                                   softTimeout = 604800, #7 days, effectively disabled
                                                   gracePeriod = 3600)
 
+                from WMCore.WorkQueue.WMBSHelper import WMBSHelper
                 wmbsHelper = WMBSHelper(wmSpec, taskName, cachepath = specDirectory)
 
                 recoSpecs[workflowName] = (wmbsHelper, wmSpec, fileset)
@@ -1036,6 +1056,7 @@ def releasePromptReco(tier0Config, specDirectory, dqmUploadProxy):
                 insertStorageNodeDAO.execute(bindsStorageNode, conn = myThread.transaction.conn, transaction = True)
             if len(bindsReleasePromptReco) > 0:
                 releasePromptRecoDAO.execute(bindsReleasePromptReco, conn = myThread.transaction.conn, transaction = True)
+            from WMCore.WMBS.Fileset import Fileset
             for (wmbsHelper, wmSpec, fileset) in recoSpecs.values():
                 wmbsHelper.createSubscription(wmSpec.getTask(taskName), Fileset(id = fileset), alternativeFilesetClose = True)
                 insertWorkflowMonitoringDAO.execute([fileset],  conn = myThread.transaction.conn, transaction = True)
@@ -1047,5 +1068,6 @@ def releasePromptReco(tier0Config, specDirectory, dqmUploadProxy):
             raise RuntimeError("Problem in releasePromptReco() database transaction !")
         else:
             myThread.transaction.commit()
+            releasedRuns.append(run)
 
-    return
+    return (True, releasedRuns)
@@ -94,6 +94,9 @@ Tier0Configuration - Global configuration object
 |             |     |--> MaxLatency - max latency to trigger repack or repack merge job
 |             |     |
 |             |     |--> BlockCloseDelay - delay to close block in WMAgent
+|             |     |
+|             |     |--> JobResources - core and memory allocation policy for Repack
+|             |                         and RepackMerge jobs (see JobSplitting.ResourcePolicy)
 |             |
 |             |--> Express - Configuration section for express streams
 |             |     |
@@ -131,6 +134,13 @@ Tier0Configuration - Global configuration object
 |             |     |--> DqmInterval - periodic DQM harvesting interval
 |             |     |
 |             |     |--> BlockCloseDelay - delay to close block in WMAgent
+|             |     |
+|             |     |--> JobResources - core and memory allocation policy for Express,
+|             |     |                   ExpressMerge and AlcaHarvest jobs
+|             |     |
+|             |     |--> AlcaHarvestLumisPerJob - if set, split the alca harvesting into
+|             |                                   several jobs, each covering this many lumis
+|             |                                   (only for multi-step harvesting scenarios)
 |             |
 |             |--> Register - Configuration section for register streams
 |             |     |
@@ -230,6 +240,28 @@ def createTier0Config():
 
     return tier0Config
 
+def checkJobResources(jobResources, jobTypes, streamName):
+    """
+    _checkJobResources_
+
+    Validate a core and memory allocation policy, it is a dictionary
+    keyed by job type, the values are dictionaries with the settings
+    for that job type.
+    """
+    if not isinstance(jobResources, dict):
+        msg = "Tier0Config : jobResources for stream %s needs to be a dictionary" % streamName
+        raise RuntimeError(msg)
+
+    for jobType, settings in jobResources.items():
+        if jobType not in jobTypes:
+            msg = "Tier0Config : jobResources for stream %s has unknown job type %s" % (streamName, jobType)
+            raise RuntimeError(msg)
+        if not isinstance(settings, dict):
+            msg = "Tier0Config : jobResources for stream %s and job type %s needs to be a dictionary" % (streamName, jobType)
+            raise RuntimeError(msg)
+
+    return
+
 def retrieveStreamConfig(config, streamName):
     """
     _retrieveStreamConfig_
@@ -682,6 +714,13 @@ def addRepackConfig(config, streamName, **options):
     else:
         streamConfig.Repack.BlockCloseDelay = options.get("blockCloseDelay", 24 * 3600)
 
+    if hasattr(streamConfig.Repack, "JobResources"):
+        streamConfig.Repack.JobResources = options.get("jobResources", streamConfig.Repack.JobResources)
+    else:
+        streamConfig.Repack.JobResources = options.get("jobResources", {})
+
+    checkJobResources(streamConfig.Repack.JobResources, [ "Repack", "RepackMerge" ], streamName)
+
     return
 
 def addExpressConfig(config, streamName, **options):
@@ -747,6 +786,15 @@ def addExpressConfig(config, streamName, **options):
 
     streamConfig.Express.BlockCloseDelay = options.get("blockCloseDelay", 3600)
 
+    streamConfig.Express.JobResources = options.get("jobResources", {})
+    checkJobResources(streamConfig.Express.JobResources, [ "Express", "ExpressMerge", "AlcaHarvest" ], streamName)
+
+    alcaHarvestLumisPerJob = options.get("alcaHarvestLumisPerJob", None)
+    if alcaHarvestLumisPerJob != None and ( not isinstance(alcaHarvestLumisPerJob, int) or alcaHarvestLumisPerJob < 1 ):
+        msg = "Tier0Config.addExpressConfig : alcaHarvestLumisPerJob needs to be a positive integer for stream %s" % streamName
+        raise RuntimeError(msg)
+    streamConfig.Express.AlcaHarvestLumisPerJob = alcaHarvestLumisPerJob
+
     return
 
 def addRegistrationConfig(config, streamName, **options):
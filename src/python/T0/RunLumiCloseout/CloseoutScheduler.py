@@ -0,0 +1,215 @@
+"""
+_CloseoutScheduler_
+
+Decides when run/stream filesets can be closed.
+
+Instead of checking every open run/stream fileset each cycle, only
+closeout candidates are evaluated. A run/stream becomes a candidate
+when its run is stopped or closed, or when a lumi is finally closed
+in an already ended run (run/streams configured after the run ended).
+After a restart the candidates are seeded from T0AST once.
+
+A candidate stays until its fileset is closed. For every candidate
+that can't be closed yet the reason is kept as diagnostics.
+
+With a run/stream filter only the run/streams it accepts become
+candidates (the ones owned by a sharded feeder worker). A sharded
+worker doesn't see all events (runs are stopped and closed by the
+leader, lumis can be finally closed by any worker), so with a
+resyncInterval the candidates are also looked up in T0AST again
+every resyncInterval seconds.
+
+"""
+import time
+import logging
+import threading
+
+from WMCore.DAOFactory import DAOFactory
+
+
+def getNotClosableReasons(status):
+    """
+    _getNotClosableReasons_
+
+    Reasons a run/stream fileset can't be closed yet, same
+    conditions as used by CloseRunStreamFilesets
+
+    """
+    reasons = []
+
+    if not status['stop_time'] > 0:
+        reasons.append("run not stopped")
+    if not status['close_time'] > 0:
+        reasons.append("run not closed")
+        return reasons
+
+    if status['lumis'] == 0:
+        reasons.append("no closed lumi records")
+        return reasons
+
+    if status['max_lumi'] != status['lumicount']:
+        reasons.append("closed lumi records up to lumi %s, run has %s lumis" % (status['max_lumi'], status['lumicount']))
+    if status['lumis'] < status['max_lumi']:
+        reasons.append("%d closed lumi records missing" % (status['max_lumi'] - status['lumis']))
+    if status['closed_lumis'] < status['lumis']:
+        reasons.append("%d lumis not finally closed" % (status['lumis'] - status['closed_lumis']))
+    if status['unused_streamers'] > 0:
+        reasons.append("%d streamers not feed" % status['unused_streamers'])
+
+    return reasons
+
+
+class CloseoutScheduler(object):
+    """
+    _CloseoutScheduler_
+
+    Keeps the closeout candidates and their diagnostics
+
+    """
+    def __init__(self, runStreamFilter = None, resyncInterval = None):
+        """
+        _init_
+
+        runStreamFilter takes and returns a list of (run, stream) tuples
+
+        """
+        self.runStreamFilter = runStreamFilter
+        self.resyncInterval = resyncInterval
+        self.candidates = None
+        self.diagnostics = {}
+        self.lastResync = time.time()
+
+        return
+
+    def filterRunStreams(self, runStreams):
+        """
+        _filterRunStreams_
+
+        """
+        if self.runStreamFilter == None:
+            return runStreams
+
+        return self.runStreamFilter(runStreams)
+
+    def reset(self):
+        """
+        _reset_
+
+        Seed the candidates from T0AST again on the next evaluation
+
+        """
+        self.candidates = None
+        self.diagnostics = {}
+
+        return
+
+    def getDAOFactory(self):
+        """
+        _getDAOFactory_
+
+        """
+        myThread = threading.currentThread()
+
+        return DAOFactory(package = "T0.WMBS",
+                          logger = logging,
+                          dbinterface = myThread.dbi)
+
+    def addRuns(self, runs):
+        """
+        _addRuns_
+
+        Add all run/streams with open filesets of the runs
+
+        """
+        if self.candidates == None or len(runs) == 0:
+            return
+
+        getCloseoutCandidatesDAO = self.getDAOFactory()(classname = "RunLumiCloseout.GetCloseoutCandidates")
+        runStreams = getCloseoutCandidatesDAO.execute(runs = runs, transaction = False)
+        self.candidates.update(self.filterRunStreams(runStreams))
+
+        return
+
+    def addRunStreams(self, runStreams):
+        """
+        _addRunStreams_
+
+        """
+        if self.candidates != None:
+            self.candidates.update(self.filterRunStreams(runStreams))
+
+        return
+
+    def closeRunStreamFilesets(self, currentTime = None):
+        """
+        _closeRunStreamFilesets_
+
+        Evaluate the candidates, close the filesets of the
+        ones that are complete and return those as a list
+        of (run, stream) tuples
+
+        """
+        if currentTime == None:
+            currentTime = time.time()
+
+        daoFactory = self.getDAOFactory()
+        getCloseoutCandidatesDAO = daoFactory(classname = "RunLumiCloseout.GetCloseoutCandidates")
+
+        if self.candidates == None:
+            runStreams = getCloseoutCandidatesDAO.execute(transaction = False)
+            self.candidates = set(self.filterRunStreams(runStreams))
+            self.lastResync = currentTime
+            logging.info("Seeded %d run/streams as closeout candidates" % len(self.candidates))
+
+        elif self.resyncInterval != None and currentTime >= self.lastResync + self.resyncInterval:
+            runStreams = getCloseoutCandidatesDAO.execute(transaction = False)
+            self.candidates.update(self.filterRunStreams(runStreams))
+            self.lastResync = currentTime
+
+        if len(self.candidates) == 0:
+            return []
+
+        getRunStreamCloseoutStatusDAO = daoFactory(classname = "RunLumiCloseout.GetRunStreamCloseoutStatus")
+        closeFilesetsDAO = daoFactory(classname = "RunLumiCloseout.CloseFilesets")
+
+        statusList = getRunStreamCloseoutStatusDAO.execute(sorted(self.candidates), transaction = False)
+
+        filesets = []
+        closedRunStreams = []
+        diagnostics = {}
+        for status in statusList:
+
+            runStream = (status['run'], status['stream'])
+
+            # closed by someone else
+            if not status['open']:
+                continue
+
+            reasons = getNotClosableReasons(status)
+            if len(reasons) == 0:
+                filesets.append(status['fileset'])
+                closedRunStreams.append(runStream)
+            else:
+                diagnostics[runStream] = reasons
+                logging.debug("Not closing fileset for run %d and stream %s: %s" % (status['run'], status['stream'],
+                                                                                  ", ".join(reasons)))
+
+        closeFilesetsDAO.execute(filesets, transaction = False)
+
+        for run, stream in sorted(closedRunStreams):
+            logging.info("Closed fileset for run %d and stream %s" % (run, stream))
+
+        self.candidates = set(diagnostics.keys())
+        self.diagnostics = diagnostics
+
+        return sorted(closedRunStreams)
+
+    def getDiagnostics(self):
+        """
+        _getDiagnostics_
+
+        Reasons why each candidate was not closed in the last
+        evaluation, keyed by (run, stream)
+
+        """
+        return dict(self.diagnostics)
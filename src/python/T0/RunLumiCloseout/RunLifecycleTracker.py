@@ -0,0 +1,226 @@
+"""
+_RunLifecycleTracker_
+
+Keeps track of the online state of active runs for stopRuns
+and closeRuns.
+
+Only runs that can still change are checked against RunSummary and
+the StorageManager. By default they are checked for every cycle,
+with a backoffFactor the longer a run has been running without
+stopping, the less often it is checked (the check interval grows
+with the run age, up to a maximum). The run age is taken from the
+T0AST start time for the stop check and from the T0AST stop time
+(if already stopped) for the close check, so it survives restarts.
+Stop and close checks are scheduled independently. Once a run is
+stopped or closed, the other transition is checked for every cycle.
+
+Runs that are stopped and closed in T0AST are dropped by updateRuns.
+
+The tracker also records when the Tier0 first saw a run and when it
+marked it as stopped and closed, together with the online stop time,
+which can be used for latency accounting.
+
+"""
+import time
+import logging
+
+
+class RunLifecycleTracker(object):
+    """
+    _RunLifecycleTracker_
+
+    """
+    def __init__(self, backoffFactor = 0, maxCheckInterval = 300):
+        """
+        _init_
+
+        backoffFactor is the check interval as fraction of the
+        run age (0 checks for every cycle), maxCheckInterval
+        caps it (in seconds)
+
+        """
+        self.backoffFactor = backoffFactor
+        self.maxCheckInterval = maxCheckInterval
+
+        # per run transition timestamps and check state
+        self.runs = {}
+
+        return
+
+    def getRun(self, run, currentTime):
+        """
+        _getRun_
+
+        """
+        if run not in self.runs:
+            self.runs[run] = { 'seen' : currentTime,
+                               'startTime' : None,
+                               'stopTime' : None,
+                               'stopped' : None,
+                               'closed' : None,
+                               'onlineStop' : None,
+                               'lumicount' : None,
+                               'checks' : 0,
+                               'nextCheck' : { 'stop' : 0, 'close' : 0 } }
+
+        return self.runs[run]
+
+    def updateRuns(self, runTimes, currentTime = None):
+        """
+        _updateRuns_
+
+        Takes the T0AST start and stop times of all runs that
+        are not stopped or not closed yet, keyed by run, and
+        drops all other runs from the tracker
+
+        """
+        if currentTime == None:
+            currentTime = time.time()
+
+        for run in list(self.runs.keys()):
+            if run not in runTimes:
+                del self.runs[run]
+
+        for run, (startTime, stopTime) in runTimes.items():
+            state = self.getRun(run, currentTime)
+            if startTime:
+                state['startTime'] = startTime
+            if stopTime:
+                state['stopTime'] = stopTime
+
+        return
+
+    def getAge(self, run, check, currentTime):
+        """
+        _getAge_
+
+        Time since the run stopped (close check of a stopped run)
+        or started, since first seen if T0AST times are not known
+
+        """
+        state = self.getRun(run, currentTime)
+
+        referenceTime = state['seen']
+        if check == 'close' and state['stopTime'] != None:
+            referenceTime = state['stopTime']
+        elif state['startTime'] != None:
+            referenceTime = state['startTime']
+
+        return max(currentTime - referenceTime, 0)
+
+    def getRunsToCheck(self, runs, check, currentTime = None):
+        """
+        _getRunsToCheck_
+
+        Runs out of the given ones that are due for
+        a check, check is either 'stop' or 'close'
+
+        """
+        if currentTime == None:
+            currentTime = time.time()
+
+        runsToCheck = []
+        for run in runs:
+            state = self.getRun(run, currentTime)
+            if state['stopped'] != None or state['closed'] != None:
+                runsToCheck.append(run)
+            elif currentTime >= state['nextCheck'][check]:
+                runsToCheck.append(run)
+
+        return runsToCheck
+
+    def markChecked(self, runs, check, currentTime = None):
+        """
+        _markChecked_
+
+        Schedule the next check of runs that did not change
+
+        """
+        if currentTime == None:
+            currentTime = time.time()
+
+        for run in runs:
+            state = self.getRun(run, currentTime)
+            state['checks'] += 1
+            age = self.getAge(run, check, currentTime)
+            state['nextCheck'][check] = currentTime + min(age * self.backoffFactor, self.maxCheckInterval)
+
+        return
+
+    def markStopped(self, run, onlineStop, currentTime = None):
+        """
+        _markStopped_
+
+        """
+        if currentTime == None:
+            currentTime = time.time()
+
+        state = self.getRun(run, currentTime)
+        state['stopped'] = currentTime
+        state['onlineStop'] = onlineStop
+        if onlineStop:
+            state['stopTime'] = onlineStop
+
+        self.checkFinished(run)
+
+        return
+
+    def markClosed(self, run, lumicount, currentTime = None):
+        """
+        _markClosed_
+
+        """
+        if currentTime == None:
+            currentTime = time.time()
+
+        state = self.getRun(run, currentTime)
+        state['closed'] = currentTime
+        state['lumicount'] = lumicount
+
+        self.checkFinished(run)
+
+        return
+
+    def checkFinished(self, run):
+        """
+        _checkFinished_
+
+        Log the transitions of runs that are stopped and closed
+
+        """
+        state = self.runs[run]
+        if state['stopped'] == None or state['closed'] == None:
+            return
+
+        message = "Run %d stopped and closed after %d checks, stopped %d s after first seen" % (run, state['checks'],
+                                                                                            state['stopped'] - state['seen'])
+        if state['onlineStop'] != None:
+            message += ", %d s after online stop" % (state['stopped'] - state['onlineStop'])
+        message += ", closed %d s after first seen" % (state['closed'] - state['seen'])
+        logging.info(message)
+
+        return
+
+    def getTransitions(self, run = None):
+        """
+        _getTransitions_
+
+        Transition timestamps (first seen, stopped, closed and online
+        stop time) of a run or of all runs, keyed by run
+
+        """
+        if run != None:
+            runs = [ run ]
+        else:
+            runs = self.runs.keys()
+
+        transitions = {}
+        for run in runs:
+            if run in self.runs:
+                state = self.runs[run]
+                transitions[run] = { 'seen' : state['seen'],
+                                     'stopped' : state['stopped'],
+                                     'closed' : state['closed'],
+                                     'onlineStop' : state['onlineStop'] }
+
+        return transitions
@@ -11,7 +11,7 @@ import time
 from WMCore.DAOFactory import DAOFactory
 
 
-def stopRuns(dbInterfaceStorageManager):
+def stopRuns(dbInterfaceStorageManager, runTracker = None):
     """
     _stopRuns_
 
@@ -23,6 +23,12 @@ def stopRuns(dbInterfaceStorageManager):
     Replays are handled differently, they will update stop_time with
     close_time (once that has been set) and leave start_time as-is.
 
+    With a RunLifecycleTracker only the runs due for a check
+    are checked and the tracker is updated with the T0AST run
+    times and the results.
+
+    Returns the runs that were marked as stopped.
+
     """
     logging.debug("stopRuns()")
     myThread = threading.currentThread()
@@ -38,6 +44,7 @@ def stopRuns(dbInterfaceStorageManager):
     findActiveRunsDAO = daoFactory(classname = "RunLumiCloseout.FindActiveRuns")
     findStoppedRunsDAO = daoFactoryStorageManager(classname = "RunLumiCloseout.FindStoppedRuns")
     stopRunsDAO = daoFactory(classname = "RunLumiCloseout.StopRuns")
+    findUnfinishedRunsDAO = daoFactory(classname = "RunLumiCloseout.FindUnfinishedRuns")
 
     # find all active runs
     #
@@ -45,12 +52,17 @@ def stopRuns(dbInterfaceStorageManager):
     # and setting stop_time to the same (skipped the other checks)
     activeRuns = findActiveRunsDAO.execute(transaction = False)
 
+    if runTracker != None:
+        runTracker.updateRuns(findUnfinishedRunsDAO.execute(transaction = False))
+        activeRuns = runTracker.getRunsToCheck(activeRuns, 'stop')
+
+    bindVarList = []
+
     # then check which one of them have ended
     if len(activeRuns) > 0:
 
         stoppedRuns = findStoppedRunsDAO.execute(runs = activeRuns, transaction = False)
 
-        bindVarList = []
         for run, (start_time, stop_time) in stoppedRuns.items():
             bindVarList.append( { 'RUN' : run,
                                   'START_TIME' : start_time,
@@ -60,10 +72,15 @@ def stopRuns(dbInterfaceStorageManager):
         if len(bindVarList) > 0:
             stopRunsDAO.execute(binds = bindVarList, transaction = False)
 
-    return
+        if runTracker != None:
+            runTracker.markChecked([ x for x in activeRuns if x not in stoppedRuns ], 'stop')
+            for binds in bindVarList:
+                runTracker.markStopped(binds['RUN'], binds['STOP_TIME'])
 
+    return sorted([ x['RUN'] for x in bindVarList ])
 
-def closeRuns(dbInterfaceStorageManager):
+
+def closeRuns(dbInterfaceStorageManager, runTracker = None):
     """
     _closeRuns_
 
@@ -72,6 +89,12 @@ def closeRuns(dbInterfaceStorageManager):
     For all open runs check the StorageManager EoR records to see if the
     run has ended. If it has, update T0AST to reflect this.
 
+    With a RunLifecycleTracker only the runs due for a check
+    are checked and the tracker is updated with the T0AST run
+    times and the results.
+
+    Returns the runs that were marked as closed.
+
     """
     logging.debug("closeRuns()")
     myThread = threading.currentThread()
@@ -87,16 +110,22 @@ def closeRuns(dbInterfaceStorageManager):
     findOpenRunsDAO = daoFactory(classname = "RunLumiCloseout.FindOpenRuns")
     findClosedRunsDAO = daoFactoryStorageManager(classname = "RunLumiCloseout.FindClosedRuns")
     closeRunsDAO = daoFactory(classname = "RunLumiCloseout.CloseRuns")
+    findUnfinishedRunsDAO = daoFactory(classname = "RunLumiCloseout.FindUnfinishedRuns")
 
     # find all active runs
     openRuns = findOpenRunsDAO.execute(transaction = False)
 
+    if runTracker != None:
+        runTracker.updateRuns(findUnfinishedRunsDAO.execute(transaction = False))
+        openRuns = runTracker.getRunsToCheck(openRuns, 'close')
+
+    bindVarList = []
+
     # then check which one of them have ended
     if len(openRuns) > 0:
 
         closedRuns = findClosedRunsDAO.execute(runs = openRuns, transaction = False)
 
-        bindVarList = []
         currentTime = int(time.time())
         for run, lumicount in closedRuns.items():
             bindVarList.append( { 'RUN' : run,
@@ -107,10 +136,15 @@ def closeRuns(dbInterfaceStorageManager):
         if len(bindVarList) > 0:
             closeRunsDAO.execute(binds = bindVarList, transaction = False)
 
-    return
+        if runTracker != None:
+            runTracker.markChecked([ x for x in openRuns if x not in closedRuns ], 'close')
+            for binds in bindVarList:
+                runTracker.markClosed(binds['RUN'], binds['LUMICOUNT'])
+
+    return sorted([ x['RUN'] for x in bindVarList ])
 
 
-def closeLumiSections(dbInterfaceStorageManager):
+def closeLumiSections(dbInterfaceStorageManager, runStreamFilter = None):
     """
     _closeLumiSections_
 
@@ -124,6 +158,15 @@ def closeLumiSections(dbInterfaceStorageManager):
     of streamers matches the filecount in the lumi_section_closed
     record and final close them if it does
 
+    Returns the run/streams of stopped and closed runs that had
+    lumis finally closed as (run, stream) tuples, together with
+    the number of new closed lumis found.
+
+    With a runStreamFilter (takes and returns a list of (run, stream)
+    tuples) only lumis of the accepted run/streams are looked for and
+    only accepted run/streams are returned. Final closing is done for
+    all run/streams, it is idempotent.
+
     """
     logging.debug("closeLumiSections()")
     myThread = threading.currentThread()
@@ -141,6 +184,7 @@ def closeLumiSections(dbInterfaceStorageManager):
     insertLumiDAO = daoFactory(classname = "RunConfig.InsertLumiSection")
     insertClosedLumiDAO = daoFactory(classname = "RunLumiCloseout.InsertClosedLumi")
     finalCloseLumiDAO = daoFactory(classname = "RunLumiCloseout.FinalCloseLumi")
+    getFinalClosedRunStreamsDAO = daoFactory(classname = "RunLumiCloseout.GetFinalClosedRunStreams")
 
     currentTime = int(time.time())
 
@@ -148,9 +192,13 @@ def closeLumiSections(dbInterfaceStorageManager):
     # in a continious 1...lumi sequence
     runStreamLumis = findHighContLumiDAO.execute(transaction = False)
 
+    if runStreamFilter != None:
+        runStreams = set(runStreamFilter([ (x['RUN'], x['STREAM']) for x in runStreamLumis ]))
+        runStreamLumis = [ x for x in runStreamLumis if (x['RUN'], x['STREAM']) in runStreams ]
+
     # nothing active, nothing to do
     if len(runStreamLumis) == 0:
-        return
+        return ([], 0)
 
     # find new closed lumis based on EoLS records for
     # any given run/stream and lumi > N 
@@ -192,14 +240,21 @@ def closeLumiSections(dbInterfaceStorageManager):
     # final lumi closing
     finalCloseLumiDAO.execute(currentTime, transaction = False)
 
-    return
+    finalClosedRunStreams = getFinalClosedRunStreamsDAO.execute(currentTime, transaction = False)
+
+    if runStreamFilter != None:
+        finalClosedRunStreams = runStreamFilter(finalClosedRunStreams)
+
+    return (finalClosedRunStreams, len(closedLumis))
 
 
 def closeRunStreamFilesets():
     """
     _closeRunStreamFilesets_
 
-    Called by Tier0Feeder
+    Called by tests and tools, the Tier0Feeder uses
+    the CloseoutScheduler, which applies the same
+    conditions to closeout candidates only
 
     For active run/stream (fileset open) and ended run
     with all lumis between 1 to high lumi present and
@@ -207,7 +262,8 @@ def closeRunStreamFilesets():
     have all the data there is. Close the run/stream
     fileset to start processing closeout.
 
-    This is all done in a single query.
+    Checks all open run/stream filesets, returns the
+    closed run/streams as (run, stream) tuples.
 
     """
     logging.debug("closeRunStreamFilesets()")
@@ -219,9 +275,12 @@ def closeRunStreamFilesets():
 
     closeRunStreamFilesetsDAO = daoFactory(classname = "RunLumiCloseout.CloseRunStreamFilesets")
 
-    closeRunStreamFilesetsDAO.execute(transaction = False)
+    closedRunStreams = closeRunStreamFilesetsDAO.execute(transaction = False)
 
-    return
+    for run, stream in closedRunStreams:
+        logging.info("Closed fileset for run %d and stream %s" % (run, stream))
+
+    return closedRunStreams
 
 
 def checkActiveSplitLumis():
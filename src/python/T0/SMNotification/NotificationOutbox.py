@@ -0,0 +1,165 @@
+"""
+_NotificationOutbox_
+
+Persistent outbox of finished streamers waiting for the repacked
+status notification to the StorageManager (transfer system), kept
+in a sqlite database on local disk.
+
+The Tier0Feeder only adds finished streamers to the outbox, the
+notifications are sent by a separate worker thread that retries
+failed chunks with exponential backoff.
+
+"""
+import time
+import sqlite3
+
+
+class NotificationOutbox(object):
+    """
+    _NotificationOutbox_
+
+    Every method uses its own sqlite connection, so the outbox can
+    be used from different threads (and survives restarts).
+
+    """
+    def __init__(self, path, retryDelay = 300, maxRetryDelay = 4 * 3600):
+        """
+        _init_
+
+        """
+        self.path = path
+        self.retryDelay = retryDelay
+        self.maxRetryDelay = maxRetryDelay
+
+        conn = self.connect()
+        try:
+            conn.execute("""CREATE TABLE IF NOT EXISTS streamer (
+                              id              INTEGER NOT NULL,
+                              lfn             TEXT    NOT NULL,
+                              attempts        INTEGER DEFAULT 0 NOT NULL,
+                              next_attempt    INTEGER DEFAULT 0 NOT NULL,
+                              last_error      TEXT,
+                              insert_time     INTEGER NOT NULL,
+                              PRIMARY KEY (id)
+                            )""")
+            conn.commit()
+        finally:
+            conn.close()
+
+        return
+
+    def connect(self):
+        """
+        _connect_
+
+        """
+        return sqlite3.connect(self.path, timeout = 60)
+
+    def enqueue(self, streamers):
+        """
+        _enqueue_
+
+        Add finished streamers (list of id and lfn). Streamers
+        already in the outbox are ignored, which makes enqueuing
+        idempotent.
+
+        """
+        binds = []
+        for (streamerId, lfn) in streamers:
+            binds.append( ( streamerId, lfn, int(time.time()) ) )
+
+        conn = self.connect()
+        try:
+            conn.executemany("""INSERT OR IGNORE INTO streamer
+                                (id, lfn, insert_time)
+                                VALUES (?, ?, ?)""", binds)
+            conn.commit()
+        finally:
+            conn.close()
+
+        return
+
+    def getDueStreamers(self, limit = 1000):
+        """
+        _getDueStreamers_
+
+        Return streamers due for (another) notification
+        attempt, oldest first.
+
+        """
+        conn = self.connect()
+        try:
+            results = conn.execute("""SELECT id, lfn, attempts
+                                      FROM streamer
+                                      WHERE next_attempt <= ?
+                                      ORDER BY next_attempt, id
+                                      LIMIT ?""", (int(time.time()), limit)).fetchall()
+        finally:
+            conn.close()
+
+        streamers = []
+        for result in results:
+            streamers.append( { 'id' : result[0],
+                                'lfn' : result[1],
+                                'attempts' : result[2] } )
+
+        return streamers
+
+    def markSent(self, streamers):
+        """
+        _markSent_
+
+        Remove notified streamers from the outbox
+
+        """
+        conn = self.connect()
+        try:
+            conn.executemany("DELETE FROM streamer WHERE id = ?",
+                             [ (streamer['id'],) for streamer in streamers ])
+            conn.commit()
+        finally:
+            conn.close()
+
+        return
+
+    def markFailed(self, streamers, error = None):
+        """
+        _markFailed_
+
+        Schedule the next attempt with exponential backoff,
+        based on the streamer with the fewest attempts
+
+        """
+        attempts = min([ streamer['attempts'] for streamer in streamers ])
+        delay = min(self.retryDelay * 2 ** attempts, self.maxRetryDelay)
+
+        conn = self.connect()
+        try:
+            conn.executemany("""UPDATE streamer
+                                SET attempts = attempts + 1,
+                                    next_attempt = ?,
+                                    last_error = ?
+                                WHERE id = ?""",
+                             [ (int(time.time()) + delay, error, streamer['id']) for streamer in streamers ])
+            conn.commit()
+        finally:
+            conn.close()
+
+        return delay
+
+    def getPendingCount(self):
+        """
+        _getPendingCount_
+
+        Return number of streamers waiting for notification
+        and of those how many failed before.
+
+        """
+        conn = self.connect()
+        try:
+            (count, failed) = conn.execute("""SELECT COUNT(*), SUM(MIN(attempts, 1))
+                                              FROM streamer""").fetchone()
+        finally:
+            conn.close()
+
+        return (count, failed or 0)
@@ -0,0 +1,111 @@
+"""
+_NotificationTransport_
+
+Transports for the repacked status notifications to the
+StorageManager (transfer system).
+
+Transports implement
+
+  notify(filenames) - notify about a chunk of processed streamers
+                      (file basenames), returns an error message
+                      or None on success
+
+"""
+import subprocess
+
+
+class TransferSystemTransport(object):
+    """
+    _TransferSystemTransport_
+
+    Runs sendRepackedStatus.pl of the transfer system
+    installation, one invocation per chunk.
+
+    """
+    def __init__(self, transferSystemBaseDir):
+        """
+        _init_
+
+        """
+        self.transferSystemBaseDir = transferSystemBaseDir
+
+        return
+
+    def notify(self, filenames):
+        """
+        _notify_
+
+        """
+        filenameParams = ""
+        for filename in filenames:
+            filenameParams += "-FILENAME %s " % filename
+
+        p = subprocess.Popen("/bin/bash", stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        output, error = p.communicate("""
+        export T0_BASE_DIR=%s
+        export T0ROOT=${T0_BASE_DIR}/T0
+        export CONFIG=${T0_BASE_DIR}/Config/TransferSystem_CERN.cfg
+
+        export PERL5LIB=${T0ROOT}/perl_lib
+
+        unset LANGUAGE
+        unset LC_ALL
+        unset LC_CTYPE
+        export LANG=C
+
+        ${T0ROOT}/operations/sendRepackedStatus.pl --config $CONFIG %s
+        """ % (self.transferSystemBaseDir, filenameParams))
+
+        if len(error) > 0:
+            return error
+
+        return None
+
+
+class ScriptTransport(object):
+    """
+    _ScriptTransport_
+
+    Runs a command with the filenames as arguments,
+    a non-zero exit code means failure. Used for
+    testing with a local stub script.
+
+    """
+    def __init__(self, command):
+        """
+        _init_
+
+        """
+        self.command = command
+
+        return
+
+    def notify(self, filenames):
+        """
+        _notify_
+
+        """
+        p = subprocess.Popen([ self.command ] + list(filenames),
+                             stdin = subprocess.PIPE,
+                             stdout = subprocess.PIPE,
+                             stderr = subprocess.STDOUT)
+        output = p.communicate()[0]
+        if p.returncode != 0:
+            return output or "exit code %d" % p.returncode
+
+        return None
+
+
+def getNotificationTransport(backend = "transfersystem", transferSystemBaseDir = None, command = None):
+    """
+    _getNotificationTransport_
+
+    Create the configured notification transport
+
+    """
+    if backend == "transfersystem":
+        return TransferSystemTransport(transferSystemBaseDir)
+    elif backend == "script":
+        return ScriptTransport(command)
+
+    raise RuntimeError("Unknown notification transport %s" % backend)
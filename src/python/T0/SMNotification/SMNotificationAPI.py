@@ -0,0 +1,174 @@
+"""
+_SMNotificationAPI_
+
+API for the repacked status notifications to the StorageManager
+
+"""
+import os
+import logging
+import threading
+
+from multiprocessing.pool import ThreadPool
+
+from WMCore.DAOFactory import DAOFactory
+
+
+def sendChunks(chunks, transport, maxWorkers = 2):
+    """
+    _sendChunks_
+
+    Send the chunks of streamers (lists of dictionaries with
+    id and lfn) with up to maxWorkers notifier processes in
+    parallel, returns the error (or None) per chunk
+
+    """
+    if len(chunks) == 0:
+        return []
+
+    notifyPool = ThreadPool(max(min(maxWorkers, len(chunks)), 1))
+
+    try:
+
+        results = []
+        for chunk in chunks:
+            filenames = [ os.path.basename(streamer['lfn']) for streamer in chunk ]
+            results.append( notifyPool.apply_async(transport.notify, (filenames,)) )
+
+        errors = []
+        for result in results:
+            try:
+                errors.append(result.get())
+            except Exception as ex:
+                logging.exception("Something went wrong with a StorageManager notification...")
+                errors.append(str(ex))
+
+    finally:
+        notifyPool.close()
+        notifyPool.join()
+
+    return errors
+
+def splitChunks(streamers, chunkSize):
+    """
+    _splitChunks_
+
+    """
+    chunkSize = max(chunkSize, 1)
+
+    return [ streamers[i:i+chunkSize] for i in range(0, len(streamers), chunkSize) ]
+
+def notifyStorageManager(transport, chunkSize = 50, maxWorkers = 2):
+    """
+    _notifyStorageManager_
+
+    Called by Tier0Feeder in every polling cycle if no
+    notification outbox is configured
+
+    Find all finished streamers for closed all run/stream
+    Send the notification message to StorageManager
+    Update the streamer status to finished (deleted = 1)
+
+    """
+    logging.debug("notifyStorageManager()")
+    myThread = threading.currentThread()
+
+    daoFactory = DAOFactory(package = "T0.WMBS",
+                            logger = logging,
+                            dbinterface = myThread.dbi)
+
+    getFinishedStreamersDAO = daoFactory(classname = "SMNotification.GetFinishedStreamers")
+    markStreamersFinishedDAO = daoFactory(classname = "SMNotification.MarkStreamersFinished")
+
+    streamers = []
+    for (streamerId, lfn) in getFinishedStreamersDAO.execute(transaction = False):
+        streamers.append( { 'id' : streamerId,
+                            'lfn' : lfn } )
+
+    if len(streamers) == 0:
+        return
+
+    logging.debug("Notifying transfer system about %d processed streamers" % len(streamers))
+
+    chunks = splitChunks(streamers, chunkSize)
+    errors = sendChunks(chunks, transport, maxWorkers = maxWorkers)
+
+    finishedStreamers = []
+    for (chunk, error) in zip(chunks, errors):
+        if error != None:
+            logging.error("ERROR: Could not notify transfer system about processed streamers")
+            logging.error("ERROR: %s" % error)
+        else:
+            finishedStreamers.extend([ streamer['id'] for streamer in chunk ])
+
+    if len(finishedStreamers) > 0:
+        markStreamersFinishedDAO.execute(finishedStreamers, transaction = False)
+
+    return
+
+def queueNotifications(outbox):
+    """
+    _queueNotifications_
+
+    Called by Tier0Feeder in every polling cycle if a
+    notification outbox is configured
+
+    Add all finished streamers to the outbox, the
+    notifications are sent by the SMNotificationPoller
+
+    """
+    logging.debug("queueNotifications()")
+    myThread = threading.currentThread()
+
+    daoFactory = DAOFactory(package = "T0.WMBS",
+                            logger = logging,
+                            dbinterface = myThread.dbi)
+
+    getFinishedStreamersDAO = daoFactory(classname = "SMNotification.GetFinishedStreamers")
+
+    streamers = getFinishedStreamersDAO.execute(transaction = False)
+
+    if len(streamers) > 0:
+        outbox.enqueue(streamers)
+
+    return
+
+def processOutbox(outbox, transport, chunkSize = 50, maxWorkers = 2):
+    """
+    _processOutbox_
+
+    Called by the SMNotificationPoller in every polling cycle
+
+    Send the notifications due from the outbox, mark the
+    notified streamers finished and reschedule failed chunks.
+
+    """
+    logging.debug("processOutbox()")
+    myThread = threading.currentThread()
+
+    streamers = outbox.getDueStreamers(limit = max(chunkSize, 1) * max(maxWorkers, 1) * 10)
+
+    if len(streamers) == 0:
+        return
+
+    daoFactory = DAOFactory(package = "T0.WMBS",
+                            logger = logging,
+                            dbinterface = myThread.dbi)
+
+    markStreamersFinishedDAO = daoFactory(classname = "SMNotification.MarkStreamersFinished")
+
+    chunks = splitChunks(streamers, chunkSize)
+    errors = sendChunks(chunks, transport, maxWorkers = maxWorkers)
+
+    for (chunk, error) in zip(chunks, errors):
+
+        if error != None:
+            delay = outbox.markFailed(chunk, error)
+            logging.error("Notification of %d streamers failed, retrying in %d seconds: %s" % (len(chunk), delay, error))
+            continue
+
+        # mark finished first, notifications are idempotent,
+        # so a crash before markSent only causes a resend
+        markStreamersFinishedDAO.execute([ streamer['id'] for streamer in chunk ], transaction = False)
+        outbox.markSent(chunk)
+
+    return
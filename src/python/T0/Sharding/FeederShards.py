@@ -0,0 +1,290 @@
+"""
+_FeederShards_
+
+Splits the Tier0Feeder work between several feeder workers.
+
+Run/stream level work (configuring run/streams, closing lumis,
+feeding streamers, closing filesets, marking workflows injected)
+is partitioned into shards by a hash of (run, stream). Global work
+(configuring runs, stopping and closing runs, Express and PromptReco
+release, monitoring, StorageManager notifications and PCL uploads)
+is only done by the leader.
+
+Ownership of the shards and of the leader role is kept as leases
+with an expire time in T0AST (tier0_feeder_lease table). Leases are
+renewed at the start of every cycle and between its stages (at most
+every renewInterval seconds), so the lease duration needs to be well
+above the longest feeder stage. A worker only acts as leader or
+shard owner while the leases from its last renewal have not expired,
+so a lease expiring within a cycle stops the work before another
+worker takes it over. Every worker also holds a worker lease, which
+tells the others that it is alive.
+
+Shard i is preferably owned by worker i % numWorkers. Shards of
+workers that are not alive (worker lease expired) are taken over
+by any other worker and handed back once the worker is alive again.
+The leader role goes to whichever worker takes the expired lease
+first.
+
+Limitations: how the feeder throughput scales with the number of
+workers has not been measured yet. bin/tier0FeederSimulator --workers
+1/2/4 runs sharded workers against the stand-in databases for that,
+but it needs the T0AST of an Oracle test agent (WMBS has no SQLite
+schema), so compare the streamers/s it reports before relying on
+more than one worker. All workers share T0AST and the global work
+is still done by a single worker. Workers only see the run ends found by the leader and their
+own final lumi closes, other events are picked up from T0AST every
+closeoutResyncInterval seconds, which can delay fileset closing by
+that much.
+
+"""
+import time
+import zlib
+import logging
+import threading
+
+from WMCore.DAOFactory import DAOFactory
+
+
+def getShard(run, stream, numShards):
+    """
+    _getShard_
+
+    Shard of a run/stream, stable across processes
+
+    """
+    return (zlib.crc32("%d:%s" % (run, stream)) & 0xffffffff) % numShards
+
+
+class FeederShards(object):
+    """
+    _FeederShards_
+
+    Leases and run/stream ownership of one feeder worker
+
+    """
+    leaderLease = "leader"
+
+    def __init__(self, owner, workerIndex, numWorkers, numShards, leaseDuration = 900, renewInterval = None):
+        """
+        _init_
+
+        owner identifies the worker process/thread in the lease table,
+        workerIndex is between 0 and numWorkers - 1, renewLeasesIfDue
+        renews at most every renewInterval seconds (default a tenth
+        of the lease duration)
+
+        """
+        self.owner = owner
+        self.workerIndex = workerIndex
+        self.numWorkers = numWorkers
+        self.numShards = numShards
+        self.leaseDuration = leaseDuration
+        self.renewInterval = renewInterval
+        if self.renewInterval == None:
+            self.renewInterval = leaseDuration // 10
+
+        self.workerLease = self.getWorkerLease(workerIndex)
+        self.shardLeases = dict([ ("shard-%d" % x, x) for x in range(numShards) ])
+
+        self.leasesCreated = False
+        self.leader = False
+        self.ownedShards = set()
+        self.lastRenewal = None
+        self.heldUntil = 0
+
+        return
+
+    def getWorkerLease(self, workerIndex):
+        """
+        _getWorkerLease_
+
+        """
+        return "worker-%d" % workerIndex
+
+    def getDAOFactory(self):
+        """
+        _getDAOFactory_
+
+        """
+        myThread = threading.currentThread()
+
+        return DAOFactory(package = "T0.WMBS",
+                          logger = logging,
+                          dbinterface = myThread.dbi)
+
+    def hasValidLeases(self, currentTime = None):
+        """
+        _hasValidLeases_
+
+        Whether the leases of the last renewal are still held
+
+        """
+        if currentTime == None:
+            currentTime = time.time()
+
+        return currentTime < self.heldUntil
+
+    def isLeader(self, currentTime = None):
+        """
+        _isLeader_
+
+        """
+        return self.leader and self.hasValidLeases(currentTime)
+
+    def ownsRunStream(self, run, stream, currentTime = None):
+        """
+        _ownsRunStream_
+
+        """
+        return self.hasValidLeases(currentTime) and getShard(run, stream, self.numShards) in self.ownedShards
+
+    def filterRunStreams(self, runStreams):
+        """
+        _filterRunStreams_
+
+        Owned run/streams out of a list of (run, stream) tuples
+
+        """
+        if not self.hasValidLeases():
+            return []
+
+        return [ x for x in runStreams if getShard(x[0], x[1], self.numShards) in self.ownedShards ]
+
+    def isHeld(self, lease, currentTime):
+        """
+        _isHeld_
+
+        """
+        return lease != None and lease['owner'] == self.owner and lease['expire_time'] > currentTime
+
+    def renewLeases(self, currentTime = None):
+        """
+        _renewLeases_
+
+        Called at the start of every cycle. Renews the held leases,
+        takes the expired ones this worker is responsible for and
+        hands back shards of workers that are alive again.
+
+        Returns whether the owned shards or the leader role changed.
+
+        """
+        if currentTime == None:
+            currentTime = int(time.time())
+        expireTime = currentTime + self.leaseDuration
+
+        self.lastRenewal = currentTime
+
+        daoFactory = self.getDAOFactory()
+        insertLeasesDAO = daoFactory(classname = "Tier0Feeder.InsertLeases")
+        getLeasesDAO = daoFactory(classname = "Tier0Feeder.GetLeases")
+        acquireLeasesDAO = daoFactory(classname = "Tier0Feeder.AcquireLeases")
+        releaseLeasesDAO = daoFactory(classname = "Tier0Feeder.ReleaseLeases")
+
+        if not self.leasesCreated:
+            names = [ self.leaderLease ]
+            names.extend([ self.getWorkerLease(x) for x in range(self.numWorkers) ])
+            names.extend(sorted(self.shardLeases.keys()))
+            insertLeasesDAO.execute(names, transaction = False)
+            self.leasesCreated = True
+
+        # a second worker with the same index does nothing
+        acquireLeasesDAO.execute([ self.workerLease ], self.owner, currentTime, expireTime,
+                                 transaction = False)
+        leases = getLeasesDAO.execute(transaction = False)
+
+        wasLeader = self.leader
+        wasOwned = self.ownedShards
+
+        if not self.isHeld(leases.get(self.workerLease), currentTime):
+            logging.error("Feeder worker %d is held by %s, %s is not doing any work" % (self.workerIndex,
+                                                                                       leases.get(self.workerLease, {}).get('owner'),
+                                                                                       self.owner))
+            self.leader = False
+            self.ownedShards = set()
+            self.heldUntil = 0
+            return wasLeader or len(wasOwned) > 0
+
+        aliveWorkers = set()
+        for workerIndex in range(self.numWorkers):
+            lease = leases.get(self.getWorkerLease(workerIndex))
+            if lease != None and lease['expire_time'] > currentTime:
+                aliveWorkers.add(workerIndex)
+
+        acquire = [ self.leaderLease ]
+        release = []
+        for name, shard in sorted(self.shardLeases.items(), key = lambda x: x[1]):
+
+            lease = leases.get(name)
+            if lease == None:
+                continue
+
+            preferredWorker = shard % self.numWorkers
+            responsible = preferredWorker == self.workerIndex or preferredWorker not in aliveWorkers
+
+            if lease['owner'] == self.owner:
+                if responsible:
+                    acquire.append(name)
+                else:
+                    release.append(name)
+            elif lease['expire_time'] < currentTime and responsible:
+                acquire.append(name)
+
+        acquireLeasesDAO.execute(acquire, self.owner, currentTime, expireTime,
+                                 transaction = False)
+        releaseLeasesDAO.execute(release, self.owner, transaction = False)
+
+        leases = getLeasesDAO.execute(transaction = False)
+
+        self.leader = self.isHeld(leases.get(self.leaderLease), currentTime)
+        self.ownedShards = set([ shard for name, shard in self.shardLeases.items() if self.isHeld(leases.get(name), currentTime) ])
+        self.heldUntil = expireTime
+
+        if self.leader != wasLeader:
+            if self.leader:
+                logging.info("Feeder worker %d (%s) is now the leader" % (self.workerIndex, self.owner))
+            else:
+                logging.info("Feeder worker %d (%s) is no longer the leader" % (self.workerIndex, self.owner))
+
+        if self.ownedShards != wasOwned:
+            logging.info("Feeder worker %d (%s) owns shards %s" % (self.workerIndex, self.owner,
+                                                                   sorted(self.ownedShards)))
+
+        return self.leader != wasLeader or self.ownedShards != wasOwned
+
+    def renewLeasesIfDue(self, currentTime = None):
+        """
+        _renewLeasesIfDue_
+
+        Called between the stages of a cycle, renews the leases
+        if the last renewal is more than renewInterval ago.
+
+        Returns whether the owned shards or the leader role changed.
+
+        """
+        if currentTime == None:
+            currentTime = int(time.time())
+
+        if self.lastRenewal != None and currentTime - self.lastRenewal < self.renewInterval:
+            return False
+
+        return self.renewLeases(currentTime)
+
+    def releaseLeases(self):
+        """
+        _releaseLeases_
+
+        Give up all leases, called on shutdown
+
+        """
+        names = [ self.leaderLease, self.workerLease ]
+        names.extend(sorted(self.shardLeases.keys()))
+
+        releaseLeasesDAO = self.getDAOFactory()(classname = "Tier0Feeder.ReleaseLeases")
+        releaseLeasesDAO.execute(names, self.owner, transaction = False)
+
+        self.leader = False
+        self.ownedShards = set()
+        self.heldUntil = 0
+
+        return
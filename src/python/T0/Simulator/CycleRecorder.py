@@ -0,0 +1,314 @@
+"""
+_CycleRecorder_
+
+Records the database and service calls of Tier0Feeder cycles,
+one compressed JSON file per cycle, for offline replay.
+
+Database interfaces are wrapped by a RecordingDBInterface, which
+records the SQL, binds, results, duration and error of every
+processData call. Other services (like the RequestDB couch writer)
+are wrapped by a RecordingService, which records the method name,
+arguments and return value of every call.
+
+A recording looks like
+
+  { 'version' : 1,
+    'cycle' : <cycle number>,
+    'start' : <start time>,
+    'duration' : <seconds>,
+    'error' : <error message or None>,
+    'sources' : { <source> : <dialect or None> },
+    'statements' : [ <sql>, ... ],
+    'calls' : [ [ <source>, <statement index>, <binds>,
+                  <results>, <duration>, <error> ], ... ] }
+
+where SQL statements (and service method names) are stored
+once per file and results are lists of [ keys, rows ].
+
+"""
+import os
+import json
+import gzip
+import time
+import logging
+import threading
+
+try:
+    from WMCore.Database.Dialects import MySQLDialect, OracleDialect
+except ImportError:
+    MySQLDialect = OracleDialect = None
+
+recordingVersion = 1
+
+def getDialectName(dbInterface):
+    """
+    _getDialectName_
+
+    Dialect of a database interface, named like the
+    DAO implementation packages
+
+    """
+    dialect = getattr(getattr(dbInterface, "engine", None), "dialect", None)
+    if dialect == None:
+        return None
+    if OracleDialect != None and isinstance(dialect, OracleDialect):
+        return "Oracle"
+    if MySQLDialect != None and isinstance(dialect, MySQLDialect):
+        return "MySQL"
+    if getattr(dialect, "name", None) == "sqlite":
+        return "SQLite"
+
+    return getattr(dialect, "name", None)
+
+def serializeResult(result):
+    """
+    _serializeResult_
+
+    Keys and rows of a ResultSet, or None for anything else
+    (like the ResultProxy of a bulk insert, which has no rows)
+
+    """
+    if not hasattr(result, "fetchall"):
+        return None
+    if not getattr(result, "returns_rows", True):
+        return None
+
+    keys = getattr(result, "keys", [])
+    if callable(keys):
+        keys = keys()
+
+    return [ [ str(key) for key in keys ],
+             [ list(row) for row in result.fetchall() ] ]
+
+
+class CycleRecorder(object):
+    """
+    _CycleRecorder_
+
+    Collects the calls of the current cycle (from any thread)
+    and writes them at the end of the cycle. Only cycles that
+    took at least minDuration seconds are kept, and at most
+    maxCycles of them.
+
+    """
+    def __init__(self, recordDir, maxCycles = 100, minDuration = 0):
+        """
+        _init_
+
+        """
+        self.recordDir = recordDir
+        self.maxCycles = maxCycles
+        self.minDuration = minDuration
+
+        if not os.path.isdir(self.recordDir):
+            os.makedirs(self.recordDir)
+
+        self.lock = threading.Lock()
+        self.cycle = 0
+        self.recording = False
+        self.sources = {}
+        self.statements = {}
+        self.calls = []
+        self.startTime = None
+
+        return
+
+    def wrap(self, source, dbInterface):
+        """
+        _wrap_
+
+        Wrap a database interface, wrapping twice is a no-op
+
+        """
+        if isinstance(dbInterface, RecordingDBInterface):
+            return dbInterface
+
+        self.sources[source] = getDialectName(dbInterface)
+
+        return RecordingDBInterface(source, dbInterface, self)
+
+    def wrapService(self, source, service):
+        """
+        _wrapService_
+
+        Wrap a service object, wrapping twice is a no-op
+
+        """
+        if isinstance(service, RecordingService):
+            return service
+
+        self.sources[source] = None
+
+        return RecordingService(source, service, self)
+
+    def startCycle(self):
+        """
+        _startCycle_
+
+        """
+        with self.lock:
+            self.cycle += 1
+            self.recording = True
+            self.statements = {}
+            self.calls = []
+            self.startTime = time.time()
+
+        return
+
+    def record(self, source, statement, binds, results, duration, error = None):
+        """
+        _record_
+
+        """
+        with self.lock:
+            if not self.recording:
+                return
+            index = self.statements.setdefault(statement, len(self.statements))
+            self.calls.append( [ source, index, binds, results, duration, error ] )
+
+        return
+
+    def endCycle(self, error = None):
+        """
+        _endCycle_
+
+        Write the recording of the cycle
+
+        """
+        with self.lock:
+            self.recording = False
+            duration = time.time() - self.startTime
+
+            if duration < self.minDuration:
+                return None
+
+            statements = [ None ] * len(self.statements)
+            for statement, index in self.statements.items():
+                statements[index] = statement
+
+            recording = { 'version' : recordingVersion,
+                          'cycle' : self.cycle,
+                          'start' : self.startTime,
+                          'duration' : duration,
+                          'error' : error,
+                          'sources' : self.sources,
+                          'statements' : statements,
+                          'calls' : self.calls }
+            self.calls = []
+            self.statements = {}
+
+        filename = os.path.join(self.recordDir, "cycle-%d-%06d.json.gz" % (int(recording['start']), recording['cycle']))
+        try:
+            f = gzip.open(filename, 'wb')
+            try:
+                f.write(json.dumps(recording, default = str))
+            finally:
+                f.close()
+        except Exception as ex:
+            logging.error("Could not write cycle recording %s: %s" % (filename, str(ex)))
+            return None
+
+        self.purge()
+
+        return filename
+
+    def purge(self):
+        """
+        _purge_
+
+        Keep only the latest maxCycles recordings
+
+        """
+        recordings = sorted([ x for x in os.listdir(self.recordDir) if x.startswith("cycle-") ])
+        for filename in recordings[:max(len(recordings) - self.maxCycles, 0)]:
+            try:
+                os.remove(os.path.join(self.recordDir, filename))
+            except OSError:
+                pass
+
+        return
+
+
+class RecordingDBInterface(object):
+    """
+    _RecordingDBInterface_
+
+    Passes everything on to the wrapped database interface,
+    processData calls are recorded.
+
+    """
+    def __init__(self, source, dbInterface, recorder):
+        """
+        _init_
+
+        """
+        self.source = source
+        self.dbInterface = dbInterface
+        self.recorder = recorder
+
+        return
+
+    def __getattr__(self, name):
+        return getattr(self.dbInterface, name)
+
+    def processData(self, sqlstmt, binds = {}, conn = None,
+                    transaction = False, returnCursor = False):
+        """
+        _processData_
+
+        """
+        startTime = time.time()
+        try:
+            results = self.dbInterface.processData(sqlstmt, binds, conn = conn,
+                                                   transaction = transaction,
+                                                   returnCursor = returnCursor)
+        except Exception as ex:
+            self.recorder.record(self.source, sqlstmt if isinstance(sqlstmt, basestring) else "\n;\n".join(sqlstmt),
+                                 binds, None, time.time() - startTime, str(ex))
+            raise
+
+        if not returnCursor:
+            self.recorder.record(self.source, sqlstmt if isinstance(sqlstmt, basestring) else "\n;\n".join(sqlstmt),
+                                 binds, [ serializeResult(result) for result in results ],
+                                 time.time() - startTime)
+
+        return results
+
+
+class RecordingService(object):
+    """
+    _RecordingService_
+
+    Records calls to the methods of the wrapped service
+
+    """
+    def __init__(self, source, service, recorder):
+        """
+        _init_
+
+        """
+        self.source = source
+        self.service = service
+        self.recorder = recorder
+
+        return
+
+    def __getattr__(self, name):
+
+        attribute = getattr(self.service, name)
+        if not callable(attribute):
+            return attribute
+
+        def recordedCall(*args, **kwargs):
+            startTime = time.time()
+            try:
+                result = attribute(*args, **kwargs)
+            except Exception as ex:
+                self.recorder.record(self.source, name, [ args, kwargs ], None,
+                                     time.time() - startTime, str(ex))
+                raise
+            self.recorder.record(self.source, name, [ args, kwargs ], result,
+                                 time.time() - startTime)
+            return result
+
+        return recordedCall
@@ -0,0 +1,399 @@
+"""
+_CycleReplay_
+
+Replays Tier0Feeder cycles recorded by the CycleRecorder offline.
+
+A ReplayTier0FeederPoller runs the normal feeder cycle, so all
+calls go through RunConfigAPI, RunLumiCloseoutAPI and
+ConditionUploadAPI as in production, but the T0AST, StorageManager,
+HLTConf and PopConLog databases and the RequestDB couch are
+replaced by replay sources that return the recorded results.
+
+Calls are matched per source by SQL statement (or service method)
+and binds, in recording order. If only the statement matches, the
+next recorded call for it is used. Calls that were not recorded
+return empty results. Both are counted, so changes to the queries
+a cycle runs show up in the replay report.
+
+With latency enabled every matched call takes as long as it did
+in production, which allows comparing the cycle time of the
+current code against the recorded cycle.
+
+"""
+import json
+import gzip
+import time
+import logging
+import threading
+import collections
+
+from WMCore.Database.ResultSet import ResultSet
+from WMCore.Database.Transaction import Transaction
+from WMCore.Database.Dialects import MySQLDialect, OracleDialect
+
+from T0Component.Tier0Feeder.Tier0FeederPoller import Tier0FeederPoller
+
+def decode(value):
+    """
+    _decode_
+
+    JSON strings are unicode, use str where
+    possible like the database drivers do
+
+    """
+    if isinstance(value, unicode):
+        try:
+            return str(value)
+        except UnicodeEncodeError:
+            return value
+    elif isinstance(value, list):
+        return [ decode(x) for x in value ]
+    elif isinstance(value, dict):
+        return dict([ (decode(k), decode(v)) for k, v in value.items() ])
+
+    return value
+
+def normalizeBinds(binds):
+    """
+    _normalizeBinds_
+
+    Binds as they look after a round trip through a recording
+
+    """
+    return decode(json.loads(json.dumps(binds, default = str)))
+
+def loadRecording(filename):
+    """
+    _loadRecording_
+
+    """
+    f = gzip.open(filename, 'rb')
+    try:
+        return decode(json.loads(f.read()))
+    finally:
+        f.close()
+
+
+class ReplayRow(tuple):
+    """
+    _ReplayRow_
+
+    Recorded row, accessible by index and by column name
+
+    """
+    def __new__(cls, keys, values):
+        row = tuple.__new__(cls, values)
+        row.columns = [ key.lower() for key in keys ]
+        return row
+
+    def __getitem__(self, item):
+        if isinstance(item, basestring):
+            item = self.columns.index(item.lower())
+        return tuple.__getitem__(self, item)
+
+    def keys(self):
+        return list(self.columns)
+
+
+class ReplayConnection(object):
+    """
+    _ReplayConnection_
+
+    Connection and transaction stand-in
+
+    """
+    closed = False
+
+    def begin(self):
+        return self
+
+    def commit(self):
+        return
+
+    def rollback(self):
+        return
+
+    def close(self):
+        return
+
+
+class ReplayEngine(object):
+    """
+    _ReplayEngine_
+
+    Only there for the DAOFactory dialect lookup
+
+    """
+    def __init__(self, dialect):
+        self.dialect = dialect
+        self.url = "replay://"
+
+
+class ReplaySource(object):
+    """
+    _ReplaySource_
+
+    Recorded calls of one source and the replay statistics
+
+    """
+    def __init__(self, name, latency = False):
+        """
+        _init_
+
+        """
+        self.name = name
+        self.latency = latency
+        self.calls = collections.defaultdict(collections.deque)
+
+        self.recorded = 0
+        self.recordedTime = 0.0
+        self.matched = 0
+        self.bindMismatches = 0
+        self.missing = 0
+        self.replayedTime = 0.0
+
+        return
+
+    def addCall(self, statement, binds, results, duration, error):
+        """
+        _addCall_
+
+        """
+        self.calls[statement].append( (binds, results, duration, error) )
+        self.recorded += 1
+        self.recordedTime += duration
+
+        return
+
+    def replayCall(self, statement, binds):
+        """
+        _replayCall_
+
+        Returns recorded results and error of the call, results
+        are None if the call was not recorded
+
+        """
+        calls = self.calls.get(statement)
+        if not calls:
+            self.missing += 1
+            logging.debug("Replay %s: no recorded call for %s" % (self.name, statement))
+            return (None, None)
+
+        binds = normalizeBinds(binds)
+        for call in calls:
+            if call[0] == binds:
+                calls.remove(call)
+                break
+        else:
+            call = calls.popleft()
+            self.bindMismatches += 1
+
+        self.matched += 1
+        self.replayedTime += call[2]
+        if self.latency:
+            time.sleep(call[2])
+
+        return (call[1], call[3])
+
+    def getReport(self):
+        """
+        _getReport_
+
+        """
+        return { 'source' : self.name,
+                 'recorded' : self.recorded,
+                 'recordedTime' : self.recordedTime,
+                 'matched' : self.matched,
+                 'bindMismatches' : self.bindMismatches,
+                 'missing' : self.missing,
+                 'unused' : sum([ len(x) for x in self.calls.values() ]),
+                 'replayedTime' : self.replayedTime }
+
+
+class ReplayDBInterface(object):
+    """
+    _ReplayDBInterface_
+
+    DBInterface returning the recorded results of a source
+
+    """
+    def __init__(self, source, dialect = "Oracle"):
+        """
+        _init_
+
+        """
+        self.source = source
+        if dialect == "MySQL":
+            self.engine = ReplayEngine(MySQLDialect())
+        else:
+            self.engine = ReplayEngine(OracleDialect())
+
+        return
+
+    def connection(self):
+        """
+        _connection_
+
+        """
+        return ReplayConnection()
+
+    def processData(self, sqlstmt, binds = {}, conn = None,
+                    transaction = False, returnCursor = False):
+        """
+        _processData_
+
+        """
+        if not isinstance(sqlstmt, basestring):
+            sqlstmt = "\n;\n".join(sqlstmt)
+
+        (results, error) = self.source.replayCall(sqlstmt, binds)
+
+        if error != None:
+            raise RuntimeError("Replayed database error: %s" % error)
+
+        if results == None:
+            return [ ResultSet() ]
+
+        resultSets = []
+        for result in results:
+            resultSet = ResultSet()
+            if result != None:
+                (keys, rows) = result
+                resultSet.keys = keys
+                resultSet.data = [ ReplayRow(keys, row) for row in rows ]
+            resultSets.append(resultSet)
+
+        return resultSets
+
+
+class ReplayService(object):
+    """
+    _ReplayService_
+
+    Service returning the recorded results of a source
+
+    """
+    def __init__(self, source):
+        """
+        _init_
+
+        """
+        self.source = source
+
+        return
+
+    def __getattr__(self, name):
+
+        def replayedCall(*args, **kwargs):
+            (result, error) = self.source.replayCall(name, [ list(args), kwargs ])
+            if error != None:
+                raise RuntimeError("Replayed service error: %s" % error)
+            return result
+
+        return replayedCall
+
+
+class ReplayTier0FeederPoller(Tier0FeederPoller):
+    """
+    _ReplayTier0FeederPoller_
+
+    Tier0FeederPoller using the replay sources
+
+    """
+    def __init__(self, config, cycleReplay):
+        """
+        _init_
+
+        """
+        self.cycleReplay = cycleReplay
+        Tier0FeederPoller.__init__(self, config)
+
+        return
+
+    def connectDatabase(self, source, connectUrl, databaseConfig = None):
+        """
+        _connectDatabase_
+
+        """
+        return self.cycleReplay.getDBInterface(source)
+
+    def connectRequestDB(self, config):
+        """
+        _connectRequestDB_
+
+        """
+        return ReplayService(self.cycleReplay.getSource("CouchDB"))
+
+
+class CycleReplay(object):
+    """
+    _CycleReplay_
+
+    Replay of one recorded cycle
+
+    """
+    def __init__(self, recording, latency = False):
+        """
+        _init_
+
+        """
+        self.recording = recording
+        self.latency = latency
+        self.sources = {}
+
+        statements = recording['statements']
+        for (source, index, binds, results, duration, error) in recording['calls']:
+            self.getSource(source).addCall(statements[index], binds, results, duration, error)
+
+        return
+
+    def getSource(self, name):
+        """
+        _getSource_
+
+        """
+        if name not in self.sources:
+            self.sources[name] = ReplaySource(name, latency = self.latency)
+
+        return self.sources[name]
+
+    def getDBInterface(self, name):
+        """
+        _getDBInterface_
+
+        """
+        return ReplayDBInterface(self.getSource(name),
+                                 dialect = self.recording['sources'].get(name))
+
+    def run(self, config):
+        """
+        _run_
+
+        Run a feeder cycle against the recording in the current
+        thread. The config needs to point the Tier0Feeder to
+        scratch spec and upload queue locations.
+
+        """
+        myThread = threading.currentThread()
+        myThread.logger = logging.getLogger()
+        myThread.dbFactory = None
+        myThread.dbi = self.getDBInterface("T0AST")
+        myThread.transaction = Transaction(myThread.dbi)
+
+        poller = ReplayTier0FeederPoller(config, self)
+
+        error = None
+        startTime = time.time()
+        try:
+            poller.algorithm()
+        except Exception as ex:
+            logging.exception("Replayed cycle failed")
+            error = str(ex)
+        duration = time.time() - startTime
+
+        return { 'cycle' : self.recording['cycle'],
+                 'recordedDuration' : self.recording['duration'],
+                 'recordedError' : self.recording['error'],
+                 'duration' : duration,
+                 'error' : error,
+                 'sources' : [ self.sources[x].getReport() for x in sorted(self.sources.keys()) ] }
@@ -0,0 +1,451 @@
+"""
+_FeederSimulator_
+
+Drives the Tier0Feeder with a synthetic RunTimeline in accelerated
+time. The timeline events are applied to T0AST (runs and streamers,
+the way the StorageManager injects them) and to the stand-in P5
+databases, the feeder runs every pollInterval simulated seconds.
+
+After each feeder cycle T0AST is checked for the progress of every
+run and the latency of each stage is recorded, in simulated seconds
+between the P5 event that makes a stage possible and the first
+feeder cycle that is seen to have completed it
+
+  run configured         - from run start
+  run/stream configured  - from the first streamer of the stream
+  lumi closed            - from the last EoLS record of the lumi
+  lumi fed               - from the last EoLS record of the lumi
+  run stopped            - from the RunSummary stop
+  run closed             - from the last EoR record
+  fileset closed         - from RunSummary stop or last EoR, whichever is later
+  run start to close     - from run start to the run/stream fileset close
+
+Latencies include the poll interval granularity.
+
+"""
+import logging
+import threading
+import time
+
+from WMCore.DAOFactory import DAOFactory
+from WMCore.Database.Transaction import Transaction
+
+from T0.WMBS.Oracle.Tier0Feeder.GetExpressLatency import percentile
+
+stages = [ "run configured",
+           "run/stream configured",
+           "lumi closed",
+           "lumi fed",
+           "run stopped",
+           "run closed",
+           "fileset closed",
+           "run start to close" ]
+
+class ParallelFeeder(object):
+    """
+    _ParallelFeeder_
+
+    Runs the cycles of several feeders (sharded Tier0FeederPoller
+    workers) concurrently, each in its own thread with its own
+    T0AST transaction, like the worker threads of the component.
+    Returns once all feeders finished their cycle.
+
+    """
+    def __init__(self, feeders):
+        """
+        _init_
+
+        """
+        self.feeders = feeders
+
+        return
+
+    def __call__(self):
+        """
+        _call_
+
+        Raises the first error of any feeder
+
+        """
+        dbi = threading.currentThread().dbi
+        errors = []
+
+        def runFeeder(feeder):
+            myThread = threading.currentThread()
+            myThread.logger = logging.getLogger()
+            myThread.dbi = dbi
+            myThread.transaction = Transaction(dbi)
+            try:
+                feeder()
+            except Exception as ex:
+                logging.exception("Feeder worker cycle failed")
+                errors.append(ex)
+
+        threads = [ threading.Thread(target = runFeeder, args = (feeder,)) for feeder in self.feeders ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if len(errors) > 0:
+            raise errors[0]
+
+        return
+
+
+class FeederSimulator(object):
+    """
+    _FeederSimulator_
+
+    feeder is called once per cycle, usually the algorithm
+    method of a Tier0FeederPoller configured to use the
+    stand-in databases or a ParallelFeeder for several
+    sharded feeder workers.
+
+    """
+    def __init__(self, timeline, clock, standIn, feeder,
+                 pollInterval = 30.0, cmsswVersion = "CMSSW_9_2_0",
+                 timeout = 3600.0):
+        """
+        _init_
+
+        """
+        self.timeline = timeline
+        self.clock = clock
+        self.standIn = standIn
+        self.feeder = feeder
+        self.pollInterval = pollInterval
+        self.cmsswVersion = cmsswVersion
+        self.timeout = timeout
+
+        myThread = threading.currentThread()
+        self.dbi = myThread.dbi
+
+        daoFactory = DAOFactory(package = "T0.WMBS",
+                                logger = logging,
+                                dbinterface = myThread.dbi)
+
+        self.insertRunDAO = daoFactory(classname = "RunConfig.InsertRun")
+        self.insertStreamDAO = daoFactory(classname = "RunConfig.InsertStream")
+        self.insertCMSSWVersionDAO = daoFactory(classname = "RunConfig.InsertCMSSWVersion")
+        self.insertStreamCMSSWVersionDAO = daoFactory(classname = "RunConfig.InsertStreamCMSSWVersion")
+        self.insertLumiDAO = daoFactory(classname = "RunConfig.InsertLumiSection")
+        self.insertStreamerDAO = daoFactory(classname = "RunConfig.InsertStreamer")
+
+        # reference times of the P5 events
+        self.runStart = {}
+        self.runStop = {}
+        self.lastEoR = {}
+        self.lastEoLS = {}
+        self.firstStreamer = {}
+        self.streamersInjected = {}
+
+        # what has been seen in T0AST
+        self.pendingRuns = set()
+        self.configuredRuns = set()
+        self.stoppedRuns = set()
+        self.closedRuns = set()
+        self.configuredRunStreams = set()
+        self.closedLumis = set()
+        self.fedLumis = set()
+        self.closedFilesets = set()
+
+        self.knownRunStreams = set()
+        self.knownRunLumis = set()
+
+        self.latencies = dict([ (stage, []) for stage in stages ])
+        self.cycleTimes = []
+        self.cycleErrors = 0
+        self.streamersFed = 0
+
+        return
+
+    def recordLatency(self, stage, reference, observed):
+        """
+        _recordLatency_
+
+        """
+        if reference != None:
+            self.latencies[stage].append(max(observed - reference, 0))
+
+        return
+
+    def applyEvents(self, events):
+        """
+        _applyEvents_
+
+        Write the P5 side of the events, streamers are
+        inserted into T0AST in one go per cycle.
+
+        """
+        lumiBinds = []
+        runStreamBinds = []
+        streamerBinds = []
+
+        for (eventTime, kind, params) in events:
+
+            run = params['run']
+
+            if kind == "runStart":
+
+                self.insertRunDAO.execute(binds = { 'RUN' : run,
+                                                    'TIME' : int(self.clock.simStart + eventTime),
+                                                    'HLTKEY' : params['hltkey'] },
+                                          transaction = False)
+                self.standIn.startRun(run, self.clock.simStart + eventTime, params['instances'])
+                self.standIn.insertPopConRecord(run)
+
+                self.runStart[run] = eventTime
+                self.pendingRuns.add(run)
+
+            elif kind == "streamer":
+
+                stream = params['stream']
+                lumi = params['lumi']
+
+                if (run, stream) not in self.knownRunStreams:
+                    self.knownRunStreams.add((run, stream))
+                    self.firstStreamer[(run, stream)] = eventTime
+                    runStreamBinds.append( { 'RUN' : run,
+                                             'STREAM' : stream,
+                                             'VERSION' : self.cmsswVersion } )
+
+                if (run, lumi) not in self.knownRunLumis:
+                    self.knownRunLumis.add((run, lumi))
+                    lumiBinds.append( { 'RUN' : run,
+                                        'LUMI' : lumi } )
+
+                streamerBinds.append( { 'RUN' : run,
+                                        'LUMI' : lumi,
+                                        'STREAM' : stream,
+                                        'LFN' : params['lfn'],
+                                        'FILESIZE' : params['filesize'],
+                                        'EVENTS' : params['events'],
+                                        'TIME' : int(self.clock.simStart + eventTime) } )
+
+                self.streamersInjected[(run, stream, lumi)] = self.streamersInjected.get((run, stream, lumi), 0) + 1
+
+            elif kind == "eols":
+
+                self.standIn.endOfLumi(run, params['instance'], params['lumi'], params['filecounts'])
+                self.lastEoLS[(run, params['lumi'])] = eventTime
+
+            elif kind == "runStop":
+
+                self.standIn.stopRun(run, self.clock.simStart + eventTime)
+                self.runStop[run] = eventTime
+
+            elif kind == "eor":
+
+                self.standIn.endOfRun(run, params['instance'], params['lumicount'])
+                self.lastEoR[run] = eventTime
+
+        if len(runStreamBinds) > 0:
+            self.insertStreamCMSSWVersionDAO.execute(binds = runStreamBinds, transaction = False)
+        if len(lumiBinds) > 0:
+            self.insertLumiDAO.execute(binds = lumiBinds, transaction = False)
+        if len(streamerBinds) > 0:
+            self.insertStreamerDAO.execute(binds = streamerBinds, transaction = False)
+
+        return
+
+    def checkProgress(self):
+        """
+        _checkProgress_
+
+        Check T0AST for completed stages of the pending runs
+
+        """
+        observed = self.clock.elapsed()
+
+        for run in sorted(self.pendingRuns):
+
+            runInfo = self.timeline.runs[run]
+
+            (acqEra, stopTime, closeTime) = self.dbi.processData("""SELECT acq_era, stop_time, close_time
+                                                                    FROM run
+                                                                    WHERE run_id = :RUN
+                                                                    """, { 'RUN' : run },
+                                                                 transaction = False)[0].fetchall()[0]
+
+            if acqEra != None and run not in self.configuredRuns:
+                self.configuredRuns.add(run)
+                self.recordLatency("run configured", self.runStart[run], observed)
+
+            if stopTime > 0 and run not in self.stoppedRuns:
+                self.stoppedRuns.add(run)
+                self.recordLatency("run stopped", self.runStop.get(run), observed)
+
+            if closeTime > 0 and run not in self.closedRuns:
+                self.closedRuns.add(run)
+                self.recordLatency("run closed", self.lastEoR.get(run), observed)
+
+            results = self.dbi.processData("""SELECT stream.name
+                                              FROM run_stream_style_assoc
+                                              INNER JOIN stream ON
+                                                stream.id = run_stream_style_assoc.stream_id
+                                              WHERE run_stream_style_assoc.run_id = :RUN
+                                              """, { 'RUN' : run },
+                                           transaction = False)[0].fetchall()
+            for (stream,) in results:
+                if (run, stream) not in self.configuredRunStreams:
+                    self.configuredRunStreams.add((run, stream))
+                    self.recordLatency("run/stream configured", self.firstStreamer.get((run, stream)), observed)
+
+            results = self.dbi.processData("""SELECT stream.name,
+                                                     lumi_section_closed.lumi_id
+                                              FROM lumi_section_closed
+                                              INNER JOIN stream ON
+                                                stream.id = lumi_section_closed.stream_id
+                                              WHERE lumi_section_closed.run_id = :RUN
+                                              AND lumi_section_closed.close_time > 0
+                                              """, { 'RUN' : run },
+                                           transaction = False)[0].fetchall()
+            for (stream, lumi) in results:
+                if (run, stream, lumi) not in self.closedLumis:
+                    self.closedLumis.add((run, stream, lumi))
+                    self.recordLatency("lumi closed", self.lastEoLS.get((run, lumi)), observed)
+
+            results = self.dbi.processData("""SELECT stream.name,
+                                                     streamer.lumi_id,
+                                                     COUNT(*)
+                                              FROM streamer
+                                              INNER JOIN stream ON
+                                                stream.id = streamer.stream_id
+                                              WHERE streamer.run_id = :RUN
+                                              AND streamer.used = 1
+                                              GROUP BY stream.name,
+                                                       streamer.lumi_id
+                                              """, { 'RUN' : run },
+                                           transaction = False)[0].fetchall()
+            for (stream, lumi, count) in results:
+                if (run, stream, lumi) not in self.fedLumis and count >= self.streamersInjected.get((run, stream, lumi), 0):
+                    self.fedLumis.add((run, stream, lumi))
+                    self.streamersFed += count
+                    self.recordLatency("lumi fed", self.lastEoLS.get((run, lumi)), observed)
+
+            results = self.dbi.processData("""SELECT stream.name
+                                              FROM run_stream_fileset_assoc
+                                              INNER JOIN wmbs_fileset ON
+                                                wmbs_fileset.id = run_stream_fileset_assoc.fileset AND
+                                                wmbs_fileset.open = 0
+                                              INNER JOIN stream ON
+                                                stream.id = run_stream_fileset_assoc.stream_id
+                                              WHERE run_stream_fileset_assoc.run_id = :RUN
+                                              """, { 'RUN' : run },
+                                           transaction = False)[0].fetchall()
+            for (stream,) in results:
+                if (run, stream) not in self.closedFilesets:
+                    self.closedFilesets.add((run, stream))
+                    reference = None
+                    if run in self.runStop and run in self.lastEoR:
+                        reference = max(self.runStop[run], self.lastEoR[run])
+                    self.recordLatency("fileset closed", reference, observed)
+                    self.recordLatency("run start to close", self.runStart[run], observed)
+
+            # run/streams without fileset (not processed) don't count
+            closedStreams = len([ x for x in self.closedFilesets if x[0] == run ])
+            configuredStreams = len([ x for x in self.configuredRunStreams if x[0] == run ])
+            if run in self.closedRuns and configuredStreams == len(runInfo['streams']) and \
+                   closedStreams == self.getNumFilesets(run):
+                self.pendingRuns.remove(run)
+                logging.info("Run %d complete after %.0f simulated seconds" % (run, observed - self.runStart[run]))
+
+        return
+
+    def getNumFilesets(self, run):
+        """
+        _getNumFilesets_
+
+        Number of run/stream filesets of a run
+
+        """
+        return self.dbi.processData("""SELECT COUNT(*)
+                                       FROM run_stream_fileset_assoc
+                                       WHERE run_id = :RUN
+                                       """, { 'RUN' : run },
+                                    transaction = False)[0].fetchall()[0][0]
+
+    def run(self):
+        """
+        _run_
+
+        Apply timeline events and run the feeder until
+        all runs are complete or the timeout is reached.
+
+        Returns True if all runs completed.
+
+        """
+        streams = set()
+        for runInfo in self.timeline.runs.values():
+            streams.update(runInfo['streams'])
+
+        self.insertCMSSWVersionDAO.execute(binds = { 'VERSION' : self.cmsswVersion },
+                                           transaction = False)
+        self.insertStreamDAO.execute(binds = [ { 'STREAM' : stream } for stream in sorted(streams) ],
+                                     transaction = False)
+
+        duration = self.timeline.getDuration()
+        self.realStart = time.time()
+        nextCycle = 0.0
+
+        while True:
+
+            self.clock.sleepUntil(nextCycle)
+            elapsed = self.clock.elapsed()
+
+            self.applyEvents(self.timeline.popDueEvents(elapsed))
+
+            cycleStart = time.time()
+            try:
+                self.feeder()
+            except Exception:
+                logging.exception("Feeder cycle failed")
+                self.cycleErrors += 1
+            self.cycleTimes.append(time.time() - cycleStart)
+
+            self.checkProgress()
+
+            if len(self.timeline.events) == 0 and len(self.pendingRuns) == 0:
+                break
+
+            if elapsed > duration + self.timeout:
+                logging.error("Runs %s not complete after timeout" % sorted(self.pendingRuns))
+                break
+
+            nextCycle = max(nextCycle + self.pollInterval, self.clock.elapsed())
+
+        self.realElapsed = time.time() - self.realStart
+
+        return len(self.pendingRuns) == 0
+
+    def getReport(self):
+        """
+        _getReport_
+
+        Latency statistics per stage (simulated seconds),
+        feeder cycle times and throughput (real seconds)
+
+        """
+        report = { 'stages' : [],
+                   'cycles' : len(self.cycleTimes),
+                   'cycleErrors' : self.cycleErrors,
+                   'streamersFed' : self.streamersFed,
+                   'realElapsed' : self.realElapsed }
+
+        for stage in stages:
+            values = sorted(self.latencies[stage])
+            report['stages'].append( { 'stage' : stage,
+                                       'count' : len(values),
+                                       'mean' : sum(values) / len(values) if values else None,
+                                       'p50' : percentile(values, 50),
+                                       'p90' : percentile(values, 90),
+                                       'max' : values[-1] if values else None } )
+
+        cycleTimes = sorted(self.cycleTimes)
+        report['cycleMean'] = sum(cycleTimes) / len(cycleTimes) if cycleTimes else None
+        report['cycleP90'] = percentile(cycleTimes, 90)
+        report['cycleMax'] = cycleTimes[-1] if cycleTimes else None
+        report['throughput'] = self.streamersFed / max(self.realElapsed, 1e-6)
+
+        return report
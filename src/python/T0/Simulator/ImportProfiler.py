@@ -0,0 +1,255 @@
+"""
+_ImportProfiler_
+
+Import time profile of a module, in the format of python -X importtime
+(self and cumulative microseconds of every imported module, nested
+imports indented below the module importing them).
+
+The profile is always taken in a fresh interpreter, so nothing is
+imported already. python -X importtime only exists from python 3.7
+on, older interpreters wrap the builtin __import__ for the duration
+of the import and print the same format. The wrapper adds a small
+overhead per import statement and does not see imports done through
+importlib directly.
+
+"""
+import os
+import re
+import sys
+import time
+import subprocess
+
+try:
+    import __builtin__ as builtins
+except ImportError:
+    import builtins
+
+importTimeRegexp = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)\s*$")
+
+
+def getCandidateNames(name, globals, level, fromlist):
+    """
+    _getCandidateNames_
+
+    Full names the modules loaded by an import statement could have,
+    packages first, then the submodules named in the fromlist
+
+    """
+    packages = []
+
+    if level != 0 and globals != None:
+
+        package = globals.get('__package__')
+        if package == None:
+            package = globals.get('__name__', '')
+            if '__path__' not in globals:
+                package = package.rpartition('.')[0]
+        if level > 1:
+            package = package.rsplit('.', level - 1)[0]
+
+        if package:
+            if name:
+                packages.append("%s.%s" % (package, name))
+            else:
+                packages.append(package)
+
+    if name:
+        packages.append(name)
+
+    candidates = list(packages)
+    for package in packages:
+        for item in fromlist or []:
+            if item != "*":
+                candidates.append("%s.%s" % (package, item))
+
+    return candidates
+
+def getLoadedModules(candidates):
+    """
+    _getLoadedModules_
+
+    python 2 implicit relative imports leave None
+    placeholders in sys.modules for failed lookups
+
+    """
+    return set([ x for x in candidates if sys.modules.get(x) != None ])
+
+
+class ImportProfiler(object):
+    """
+    _ImportProfiler_
+
+    Wraps the builtin __import__ between start and stop
+
+    """
+    def __init__(self):
+        """
+        _init_
+
+        """
+        self.entries = []
+        self.stack = []
+        self.originalImport = None
+
+        return
+
+    def start(self):
+        """
+        _start_
+
+        """
+        self.originalImport = builtins.__import__
+        builtins.__import__ = self.profiledImport
+
+        return
+
+    def stop(self):
+        """
+        _stop_
+
+        """
+        if self.originalImport != None:
+            builtins.__import__ = self.originalImport
+            self.originalImport = None
+
+        return
+
+    def profiledImport(self, name, globals = None, locals = None, fromlist = None, level = -1):
+        """
+        _profiledImport_
+
+        Only imports that load new modules are recorded, the
+        time of cached imports counts for the importing module
+
+        """
+        numModules = len(sys.modules)
+        candidates = getCandidateNames(name, globals, level, fromlist)
+        loaded = getLoadedModules(candidates)
+        frame = { 'children' : 0.0 }
+        self.stack.append(frame)
+
+        startTime = time.time()
+        try:
+            if level == -1:
+                return self.originalImport(name, globals, locals, fromlist)
+            return self.originalImport(name, globals, locals, fromlist, level)
+        finally:
+            duration = time.time() - startTime
+            self.stack.pop()
+
+            if len(sys.modules) != numModules:
+                newModules = [ x for x in candidates if x not in loaded and sys.modules.get(x) != None ]
+                if len(newModules) > 0:
+                    moduleName = newModules[0]
+                elif len(candidates) > 0:
+                    moduleName = candidates[0]
+                else:
+                    moduleName = name
+                self.entries.append( { 'module' : moduleName,
+                                       'self' : int((duration - frame['children']) * 1000000),
+                                       'cumulative' : int(duration * 1000000),
+                                       'depth' : len(self.stack) } )
+                if len(self.stack) > 0:
+                    self.stack[-1]['children'] += duration
+
+    def formatEntries(self):
+        """
+        _formatEntries_
+
+        Lines in the python -X importtime format
+
+        """
+        lines = [ "import time: self [us] | cumulative | imported package" ]
+        for entry in self.entries:
+            lines.append("import time: %9d | %10d | %s%s" % (entry['self'], entry['cumulative'],
+                                                              "  " * entry['depth'], entry['module']))
+
+        return lines
+
+
+def parseImportTime(output):
+    """
+    _parseImportTime_
+
+    Entries out of python -X importtime output,
+    other lines (errors, warnings) are skipped
+
+    """
+    entries = []
+    for line in output.splitlines():
+        match = importTimeRegexp.match(line)
+        if match == None:
+            continue
+        entries.append( { 'module' : match.group(4),
+                          'self' : int(match.group(1)),
+                          'cumulative' : int(match.group(2)),
+                          'depth' : (len(match.group(3)) - 1) // 2 } )
+
+    return entries
+
+def summarizeImportTime(entries, top = 15):
+    """
+    _summarizeImportTime_
+
+    Total import time, the slowest modules (cumulative and
+    self) and the self time per top level package, in seconds
+
+    """
+    packages = {}
+    for entry in entries:
+        package = entry['module'].split(".")[0]
+        packages[package] = packages.get(package, 0) + entry['self']
+
+    cumulative = sorted(entries, key = lambda x: x['cumulative'], reverse = True)
+    selfTime = sorted(entries, key = lambda x: x['self'], reverse = True)
+
+    return { 'total' : sum([ x['cumulative'] for x in entries if x['depth'] == 0 ]) / 1000000.0,
+             'modules' : len(entries),
+             'cumulative' : [ (x['module'], x['cumulative'] / 1000000.0) for x in cumulative[:top] ],
+             'self' : [ (x['module'], x['self'] / 1000000.0) for x in selfTime[:top] ],
+             'packages' : sorted([ (x, y / 1000000.0) for x, y in packages.items() ],
+                                 key = lambda x: x[1], reverse = True)[:top] }
+
+def profileImport(moduleName):
+    """
+    _profileImport_
+
+    Import moduleName in a fresh interpreter, returns the entries
+    and whether the import worked. Uses python -X importtime if
+    available, the __import__ wrapper otherwise.
+
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([ x for x in sys.path if x ])
+
+    if sys.version_info >= (3, 7):
+        command = [ sys.executable, "-X", "importtime", "-c", "import %s" % moduleName ]
+    else:
+        command = [ sys.executable, "-c",
+                    "from T0.Simulator.ImportProfiler import main; main(%r)" % moduleName ]
+
+    process = subprocess.Popen(command, stdout = subprocess.PIPE,
+                               stderr = subprocess.PIPE, env = env)
+    (stdout, stderr) = process.communicate()
+    if not isinstance(stderr, str):
+        stderr = stderr.decode("utf-8", "replace")
+
+    return (parseImportTime(stderr), process.returncode == 0)
+
+def main(moduleName):
+    """
+    _main_
+
+    Import moduleName with the __import__ wrapper and print the
+    profile to stderr, run by profileImport in the fresh interpreter
+
+    """
+    profiler = ImportProfiler()
+    profiler.start()
+    try:
+        __import__(moduleName)
+    finally:
+        profiler.stop()
+        sys.stderr.write("\n".join(profiler.formatEntries()) + "\n")
+
+    return
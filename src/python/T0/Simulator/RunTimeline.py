@@ -0,0 +1,192 @@
+"""
+_RunTimeline_
+
+Synthetic timeline of what happens at P5 during data taking, used
+to drive the Tier0Feeder in load tests. A run produces the events
+
+  runStart - run registered in T0AST, RunSummary start time,
+             StorageManager run records and PopCon IOV
+  streamer - a streamer file written by a StorageManager instance
+  eols     - EoLS records of an instance for a lumi
+  runStop  - RunSummary stop time
+  eor      - EoR record of an instance
+
+Event times are in seconds relative to the start of the timeline.
+
+"""
+import heapq
+import random
+import time
+
+
+class AcceleratedClock(object):
+    """
+    _AcceleratedClock_
+
+    Simulated time running speedup times faster than real time.
+
+    The simulated time starts duration seconds in the past and
+    reaches the current time when the timeline is complete, so
+    simulated timestamps are never in the future for the feeder.
+
+    """
+    def __init__(self, speedup = 1.0, duration = 0):
+        """
+        _init_
+
+        """
+        self.speedup = float(speedup)
+        self.realStart = time.time()
+        self.simStart = self.realStart - duration
+
+        return
+
+    def time(self):
+        """
+        _time_
+
+        Current simulated time
+
+        """
+        return self.simStart + (time.time() - self.realStart) * self.speedup
+
+    def elapsed(self):
+        """
+        _elapsed_
+
+        Simulated seconds since the start
+
+        """
+        return self.time() - self.simStart
+
+    def sleepUntil(self, elapsed):
+        """
+        _sleepUntil_
+
+        Sleep until the given simulated seconds since the start
+
+        """
+        delay = (elapsed - self.elapsed()) / self.speedup
+        if delay > 0:
+            time.sleep(delay)
+
+        return
+
+
+class RunTimeline(object):
+    """
+    _RunTimeline_
+
+    Runs are added one after the other, separated by gap seconds.
+    Streamers of a lumi are written at random times during the lumi,
+    EoLS records eolsDelay seconds after the end of the lumi (plus
+    a random jitter per instance), EoR records eorDelay seconds after
+    the end of the run and RunSummary stops stopDelay seconds after it.
+
+    """
+    def __init__(self, firstRun = 900000, gap = 60.0, seed = None):
+        """
+        _init_
+
+        """
+        self.nextRun = firstRun
+        self.nextStart = 0.0
+        self.gap = gap
+        self.random = random.Random(seed)
+
+        self.runs = {}
+        self.events = []
+        self.counter = 0
+
+        return
+
+    def addEvent(self, eventTime, kind, **params):
+        """
+        _addEvent_
+
+        """
+        # counter keeps the order of simultaneous events stable
+        heapq.heappush(self.events, (eventTime, self.counter, kind, params))
+        self.counter += 1
+
+        return
+
+    def addRun(self, lumis, streams, instances = 4, filesPerLumi = 1,
+               lumiLength = 23.31, eolsDelay = 5.0, eolsJitter = 5.0,
+               eorDelay = 30.0, stopDelay = 10.0, hltkey = None,
+               fileSize = 1000000, fileEvents = 1000):
+        """
+        _addRun_
+
+        Add a run with the given number of lumis, each instance
+        writes filesPerLumi streamers per stream and lumi.
+
+        """
+        run = self.nextRun
+        start = self.nextStart
+
+        self.runs[run] = { 'start' : start,
+                           'lumis' : lumis,
+                           'streams' : list(streams),
+                           'instances' : instances,
+                           'streamers' : lumis * len(streams) * instances * filesPerLumi }
+
+        self.addEvent(start, "runStart", run = run, hltkey = hltkey,
+                      instances = instances)
+
+        for lumi in range(1, lumis + 1):
+
+            lumiStart = start + (lumi - 1) * lumiLength
+            lumiEnd = lumiStart + lumiLength
+
+            for instance in range(instances):
+                for stream in streams:
+                    for index in range(filesPerLumi):
+                        lfn = "/store/t0streamer/Data/%s/000/%03d/%03d/run%d_ls%04d_stream%s_instance%d_%d.dat" % \
+                              (stream, run // 1000000, (run // 1000) % 1000, run, lumi, stream, instance, index)
+                        self.addEvent(lumiStart + self.random.uniform(0, lumiLength), "streamer",
+                                      run = run, stream = stream, lumi = lumi, lfn = lfn,
+                                      filesize = fileSize, events = fileEvents)
+
+                self.addEvent(lumiEnd + eolsDelay + self.random.uniform(0, eolsJitter), "eols",
+                              run = run, instance = instance, lumi = lumi,
+                              filecounts = dict([ (stream, filesPerLumi) for stream in streams ]))
+
+        runEnd = start + lumis * lumiLength
+
+        self.addEvent(runEnd + stopDelay, "runStop", run = run)
+
+        for instance in range(instances):
+            self.addEvent(runEnd + eorDelay + self.random.uniform(0, eolsJitter), "eor",
+                          run = run, instance = instance, lumicount = lumis)
+
+        self.nextRun += 1
+        self.nextStart = runEnd + eorDelay + eolsJitter + self.gap
+
+        return run
+
+    def getDuration(self):
+        """
+        _getDuration_
+
+        Time of the last event
+
+        """
+        if len(self.events) == 0:
+            return 0
+
+        return max([ event[0] for event in self.events ])
+
+    def popDueEvents(self, elapsed):
+        """
+        _popDueEvents_
+
+        Remove and return all events up to the given time
+
+        """
+        dueEvents = []
+        while len(self.events) > 0 and self.events[0][0] <= elapsed:
+            (eventTime, counter, kind, params) = heapq.heappop(self.events)
+            dueEvents.append( (eventTime, kind, params) )
+
+        return dueEvents
@@ -0,0 +1,273 @@
+"""
+_StandInDatabases_
+
+Stand-ins for the P5 databases the Tier0Feeder reads from
+
+  CMS_STOMGR     - StorageManager EoR (runs) and EoLS (streams) records
+  CMS_WBM        - RunSummary start and stop times
+  cms_hlt_gdr    - HLT configuration (stream/dataset/path mapping)
+  CMS_CONDITIONS - PopCon IOVs used to release express
+
+Each schema is kept in its own sqlite file. The feeder DAOs use
+schema qualified table names, so the files are attached under
+the schema name to every connection of the stand-in engine,
+see setupStandInEngine. The feeder is then configured with
+getConnectUrl() for the StorageManager, HLTConf and PopConLog
+databases and runs its queries unchanged.
+
+"""
+import os
+import time
+import sqlite3
+
+from sqlalchemy import event
+
+from T0.WMBS.SQLite import registerFunctions
+
+schemas = { 'CMS_STOMGR' : [ """CREATE TABLE IF NOT EXISTS runs (
+                                  runnumber       INTEGER NOT NULL,
+                                  instance        INTEGER NOT NULL,
+                                  status          INTEGER NOT NULL,
+                                  n_instances     INTEGER NOT NULL,
+                                  n_lumisections  INTEGER DEFAULT 0 NOT NULL,
+                                  PRIMARY KEY (runnumber, instance)
+                                )""",
+                             """CREATE TABLE IF NOT EXISTS streams (
+                                  runnumber    INTEGER NOT NULL,
+                                  instance     INTEGER NOT NULL,
+                                  stream       TEXT    NOT NULL,
+                                  lumisection  INTEGER NOT NULL,
+                                  filecount    INTEGER NOT NULL,
+                                  PRIMARY KEY (runnumber, stream, lumisection, instance)
+                                )""" ],
+            'CMS_WBM' : [ """CREATE TABLE IF NOT EXISTS RUNSUMMARY (
+                               runnumber  INTEGER NOT NULL,
+                               starttime  TEXT,
+                               stoptime   TEXT,
+                               PRIMARY KEY (runnumber)
+                             )""" ],
+            'cms_hlt_gdr' : [ "CREATE TABLE IF NOT EXISTS u_confversions (id INTEGER PRIMARY KEY, name TEXT, processname TEXT)",
+                              "CREATE TABLE IF NOT EXISTS u_streams (id INTEGER PRIMARY KEY, name TEXT)",
+                              "CREATE TABLE IF NOT EXISTS u_datasets (id INTEGER PRIMARY KEY, name TEXT)",
+                              "CREATE TABLE IF NOT EXISTS u_paths (id INTEGER PRIMARY KEY, name TEXT)",
+                              "CREATE TABLE IF NOT EXISTS u_streamids (id INTEGER PRIMARY KEY, id_stream INTEGER, fractodisk REAL)",
+                              "CREATE TABLE IF NOT EXISTS u_datasetids (id INTEGER PRIMARY KEY, id_dataset INTEGER)",
+                              "CREATE TABLE IF NOT EXISTS u_pathids (id INTEGER PRIMARY KEY, id_path INTEGER)",
+                              "CREATE TABLE IF NOT EXISTS u_pathid2conf (id_pathid INTEGER, id_confver INTEGER)",
+                              "CREATE TABLE IF NOT EXISTS u_pathid2strdst (id_pathid INTEGER, id_streamid INTEGER, id_datasetid INTEGER)",
+                              "CREATE TABLE IF NOT EXISTS u_conf2strdst (id_confver INTEGER, id_streamid INTEGER, id_datasetid INTEGER)" ],
+            'CMS_CONDITIONS' : [ """CREATE TABLE IF NOT EXISTS IOV (
+                                      tag_name  TEXT    NOT NULL,
+                                      since     INTEGER NOT NULL
+                                    )""" ] }
+
+def setupStandInEngine(engine, baseDir):
+    """
+    _setupStandInEngine_
+
+    Attach the stand-in databases to every connection of
+    the engine and register the T0 SQLite functions.
+
+    """
+    def attachStandInDatabases(dbapiConnection, connectionRecord = None):
+        for schema in sorted(schemas.keys()):
+            dbapiConnection.execute("ATTACH DATABASE '%s' AS %s" % (os.path.join(baseDir, "%s.db" % schema), schema))
+        registerFunctions(dbapiConnection, connectionRecord)
+
+    event.listen(engine, "connect", attachStandInDatabases)
+
+    return
+
+def formatTime(timestamp):
+    """
+    _formatTime_
+
+    RunSummary times are timestamps (UTC)
+
+    """
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(int(timestamp)))
+
+
+class StandInDatabases(object):
+    """
+    _StandInDatabases_
+
+    Creates the stand-in schemas and records what the P5
+    systems would record during a run. Every method uses its
+    own sqlite connection, like the UploadQueue.
+
+    """
+    def __init__(self, baseDir):
+        """
+        _init_
+
+        """
+        self.baseDir = baseDir
+
+        if not os.path.isdir(self.baseDir):
+            os.makedirs(self.baseDir)
+
+        for schema, creates in schemas.items():
+            conn = self.connect(schema)
+            try:
+                for create in creates:
+                    conn.execute(create)
+                conn.commit()
+            finally:
+                conn.close()
+
+        return
+
+    def connect(self, schema):
+        """
+        _connect_
+
+        """
+        return sqlite3.connect(os.path.join(self.baseDir, "%s.db" % schema), timeout = 60)
+
+    def getConnectUrl(self):
+        """
+        _getConnectUrl_
+
+        Connect URL for the StorageManager, HLTConf and PopConLog
+        databases, needs setupStandInEngine on its engine.
+
+        """
+        return "sqlite:///%s" % os.path.join(self.baseDir, "StandIn.db")
+
+    def insertHLTConfig(self, hltkey, process, mapping):
+        """
+        _insertHLTConfig_
+
+        Insert a HLT configuration, mapping is a dictionary
+        of stream to dataset to list of trigger paths.
+
+        """
+        conn = self.connect("cms_hlt_gdr")
+        try:
+            cursor = conn.cursor()
+            cursor.execute("INSERT INTO u_confversions (name, processname) VALUES (?, ?)", (hltkey, process))
+            confId = cursor.lastrowid
+
+            for stream, datasets in mapping.items():
+                cursor.execute("INSERT INTO u_streams (name) VALUES (?)", (stream,))
+                cursor.execute("INSERT INTO u_streamids (id_stream, fractodisk) VALUES (?, 1)", (cursor.lastrowid,))
+                streamId = cursor.lastrowid
+
+                for dataset, paths in datasets.items():
+                    cursor.execute("INSERT INTO u_datasets (name) VALUES (?)", (dataset,))
+                    cursor.execute("INSERT INTO u_datasetids (id_dataset) VALUES (?)", (cursor.lastrowid,))
+                    datasetId = cursor.lastrowid
+                    cursor.execute("INSERT INTO u_conf2strdst (id_confver, id_streamid, id_datasetid) VALUES (?, ?, ?)",
+                                   (confId, streamId, datasetId))
+
+                    for path in paths:
+                        cursor.execute("INSERT INTO u_paths (name) VALUES (?)", (path,))
+                        cursor.execute("INSERT INTO u_pathids (id_path) VALUES (?)", (cursor.lastrowid,))
+                        pathId = cursor.lastrowid
+                        cursor.execute("INSERT INTO u_pathid2conf (id_pathid, id_confver) VALUES (?, ?)",
+                                       (pathId, confId))
+                        cursor.execute("INSERT INTO u_pathid2strdst (id_pathid, id_streamid, id_datasetid) VALUES (?, ?, ?)",
+                                       (pathId, streamId, datasetId))
+            conn.commit()
+        finally:
+            conn.close()
+
+        return
+
+    def startRun(self, run, startTime, instances):
+        """
+        _startRun_
+
+        RunSummary start time and StorageManager run
+        records (without EoR) for all instances
+
+        """
+        conn = self.connect("CMS_WBM")
+        try:
+            conn.execute("INSERT OR REPLACE INTO RUNSUMMARY (runnumber, starttime, stoptime) VALUES (?, ?, NULL)",
+                         (run, formatTime(startTime)))
+            conn.commit()
+        finally:
+            conn.close()
+
+        conn = self.connect("CMS_STOMGR")
+        try:
+            conn.executemany("INSERT OR REPLACE INTO runs (runnumber, instance, status, n_instances) VALUES (?, ?, 1, ?)",
+                             [ (run, instance, instances) for instance in range(instances) ])
+            conn.commit()
+        finally:
+            conn.close()
+
+        return
+
+    def insertPopConRecord(self, run):
+        """
+        _insertPopConRecord_
+
+        """
+        conn = self.connect("CMS_CONDITIONS")
+        try:
+            conn.execute("INSERT INTO IOV (tag_name, since) VALUES ('runinfo_start_31X_hlt', ?)", (run,))
+            conn.commit()
+        finally:
+            conn.close()
+
+        return
+
+    def endOfLumi(self, run, instance, lumi, filecounts):
+        """
+        _endOfLumi_
+
+        EoLS records of an instance, filecounts
+        is a dictionary of stream to filecount
+
+        """
+        conn = self.connect("CMS_STOMGR")
+        try:
+            conn.executemany("""INSERT OR REPLACE INTO streams
+                                (runnumber, instance, stream, lumisection, filecount)
+                                VALUES (?, ?, ?, ?, ?)""",
+                             [ (run, instance, stream, lumi, filecount) for stream, filecount in filecounts.items() ])
+            conn.commit()
+        finally:
+            conn.close()
+
+        return
+
+    def endOfRun(self, run, instance, lumicount):
+        """
+        _endOfRun_
+
+        EoR record of an instance
+
+        """
+        conn = self.connect("CMS_STOMGR")
+        try:
+            conn.execute("""UPDATE runs
+                            SET status = 0,
+                                n_lumisections = ?
+                            WHERE runnumber = ? AND instance = ?""",
+                         (lumicount, run, instance))
+            conn.commit()
+        finally:
+            conn.close()
+
+        return
+
+    def stopRun(self, run, stopTime):
+        """
+        _stopRun_
+
+        RunSummary stop time
+
+        """
+        conn = self.connect("CMS_WBM")
+        try:
+            conn.execute("UPDATE RUNSUMMARY SET stoptime = ? WHERE runnumber = ?",
+                         (formatTime(stopTime), run))
+            conn.commit()
+        finally:
+            conn.close()
+
+        return
@@ -0,0 +1,292 @@
+"""
+_T0DataSvcSync_
+
+Syncs T0AST records to the Tier0 Data Service.
+
+Every synced table is described by a SyncTable, which names the
+T0AST DAO returning the changed (not yet synced) records, the Tier0
+Data Service DAO writing them and the T0AST DAO marking them synced,
+and maps a record to the binds of the latter two.
+
+Records are synced in batches of bounded size. For each batch the
+Tier0 Data Service write (an idempotent MERGE) is committed first
+and then the records are marked synced in T0AST. If anything fails
+in between, the batch is still pending in T0AST and written again
+on the next sync, which is harmless. Completed batches are never
+repeated.
+
+"""
+import time
+import logging
+
+
+class SyncTable(object):
+    """
+    _SyncTable_
+
+    Subclasses set the DAO classnames and the bind name to
+    record key mappings, or override getBinds if the binds
+    can't be copied from the record as they are
+
+    """
+    name = None
+    getClassname = None
+    writeClassname = None
+    markClassname = None
+
+    writeBinds = {}
+    markBinds = {}
+
+    def getBinds(self, record):
+        """
+        _getBinds_
+
+        Binds of the Tier0 Data Service write and the T0AST marker
+
+        """
+        bindWrite = {}
+        for bind, key in self.writeBinds.items():
+            bindWrite[bind] = record[key]
+
+        bindMark = {}
+        for bind, key in self.markBinds.items():
+            bindMark[bind] = record[key]
+
+        return (bindWrite, bindMark)
+
+
+class RunStreamDoneSync(SyncTable):
+
+    name = "run_stream_done"
+    getClassname = "T0DataSvc.GetRunStreamDone"
+    writeClassname = "T0DataSvc.InsertRunStreamDone"
+    markClassname = "T0DataSvc.UpdateRunStreamDone"
+
+    writeBinds = { 'RUN' : 'run',
+                   'STREAM' : 'stream' }
+    markBinds = { 'RUN' : 'run',
+                  'STREAM' : 'stream' }
+
+
+class ExpressConfigSync(SyncTable):
+
+    name = "express_config"
+    getClassname = "T0DataSvc.GetExpressConfigs"
+    writeClassname = "T0DataSvc.InsertExpressConfigs"
+    markClassname = "T0DataSvc.UpdateExpressConfigs"
+
+    writeBinds = { 'RUN' : 'run',
+                   'STREAM' : 'stream',
+                   'CMSSW' : 'cmssw',
+                   'SCRAM_ARCH' : 'scram_arch',
+                   'RECO_CMSSW' : 'reco_cmssw',
+                   'RECO_SCRAM_ARCH' : 'reco_scram_arch',
+                   'ALCA_SKIM' : 'alca_skim',
+                   'DQM_SEQ' : 'dqm_seq',
+                   'GLOBAL_TAG' : 'global_tag',
+                   'SCENARIO' : 'scenario' }
+    markBinds = { 'RUN' : 'run',
+                  'STREAM' : 'stream' }
+
+    def getBinds(self, record):
+        (bindWrite, bindMark) = SyncTable.getBinds(self, record)
+        bindWrite['GLOBAL_TAG'] = bindWrite['GLOBAL_TAG'][:50]
+        return (bindWrite, bindMark)
+
+
+class RecoConfigSync(SyncTable):
+
+    name = "reco_config"
+    getClassname = "T0DataSvc.GetRecoConfigs"
+    writeClassname = "T0DataSvc.InsertRecoConfigs"
+    markClassname = "T0DataSvc.UpdateRecoConfigs"
+
+    writeBinds = { 'RUN' : 'run',
+                   'PRIMDS' : 'primds',
+                   'CMSSW' : 'cmssw',
+                   'SCRAM_ARCH' : 'scram_arch',
+                   'ALCA_SKIM' : 'alca_skim',
+                   'PHYSICS_SKIM' : 'physics_skim',
+                   'DQM_SEQ' : 'dqm_seq',
+                   'GLOBAL_TAG' : 'global_tag',
+                   'SCENARIO' : 'scenario' }
+    markBinds = { 'RUN' : 'run',
+                  'PRIMDS' : 'primds' }
+
+    def getBinds(self, record):
+        (bindWrite, bindMark) = SyncTable.getBinds(self, record)
+        bindWrite['GLOBAL_TAG'] = bindWrite['GLOBAL_TAG'][:50]
+        return (bindWrite, bindMark)
+
+
+class RecoReleaseConfigSync(SyncTable):
+    """
+    _RecoReleaseConfigSync_
+
+    Aggregated by run, if one primary dataset is released
+    that means the whole run is considered released.
+    Runs are synced again once when they are released.
+
+    """
+    name = "reco_release_config"
+    getClassname = "T0DataSvc.GetRecoReleaseConfigs"
+    writeClassname = "T0DataSvc.InsertRecoReleaseConfigs"
+    markClassname = "T0DataSvc.UpdateRecoReleaseConfigs"
+
+    def getBinds(self, record):
+        locked = int(record['released'] > 0)
+        return ( { 'RUN' : record['run'],
+                   'LOCKED' : locked },
+                 { 'RUN' : record['run'],
+                   'IN_DATASVC' : locked + 1 } )
+
+
+class DatasetLockedSync(SyncTable):
+
+    name = "dataset_locked"
+    getClassname = "T0DataSvc.GetDatasetLocked"
+    writeClassname = "T0DataSvc.InsertDatasetLocked"
+    markClassname = "T0DataSvc.UpdateDatasetLocked"
+
+    writeBinds = { 'PATH' : 'path' }
+    markBinds = { 'ID' : 'id' }
+
+
+defaultSyncTables = [ RunStreamDoneSync(), ExpressConfigSync(), RecoConfigSync(),
+                      RecoReleaseConfigSync(), DatasetLockedSync() ]
+
+
+class T0DataSvcSync(object):
+    """
+    _T0DataSvcSync_
+
+    Syncs the tables and keeps throughput metrics per table
+
+    """
+    def __init__(self, daoFactory, daoFactoryT0DataSvc, tables = None, batchSize = 500):
+        """
+        _init_
+
+        """
+        self.daoFactory = daoFactory
+        self.daoFactoryT0DataSvc = daoFactoryT0DataSvc
+        self.batchSize = max(batchSize, 1)
+
+        self.tables = tables
+        if self.tables == None:
+            self.tables = defaultSyncTables
+
+        # table to start with, after a sync that ran out of time
+        self.nextTable = 0
+
+        self.metrics = {}
+        for table in self.tables:
+            self.metrics[table.name] = { 'records' : 0,
+                                         'batches' : 0,
+                                         'failures' : 0,
+                                         'deferred' : 0,
+                                         'seconds' : 0.0,
+                                         'lastSync' : None }
+
+        return
+
+    def syncTable(self, table, deadline = None):
+        """
+        _syncTable_
+
+        Sync the pending records of a table, returns
+        the number of records synced and whether all
+        were synced (only not the case once the deadline
+        is reached, the rest is synced the next time)
+
+        """
+        getDAO = self.daoFactory(classname = table.getClassname)
+        writeDAO = self.daoFactoryT0DataSvc(classname = table.writeClassname)
+        markDAO = self.daoFactory(classname = table.markClassname)
+
+        records = getDAO.execute(transaction = False)
+
+        synced = 0
+        for i in range(0, len(records), self.batchSize):
+
+            if deadline != None and i > 0 and time.time() > deadline:
+                return (synced, False)
+
+            bindsWrite = []
+            bindsMark = []
+            for record in records[i:i+self.batchSize]:
+                (bindWrite, bindMark) = table.getBinds(record)
+                bindsWrite.append(bindWrite)
+                bindsMark.append(bindMark)
+
+            writeDAO.execute(binds = bindsWrite, transaction = False)
+            markDAO.execute(binds = bindsMark, transaction = False)
+
+            synced += len(bindsMark)
+            self.metrics[table.name]['batches'] += 1
+
+        return (synced, True)
+
+    def sync(self, deadline = None):
+        """
+        _sync_
+
+        Sync all tables, a failing table
+        does not hold up the others
+
+        Once the deadline is reached the sync stops, the next
+        sync starts with the table it stopped at
+
+        """
+        numTables = len(self.tables)
+        for index in range(numTables):
+
+            tableIndex = (self.nextTable + index) % numTables
+            table = self.tables[tableIndex]
+            metrics = self.metrics[table.name]
+
+            if deadline != None and index > 0 and time.time() > deadline:
+                self.nextTable = tableIndex
+                logging.info("Deferring Tier0 Data Service sync of %d tables to the next cycle" % (numTables - index))
+                return
+
+            startTime = time.time()
+            try:
+                (synced, complete) = self.syncTable(table, deadline = deadline)
+            except Exception:
+                metrics['failures'] += 1
+                logging.exception("Can't sync %s to the Tier0 Data Service" % table.name)
+                continue
+            duration = time.time() - startTime
+
+            metrics['records'] += synced
+            metrics['seconds'] += duration
+            metrics['lastSync'] = time.time()
+
+            if synced > 0:
+                logging.info("Synced %d %s records to the Tier0 Data Service in %.2f seconds (%.1f records/s)" %
+                             (synced, table.name, duration, synced / max(duration, 0.001)))
+
+            if not complete:
+                metrics['deferred'] += 1
+                self.nextTable = tableIndex
+                logging.info("Deferring the rest of the Tier0 Data Service sync to the next cycle")
+                return
+
+        self.nextTable = 0
+
+        return
+
+    def getMetrics(self):
+        """
+        _getMetrics_
+
+        Totals per table since startup, including throughput
+
+        """
+        metrics = {}
+        for name, tableMetrics in self.metrics.items():
+            metrics[name] = dict(tableMetrics)
+            metrics[name]['throughput'] = tableMetrics['records'] / max(tableMetrics['seconds'], 0.001)
+
+        return metrics
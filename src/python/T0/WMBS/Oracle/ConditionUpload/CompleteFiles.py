@@ -6,6 +6,8 @@ Oracle implementation of CompleteFiles
 There is a DQ in WMCore for this, but it also deletes from
 the available and failed tables, which isn't needed here.
 
+Idempotent, files already complete are left alone.
+
 """
 
 from WMCore.Database.DBFormatter import DBFormatter
@@ -16,7 +18,11 @@ class CompleteFiles(DBFormatter):
 
         sql = """INSERT INTO wmbs_sub_files_complete
                  (SUBSCRIPTION, FILEID)
-                 VALUES (:SUBSCRIPTION, :FILEID)
+                 SELECT :SUBSCRIPTION, :FILEID FROM DUAL
+                 WHERE NOT EXISTS (
+                   SELECT * FROM wmbs_sub_files_complete
+                   WHERE subscription = :SUBSCRIPTION
+                   AND fileid = :FILEID )
                  """
 
         self.dbi.processData(sql, binds, conn = conn,
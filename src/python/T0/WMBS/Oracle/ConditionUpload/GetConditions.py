@@ -6,6 +6,10 @@ Oracle implementation of GetConditions
 Return information about all run/streams that have not
 finished the PCL yet and all still to be uploaded files.
 
+For finished run/streams (late arriving payloads) only
+files inserted at or after insertTime are considered,
+so the caller can restrict the query to recent files.
+
 """
 
 from WMCore.Database.DBFormatter import DBFormatter
@@ -19,7 +23,9 @@ class GetConditions(DBFormatter):
                                prompt_calib.stream_id,
                                prompt_calib_file.fileid,
                                prompt_calib_file.subscription,
-                               wmbs_file_details.lfn
+                               wmbs_file_details.lfn,
+                               wmbs_file_details.filesize,
+                               prompt_calib_file.insert_time
                         FROM prompt_calib
                         INNER JOIN run ON
                           run.run_id = prompt_calib.run_id
@@ -40,24 +46,28 @@ class GetConditions(DBFormatter):
                             prompt_calib.stream_id,
                             prompt_calib_file.fileid,
                             prompt_calib_file.subscription,
-                            wmbs_file_details.lfn
-                     FROM prompt_calib
+                            wmbs_file_details.lfn,
+                            wmbs_file_details.filesize,
+                            prompt_calib_file.insert_time
+                     FROM prompt_calib_file
+                     INNER JOIN prompt_calib ON
+                       prompt_calib.run_id = prompt_calib_file.run_id AND
+                       prompt_calib.stream_id = prompt_calib_file.stream_id
                      INNER JOIN run ON
                        run.run_id = prompt_calib.run_id
-                     INNER JOIN prompt_calib_file ON
-                       prompt_calib_file.run_id = prompt_calib.run_id AND
-                       prompt_calib_file.stream_id = prompt_calib.stream_id
                      INNER JOIN wmbs_sub_files_acquired ON
                        wmbs_sub_files_acquired.fileid = prompt_calib_file.fileid
                      INNER JOIN wmbs_file_details ON
                        wmbs_file_details.id = wmbs_sub_files_acquired.fileid
-                     WHERE prompt_calib.finished = 1
+                     WHERE prompt_calib_file.insert_time >= :INSERT_TIME
+                     AND prompt_calib.finished = 1
                      """
 
-    def execute(self, finished, conn = None, transaction = False):
+    def execute(self, finished, insertTime = None, conn = None, transaction = False):
 
         if finished:
-            results = self.dbi.processData(self.sqlFinished, {},
+            binds = { 'INSERT_TIME' : insertTime or 0 }
+            results = self.dbi.processData(self.sqlFinished, binds,
                                            conn = conn, transaction = transaction)[0].fetchall()
         else:
             results = self.dbi.processData(self.sqlNotFinished, {},
@@ -82,6 +92,8 @@ class GetConditions(DBFormatter):
             if result[7] != None:
                 conditions[run]['streams'][streamid].append( { 'fileid' : result[5],
                                                                'subscription' : result[6],
-                                                               'lfn' : result[7] } )
+                                                               'lfn' : result[7],
+                                                               'filesize' : result[8],
+                                                               'insert_time' : result[9] } )
 
         return conditions
@@ -0,0 +1,29 @@
+"""
+_GetOldestAcquiredInsertTime_
+
+Oracle implementation of GetOldestAcquiredInsertTime
+
+Returns the insert time of the oldest prompt_calib_file
+that is still acquired (not uploaded yet), no matter if
+its run/stream PCL is finished or not. None if there are
+no such files.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class GetOldestAcquiredInsertTime(DBFormatter):
+
+    def execute(self, conn = None, transaction = False):
+
+        sql = """SELECT MIN(prompt_calib_file.insert_time)
+                 FROM prompt_calib_file
+                 INNER JOIN wmbs_sub_files_acquired ON
+                   wmbs_sub_files_acquired.subscription = prompt_calib_file.subscription AND
+                   wmbs_sub_files_acquired.fileid = prompt_calib_file.fileid
+                 """
+
+        insertTime = self.dbi.processData(sql, {}, conn = conn,
+                                          transaction = transaction)[0].fetchall()[0][0]
+
+        return insertTime
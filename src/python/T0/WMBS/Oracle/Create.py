@@ -106,6 +106,7 @@ class Create(DBCreator):
                  status             int           default 1 not null,
                  last_updated       int           not null,
                  express_released   int           default 0 not null,
+                 express_release_time int         default 0 not null,
                  hltkey             varchar2(255) not null,
                  start_time         int           not null,
                  stop_time          int           default 0 not null,
@@ -233,6 +234,26 @@ class Create(DBCreator):
                  primary key(subscription, run_id, lumi_id)
                ) ORGANIZATION INDEX"""
 
+        self.create[len(self.create)] = \
+            """CREATE TABLE lumi_section_express_job (
+                 run_id      int   not null,
+                 stream_id   int   not null,
+                 lumi_id     int   not null,
+                 job_time    int   not null,
+                 primary key(run_id, stream_id, lumi_id)
+               ) ORGANIZATION INDEX"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE subscription_metrics (
+                 subscription      int not null,
+                 run_id            int not null,
+                 overrate_lumis    int default 0 not null,
+                 overrate_files    int default 0 not null,
+                 overrate_events   int default 0 not null,
+                 last_updated      int not null,
+                 primary key(subscription)
+               ) ORGANIZATION INDEX"""
+
         self.create[len(self.create)] = \
             """CREATE TABLE streamer (
                  id            int not null,
@@ -305,6 +326,7 @@ class Create(DBCreator):
                  stream_id     int not null,
                  fileid        int not null,
                  subscription  int not null,
+                 insert_time   int not null,
                  primary key (run_id, stream_id, fileid)
                ) ORGANIZATION INDEX"""
 
@@ -355,6 +377,14 @@ class Create(DBCreator):
                  primary key (dataset_id)
                ) ORGANIZATION INDEX"""
 
+        self.create[len(self.create)] = \
+            """CREATE TABLE tier0_feeder_lease (
+                 name         varchar2(50) not null,
+                 owner        varchar2(255),
+                 expire_time  int default 0 not null,
+                 primary key (name)
+               ) ORGANIZATION INDEX"""
+
         self.create[len(self.create)] = \
             """CREATE FUNCTION checkForZeroState (value IN int)
                RETURN int DETERMINISTIC IS
@@ -463,6 +493,9 @@ class Create(DBCreator):
         self.indexes[len(self.indexes)] = \
             """CREATE INDEX idx_prompt_calib_1 ON prompt_calib (checkForZeroState(finished))"""
 
+        self.indexes[len(self.indexes)] = \
+            """CREATE INDEX idx_prompt_calib_file_1 ON prompt_calib_file (insert_time)"""
+
         self.indexes[len(self.indexes)] = \
             """CREATE INDEX idx_express_config_1 ON express_config (checkForZeroState(in_datasvc))"""
 
@@ -677,6 +710,18 @@ class Create(DBCreator):
                  FOREIGN KEY (subscription)
                  REFERENCES wmbs_subscription(id)"""
 
+        self.constraints[len(self.constraints)] = \
+            """ALTER TABLE lumi_section_express_job
+                 ADD CONSTRAINT lum_sec_exp_job_rl_id_fk
+                 FOREIGN KEY (run_id, lumi_id)
+                 REFERENCES lumi_section(run_id, lumi_id)"""
+
+        self.constraints[len(self.constraints)] = \
+            """ALTER TABLE lumi_section_express_job
+                 ADD CONSTRAINT lum_sec_exp_job_stre_id_fk
+                 FOREIGN KEY (stream_id)
+                 REFERENCES stream(id)"""
+
         self.constraints[len(self.constraints)] = \
             """ALTER TABLE streamer
                  ADD CONSTRAINT str_run_id_fk
@@ -737,6 +782,16 @@ class Create(DBCreator):
                  FOREIGN KEY (stream_id)
                  REFERENCES stream(id)"""
 
+        #
+        # no constraint on the subscription, metrics are
+        # kept after the subscription is cleaned up
+        #
+        self.constraints[len(self.constraints)] = \
+            """ALTER TABLE subscription_metrics
+                 ADD CONSTRAINT sub_met_run_id_fk
+                 FOREIGN KEY (run_id)
+                 REFERENCES run(run_id)"""
+
         self.constraints[len(self.constraints)] = \
             """ALTER TABLE prompt_calib_file
                  ADD CONSTRAINT pro_cal_fil_run_id_fk
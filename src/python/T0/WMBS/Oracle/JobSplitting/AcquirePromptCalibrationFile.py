@@ -0,0 +1,37 @@
+"""
+_AcquirePromptCalibrationFile_
+
+Oracle implementation of AcquirePromptCalibrationFile
+
+Marks files that are already in the prompt_calib_file
+table as acquired for the subscription, so they are
+not returned as available anymore.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class AcquirePromptCalibrationFile(DBFormatter):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """INSERT INTO wmbs_sub_files_acquired
+                 (SUBSCRIPTION, FILEID)
+                 SELECT :SUBSCRIPTION, :FILEID FROM DUAL
+                 WHERE NOT EXISTS (
+                   SELECT * FROM wmbs_sub_files_acquired
+                   WHERE subscription = :SUBSCRIPTION
+                   AND fileid = :FILEID )
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        sql = """DELETE FROM wmbs_sub_files_available
+                 WHERE subscription = :SUBSCRIPTION
+                 AND fileid = :FILEID"""
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
@@ -0,0 +1,29 @@
+"""
+_GetPromptCalibrationFiles_
+
+Oracle implementation of GetPromptCalibrationFiles
+
+Return the ids of all files of a subscription
+that are already in the prompt_calib_file table.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class GetPromptCalibrationFiles(DBFormatter):
+
+    def execute(self, subscription, conn = None, transaction = False):
+
+        sql = """SELECT fileid
+                 FROM prompt_calib_file
+                 WHERE subscription = :SUBSCRIPTION
+                 """
+
+        results = self.dbi.processData(sql, { 'SUBSCRIPTION' : subscription },
+                                       conn = conn, transaction = transaction)[0].fetchall()
+
+        fileids = set()
+        for result in results:
+            fileids.add(result[0])
+
+        return fileids
@@ -0,0 +1,31 @@
+"""
+_InsertExpressJobTime_
+
+Oracle implementation of InsertExpressJobTime
+
+Record when the first express job for
+a lumi section has been created.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class InsertExpressJobTime(DBFormatter):
+
+    sql = """MERGE INTO lumi_section_express_job a
+             USING (
+               SELECT run_id, stream_id, :LUMI AS lumi_id
+               FROM run_stream_fileset_assoc
+               WHERE fileset = (SELECT fileset FROM wmbs_subscription WHERE id = :SUB)
+             ) b ON ( b.run_id = a.run_id AND b.stream_id = a.stream_id AND b.lumi_id = a.lumi_id )
+             WHEN NOT MATCHED THEN
+               INSERT (run_id, stream_id, lumi_id, job_time)
+               VALUES (b.run_id, b.stream_id, b.lumi_id, :TIME)
+             """
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        self.dbi.processData(self.sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
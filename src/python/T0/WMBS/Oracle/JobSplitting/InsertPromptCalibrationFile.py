@@ -8,17 +8,26 @@ marks them as acquired for the subscription. The files
 will then be picked up by another piece of code,
 uploaded to the DropBox and be marked as completed.
 
+The insert time is recorded, it's used as a watermark
+to find late arriving payloads for finished runs.
+
 """
 
+import time
+
 from WMCore.Database.DBFormatter import DBFormatter
 
 class InsertPromptCalibrationFile(DBFormatter):
 
     def execute(self, binds, conn = None, transaction = False):
 
+        insertTime = int(time.time())
+        for bind in binds:
+            bind['INSERT_TIME'] = insertTime
+
         sql = """INSERT ALL
-                   INTO prompt_calib_file (RUN_ID, STREAM_ID, FILEID, SUBSCRIPTION)
-                     VALUES (:RUN_ID, id, :FILEID, :SUBSCRIPTION)
+                   INTO prompt_calib_file (RUN_ID, STREAM_ID, FILEID, SUBSCRIPTION, INSERT_TIME)
+                     VALUES (:RUN_ID, id, :FILEID, :SUBSCRIPTION, :INSERT_TIME)
                    INTO wmbs_sub_files_acquired (SUBSCRIPTION, FILEID)
                      VALUES (:SUBSCRIPTION, :FILEID)
                  SELECT id FROM stream
@@ -31,6 +40,7 @@ class InsertPromptCalibrationFile(DBFormatter):
         for bind in binds:
             del bind['RUN_ID']
             del bind['STREAM']
+            del bind['INSERT_TIME']
 
         sql = """DELETE FROM wmbs_sub_files_available
                  WHERE subscription = :SUBSCRIPTION
@@ -0,0 +1,37 @@
+"""
+_UpdateSubscriptionMetrics_
+
+Oracle implementation of UpdateSubscriptionMetrics
+
+Add the over-rate (dropped) lumi, file and event counts
+of a splitter pass to the subscription metrics record.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class UpdateSubscriptionMetrics(DBFormatter):
+
+    sql = """MERGE INTO subscription_metrics a
+             USING (
+               SELECT :SUB AS subscription, run_id
+               FROM run_stream_fileset_assoc
+               WHERE fileset = (SELECT fileset FROM wmbs_subscription WHERE id = :SUB)
+             ) b ON ( b.subscription = a.subscription )
+             WHEN MATCHED THEN UPDATE
+               SET a.overrate_lumis = a.overrate_lumis + :LUMIS,
+                   a.overrate_files = a.overrate_files + :FILES,
+                   a.overrate_events = a.overrate_events + :EVENTS,
+                   a.last_updated = :TIME
+             WHEN NOT MATCHED THEN
+               INSERT (subscription, run_id, overrate_lumis,
+                       overrate_files, overrate_events, last_updated)
+               VALUES (b.subscription, b.run_id, :LUMIS,
+                       :FILES, :EVENTS, :TIME)
+             """
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        self.dbi.processData(self.sql, binds, conn = conn,
+                             transaction = transaction)
+        return
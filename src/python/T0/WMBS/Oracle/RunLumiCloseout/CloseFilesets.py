@@ -0,0 +1,37 @@
+"""
+_CloseFilesets_
+
+Oracle implementation of CloseFilesets
+
+Closes the given run/stream filesets.
+
+"""
+import time
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class CloseFilesets(DBFormatter):
+
+    def execute(self, filesets, conn = None, transaction = False):
+
+        if len(filesets) == 0:
+            return
+
+        sql = """UPDATE wmbs_fileset
+                 SET open = 0,
+                     last_update = :CLOSE_TIME
+                 WHERE id = :FILESET
+                 AND open = 1
+                 """
+
+        closeTime = int(time.time())
+
+        binds = []
+        for fileset in filesets:
+            binds.append( { 'FILESET' : fileset,
+                            'CLOSE_TIME' : closeTime } )
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
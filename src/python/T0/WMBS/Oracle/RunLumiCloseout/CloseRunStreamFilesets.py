@@ -10,6 +10,8 @@ all data has been feed to the filesets for processing.
 
 If all these conditions are satisifed, close the run/stream fileset.
 
+Returns the closed run/streams as a list of (run, stream) tuples.
+
 """
 import time
 
@@ -17,54 +19,72 @@ from WMCore.Database.DBFormatter import DBFormatter
 
 class CloseRunStreamFilesets(DBFormatter):
 
+    sqlSelect = \
+       """SELECT b.run_id AS run_id,
+                 stream.name AS stream,
+                 b.fileset AS fileset
+          FROM (
+            SELECT run_stream_fileset_assoc.run_id AS run_id,
+                   run_stream_fileset_assoc.stream_id AS stream_id,
+                   run_stream_fileset_assoc.fileset AS fileset
+            FROM run_stream_fileset_assoc
+            INNER JOIN wmbs_fileset ON
+              wmbs_fileset.id = run_stream_fileset_assoc.fileset AND
+              wmbs_fileset.open = 1
+            INNER JOIN run ON
+              run.run_id = run_stream_fileset_assoc.run_id AND
+              run.stop_time > 0 AND
+              run.close_time > 0
+            INNER JOIN lumi_section_closed ON
+              lumi_section_closed.run_id = run_stream_fileset_assoc.run_id AND
+              lumi_section_closed.stream_id = run_stream_fileset_assoc.stream_id
+            GROUP BY run_stream_fileset_assoc.run_id,
+                     run_stream_fileset_assoc.stream_id,
+                     run_stream_fileset_assoc.fileset
+            HAVING SUM(CASE
+                         WHEN lumi_section_closed.close_time = 0 THEN 0
+                         ELSE 1
+                       END) = MAX(lumi_section_closed.lumi_id)
+            AND MAX(lumi_section_closed.lumi_id) = MAX(run.lumicount)
+          ) b
+          INNER JOIN stream ON
+            stream.id = b.stream_id
+          LEFT OUTER JOIN streamer ON
+            streamer.run_id = b.run_id AND
+            streamer.stream_id = b.stream_id AND
+            checkForZeroState(streamer.used) = 0
+          WHERE streamer.run_id IS NULL
+          GROUP BY b.run_id,
+                   stream.name,
+                   b.fileset
+          """
+
+    sqlUpdate = \
+       """UPDATE wmbs_fileset
+          SET open = 0,
+              last_update = :CLOSE_TIME
+          WHERE id = :FILESET
+          AND open = 1
+          """
+
     def execute(self, conn = None, transaction = False):
 
-        sql = """MERGE INTO wmbs_fileset a
-                 USING (
-                   SELECT b.run_id AS run_id,
-                          b.stream_id AS stream_id,
-                          b.fileset AS fileset
-                   FROM (
-                     SELECT run_stream_fileset_assoc.run_id AS run_id,
-                            run_stream_fileset_assoc.stream_id AS stream_id,
-                            run_stream_fileset_assoc.fileset AS fileset
-                     FROM run_stream_fileset_assoc
-                     INNER JOIN wmbs_fileset ON
-                       wmbs_fileset.id = run_stream_fileset_assoc.fileset AND
-                       wmbs_fileset.open = 1
-                     INNER JOIN run ON
-                       run.run_id = run_stream_fileset_assoc.run_id AND
-                       run.stop_time > 0 AND
-                       run.close_time > 0
-                     INNER JOIN lumi_section_closed ON
-                       lumi_section_closed.run_id = run_stream_fileset_assoc.run_id AND
-                       lumi_section_closed.stream_id = run_stream_fileset_assoc.stream_id
-                     GROUP BY run_stream_fileset_assoc.run_id,
-                              run_stream_fileset_assoc.stream_id,
-                              run_stream_fileset_assoc.fileset
-                     HAVING SUM(CASE
-                                  WHEN lumi_section_closed.close_time = 0 THEN 0
-                                  ELSE 1
-                                END) = MAX(lumi_section_closed.lumi_id)
-                     AND MAX(lumi_section_closed.lumi_id) = MAX(run.lumicount)
-                   ) b
-                   LEFT OUTER JOIN streamer ON
-                     streamer.run_id = b.run_id AND
-                     streamer.stream_id = b.stream_id AND
-                     checkForZeroState(streamer.used) = 0
-                   WHERE streamer.run_id IS NULL
-                   GROUP BY b.run_id,
-                            b.stream_id,
-                            b.fileset
-                 ) c ON ( c.fileset = a.id )
-                 WHEN MATCHED THEN
-                   UPDATE SET a.open = 0,
-                              a.last_update = :CLOSE_TIME
-                 """
-
-        binds = { 'CLOSE_TIME' : int(time.time()) }
-
-        self.dbi.processData(sql, binds, conn = conn,
+        results = self.dbi.processData(self.sqlSelect, {}, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        if len(results) == 0:
+            return []
+
+        closeTime = int(time.time())
+
+        binds = []
+        runStreams = []
+        for result in results:
+            binds.append( { 'FILESET' : result[2],
+                            'CLOSE_TIME' : closeTime } )
+            runStreams.append( (result[0], result[1]) )
+
+        self.dbi.processData(self.sqlUpdate, binds, conn = conn,
                              transaction = transaction)
 
-        return
+        return runStreams
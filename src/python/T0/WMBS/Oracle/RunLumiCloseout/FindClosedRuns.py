@@ -7,31 +7,42 @@ Checks the given runs whether they are closed according to
 the StorageManager EoR records and returns a list of all
 closed runs together with the high lumi section for each run.
 
+All runs are checked in one query (or a few for many runs).
+
 """
 
 from WMCore.Database.DBFormatter import DBFormatter
 
 class FindClosedRuns(DBFormatter):
 
-    def execute(self, runs, conn = None, transaction = False):
+    # Oracle allows at most 1000 expressions in an IN list
+    maxInList = 500
 
-        sql = """SELECT a.runnumber, MAX(a.n_lumisections)
-                 FROM CMS_STOMGR.runs a
-                 WHERE a.runnumber = :RUN
-                 AND a.status = 0
-                 GROUP BY a.runnumber
-                 HAVING COUNT(*) = MAX(a.n_instances)
-                 """
+    sql = """SELECT a.runnumber, MAX(a.n_lumisections)
+             FROM CMS_STOMGR.runs a
+             WHERE a.runnumber IN (%s)
+             AND a.status = 0
+             GROUP BY a.runnumber
+             HAVING COUNT(*) = MAX(a.n_instances)
+             """
 
-        binds = []
-        for run in runs:
-            binds.append( { 'RUN' : run } )
+    def execute(self, runs, conn = None, transaction = False):
 
-        results = self.dbi.processData(sql, binds, conn = conn,
-                                       transaction = transaction)[0].fetchall()
+        runs = list(runs)
 
         closedRuns = {}
-        for result in results:
-            closedRuns[result[0]] = result[1]
+        for i in range(0, len(runs), self.maxInList):
+
+            binds = {}
+            for j, run in enumerate(runs[i:i+self.maxInList]):
+                binds['RUN%d' % j] = run
+
+            sql = self.sql % ", ".join([ ":RUN%d" % j for j in range(len(binds)) ])
+
+            results = self.dbi.processData(sql, binds, conn = conn,
+                                           transaction = transaction)[0].fetchall()
+
+            for result in results:
+                closedRuns[result[0]] = result[1]
 
         return closedRuns
@@ -6,43 +6,45 @@ Oracle implementation of FindStoppedRuns
 Checks RunSummary start and stop times for the the given runs
 and returns them if both are greater than null.
 
+All runs are checked in one query (or a few for many runs),
+start and stop times are converted to seconds since the epoch
+with DATE arithmetic.
+
 """
 
 from WMCore.Database.DBFormatter import DBFormatter
 
 class FindStoppedRuns(DBFormatter):
 
+    # Oracle allows at most 1000 expressions in an IN list
+    maxInList = 500
+
+    sql = """SELECT RUNSUMMARY.runnumber,
+                    ROUND((CAST(RUNSUMMARY.starttime AS DATE) - TO_DATE('01/01/1970 00:00:00', 'DD/MM/YYYY HH24:MI:SS')) * 86400) AS starttime,
+                    ROUND((CAST(RUNSUMMARY.stoptime AS DATE) - TO_DATE('01/01/1970 00:00:00', 'DD/MM/YYYY HH24:MI:SS')) * 86400) AS stoptime
+             FROM CMS_WBM.RUNSUMMARY
+             WHERE RUNSUMMARY.runnumber IN (%s)
+             AND RUNSUMMARY.starttime IS NOT NULL
+             AND RUNSUMMARY.stoptime IS NOT NULL
+             """
+
     def execute(self, runs, conn = None, transaction = False):
 
-        sql = """SELECT runnumber,
-                        (EXTRACT(DAY FROM start_interval)  * 86400) +
-                        (EXTRACT(HOUR FROM start_interval) * 3600) +
-                        (EXTRACT(MINUTE FROM start_interval) * 60) +
-                        (EXTRACT(SECOND FROM start_interval)) AS starttime,
-                        (EXTRACT(DAY FROM stop_interval)  * 86400) +
-                        (EXTRACT(HOUR FROM stop_interval) * 3600) +
-                        (EXTRACT(MINUTE FROM stop_interval) * 60) +
-                        (EXTRACT(SECOND FROM stop_interval)) AS stoptime
-                 FROM (
-                   SELECT (RUNSUMMARY.starttime - TO_TIMESTAMP('01/01/1970 00:00:00', 'DD/MM/YYYY HH24:MI:SS')) AS start_interval,
-                          (RUNSUMMARY.stoptime - TO_TIMESTAMP('01/01/1970 00:00:00', 'DD/MM/YYYY HH24:MI:SS')) AS stop_interval,
-                          RUNSUMMARY.runnumber AS runnumber
-                   FROM CMS_WBM.RUNSUMMARY
-                   WHERE RUNSUMMARY.runnumber = :RUN
-                   AND RUNSUMMARY.starttime IS NOT NULL
-                   AND RUNSUMMARY.stoptime IS NOT NULL
-                 )
-                 """
-
-        binds = []
-        for run in runs:
-            binds.append( { 'RUN' : run } )
-
-        results = self.dbi.processData(sql, binds, conn = conn,
-                                       transaction = transaction)[0].fetchall()
+        runs = list(runs)
 
         stoppedRuns = {}
-        for result in results:
-            stoppedRuns[result[0]] = (result[1], result[2])
+        for i in range(0, len(runs), self.maxInList):
+
+            binds = {}
+            for j, run in enumerate(runs[i:i+self.maxInList]):
+                binds['RUN%d' % j] = run
+
+            sql = self.sql % ", ".join([ ":RUN%d" % j for j in range(len(binds)) ])
+
+            results = self.dbi.processData(sql, binds, conn = conn,
+                                           transaction = transaction)[0].fetchall()
+
+            for result in results:
+                stoppedRuns[result[0]] = (result[1], result[2])
 
         return stoppedRuns
@@ -0,0 +1,32 @@
+"""
+_FindUnfinishedRuns_
+
+Oracle implementation of FindUnfinishedRuns
+
+Return start and stop time of all runs that
+are either not stopped or not closed yet
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class FindUnfinishedRuns(DBFormatter):
+
+    def execute(self, conn = None, transaction = False):
+
+        sql = """SELECT run_id,
+                        start_time,
+                        stop_time
+                 FROM run
+                 WHERE stop_time = 0
+                 OR close_time = 0
+                 """
+
+        results = self.dbi.processData(sql, {}, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        runs = {}
+        for result in results:
+            runs[result[0]] = (result[1], result[2])
+
+        return runs
@@ -0,0 +1,50 @@
+"""
+_GetCloseoutCandidates_
+
+Oracle implementation of GetCloseoutCandidates
+
+Returns the run/streams with open filesets as (run, stream) tuples,
+either for the given runs or for all runs that are stopped or closed.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class GetCloseoutCandidates(DBFormatter):
+
+    def execute(self, runs = None, conn = None, transaction = False):
+
+        sql = """SELECT run_stream_fileset_assoc.run_id,
+                        stream.name
+                 FROM run_stream_fileset_assoc
+                 INNER JOIN stream ON
+                   stream.id = run_stream_fileset_assoc.stream_id
+                 INNER JOIN wmbs_fileset ON
+                   wmbs_fileset.id = run_stream_fileset_assoc.fileset AND
+                   wmbs_fileset.open = 1
+                 """
+
+        if runs == None:
+            sql += """INNER JOIN run ON
+                        run.run_id = run_stream_fileset_assoc.run_id
+                      WHERE run.stop_time > 0
+                      OR run.close_time > 0
+                      """
+            binds = {}
+        else:
+            if len(runs) == 0:
+                return []
+            sql += """WHERE run_stream_fileset_assoc.run_id = :RUN
+                      """
+            binds = []
+            for run in runs:
+                binds.append( { 'RUN' : run } )
+
+        results = self.dbi.processData(sql, binds, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        runStreams = []
+        for result in results:
+            runStreams.append( (result[0], result[1]) )
+
+        return runStreams
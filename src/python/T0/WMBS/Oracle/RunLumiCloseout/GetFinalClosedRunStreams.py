@@ -0,0 +1,38 @@
+"""
+_GetFinalClosedRunStreams_
+
+Oracle implementation of GetFinalClosedRunStreams
+
+Returns the run/streams as (run, stream) tuples of runs that are
+stopped and closed and have lumis finally closed at the given time.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class GetFinalClosedRunStreams(DBFormatter):
+
+    def execute(self, closeTime, conn = None, transaction = False):
+
+        sql = """SELECT DISTINCT lumi_section_closed.run_id,
+                                 stream.name
+                 FROM lumi_section_closed
+                 INNER JOIN run ON
+                   run.run_id = lumi_section_closed.run_id AND
+                   run.stop_time > 0 AND
+                   run.close_time > 0
+                 INNER JOIN stream ON
+                   stream.id = lumi_section_closed.stream_id
+                 WHERE lumi_section_closed.close_time = :CLOSE_TIME
+                 """
+
+        binds = { 'CLOSE_TIME' : closeTime }
+
+        results = self.dbi.processData(sql, binds, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        runStreams = []
+        for result in results:
+            runStreams.append( (result[0], result[1]) )
+
+        return runStreams
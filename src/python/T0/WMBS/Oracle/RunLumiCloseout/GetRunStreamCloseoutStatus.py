@@ -0,0 +1,81 @@
+"""
+_GetRunStreamCloseoutStatus_
+
+Oracle implementation of GetRunStreamCloseoutStatus
+
+For the given (run, stream) tuples returns everything needed to decide
+whether the run/stream fileset can be closed: the run stop and close
+times, the run lumi count, the number and highest lumi of the closed
+lumi records, how many of them are finally closed and how many
+streamers have not been feed yet.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class GetRunStreamCloseoutStatus(DBFormatter):
+
+    def execute(self, runStreams, conn = None, transaction = False):
+
+        if len(runStreams) == 0:
+            return []
+
+        sql = """SELECT run_stream_fileset_assoc.run_id,
+                        stream.name,
+                        run_stream_fileset_assoc.fileset,
+                        wmbs_fileset.open,
+                        run.stop_time,
+                        run.close_time,
+                        run.lumicount,
+                        (SELECT COUNT(*)
+                         FROM lumi_section_closed
+                         WHERE lumi_section_closed.run_id = run_stream_fileset_assoc.run_id
+                         AND lumi_section_closed.stream_id = run_stream_fileset_assoc.stream_id),
+                        (SELECT MAX(lumi_section_closed.lumi_id)
+                         FROM lumi_section_closed
+                         WHERE lumi_section_closed.run_id = run_stream_fileset_assoc.run_id
+                         AND lumi_section_closed.stream_id = run_stream_fileset_assoc.stream_id),
+                        (SELECT COUNT(*)
+                         FROM lumi_section_closed
+                         WHERE lumi_section_closed.run_id = run_stream_fileset_assoc.run_id
+                         AND lumi_section_closed.stream_id = run_stream_fileset_assoc.stream_id
+                         AND lumi_section_closed.close_time > 0),
+                        (SELECT COUNT(*)
+                         FROM streamer
+                         WHERE streamer.run_id = run_stream_fileset_assoc.run_id
+                         AND streamer.stream_id = run_stream_fileset_assoc.stream_id
+                         AND checkForZeroState(streamer.used) = 0)
+                 FROM run_stream_fileset_assoc
+                 INNER JOIN stream ON
+                   stream.id = run_stream_fileset_assoc.stream_id
+                 INNER JOIN wmbs_fileset ON
+                   wmbs_fileset.id = run_stream_fileset_assoc.fileset
+                 INNER JOIN run ON
+                   run.run_id = run_stream_fileset_assoc.run_id
+                 WHERE run_stream_fileset_assoc.run_id = :RUN
+                 AND stream.name = :STREAM
+                 """
+
+        binds = []
+        for run, stream in runStreams:
+            binds.append( { 'RUN' : run,
+                            'STREAM' : stream } )
+
+        results = self.dbi.processData(sql, binds, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        statusList = []
+        for result in results:
+            statusList.append( { 'run' : result[0],
+                                 'stream' : result[1],
+                                 'fileset' : result[2],
+                                 'open' : int(result[3]) == 1,
+                                 'stop_time' : result[4],
+                                 'close_time' : result[5],
+                                 'lumicount' : result[6],
+                                 'lumis' : result[7],
+                                 'max_lumi' : result[8],
+                                 'closed_lumis' : result[9],
+                                 'unused_streamers' : result[10] } )
+
+        return statusList
@@ -5,6 +5,12 @@ Oracle implementation of GetAllFiles
 
 For a given subscription return all the
 files in the corresponding fileset
+
+The result is streamed from the cursor in chunks
+and returned as a generator of (id, lfn, locations, lumi)
+tuples, where lumi is the lowest lumi section of the
+file. Files are ordered by lumi, which allows the
+caller to group them into lumi ranges.
 """
 
 from WMCore.Database.DBFormatter import DBFormatter
@@ -13,7 +19,10 @@ class GetAllFiles(DBFormatter):
 
     sql = """SELECT wmbs_fileset_files.fileid AS id,
                     wmbs_file_details.lfn AS lfn,
-                    wmbs_location_pnns.pnn AS location
+                    wmbs_location_pnns.pnn AS location,
+                    (SELECT MIN(wmbs_file_runlumi_map.lumi)
+                     FROM wmbs_file_runlumi_map
+                     WHERE wmbs_file_runlumi_map.fileid = wmbs_fileset_files.fileid) AS lumi
              FROM wmbs_subscription
              INNER JOIN wmbs_fileset_files ON
                wmbs_fileset_files.fileset = wmbs_subscription.fileset
@@ -26,20 +35,46 @@ class GetAllFiles(DBFormatter):
              INNER JOIN wmbs_location_pnns ON
                wmbs_location_pnns.location = wmbs_location.id
              WHERE wmbs_subscription.id = :subscription
+             ORDER BY lumi, wmbs_fileset_files.fileid
              """
 
-    def execute(self, subscription, conn = None, transaction = False):
+    def execute(self, subscription, chunkSize = 10000, conn = None, transaction = False):
+
+        # the cursor needs a connection that stays open until we
+        # are done reading from it, so manage our own if needed
+        ownConnection = conn == None
+        if ownConnection:
+            conn = self.dbi.connection()
+
+        try:
+
+            cursor = self.dbi.processData(self.sql, { 'subscription' : subscription },
+                                          conn = conn, transaction = transaction,
+                                          returnCursor = True)[0]
+
+            # rows are ordered by file, accumulate
+            # locations until the file changes
+            current = None
+            while True:
+                rows = cursor.fetchmany(chunkSize)
+                if not rows:
+                    break
+                for (fileid, lfn, location, lumi) in rows:
+                    if current != None and current[0] == fileid:
+                        current[2].add(location)
+                    else:
+                        if current != None:
+                            yield current
+                        current = (fileid, lfn, set([location]), lumi)
+
+            if current != None:
+                yield current
+
+            cursor.close()
 
-        results = self.dbi.processData(self.sql, { 'subscription' : subscription },
-                                       conn = conn, transaction = transaction)
+        finally:
 
-        ungroupedResults = self.formatDict(results)
-        result = {}
-        for entry in ungroupedResults:
-            if entry['lfn'] not in result:
-                entry['location'] = set([entry['location']])
-                result[entry['lfn']] = entry
-            else:
-                result[entry['lfn']]['location'].add(entry['location'])
+            if ownConnection:
+                conn.close()
 
-        return result.values()
+        return
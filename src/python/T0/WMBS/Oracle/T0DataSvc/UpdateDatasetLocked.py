@@ -13,9 +13,11 @@ class UpdateDatasetLocked(DBFormatter):
 
     def execute(self, binds, conn = None, transaction = False):
 
-        sql = """INSERT INTO dataset_locked
-                 (dataset_id)
-                 VALUES (:ID)
+        sql = """MERGE INTO dataset_locked
+                 USING DUAL ON ( dataset_id = :ID )
+                 WHEN NOT MATCHED THEN
+                   INSERT (dataset_id)
+                   VALUES (:ID)
                  """
 
         self.dbi.processData(sql, binds, conn = conn,
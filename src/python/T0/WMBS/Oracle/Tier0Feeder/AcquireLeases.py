@@ -0,0 +1,39 @@
+"""
+_AcquireLeases_
+
+Oracle implementation of AcquireLeases
+
+Takes or renews Tier0Feeder leases for an owner. A lease
+is only taken if the owner already holds it or if it
+expired, so only one of several competing owners gets it.
+Use GetLeases afterwards to see which leases were taken.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class AcquireLeases(DBFormatter):
+
+    def execute(self, names, owner, currentTime, expireTime, conn = None, transaction = False):
+
+        if len(names) == 0:
+            return
+
+        sql = """UPDATE tier0_feeder_lease
+                 SET owner = :OWNER,
+                     expire_time = :EXPIRE_TIME
+                 WHERE name = :NAME
+                 AND ( owner = :OWNER OR expire_time < :TIME )
+                 """
+
+        binds = []
+        for name in names:
+            binds.append( { 'NAME' : name,
+                            'OWNER' : owner,
+                            'TIME' : currentTime,
+                            'EXPIRE_TIME' : expireTime } )
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
@@ -9,6 +9,12 @@ check for new streamers and insert them into the
 appropriate fileset. Also mark streamers as used.
 Only consider streamers that are in closed lumis.
 
+Optionally only for the given run/streams, as
+list of (run, stream) tuples.
+
+With countFed returns the number of streamers feed,
+counted with two extra queries on unused streamers.
+
 """
 
 import time
@@ -18,7 +24,64 @@ from WMCore.Database.DBFormatter import DBFormatter
 
 class FeedStreamers(DBFormatter):
 
-    def execute(self, conn = None, transaction = False):
+    runStreamSql = """AND streamer.run_id = :RUN
+                      AND streamer.stream_id = (
+                        SELECT id FROM stream WHERE name = :STREAM
+                      )
+                      """
+
+    def getBinds(self, runStreams, binds):
+        """
+        _getBinds_
+
+        One set of binds per run/stream (if given)
+
+        """
+        if runStreams == None:
+            return binds
+
+        bindList = []
+        for run, stream in runStreams:
+            runStreamBinds = dict(binds)
+            runStreamBinds['RUN'] = run
+            runStreamBinds['STREAM'] = stream
+            bindList.append(runStreamBinds)
+
+        return bindList
+
+    def countUnused(self, runStreams, runStreamSql, conn = None, transaction = False):
+        """
+        _countUnused_
+
+        Number of not yet used streamers (uses the
+        checkForZeroState index, which is small)
+
+        """
+        sql = """SELECT COUNT(*)
+                 FROM streamer
+                 WHERE checkForZeroState(streamer.used) = 0
+                 %s""" % runStreamSql
+
+        results = self.dbi.processData(sql, self.getBinds(runStreams, {}), conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        return sum([ result[0] for result in results ])
+
+    def execute(self, runStreams = None, countFed = False, conn = None, transaction = False):
+
+        if runStreams != None:
+            if len(runStreams) == 0:
+                return 0
+            runStreamSql = self.runStreamSql
+        else:
+            runStreamSql = ""
+
+        unused = None
+        if countFed:
+            unused = self.countUnused(runStreams, runStreamSql, conn = conn,
+                                      transaction = transaction)
+            if unused == 0:
+                return 0
 
         #
         # query only works under the assumption that there
@@ -49,9 +112,9 @@ class FeedStreamers(DBFormatter):
                  INNER JOIN wmbs_subscription ON
                    wmbs_subscription.fileset = run_stream_fileset_assoc.fileset
                  WHERE checkForZeroState(streamer.used) = 0
-                 """
+                 %s""" % runStreamSql
 
-        binds = { 'TIME' : int(time.time()) }
+        binds = self.getBinds(runStreams, { 'TIME' : int(time.time()) })
         self.dbi.processData(sql, binds, conn = conn,
                              transaction = transaction)
 
@@ -66,12 +129,18 @@ class FeedStreamers(DBFormatter):
                    INNER JOIN wmbs_fileset_files ON
                      wmbs_fileset_files.fileid = streamer.id
                    WHERE checkForZeroState(streamer.used) = 0
+                   %s
                  ) b ON ( b.id = a.id )
                  WHEN MATCHED THEN UPDATE
                    SET a.used = 1
-                 """
+                 """ % runStreamSql
 
-        self.dbi.processData(sql, {}, conn = conn,
+        self.dbi.processData(sql, self.getBinds(runStreams, {}), conn = conn,
                              transaction = transaction)
 
-        return
+        if unused == None:
+            return
+
+        # streamers arriving meanwhile can make this slightly off
+        return max(unused - self.countUnused(runStreams, runStreamSql, conn = conn,
+                                             transaction = transaction), 0)
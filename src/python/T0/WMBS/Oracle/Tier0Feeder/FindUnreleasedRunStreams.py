@@ -0,0 +1,54 @@
+"""
+_FindUnreleasedRunStreams_
+
+Oracle implementation of FindUnreleasedRunStreams
+
+Returns the run/streams out of the given (run, stream)
+candidates that use Bulk processing and have primary
+datasets that are not released for PromptReco yet.
+Their Repack workflows can't be marked as injected
+before the release.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class FindUnreleasedRunStreams(DBFormatter):
+
+    def execute(self, candidates, conn = None, transaction = False):
+
+        if len(candidates) == 0:
+            return []
+
+        sql = """SELECT DISTINCT run_stream_style_assoc.run_id,
+                                 stream.name
+                 FROM run_stream_style_assoc
+                 INNER JOIN stream ON
+                   stream.id = run_stream_style_assoc.stream_id
+                 INNER JOIN processing_style ON
+                   processing_style.id = run_stream_style_assoc.style_id AND
+                   processing_style.name = 'Bulk'
+                 INNER JOIN run_primds_stream_assoc ON
+                   run_primds_stream_assoc.run_id = run_stream_style_assoc.run_id AND
+                   run_primds_stream_assoc.stream_id = run_stream_style_assoc.stream_id
+                 LEFT OUTER JOIN reco_config ON
+                   reco_config.run_id = run_primds_stream_assoc.run_id AND
+                   reco_config.primds_id = run_primds_stream_assoc.primds_id
+                 WHERE run_stream_style_assoc.run_id = :RUN
+                 AND stream.name = :STREAM
+                 AND reco_config.run_id IS NULL
+                 """
+
+        binds = []
+        for run, stream in candidates:
+            binds.append( { 'RUN' : run,
+                            'STREAM' : stream } )
+
+        results = self.dbi.processData(sql, binds, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        runStreams = []
+        for result in results:
+            runStreams.append( (result[0], result[1]) )
+
+        return runStreams
@@ -0,0 +1,34 @@
+"""
+_GetActiveRunStreams_
+
+Oracle implementation of GetActiveRunStreams
+
+Returns all run/streams with open filesets
+as list of (run, stream) tuples.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class GetActiveRunStreams(DBFormatter):
+
+    def execute(self, conn = None, transaction = False):
+
+        sql = """SELECT run_stream_fileset_assoc.run_id,
+                        stream.name
+                 FROM run_stream_fileset_assoc
+                 INNER JOIN stream ON
+                   stream.id = run_stream_fileset_assoc.stream_id
+                 INNER JOIN wmbs_fileset ON
+                   wmbs_fileset.id = run_stream_fileset_assoc.fileset AND
+                   wmbs_fileset.open = 1
+                 """
+
+        results = self.dbi.processData(sql, {}, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        runStreams = []
+        for result in results:
+            runStreams.append( (result[0], result[1]) )
+
+        return runStreams
@@ -0,0 +1,110 @@
+"""
+_GetExpressLatency_
+
+Oracle implementation of GetExpressLatency
+
+For express streams of a run, return per stream latency
+percentiles (in seconds) for the different processing
+stages of a lumi section. All stages are measured
+against the arrival of the last streamer of the lumi:
+
+  feed    - streamers fed into the WMBS fileset
+  close   - lumi section closed
+  release - express released for the run
+  job     - first express job for the lumi created
+
+Lumis that did not reach a stage yet are
+not counted for that stage.
+
+"""
+import math
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+def percentile(values, percentile):
+    """
+    _percentile_
+
+    Nearest rank percentile of a sorted list
+
+    """
+    if not values:
+        return None
+
+    rank = int(math.ceil(len(values) * percentile / 100.0))
+    return values[min(max(rank, 1), len(values)) - 1]
+
+class GetExpressLatency(DBFormatter):
+
+    stages = [ 'feed', 'close', 'release', 'job' ]
+
+    percentiles = [ 50, 90, 99 ]
+
+    sql = """SELECT stream.name,
+                    streamer_times.last_arrival,
+                    streamer_times.feed_time,
+                    lumi_section_closed.close_time,
+                    run.express_release_time,
+                    lumi_section_express_job.job_time
+             FROM lumi_section_closed
+             INNER JOIN express_config ON
+               express_config.run_id = lumi_section_closed.run_id AND
+               express_config.stream_id = lumi_section_closed.stream_id
+             INNER JOIN run ON
+               run.run_id = lumi_section_closed.run_id
+             INNER JOIN stream ON
+               stream.id = lumi_section_closed.stream_id
+             INNER JOIN (
+               SELECT streamer.stream_id,
+                      streamer.lumi_id,
+                      MAX(streamer.insert_time) AS last_arrival,
+                      MAX(wmbs_fileset_files.insert_time) AS feed_time
+               FROM streamer
+               LEFT OUTER JOIN wmbs_fileset_files ON
+                 wmbs_fileset_files.fileid = streamer.id
+               WHERE streamer.run_id = :RUN
+               GROUP BY streamer.stream_id, streamer.lumi_id
+             ) streamer_times ON
+               streamer_times.stream_id = lumi_section_closed.stream_id AND
+               streamer_times.lumi_id = lumi_section_closed.lumi_id
+             LEFT OUTER JOIN lumi_section_express_job ON
+               lumi_section_express_job.run_id = lumi_section_closed.run_id AND
+               lumi_section_express_job.stream_id = lumi_section_closed.stream_id AND
+               lumi_section_express_job.lumi_id = lumi_section_closed.lumi_id
+             WHERE lumi_section_closed.run_id = :RUN
+             """
+
+    def execute(self, run, conn = None, transaction = False):
+
+        results = self.dbi.processData(self.sql, { 'RUN' : run },
+                                       conn = conn, transaction = transaction)[0].fetchall()
+
+        latencies = {}
+        for (stream, arrival, feedTime, closeTime, releaseTime, jobTime) in results:
+
+            if stream not in latencies:
+                latencies[stream] = {}
+                for stage in self.stages:
+                    latencies[stream][stage] = []
+
+            # zero means the stage was not reached yet
+            stageTimes = { 'feed' : feedTime,
+                           'close' : closeTime,
+                           'release' : releaseTime,
+                           'job' : jobTime }
+            for stage in self.stages:
+                if stageTimes[stage]:
+                    latencies[stream][stage].append(max(stageTimes[stage] - arrival, 0))
+
+        summary = {}
+        for stream in latencies:
+            summary[stream] = {}
+            for stage in self.stages:
+                values = sorted(latencies[stream][stage])
+                stageSummary = { 'lumis' : len(values) }
+                for level in self.percentiles:
+                    stageSummary['p%d' % level] = percentile(values, level)
+                stageSummary['max'] = values[-1] if values else None
+                summary[stream][stage] = stageSummary
+
+        return summary
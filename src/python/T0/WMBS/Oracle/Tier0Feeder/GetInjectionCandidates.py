@@ -0,0 +1,44 @@
+"""
+_GetInjectionCandidates_
+
+Oracle implementation of GetInjectionCandidates
+
+Returns all run/streams as (run, stream) tuples that
+have Express or Repack workflows not marked as injected.
+
+With streamer notifications only run/streams with closed
+filesets can be marked as injected and are returned.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class GetInjectionCandidates(DBFormatter):
+
+    def execute(self, streamerNotification, conn = None, transaction = False):
+
+        sql = """SELECT DISTINCT run_stream_fileset_assoc.run_id,
+                                 stream.name
+                 FROM run_stream_fileset_assoc
+                 INNER JOIN stream ON
+                   stream.id = run_stream_fileset_assoc.stream_id
+                 INNER JOIN wmbs_fileset ON
+                   wmbs_fileset.id = run_stream_fileset_assoc.fileset
+                 INNER JOIN wmbs_subscription ON
+                   wmbs_subscription.fileset = run_stream_fileset_assoc.fileset
+                 INNER JOIN wmbs_workflow ON
+                   wmbs_workflow.id = wmbs_subscription.workflow AND
+                   wmbs_workflow.injected = 0
+                 """
+
+        if streamerNotification:
+            sql += "WHERE wmbs_fileset.open = 0\n"
+
+        results = self.dbi.processData(sql, {}, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        runStreams = []
+        for result in results:
+            runStreams.append( (result[0], result[1]) )
+
+        return runStreams
@@ -0,0 +1,29 @@
+"""
+_GetLeases_
+
+Oracle implementation of GetLeases
+
+Returns all Tier0Feeder leases as dictionary keyed
+by name with owner and expire_time.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class GetLeases(DBFormatter):
+
+    def execute(self, conn = None, transaction = False):
+
+        sql = """SELECT name, owner, expire_time
+                 FROM tier0_feeder_lease
+                 """
+
+        results = self.dbi.processData(sql, {}, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        leases = {}
+        for result in results:
+            leases[result[0]] = { 'owner' : result[1],
+                                  'expire_time' : result[2] }
+
+        return leases
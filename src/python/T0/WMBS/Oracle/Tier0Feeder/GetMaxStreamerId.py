@@ -0,0 +1,24 @@
+"""
+_GetMaxStreamerId_
+
+Oracle implementation of GetMaxStreamerId
+
+Returns the highest streamer id (or None if
+there are no streamers), a primary key lookup.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class GetMaxStreamerId(DBFormatter):
+
+    def execute(self, conn = None, transaction = False):
+
+        sql = """SELECT MAX(id)
+                 FROM streamer
+                 """
+
+        results = self.dbi.processData(sql, {}, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        return results[0][0]
@@ -0,0 +1,34 @@
+"""
+_InsertLeases_
+
+Oracle implementation of InsertLeases
+
+Creates the given Tier0Feeder leases (unowned)
+unless they already exist.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class InsertLeases(DBFormatter):
+
+    def execute(self, names, conn = None, transaction = False):
+
+        if len(names) == 0:
+            return
+
+        sql = """MERGE INTO tier0_feeder_lease
+                 USING DUAL ON ( name = :NAME )
+                 WHEN NOT MATCHED THEN
+                   INSERT (name, owner, expire_time)
+                   VALUES (:NAME, NULL, 0)
+                 """
+
+        binds = []
+        for name in names:
+            binds.append( { 'NAME' : name } )
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
@@ -8,13 +8,23 @@ from WMCore.Database.DBFormatter import DBFormatter
 
 class MarkCloseoutWorkflowMonitoring(DBFormatter):
 
-    def execute(self, workflowId, conn = None, transaction = False):
+    def execute(self, workflowIds, conn = None, transaction = False):
 
         sql = """UPDATE workflow_monitoring
                  SET closeout = 1
                  WHERE workflow = :WORKFLOW_ID"""
 
-        binds = [{'WORKFLOW_ID': workflowId}]
+        if not isinstance(workflowIds, list):
+            workflowIds = [ workflowIds ]
+
+        binds = []
+        for workflowId in workflowIds:
+            binds.append( { 'WORKFLOW_ID' : workflowId } )
+
+        if len(binds) == 0:
+            return
+
         self.dbi.processData(sql, binds, conn = conn,
                              transaction = transaction)
-        return 
+
+        return
@@ -12,13 +12,21 @@ from WMCore.Database.DBFormatter import DBFormatter
 
 class MarkTrackedWorkflowMonitoring(DBFormatter):
 
-    def execute(self, workflowId, conn = None, transaction = False):
+    def execute(self, workflowIds, conn = None, transaction = False):
 
         sql = """UPDATE workflow_monitoring
                  SET tracked = 1
                  WHERE workflow = :WORKFLOW_ID"""
 
-        binds = { 'WORKFLOW_ID' : workflowId }
+        if not isinstance(workflowIds, list):
+            workflowIds = [ workflowIds ]
+
+        binds = []
+        for workflowId in workflowIds:
+            binds.append( { 'WORKFLOW_ID' : workflowId } )
+
+        if len(binds) == 0:
+            return
 
         self.dbi.processData(sql, binds, conn = conn,
                              transaction = transaction)
@@ -20,6 +20,12 @@ without P5 streamer notifications:
    PromptReco released before the workflow is set
    to injected
 
+If a list of (run, stream) candidates is passed, only the workflows
+of these run/streams are checked (both Express and Repack in one
+query per candidate) and the candidates that still have workflows
+not marked as injected are returned. Without candidates all run/streams
+are checked and nothing is returned.
+
 """
 
 from WMCore.Database.DBFormatter import DBFormatter
@@ -132,7 +138,116 @@ class MarkWorkflowsInjected(DBFormatter):
           )
           """
 
-    def execute(self, streamerNotification, conn = None, transaction = False):
+    sqlCandidateNotify = \
+       """UPDATE wmbs_workflow
+          SET injected = 1
+          WHERE injected = 0
+          AND name in (
+            SELECT wmbs_workflow.name
+            FROM run_stream_fileset_assoc
+              INNER JOIN wmbs_subscription ON
+                wmbs_subscription.fileset = run_stream_fileset_assoc.fileset
+              INNER JOIN wmbs_fileset ON
+                wmbs_fileset.id = wmbs_subscription.fileset AND
+                wmbs_fileset.open = 0
+              INNER JOIN wmbs_workflow ON
+                wmbs_workflow.id = wmbs_subscription.workflow AND
+                wmbs_workflow.injected = 0
+              INNER JOIN run_stream_style_assoc ON
+                run_stream_style_assoc.run_id = run_stream_fileset_assoc.run_id AND
+                run_stream_style_assoc.stream_id =   run_stream_fileset_assoc.stream_id
+              INNER JOIN processing_style ON
+                processing_style.id = run_stream_style_assoc.style_id
+            WHERE run_stream_fileset_assoc.run_id = :RUN
+            AND run_stream_fileset_assoc.stream_id = (SELECT id FROM stream WHERE name = :STREAM)
+            AND NOT EXISTS (
+              SELECT streamer.run_id
+              FROM streamer
+              WHERE streamer.run_id = run_stream_fileset_assoc.run_id
+              AND streamer.stream_id = run_stream_fileset_assoc.stream_id
+              AND checkForZeroState(streamer.deleted) = 0
+            )
+            AND ( processing_style.name = 'Express' OR
+                  ( processing_style.name = 'Bulk' AND
+                    EXISTS (
+                      SELECT run_primds_stream_assoc.run_id
+                      FROM run_primds_stream_assoc
+                      WHERE run_primds_stream_assoc.run_id = run_stream_fileset_assoc.run_id
+                      AND run_primds_stream_assoc.stream_id = run_stream_fileset_assoc.stream_id
+                    ) AND
+                    NOT EXISTS (
+                      SELECT run_primds_stream_assoc.run_id
+                      FROM run_primds_stream_assoc
+                      LEFT OUTER JOIN reco_config ON
+                        reco_config.run_id = run_primds_stream_assoc.run_id AND
+                        reco_config.primds_id = run_primds_stream_assoc.primds_id
+                      WHERE run_primds_stream_assoc.run_id = run_stream_fileset_assoc.run_id
+                      AND run_primds_stream_assoc.stream_id = run_stream_fileset_assoc.stream_id
+                      AND reco_config.run_id IS NULL
+                    ) ) )
+          )
+          """
+
+    sqlCandidateNoNotify = \
+       """UPDATE wmbs_workflow
+          SET injected = 1
+          WHERE injected = 0
+          AND name in (
+            SELECT wmbs_workflow.name
+            FROM run_stream_fileset_assoc
+              INNER JOIN wmbs_subscription ON
+                wmbs_subscription.fileset = run_stream_fileset_assoc.fileset
+              INNER JOIN wmbs_workflow ON
+                wmbs_workflow.id = wmbs_subscription.workflow AND
+                wmbs_workflow.injected = 0
+              INNER JOIN run_stream_style_assoc ON
+                run_stream_style_assoc.run_id = run_stream_fileset_assoc.run_id AND
+                run_stream_style_assoc.stream_id =   run_stream_fileset_assoc.stream_id
+              INNER JOIN processing_style ON
+                processing_style.id = run_stream_style_assoc.style_id
+            WHERE run_stream_fileset_assoc.run_id = :RUN
+            AND run_stream_fileset_assoc.stream_id = (SELECT id FROM stream WHERE name = :STREAM)
+            AND ( processing_style.name = 'Express' OR
+                  ( processing_style.name = 'Bulk' AND
+                    EXISTS (
+                      SELECT run_primds_stream_assoc.run_id
+                      FROM run_primds_stream_assoc
+                      WHERE run_primds_stream_assoc.run_id = run_stream_fileset_assoc.run_id
+                      AND run_primds_stream_assoc.stream_id = run_stream_fileset_assoc.stream_id
+                    ) AND
+                    NOT EXISTS (
+                      SELECT run_primds_stream_assoc.run_id
+                      FROM run_primds_stream_assoc
+                      LEFT OUTER JOIN reco_config ON
+                        reco_config.run_id = run_primds_stream_assoc.run_id AND
+                        reco_config.primds_id = run_primds_stream_assoc.primds_id
+                      WHERE run_primds_stream_assoc.run_id = run_stream_fileset_assoc.run_id
+                      AND run_primds_stream_assoc.stream_id = run_stream_fileset_assoc.stream_id
+                      AND reco_config.run_id IS NULL
+                    ) ) )
+          )
+          """
+
+    sqlCandidatePending = \
+       """SELECT DISTINCT run_stream_fileset_assoc.run_id AS run_id,
+                          stream.name AS stream
+          FROM run_stream_fileset_assoc
+            INNER JOIN stream ON
+              stream.id = run_stream_fileset_assoc.stream_id
+            INNER JOIN wmbs_subscription ON
+              wmbs_subscription.fileset = run_stream_fileset_assoc.fileset
+            INNER JOIN wmbs_workflow ON
+              wmbs_workflow.id = wmbs_subscription.workflow AND
+              wmbs_workflow.injected = 0
+          WHERE run_stream_fileset_assoc.run_id = :RUN
+          AND stream.name = :STREAM
+          """
+
+    def execute(self, streamerNotification, candidates = None, conn = None, transaction = False):
+
+        if candidates != None:
+            return self.executeCandidates(streamerNotification, candidates,
+                                          conn = conn, transaction = transaction)
 
         if streamerNotification:
 
@@ -151,3 +266,30 @@ class MarkWorkflowsInjected(DBFormatter):
                                  transaction = transaction)
 
         return
+
+    def executeCandidates(self, streamerNotification, candidates, conn = None, transaction = False):
+
+        if len(candidates) == 0:
+            return []
+
+        binds = []
+        for run, stream in candidates:
+            binds.append( { 'RUN' : run,
+                            'STREAM' : stream } )
+
+        if streamerNotification:
+            sql = self.sqlCandidateNotify
+        else:
+            sql = self.sqlCandidateNoNotify
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        results = self.dbi.processData(self.sqlCandidatePending, binds, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        pending = []
+        for result in results:
+            pending.append( (result[0], result[1]) )
+
+        return pending
@@ -4,8 +4,10 @@ _ReleaseExpress_
 Oracle implementation of ReleaseExpress
 
 Release express for the runs specified
+and record the release time
 
 """
+import time
 
 from WMCore.Database.DBFormatter import DBFormatter
 
@@ -14,11 +16,21 @@ class ReleaseExpress(DBFormatter):
     def execute(self, binds, conn = None, transaction = False):
 
         sql = """UPDATE run
-                 SET express_released = 1
+                 SET express_released = 1,
+                     express_release_time = :TIME
                  WHERE run_id = :RUN
                  """
 
-        self.dbi.processData(sql, binds, conn = conn,
+        if isinstance(binds, dict):
+            binds = [ binds ]
+
+        releaseTime = int(time.time())
+        timeBinds = []
+        for bind in binds:
+            timeBinds.append( { 'RUN' : bind['RUN'],
+                                'TIME' : releaseTime } )
+
+        self.dbi.processData(sql, timeBinds, conn = conn,
                              transaction = transaction)
 
         return
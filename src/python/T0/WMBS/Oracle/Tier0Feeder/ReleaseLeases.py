@@ -0,0 +1,36 @@
+"""
+_ReleaseLeases_
+
+Oracle implementation of ReleaseLeases
+
+Gives up the Tier0Feeder leases of an owner, so
+other owners can take them without waiting for
+them to expire.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class ReleaseLeases(DBFormatter):
+
+    def execute(self, names, owner, conn = None, transaction = False):
+
+        if len(names) == 0:
+            return
+
+        sql = """UPDATE tier0_feeder_lease
+                 SET owner = NULL,
+                     expire_time = 0
+                 WHERE name = :NAME
+                 AND owner = :OWNER
+                 """
+
+        binds = []
+        for name in names:
+            binds.append( { 'NAME' : name,
+                            'OWNER' : owner } )
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
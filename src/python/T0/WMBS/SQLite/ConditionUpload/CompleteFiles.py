@@ -0,0 +1,11 @@
+"""
+_CompleteFiles_
+
+SQLite implementation of CompleteFiles
+
+"""
+
+from T0.WMBS.Oracle.ConditionUpload.CompleteFiles import CompleteFiles as OracleCompleteFiles
+
+class CompleteFiles(OracleCompleteFiles):
+    pass
@@ -0,0 +1,11 @@
+"""
+_FinishPCLforEmptyExpress_
+
+SQLite implementation of FinishPCLforEmptyExpress
+
+"""
+
+from T0.WMBS.Oracle.ConditionUpload.FinishPCLforEmptyExpress import FinishPCLforEmptyExpress as OracleFinishPCLforEmptyExpress
+
+class FinishPCLforEmptyExpress(OracleFinishPCLforEmptyExpress):
+    pass
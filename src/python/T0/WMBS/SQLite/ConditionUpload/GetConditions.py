@@ -0,0 +1,11 @@
+"""
+_GetConditions_
+
+SQLite implementation of GetConditions
+
+"""
+
+from T0.WMBS.Oracle.ConditionUpload.GetConditions import GetConditions as OracleGetConditions
+
+class GetConditions(OracleGetConditions):
+    pass
@@ -0,0 +1,11 @@
+"""
+_GetOldestAcquiredInsertTime_
+
+SQLite implementation of GetOldestAcquiredInsertTime
+
+"""
+
+from T0.WMBS.Oracle.ConditionUpload.GetOldestAcquiredInsertTime import GetOldestAcquiredInsertTime as OracleGetOldestAcquiredInsertTime
+
+class GetOldestAcquiredInsertTime(OracleGetOldestAcquiredInsertTime):
+    pass
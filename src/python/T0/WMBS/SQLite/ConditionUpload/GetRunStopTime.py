@@ -0,0 +1,11 @@
+"""
+_GetRunStopTime_
+
+SQLite implementation of GetRunStopTime
+
+"""
+
+from T0.WMBS.Oracle.ConditionUpload.GetRunStopTime import GetRunStopTime as OracleGetRunStopTime
+
+class GetRunStopTime(OracleGetRunStopTime):
+    pass
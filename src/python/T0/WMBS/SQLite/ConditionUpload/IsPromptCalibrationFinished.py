@@ -0,0 +1,28 @@
+"""
+_IsPromptCalibrationFinished_
+
+SQLite implementation of IsPromptCalibrationFinished
+
+SQLite only allows HAVING with GROUP BY.
+
+"""
+
+from T0.WMBS.Oracle.ConditionUpload.IsPromptCalibrationFinished import IsPromptCalibrationFinished as OracleIsPromptCalibrationFinished
+
+class IsPromptCalibrationFinished(OracleIsPromptCalibrationFinished):
+
+    def execute(self, run, conn = None, transaction = False):
+
+        sql = """SELECT 1
+                 FROM prompt_calib
+                 WHERE run_id = :RUN
+                 GROUP BY run_id
+                 HAVING COUNT(*) = SUM(finished)
+                 """
+
+        binds = { 'RUN' : run }
+
+        results = self.dbi.processData(sql, binds, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        return ( len(results) > 0 and results[0][0] == 1 )
@@ -0,0 +1,11 @@
+"""
+_MarkPromptCalibrationFinished_
+
+SQLite implementation of MarkPromptCalibrationFinished
+
+"""
+
+from T0.WMBS.Oracle.ConditionUpload.MarkPromptCalibrationFinished import MarkPromptCalibrationFinished as OracleMarkPromptCalibrationFinished
+
+class MarkPromptCalibrationFinished(OracleMarkPromptCalibrationFinished):
+    pass
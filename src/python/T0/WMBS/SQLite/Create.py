@@ -0,0 +1,666 @@
+"""
+_Create_
+
+Implementation of Create for SQLite
+
+Same schema as for Oracle, with the differences
+
+  - no index organized tables, types and syntax adjusted
+  - foreign keys are part of the table definitions, SQLite
+    can't add constraints to existing tables
+  - no sequences, the DAOs determine the next id themselves
+  - indexes on the column instead of function based indexes
+  - a single row DUAL table, used by some of the DAOs
+
+The checkForZeroState and checkForZeroOneState functions
+are registered on the connection, see T0.WMBS.SQLite.
+
+"""
+
+import threading
+
+from WMCore.Database.DBCreator import DBCreator
+
+class Create(DBCreator):
+
+    def __init__(self, logger = None, dbi = None, params = None):
+        """
+        _init_
+
+        Call the DBCreator constructor and initialize the schema
+
+        """
+        myThread = threading.currentThread()
+        if logger == None:
+            logger = myThread.logger
+        if dbi == None:
+            dbi = myThread.dbi
+
+        DBCreator.__init__(self, logger, dbi)
+
+        #
+        # Tables
+        #
+        self.create[len(self.create)] = \
+            """CREATE TABLE dual (
+                 dummy   varchar(1)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE t0_config (
+                 run_id   int           not null,
+                 config   varchar(255)  not null,
+                 primary key(run_id),
+                 constraint t0_conf_run_id_fk foreign key (run_id)
+                   references run(run_id)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE run_status (
+                 id     int          not null,
+                 name   varchar(25)  not null,
+                 primary key(id),
+                 constraint run_sta_name_uq unique(name)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE processing_style (
+                 id     int          not null,
+                 name   varchar(25)  not null,
+                 primary key(id),
+                 constraint pro_sty_name_uq unique(name)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE event_scenario (
+                 id     int          not null,
+                 name   varchar(50)  not null,
+                 primary key(id),
+                 constraint eve_sce_name_uq unique(name)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE cmssw_version (
+                 id     int           not null,
+                 name   varchar(255)  not null,
+                 primary key(id),
+                 constraint cms_ver_name_uq unique(name)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE stream (
+                 id     int           not null,
+                 name   varchar(255)  not null,
+                 primary key(id),
+                 constraint str_name_uq unique(name)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE trigger_label (
+                 id     int           not null,
+                 name   varchar(255)  not null,
+                 primary key(id),
+                 constraint tri_lab_name_uq unique(name)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE primary_dataset (
+                 id     int           not null,
+                 name   varchar(255)  not null,
+                 primary key(id),
+                 constraint pri_dat_name_uq unique(name)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE storage_node (
+                 id     int           not null,
+                 name   varchar(255)  not null,
+                 primary key(id),
+                 constraint sto_nod_name_uq unique(name)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE run (
+                 run_id             int           not null,
+                 status             int           default 1 not null,
+                 last_updated       int           not null,
+                 express_released   int           default 0 not null,
+                 express_release_time int         default 0 not null,
+                 hltkey             varchar(255)  not null,
+                 start_time         int           not null,
+                 stop_time          int           default 0 not null,
+                 close_time         int           default 0 not null,
+                 lumicount          int           default 0 not null,
+                 process            varchar(255),
+                 acq_era            varchar(255),
+                 backfill           varchar(255),
+                 bulk_data_type     varchar(255),
+                 express_subscribe  int,
+                 dqmuploadurl       varchar(255),
+                 ah_timeout         int,
+                 ah_dir             varchar(255),
+                 cond_timeout       int,
+                 db_host            varchar(255),
+                 valid_mode         int,
+                 primary key(run_id),
+                 constraint run_sta_fk foreign key (status)
+                   references run_status(id),
+                 constraint run_exp_sub foreign key (express_subscribe)
+                   references storage_node(id)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE run_trig_primds_assoc (
+                 run_id      int not null,
+                 primds_id   int not null,
+                 trig_id     int not null,
+                 primary key(run_id, primds_id, trig_id),
+                 constraint run_tri_pri_run_id_fk foreign key (run_id)
+                   references run(run_id),
+                 constraint run_tri_pri_pri_id_fk foreign key (primds_id)
+                   references primary_dataset(id),
+                 constraint run_tri_pri_tri_id_fk foreign key (trig_id)
+                   references trigger_label(id)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE run_primds_stream_assoc (
+                 run_id      int not null,
+                 primds_id   int not null,
+                 stream_id   int not null,
+                 primary key(run_id, primds_id),
+                 constraint run_pri_tri_run_id_fk foreign key (run_id)
+                   references run(run_id),
+                 constraint run_pri_tri_pri_id_fk foreign key (primds_id)
+                   references primary_dataset(id),
+                 constraint run_pri_tri_str_id_fk foreign key (stream_id)
+                   references stream(id)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE run_primds_scenario_assoc (
+                 run_id        int not null,
+                 primds_id     int not null,
+                 scenario_id   int not null,
+                 primary key(run_id, primds_id),
+                 constraint run_pri_sce_run_id_fk foreign key (run_id)
+                   references run(run_id),
+                 constraint run_pri_sce_pri_id_fk foreign key (primds_id)
+                   references primary_dataset(id),
+                 constraint run_pri_sce_sce_id_fk foreign key (scenario_id)
+                   references event_scenario(id)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE run_stream_style_assoc (
+                 run_id      int not null,
+                 stream_id   int not null,
+                 style_id    int not null,
+                 primary key(run_id, stream_id),
+                 constraint run_str_sty_run_id_fk foreign key (run_id)
+                   references run(run_id),
+                 constraint run_str_sty_str_id_fk foreign key (stream_id)
+                   references stream(id),
+                 constraint run_str_sty_sty_id_fk foreign key (style_id)
+                   references processing_style(id)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE run_stream_cmssw_assoc (
+                 run_id             int not null,
+                 stream_id          int not null,
+                 online_version     int not null,
+                 primary key(run_id, stream_id),
+                 constraint run_str_cms_run_id_fk foreign key (run_id)
+                   references run(run_id),
+                 constraint run_str_cms_str_id_fk foreign key (stream_id)
+                   references stream(id),
+                 constraint run_str_cms_onl_ver_fk foreign key (online_version)
+                   references cmssw_version(id)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE run_stream_fileset_assoc (
+                 run_id      int not null,
+                 stream_id   int not null,
+                 fileset     int not null,
+                 primary key(run_id, stream_id),
+                 constraint run_str_fil_ass_fil_uq unique(fileset),
+                 constraint run_str_fil_run_id_fk foreign key (run_id)
+                   references run(run_id),
+                 constraint run_str_fil_str_id_fk foreign key (stream_id)
+                   references stream(id),
+                 constraint run_str_fil_fil_id_fk foreign key (fileset)
+                   references wmbs_fileset(id)
+                   on delete cascade
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE run_stream_done (
+                 run_id      int not null,
+                 stream_id   int not null,
+                 in_datasvc  int default 0 not null,
+                 primary key(run_id, stream_id),
+                 constraint run_str_don_run_id_fk foreign key (run_id)
+                   references run(run_id),
+                 constraint run_str_don_str_id_fk foreign key (stream_id)
+                   references stream(id)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE reco_release_config (
+                 run_id         int not null,
+                 primds_id      int not null,
+                 in_datasvc     int default 0 not null,
+                 released       int default 0 not null,
+                 fileset        int not null,
+                 delay          int not null,
+                 delay_offset   int not null,
+                 primary key(run_id, primds_id),
+                 constraint rec_rel_con_fil_uq unique(fileset),
+                 constraint rec_rel_con_run_id_fk foreign key (run_id)
+                   references run(run_id),
+                 constraint rec_rel_con_pri_id_fk foreign key (primds_id)
+                   references primary_dataset(id),
+                 constraint rec_rel_con_fil_id_fk foreign key (fileset)
+                   references wmbs_fileset(id)
+                   on delete cascade
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE stream_special_primds_assoc (
+                 stream_id   int not null,
+                 primds_id   int not null,
+                 primary key(stream_id),
+                 constraint str_spe_pri_str_id_fk foreign key (stream_id)
+                   references stream(id),
+                 constraint str_spe_pri_pri_id_fk foreign key (primds_id)
+                   references primary_dataset(id)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE lumi_section (
+                 run_id    int not null,
+                 lumi_id   int not null,
+                 primary key(run_id, lumi_id),
+                 constraint lum_sec_run_id_fk foreign key (run_id)
+                   references run(run_id)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE lumi_section_closed (
+                 run_id      int   not null,
+                 stream_id   int   not null,
+                 lumi_id     int   not null,
+                 filecount   int   not null,
+                 insert_time int   not null,
+                 close_time  int   default 0 not null,
+                 primary key(run_id, stream_id, lumi_id),
+                 constraint lum_sec_clo_rl_id_fk foreign key (run_id, lumi_id)
+                   references lumi_section(run_id, lumi_id),
+                 constraint lum_sec_clo_stre_id_fk foreign key (stream_id)
+                   references stream(id)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE lumi_section_split_active (
+                 subscription   int not null,
+                 run_id         int not null,
+                 lumi_id        int not null,
+                 nfiles         int not null,
+                 primary key(subscription, run_id, lumi_id),
+                 constraint lum_sec_spli_act_rl_id_fk foreign key (run_id, lumi_id)
+                   references lumi_section(run_id, lumi_id),
+                 constraint lum_sec_spli_act_stre_id_fk foreign key (subscription)
+                   references wmbs_subscription(id)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE lumi_section_express_job (
+                 run_id      int   not null,
+                 stream_id   int   not null,
+                 lumi_id     int   not null,
+                 job_time    int   not null,
+                 primary key(run_id, stream_id, lumi_id),
+                 constraint lum_sec_exp_job_rl_id_fk foreign key (run_id, lumi_id)
+                   references lumi_section(run_id, lumi_id),
+                 constraint lum_sec_exp_job_stre_id_fk foreign key (stream_id)
+                   references stream(id)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE subscription_metrics (
+                 subscription      int not null,
+                 run_id            int not null,
+                 overrate_lumis    int default 0 not null,
+                 overrate_files    int default 0 not null,
+                 overrate_events   int default 0 not null,
+                 last_updated      int not null,
+                 primary key(subscription),
+                 constraint sub_met_run_id_fk foreign key (run_id)
+                   references run(run_id)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE streamer (
+                 id            int not null,
+                 run_id        int not null,
+                 stream_id     int not null,
+                 lumi_id       int not null,
+                 insert_time   int not null,
+                 used          int default 0 not null,
+                 deleted       int default 0 not null,
+                 primary key(id),
+                 constraint str_run_id_fk foreign key (run_id)
+                   references run(run_id),
+                 constraint str_rl_id_fk foreign key (run_id, lumi_id)
+                   references lumi_section(run_id, lumi_id),
+                 constraint str_str_id_fk foreign key (stream_id)
+                   references stream(id)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE repack_config (
+                 run_id               int          not null,
+                 stream_id            int          not null,
+                 proc_version         int          not null,
+                 max_size_single_lumi int          not null,
+                 max_size_multi_lumi  int          not null,
+                 min_size             int          not null,
+                 max_size             int          not null,
+                 max_edm_size         int          not null,
+                 max_over_size        int          not null,
+                 max_events           int          not null,
+                 max_files            int          not null,
+                 block_delay          int          not null,
+                 cmssw_id             int          not null,
+                 scram_arch           varchar(50)  not null,
+                 primary key (run_id, stream_id),
+                 constraint rep_con_run_id_fk foreign key (run_id)
+                   references run(run_id),
+                 constraint rep_con_str_id_fk foreign key (stream_id)
+                   references stream(id)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE express_config (
+                 run_id          int           not null,
+                 stream_id       int           not null,
+                 in_datasvc      int           default 0 not null,
+                 proc_version    int           not null,
+                 write_tiers     varchar(255)  not null,
+                 write_dqm       int           not null,
+                 global_tag      varchar(255)  not null,
+                 max_rate        int           not null,
+                 max_events      int           not null,
+                 max_size        int           not null,
+                 max_files       int           not null,
+                 max_latency     int           not null,
+                 dqm_interval    int           not null,
+                 block_delay     int           not null,
+                 cmssw_id        int           not null,
+                 scram_arch      varchar(50)   not null,
+                 reco_cmssw_id   int,
+                 multicore       int,
+                 reco_scram_arch varchar(50),
+                 alca_skim       varchar(700),
+                 dqm_seq         varchar(700),
+                 primary key (run_id, stream_id),
+                 constraint exp_con_run_id_fk foreign key (run_id)
+                   references run(run_id),
+                 constraint exp_con_str_id_fk foreign key (stream_id)
+                   references stream(id),
+                 constraint exp_con_cms_id_fk foreign key (cmssw_id)
+                   references cmssw_version(id)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE prompt_calib (
+                 run_id        int not null,
+                 stream_id     int not null,
+                 num_producer  int not null,
+                 finished      int default 0 not null,
+                 primary key (run_id, stream_id),
+                 constraint pro_cal_run_id_fk foreign key (run_id)
+                   references run(run_id),
+                 constraint pro_cal_str_id_fk foreign key (stream_id)
+                   references stream(id)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE prompt_calib_file (
+                 run_id        int not null,
+                 stream_id     int not null,
+                 fileid        int not null,
+                 subscription  int not null,
+                 insert_time   int not null,
+                 primary key (run_id, stream_id, fileid),
+                 constraint pro_cal_fil_run_id_fk foreign key (run_id)
+                   references run(run_id),
+                 constraint pro_cal_fil_str_id_fk foreign key (stream_id)
+                   references stream(id),
+                 constraint pro_cal_fil_fil_id_fk foreign key (fileid)
+                   references wmbs_file_details(id)
+                   on delete cascade,
+                 constraint pro_cal_fil_sub_fk foreign key (subscription)
+                   references wmbs_subscription(id)
+                   on delete cascade
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE reco_config (
+                 run_id         int            not null,
+                 primds_id      int            not null,
+                 in_datasvc     int            default 0 not null,
+                 do_reco        int            not null,
+                 reco_split     int            not null,
+                 write_reco     int            not null,
+                 write_dqm      int            not null,
+                 write_aod      int            not null,
+                 write_miniaod  int            not null,
+                 proc_version   int            not null,
+                 block_delay    int            not null,
+                 cmssw_id       int            not null,
+                 scram_arch     varchar(50)    not null,
+                 global_tag     varchar(255)   not null,
+                 multicore      int,
+                 alca_skim      varchar(700),
+                 physics_skim   varchar(700),
+                 dqm_seq        varchar(700),
+                 primary key (run_id, primds_id),
+                 constraint rec_con_run_id_fk foreign key (run_id)
+                   references run(run_id),
+                 constraint rec_con_primds_id_fk foreign key (primds_id)
+                   references primary_dataset(id),
+                 constraint rec_con_cms_id_fk foreign key (cmssw_id)
+                   references cmssw_version(id)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE phedex_config (
+                 run_id           int not null,
+                 primds_id        int not null,
+                 archival_node_id int,
+                 tape_node_id     int,
+                 disk_node_id     int,
+                 primary key (run_id, primds_id),
+                 constraint phe_con_run_id_fk foreign key (run_id)
+                   references run(run_id),
+                 constraint phe_con_primds_id_fk foreign key (primds_id)
+                   references primary_dataset(id),
+                 constraint phe_con_arc_nod_id_fk foreign key (archival_node_id)
+                   references storage_node(id),
+                 constraint phe_con_tap_nod_id_fk foreign key (tape_node_id)
+                   references storage_node(id),
+                 constraint phe_con_dis_nod_id_fk foreign key (disk_node_id)
+                   references storage_node(id)
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE workflow_monitoring (
+                 workflow   int not null,
+                 tracked    int default 0 not null,
+                 closeout   int default 0 not null,  
+                 primary key (workflow),
+                 constraint wor_mon_wor_fk foreign key (workflow)
+                   references wmbs_workflow(id)
+                   on delete cascade
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE dataset_locked (
+                 dataset_id  int not null,
+                 primary key (dataset_id),
+                 constraint dat_loc foreign key (dataset_id)
+                   references dbsbuffer_dataset(id)
+                   on delete cascade
+               )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE tier0_feeder_lease (
+                 name         varchar(50) not null,
+                 owner        varchar(255),
+                 expire_time  int default 0 not null,
+                 primary key (name)
+               )"""
+
+        #
+        # Indexes
+        #
+        # function based indexes from the Oracle schema
+        # are replaced by indexes on the column
+        #
+        self.indexes[len(self.indexes)] = \
+            """CREATE INDEX idx_run_1 ON run (express_released)"""
+
+        self.indexes[len(self.indexes)] = \
+            """CREATE INDEX idx_run_2 ON run (status)"""
+
+        self.indexes[len(self.indexes)] = \
+            """CREATE INDEX idx_run_primds_stream_1 ON run_primds_stream_assoc (run_id, stream_id)"""
+
+        self.indexes[len(self.indexes)] = \
+            """CREATE INDEX idx_run_stream_done_1 ON run_stream_done (in_datasvc)"""
+
+        self.indexes[len(self.indexes)] = \
+            """CREATE INDEX idx_reco_release_config_2 ON reco_release_config (in_datasvc)"""
+
+        self.indexes[len(self.indexes)] = \
+            """CREATE INDEX idx_reco_release_config_3 ON reco_release_config (released)"""
+
+        self.indexes[len(self.indexes)] = \
+            """CREATE INDEX idx_lumi_section_closed_1 ON lumi_section_closed (close_time)"""
+
+        self.indexes[len(self.indexes)] = \
+            """CREATE INDEX idx_streamer_1 ON streamer (run_id, stream_id, lumi_id)"""
+
+        self.indexes[len(self.indexes)] = \
+            """CREATE INDEX idx_streamer_2 ON streamer (used)"""
+
+        self.indexes[len(self.indexes)] = \
+            """CREATE INDEX idx_streamer_3 ON streamer (deleted)"""
+
+        self.indexes[len(self.indexes)] = \
+            """CREATE INDEX idx_prompt_calib_1 ON prompt_calib (finished)"""
+
+        self.indexes[len(self.indexes)] = \
+            """CREATE INDEX idx_prompt_calib_file_1 ON prompt_calib_file (insert_time)"""
+
+        self.indexes[len(self.indexes)] = \
+            """CREATE INDEX idx_express_config_1 ON express_config (in_datasvc)"""
+
+        self.indexes[len(self.indexes)] = \
+            """CREATE INDEX idx_reco_config_1 ON reco_config (in_datasvc)"""
+
+        self.indexes[len(self.indexes)] = \
+            """CREATE INDEX idx_workflow_monitoring_0 ON workflow_monitoring (tracked)"""
+
+        self.indexes[len(self.indexes)] = \
+            """CREATE INDEX idx_workflow_monitoring_1 ON workflow_monitoring (closeout)"""
+
+        self.inserts[len(self.inserts)] = \
+            """INSERT INTO dual (dummy) VALUES ('X')"""
+
+        subTypes = ["Express", "Repack"]
+        for name in subTypes:
+            sql = """INSERT INTO wmbs_sub_types
+                     (ID, NAME)
+                     SELECT (SELECT IFNULL(MAX(id), 0) + 1 FROM wmbs_sub_types), '%s'
+                     FROM DUAL
+                     WHERE NOT EXISTS (
+                       SELECT id FROM wmbs_sub_types WHERE name = '%s'
+                     )
+                     """ % (name, name)
+            self.inserts[len(self.inserts)] = sql
+
+        runStates = { 1 : "Active",
+                      2 : "CloseOutRepack",
+                      3 : "CloseOutRepackMerge",
+                      4 : "CloseOutPromptReco",
+                      5 : "CloseOutRecoMerge",
+                      6 : "CloseOutAlcaSkim",
+                      7 : "CloseOutAlcaSkimMerge",
+                      8 : "CloseOutExport",
+                      9 : "CloseOutT1Skimming",
+                      10 : "Complete" }
+        for id, name in runStates.items():
+            sql = """INSERT INTO run_status
+                     (ID, NAME)
+                     VALUES (%d, '%s')
+                     """ % (id, name)
+            self.inserts[len(self.inserts)] = sql
+
+        processingStyles = { 1 : "Bulk",
+                             2 : "Express",
+                             3 : "Register",
+                             4 : "Convert",
+                             5 : "RegisterAndConvert",
+                             6 : "Ignore" }
+        for id, name in processingStyles.items():
+            sql = """INSERT INTO processing_style
+                     (ID, NAME)
+                     VALUES (%d, '%s')
+                     """ % (id, name)
+            self.inserts[len(self.inserts)] = sql
+
+        eventScenarios = { 1 : "pp",
+                           2 : "cosmics",
+                           3 : "hcalnzs",
+                           4 : "HeavyIons",
+                           5 : "AlCaTestEnable",
+                           6 : "AlCaP0",
+                           7 : "AlCaPhiSymEcal",
+                           8 : "AlCaLumiPixels",
+                           9 : "DataScouting",
+                           10 : "ppRun2",
+                           11 : "cosmicsRun2",
+                           12 : "hcalnzsRun2",
+                           13 : "ppRun2B0T",
+                           14 : "AlCa",
+                           15 : "ppRun2at50ns",
+                           16 : "HeavyIonsRun2",
+                           17 : "ppEra_Run2_25ns",
+                           18 : "cosmicsEra_Run2_25ns",
+                           19 : "hcalnzsEra_Run2_25ns",
+                           20 : "ppEra_Run2_2016",
+                           21 : "cosmicsEra_Run2_2016",
+                           22 : "hcalnzsEra_Run2_2016",
+                           23 : "ppEra_Run2_2016_trackingLowPU",
+                           24 : "ppEra_Run2_2016_pA" }
+        for id, name in eventScenarios.items():
+            sql = """INSERT INTO event_scenario
+                     (ID, NAME)
+                     VALUES (%d, '%s')
+                     """ % (id, name)
+            self.inserts[len(self.inserts)] = sql
+
+        return
+
+    def execute(self, conn = None, transaction = None):
+        """
+        _execute_
+
+        """
+        DBCreator.execute(self, conn, transaction)
+
+        return True
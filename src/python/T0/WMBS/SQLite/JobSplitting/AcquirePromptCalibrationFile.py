@@ -0,0 +1,11 @@
+"""
+_AcquirePromptCalibrationFile_
+
+SQLite implementation of AcquirePromptCalibrationFile
+
+"""
+
+from T0.WMBS.Oracle.JobSplitting.AcquirePromptCalibrationFile import AcquirePromptCalibrationFile as OracleAcquirePromptCalibrationFile
+
+class AcquirePromptCalibrationFile(OracleAcquirePromptCalibrationFile):
+    pass
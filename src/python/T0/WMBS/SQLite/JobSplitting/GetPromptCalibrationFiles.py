@@ -0,0 +1,11 @@
+"""
+_GetPromptCalibrationFiles_
+
+SQLite implementation of GetPromptCalibrationFiles
+
+"""
+
+from T0.WMBS.Oracle.JobSplitting.GetPromptCalibrationFiles import GetPromptCalibrationFiles as OracleGetPromptCalibrationFiles
+
+class GetPromptCalibrationFiles(OracleGetPromptCalibrationFiles):
+    pass
@@ -0,0 +1,17 @@
+"""
+_InsertExpressJobTime_
+
+SQLite implementation of InsertExpressJobTime
+
+"""
+
+from T0.WMBS.Oracle.JobSplitting.InsertExpressJobTime import InsertExpressJobTime as OracleInsertExpressJobTime
+
+class InsertExpressJobTime(OracleInsertExpressJobTime):
+
+    sql = """INSERT OR IGNORE INTO lumi_section_express_job
+             (run_id, stream_id, lumi_id, job_time)
+             SELECT run_id, stream_id, :LUMI, :TIME
+             FROM run_stream_fileset_assoc
+             WHERE fileset = (SELECT fileset FROM wmbs_subscription WHERE id = :SUB)
+             """
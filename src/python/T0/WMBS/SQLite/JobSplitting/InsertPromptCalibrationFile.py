@@ -0,0 +1,52 @@
+"""
+_InsertPromptCalibrationFile_
+
+SQLite implementation of InsertPromptCalibrationFile
+
+No INSERT ALL in SQLite, uses separate inserts.
+
+"""
+
+import time
+
+from T0.WMBS.Oracle.JobSplitting.InsertPromptCalibrationFile import InsertPromptCalibrationFile as OracleInsertPromptCalibrationFile
+
+class InsertPromptCalibrationFile(OracleInsertPromptCalibrationFile):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        insertTime = int(time.time())
+        for bind in binds:
+            bind['INSERT_TIME'] = insertTime
+
+        sql = """INSERT INTO prompt_calib_file
+                 (RUN_ID, STREAM_ID, FILEID, SUBSCRIPTION, INSERT_TIME)
+                 SELECT :RUN_ID, id, :FILEID, :SUBSCRIPTION, :INSERT_TIME
+                 FROM stream
+                 WHERE name = :STREAM
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        for bind in binds:
+            del bind['RUN_ID']
+            del bind['STREAM']
+            del bind['INSERT_TIME']
+
+        sql = """INSERT INTO wmbs_sub_files_acquired
+                 (SUBSCRIPTION, FILEID)
+                 VALUES (:SUBSCRIPTION, :FILEID)
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        sql = """DELETE FROM wmbs_sub_files_available
+                 WHERE subscription = :SUBSCRIPTION
+                 AND fileid = :FILEID"""
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
@@ -0,0 +1,11 @@
+"""
+_InsertSplitLumis_
+
+SQLite implementation of InsertSplitLumis
+
+"""
+
+from T0.WMBS.Oracle.JobSplitting.InsertSplitLumis import InsertSplitLumis as OracleInsertSplitLumis
+
+class InsertSplitLumis(OracleInsertSplitLumis):
+    pass
@@ -0,0 +1,42 @@
+"""
+_UpdateSubscriptionMetrics_
+
+SQLite implementation of UpdateSubscriptionMetrics
+
+No MERGE in SQLite, update the existing
+record and insert it if there is none.
+
+"""
+
+from T0.WMBS.Oracle.JobSplitting.UpdateSubscriptionMetrics import UpdateSubscriptionMetrics as OracleUpdateSubscriptionMetrics
+
+class UpdateSubscriptionMetrics(OracleUpdateSubscriptionMetrics):
+
+    updateSql = """UPDATE subscription_metrics
+                   SET overrate_lumis = overrate_lumis + :LUMIS,
+                       overrate_files = overrate_files + :FILES,
+                       overrate_events = overrate_events + :EVENTS,
+                       last_updated = :TIME
+                   WHERE subscription = :SUB
+                   """
+
+    sql = """INSERT INTO subscription_metrics
+             (subscription, run_id, overrate_lumis,
+              overrate_files, overrate_events, last_updated)
+             SELECT :SUB, run_id, :LUMIS, :FILES, :EVENTS, :TIME
+             FROM run_stream_fileset_assoc
+             WHERE fileset = (SELECT fileset FROM wmbs_subscription WHERE id = :SUB)
+             AND NOT EXISTS (
+               SELECT 1 FROM subscription_metrics
+               WHERE subscription = :SUB
+             )
+             """
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        self.dbi.processData(self.updateSql, binds, conn = conn,
+                             transaction = transaction)
+
+        self.dbi.processData(self.sql, binds, conn = conn,
+                             transaction = transaction)
+        return
@@ -0,0 +1,84 @@
+"""
+_FindRecoRelease_
+
+SQLite implementation of FindRecoRelease
+
+SQLite can't update a join, restrict the
+pre-release update with subqueries instead.
+
+"""
+import time
+
+from T0.WMBS.Oracle.RunConfig.FindRecoRelease import FindRecoRelease as OracleFindRecoRelease
+
+class FindRecoRelease(OracleFindRecoRelease):
+
+    def execute(self, datasetDelays, conn = None, transaction = False):
+
+        now = int(time.time())
+
+        binds = []
+        for dataset, delays in datasetDelays.items():
+            binds.append( { 'NOW' : now,
+                            'DATASET' : dataset,
+                            'DELAY' : delays[0],
+                            'DELAY_OFFSET' : delays[1] } )
+
+        sql = """UPDATE reco_release_config
+                 SET released = 1,
+                     delay = :DELAY,
+                     delay_offset = :DELAY_OFFSET
+                 WHERE checkForZeroOneState(released) = 0
+                 AND primds_id = ( SELECT id
+                                   FROM primary_dataset
+                                   WHERE name = :DATASET )
+                 AND run_id = ( SELECT MIN(reco_release_config.run_id)
+                                FROM reco_release_config
+                                WHERE checkForZeroOneState(reco_release_config.released) = 0 )
+                 AND run_id IN ( SELECT run_id
+                                 FROM run
+                                 WHERE run.stop_time + :DELAY - :DELAY_OFFSET < :NOW
+                                 AND run.stop_time > 0 )
+                 """
+
+        if len(binds) > 0:
+            self.dbi.processData(sql, binds, conn = conn,
+                                 transaction = transaction)
+
+        binds = { 'NOW' : now }
+
+        sql = """SELECT reco_release_config.run_id,
+                        primary_dataset.name,
+                        reco_release_config.fileset,
+                        repack_config.proc_version
+                 FROM reco_release_config
+                 INNER JOIN run ON
+                   run.run_id = reco_release_config.run_id
+                 INNER JOIN primary_dataset ON
+                   primary_dataset.id = reco_release_config.primds_id
+                 INNER JOIN run_primds_stream_assoc ON
+                   run_primds_stream_assoc.run_id = reco_release_config.run_id AND
+                   run_primds_stream_assoc.primds_id = reco_release_config.primds_id
+                 INNER JOIN repack_config ON
+                   repack_config.run_id = reco_release_config.run_id AND
+                   repack_config.stream_id = run_primds_stream_assoc.stream_id
+                 WHERE checkForZeroOneState(reco_release_config.released) = 1
+                 AND run.stop_time + reco_release_config.delay < :NOW
+                 """
+
+        results = self.dbi.processData(sql, binds, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        recoRelease = {}
+        for result in results:
+
+            run = result[0]
+
+            if run not in recoRelease:
+                recoRelease[run] = []
+
+            recoRelease[run].append((result[1],
+                                     result[2],
+                                     result[3]))
+
+        return recoRelease
@@ -0,0 +1,11 @@
+"""
+_FindRecoReleaseDatasets_
+
+SQLite implementation of FindRecoReleaseDatasets
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.FindRecoReleaseDatasets import FindRecoReleaseDatasets as OracleFindRecoReleaseDatasets
+
+class FindRecoReleaseDatasets(OracleFindRecoReleaseDatasets):
+    pass
@@ -0,0 +1,11 @@
+"""
+_GetExpressConfig_
+
+SQLite implementation of GetExpressConfig
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.GetExpressConfig import GetExpressConfig as OracleGetExpressConfig
+
+class GetExpressConfig(OracleGetExpressConfig):
+    pass
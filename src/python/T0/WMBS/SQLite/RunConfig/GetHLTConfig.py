@@ -0,0 +1,11 @@
+"""
+_GetHLTConfig_
+
+SQLite implementation of GetHLTConfig
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.GetHLTConfig import GetHLTConfig as OracleGetHLTConfig
+
+class GetHLTConfig(OracleGetHLTConfig):
+    pass
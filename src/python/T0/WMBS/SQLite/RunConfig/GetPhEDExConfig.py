@@ -0,0 +1,11 @@
+"""
+_GetPhEDExConfig_
+
+SQLite implementation of GetPhEDExConfig
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.GetPhEDExConfig import GetPhEDExConfig as OracleGetPhEDExConfig
+
+class GetPhEDExConfig(OracleGetPhEDExConfig):
+    pass
@@ -0,0 +1,11 @@
+"""
+_GetRecoConfig_
+
+SQLite implementation of GetRecoConfig
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.GetRecoConfig import GetRecoConfig as OracleGetRecoConfig
+
+class GetRecoConfig(OracleGetRecoConfig):
+    pass
@@ -0,0 +1,11 @@
+"""
+_GetRepackConfig_
+
+SQLite implementation of GetRepackConfig
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.GetRepackConfig import GetRepackConfig as OracleGetRepackConfig
+
+class GetRepackConfig(OracleGetRepackConfig):
+    pass
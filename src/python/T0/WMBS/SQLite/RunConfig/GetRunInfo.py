@@ -0,0 +1,11 @@
+"""
+_GetRunInfo_
+
+SQLite implementation of GetRunInfo
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.GetRunInfo import GetRunInfo as OracleGetRunInfo
+
+class GetRunInfo(OracleGetRunInfo):
+    pass
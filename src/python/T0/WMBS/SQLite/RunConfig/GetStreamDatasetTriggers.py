@@ -0,0 +1,11 @@
+"""
+_GetStreamDatasetTriggers_
+
+SQLite implementation of GetStreamDatasetTriggers
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.GetStreamDatasetTriggers import GetStreamDatasetTriggers as OracleGetStreamDatasetTriggers
+
+class GetStreamDatasetTriggers(OracleGetStreamDatasetTriggers):
+    pass
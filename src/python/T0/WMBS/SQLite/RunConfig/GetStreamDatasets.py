@@ -0,0 +1,11 @@
+"""
+_GetStreamDatasets_
+
+SQLite implementation of GetStreamDatasets
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.GetStreamDatasets import GetStreamDatasets as OracleGetStreamDatasets
+
+class GetStreamDatasets(OracleGetStreamDatasets):
+    pass
@@ -0,0 +1,11 @@
+"""
+_GetStreamOnlineVersion_
+
+SQLite implementation of GetStreamOnlineVersion
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.GetStreamOnlineVersion import GetStreamOnlineVersion as OracleGetStreamOnlineVersion
+
+class GetStreamOnlineVersion(OracleGetStreamOnlineVersion):
+    pass
@@ -0,0 +1,11 @@
+"""
+_GetStreamStyle_
+
+SQLite implementation of GetStreamStyle
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.GetStreamStyle import GetStreamStyle as OracleGetStreamStyle
+
+class GetStreamStyle(OracleGetStreamStyle):
+    pass
@@ -0,0 +1,26 @@
+"""
+_InsertCMSSWVersion_
+
+SQLite implementation of InsertCMSSWVersion
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertCMSSWVersion import InsertCMSSWVersion as OracleInsertCMSSWVersion
+
+class InsertCMSSWVersion(OracleInsertCMSSWVersion):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """INSERT INTO cmssw_version
+                 (ID, NAME)
+                 SELECT (SELECT IFNULL(MAX(id), 0) + 1 FROM cmssw_version), :VERSION
+                 FROM DUAL
+                 WHERE NOT EXISTS (
+                   SELECT * FROM cmssw_version
+                   WHERE name = :VERSION
+                 )"""
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
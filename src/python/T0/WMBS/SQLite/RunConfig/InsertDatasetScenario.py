@@ -0,0 +1,11 @@
+"""
+_InsertDatasetScenario_
+
+SQLite implementation of InsertDatasetScenario
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertDatasetScenario import InsertDatasetScenario as OracleInsertDatasetScenario
+
+class InsertDatasetScenario(OracleInsertDatasetScenario):
+    pass
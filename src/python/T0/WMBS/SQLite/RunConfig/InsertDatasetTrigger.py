@@ -0,0 +1,11 @@
+"""
+_InsertDatasetTrigger_
+
+SQLite implementation of InsertDatasetTrigger
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertDatasetTrigger import InsertDatasetTrigger as OracleInsertDatasetTrigger
+
+class InsertDatasetTrigger(OracleInsertDatasetTrigger):
+    pass
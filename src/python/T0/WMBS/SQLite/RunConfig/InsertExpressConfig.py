@@ -0,0 +1,11 @@
+"""
+_InsertExpressConfig_
+
+SQLite implementation of InsertExpressConfig
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertExpressConfig import InsertExpressConfig as OracleInsertExpressConfig
+
+class InsertExpressConfig(OracleInsertExpressConfig):
+    pass
@@ -0,0 +1,11 @@
+"""
+_InsertPhEDExConfig_
+
+SQLite implementation of InsertPhEDExConfig
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertPhEDExConfig import InsertPhEDExConfig as OracleInsertPhEDExConfig
+
+class InsertPhEDExConfig(OracleInsertPhEDExConfig):
+    pass
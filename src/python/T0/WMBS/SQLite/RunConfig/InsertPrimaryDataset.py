@@ -0,0 +1,26 @@
+"""
+_InsertPrimaryDataset_
+
+SQLite implementation of InsertPrimaryDataset
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertPrimaryDataset import InsertPrimaryDataset as OracleInsertPrimaryDataset
+
+class InsertPrimaryDataset(OracleInsertPrimaryDataset):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """INSERT INTO primary_dataset
+                 (ID, NAME)
+                 SELECT (SELECT IFNULL(MAX(id), 0) + 1 FROM primary_dataset), :PRIMDS
+                 FROM DUAL
+                 WHERE NOT EXISTS (
+                   SELECT * FROM primary_dataset
+                   WHERE name = :PRIMDS
+                 )"""
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
@@ -0,0 +1,11 @@
+"""
+_InsertPromptCalibration_
+
+SQLite implementation of InsertPromptCalibration
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertPromptCalibration import InsertPromptCalibration as OracleInsertPromptCalibration
+
+class InsertPromptCalibration(OracleInsertPromptCalibration):
+    pass
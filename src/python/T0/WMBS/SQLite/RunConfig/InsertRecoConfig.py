@@ -0,0 +1,11 @@
+"""
+_InsertRecoConfig_
+
+SQLite implementation of InsertRecoConfig
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertRecoConfig import InsertRecoConfig as OracleInsertRecoConfig
+
+class InsertRecoConfig(OracleInsertRecoConfig):
+    pass
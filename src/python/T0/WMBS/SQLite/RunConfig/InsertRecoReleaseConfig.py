@@ -0,0 +1,11 @@
+"""
+_InsertRecoReleaseConfig_
+
+SQLite implementation of InsertRecoReleaseConfig
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertRecoReleaseConfig import InsertRecoReleaseConfig as OracleInsertRecoReleaseConfig
+
+class InsertRecoReleaseConfig(OracleInsertRecoReleaseConfig):
+    pass
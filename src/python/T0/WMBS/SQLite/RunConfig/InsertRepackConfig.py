@@ -0,0 +1,11 @@
+"""
+_InsertRepackConfig_
+
+SQLite implementation of InsertRepackConfig
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertRepackConfig import InsertRepackConfig as OracleInsertRepackConfig
+
+class InsertRepackConfig(OracleInsertRepackConfig):
+    pass
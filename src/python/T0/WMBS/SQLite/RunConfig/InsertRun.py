@@ -0,0 +1,11 @@
+"""
+_InsertRun_
+
+SQLite implementation of InsertRun
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertRun import InsertRun as OracleInsertRun
+
+class InsertRun(OracleInsertRun):
+    pass
@@ -0,0 +1,11 @@
+"""
+_InsertRunStreamDone_
+
+SQLite implementation of InsertRunStreamDone
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertRunStreamDone import InsertRunStreamDone as OracleInsertRunStreamDone
+
+class InsertRunStreamDone(OracleInsertRunStreamDone):
+    pass
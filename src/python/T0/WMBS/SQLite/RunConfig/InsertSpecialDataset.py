@@ -0,0 +1,11 @@
+"""
+_InsertSpecialDataset_
+
+SQLite implementation of InsertSpecialDataset
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertSpecialDataset import InsertSpecialDataset as OracleInsertSpecialDataset
+
+class InsertSpecialDataset(OracleInsertSpecialDataset):
+    pass
@@ -0,0 +1,26 @@
+"""
+_InsertStorageNode_
+
+SQLite implementation of InsertStorageNode
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertStorageNode import InsertStorageNode as OracleInsertStorageNode
+
+class InsertStorageNode(OracleInsertStorageNode):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """INSERT INTO storage_node
+                 (ID, NAME)
+                 SELECT (SELECT IFNULL(MAX(id), 0) + 1 FROM storage_node), :NODE
+                 FROM DUAL
+                 WHERE NOT EXISTS (
+                   SELECT * FROM storage_node
+                   WHERE name = :NODE
+                 )"""
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
@@ -0,0 +1,26 @@
+"""
+_InsertStream_
+
+SQLite implementation of InsertStream
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertStream import InsertStream as OracleInsertStream
+
+class InsertStream(OracleInsertStream):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """INSERT INTO stream
+                 (ID, NAME)
+                 SELECT (SELECT IFNULL(MAX(id), 0) + 1 FROM stream), :STREAM
+                 FROM DUAL
+                 WHERE NOT EXISTS (
+                   SELECT * FROM stream
+                   WHERE name = :STREAM
+                 )"""
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
@@ -0,0 +1,11 @@
+"""
+_InsertStreamCMSSWVersion_
+
+SQLite implementation of InsertStreamCMSSWVersion
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertStreamCMSSWVersion import InsertStreamCMSSWVersion as OracleInsertStreamCMSSWVersion
+
+class InsertStreamCMSSWVersion(OracleInsertStreamCMSSWVersion):
+    pass
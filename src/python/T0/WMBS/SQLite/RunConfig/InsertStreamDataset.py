@@ -0,0 +1,11 @@
+"""
+_InsertStreamDataset_
+
+SQLite implementation of InsertStreamDataset
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertStreamDataset import InsertStreamDataset as OracleInsertStreamDataset
+
+class InsertStreamDataset(OracleInsertStreamDataset):
+    pass
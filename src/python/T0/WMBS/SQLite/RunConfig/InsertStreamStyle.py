@@ -0,0 +1,11 @@
+"""
+_InsertStreamStyle_
+
+SQLite implementation of InsertStreamStyle
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertStreamStyle import InsertStreamStyle as OracleInsertStreamStyle
+
+class InsertStreamStyle(OracleInsertStreamStyle):
+    pass
@@ -0,0 +1,63 @@
+"""
+_InsertStreamer_
+
+SQLite implementation of InsertStreamer
+
+No INSERT ALL and sequences in SQLite, inserts the
+file and then uses its id (looked up by LFN) for
+the run/lumi and streamer records.
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertStreamer import InsertStreamer as OracleInsertStreamer
+
+class InsertStreamer(OracleInsertStreamer):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        if isinstance(binds, dict):
+            binds = [ binds ]
+
+        sql = """INSERT INTO wmbs_file_details
+                 (ID, LFN, FILESIZE, EVENTS, MERGED)
+                 SELECT IFNULL(MAX(id), 0) + 1, :LFN, :FILESIZE, :EVENTS, '1'
+                 FROM wmbs_file_details
+                 WHERE EXISTS (
+                   SELECT * FROM stream WHERE name = :STREAM
+                 )
+                 """
+
+        self.dbi.processData(sql, [ { 'LFN' : x['LFN'],
+                                      'FILESIZE' : x['FILESIZE'],
+                                      'EVENTS' : x['EVENTS'],
+                                      'STREAM' : x['STREAM'] } for x in binds ],
+                             conn = conn, transaction = transaction)
+
+        sql = """INSERT INTO wmbs_file_runlumi_map
+                 (FILEID, RUN, LUMI)
+                 SELECT id, :RUN, :LUMI
+                 FROM wmbs_file_details
+                 WHERE lfn = :LFN
+                 """
+
+        self.dbi.processData(sql, [ { 'LFN' : x['LFN'],
+                                      'RUN' : x['RUN'],
+                                      'LUMI' : x['LUMI'] } for x in binds ],
+                             conn = conn, transaction = transaction)
+
+        sql = """INSERT INTO streamer
+                 (ID, RUN_ID, STREAM_ID, LUMI_ID, INSERT_TIME)
+                 SELECT wmbs_file_details.id, :RUN, stream.id, :LUMI, :TIME
+                 FROM wmbs_file_details, stream
+                 WHERE wmbs_file_details.lfn = :LFN
+                 AND stream.name = :STREAM
+                 """
+
+        self.dbi.processData(sql, [ { 'LFN' : x['LFN'],
+                                      'RUN' : x['RUN'],
+                                      'LUMI' : x['LUMI'],
+                                      'STREAM' : x['STREAM'],
+                                      'TIME' : x['TIME'] } for x in binds ],
+                             conn = conn, transaction = transaction)
+
+        return
@@ -0,0 +1,26 @@
+"""
+_InsertTrigger_
+
+SQLite implementation of InsertTrigger
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertTrigger import InsertTrigger as OracleInsertTrigger
+
+class InsertTrigger(OracleInsertTrigger):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """INSERT INTO trigger_label
+                 (ID, NAME)
+                 SELECT (SELECT IFNULL(MAX(id), 0) + 1 FROM trigger_label), :TRIG
+                 FROM DUAL
+                 WHERE NOT EXISTS (
+                   SELECT * FROM trigger_label
+                   WHERE name = :TRIG
+                 )"""
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
@@ -0,0 +1,11 @@
+"""
+_InsertWorkflowMonitoring_
+
+SQLite implementation of InsertWorkflowMonitoring
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertWorkflowMonitoring import InsertWorkflowMonitoring as OracleInsertWorkflowMonitoring
+
+class InsertWorkflowMonitoring(OracleInsertWorkflowMonitoring):
+    pass
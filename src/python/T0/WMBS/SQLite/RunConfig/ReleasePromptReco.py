@@ -0,0 +1,11 @@
+"""
+_ReleasePromptReco_
+
+SQLite implementation of ReleasePromptReco
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.ReleasePromptReco import ReleasePromptReco as OracleReleasePromptReco
+
+class ReleasePromptReco(OracleReleasePromptReco):
+    pass
@@ -0,0 +1,11 @@
+"""
+_UpdateRun_
+
+SQLite implementation of UpdateRun
+
+"""
+
+from T0.WMBS.Oracle.RunConfig.UpdateRun import UpdateRun as OracleUpdateRun
+
+class UpdateRun(OracleUpdateRun):
+    pass
@@ -0,0 +1,11 @@
+"""
+_CheckActiveSplitLumis_
+
+SQLite implementation of CheckActiveSplitLumis
+
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.CheckActiveSplitLumis import CheckActiveSplitLumis as OracleCheckActiveSplitLumis
+
+class CheckActiveSplitLumis(OracleCheckActiveSplitLumis):
+    pass
@@ -0,0 +1,11 @@
+"""
+_CheckClosedLumis_
+
+SQLite implementation of CheckClosedLumis
+
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.CheckClosedLumis import CheckClosedLumis as OracleCheckClosedLumis
+
+class CheckClosedLumis(OracleCheckClosedLumis):
+    pass
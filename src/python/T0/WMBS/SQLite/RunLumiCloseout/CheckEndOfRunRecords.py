@@ -0,0 +1,11 @@
+"""
+_CheckEndOfRunRecords_
+
+SQLite implementation of CheckEndOfRunRecords
+
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.CheckEndOfRunRecords import CheckEndOfRunRecords as OracleCheckEndOfRunRecords
+
+class CheckEndOfRunRecords(OracleCheckEndOfRunRecords):
+    pass
@@ -0,0 +1,11 @@
+"""
+_CloseFilesets_
+
+SQLite implementation of CloseFilesets
+
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.CloseFilesets import CloseFilesets as OracleCloseFilesets
+
+class CloseFilesets(OracleCloseFilesets):
+    pass
@@ -0,0 +1,11 @@
+"""
+_CloseRunStreamFilesets_
+
+SQLite implementation of CloseRunStreamFilesets
+
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.CloseRunStreamFilesets import CloseRunStreamFilesets as OracleCloseRunStreamFilesets
+
+class CloseRunStreamFilesets(OracleCloseRunStreamFilesets):
+    pass
@@ -0,0 +1,11 @@
+"""
+_CloseRuns_
+
+SQLite implementation of CloseRuns
+
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.CloseRuns import CloseRuns as OracleCloseRuns
+
+class CloseRuns(OracleCloseRuns):
+    pass
@@ -0,0 +1,11 @@
+"""
+_DeleteStreamers_
+
+SQLite implementation of DeleteStreamers
+
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.DeleteStreamers import DeleteStreamers as OracleDeleteStreamers
+
+class DeleteStreamers(OracleDeleteStreamers):
+    pass
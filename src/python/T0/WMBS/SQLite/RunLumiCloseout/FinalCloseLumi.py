@@ -0,0 +1,32 @@
+"""
+_FinalCloseLumi_
+
+SQLite implementation of FinalCloseLumi
+
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.FinalCloseLumi import FinalCloseLumi as OracleFinalCloseLumi
+
+class FinalCloseLumi(OracleFinalCloseLumi):
+
+    def execute(self, currentTime, conn = None, transaction = False):
+
+        sql = """UPDATE lumi_section_closed
+                 SET close_time = :CLOSE_TIME
+                 WHERE checkForZeroState(close_time) = 0
+                 AND filecount = (
+                   SELECT COUNT(*)
+                   FROM streamer
+                   WHERE streamer.run_id = lumi_section_closed.run_id
+                   AND streamer.stream_id = lumi_section_closed.stream_id
+                   AND streamer.lumi_id = lumi_section_closed.lumi_id
+                 )
+                 AND filecount > 0
+                 """
+
+        binds = { 'CLOSE_TIME' : currentTime }
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
@@ -0,0 +1,11 @@
+"""
+_FindActiveRuns_
+
+SQLite implementation of FindActiveRuns
+
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.FindActiveRuns import FindActiveRuns as OracleFindActiveRuns
+
+class FindActiveRuns(OracleFindActiveRuns):
+    pass
@@ -0,0 +1,11 @@
+"""
+_FindClosedLumis_
+
+SQLite implementation of FindClosedLumis
+
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.FindClosedLumis import FindClosedLumis as OracleFindClosedLumis
+
+class FindClosedLumis(OracleFindClosedLumis):
+    pass
@@ -0,0 +1,11 @@
+"""
+_FindClosedRuns_
+
+SQLite implementation of FindClosedRuns
+
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.FindClosedRuns import FindClosedRuns as OracleFindClosedRuns
+
+class FindClosedRuns(OracleFindClosedRuns):
+    pass
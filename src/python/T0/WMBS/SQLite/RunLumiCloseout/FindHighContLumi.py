@@ -0,0 +1,11 @@
+"""
+_FindHighContLumi_
+
+SQLite implementation of FindHighContLumi
+
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.FindHighContLumi import FindHighContLumi as OracleFindHighContLumi
+
+class FindHighContLumi(OracleFindHighContLumi):
+    pass
@@ -0,0 +1,11 @@
+"""
+_FindOpenRuns_
+
+SQLite implementation of FindOpenRuns
+
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.FindOpenRuns import FindOpenRuns as OracleFindOpenRuns
+
+class FindOpenRuns(OracleFindOpenRuns):
+    pass
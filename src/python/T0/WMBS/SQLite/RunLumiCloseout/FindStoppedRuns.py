@@ -0,0 +1,22 @@
+"""
+_FindStoppedRuns_
+
+SQLite implementation of FindStoppedRuns
+
+RunSummary start and stop times are stored as
+UTC timestamps, strftime converts them to seconds.
+
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.FindStoppedRuns import FindStoppedRuns as OracleFindStoppedRuns
+
+class FindStoppedRuns(OracleFindStoppedRuns):
+
+    sql = """SELECT RUNSUMMARY.runnumber,
+                    CAST(strftime('%%s', RUNSUMMARY.starttime) AS INTEGER) AS starttime,
+                    CAST(strftime('%%s', RUNSUMMARY.stoptime) AS INTEGER) AS stoptime
+             FROM CMS_WBM.RUNSUMMARY
+             WHERE RUNSUMMARY.runnumber IN (%s)
+             AND RUNSUMMARY.starttime IS NOT NULL
+             AND RUNSUMMARY.stoptime IS NOT NULL
+             """
@@ -0,0 +1,11 @@
+"""
+_FindUnfinishedRuns_
+
+SQLite implementation of FindUnfinishedRuns
+
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.FindUnfinishedRuns import FindUnfinishedRuns as OracleFindUnfinishedRuns
+
+class FindUnfinishedRuns(OracleFindUnfinishedRuns):
+    pass
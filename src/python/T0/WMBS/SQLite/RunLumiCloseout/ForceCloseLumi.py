@@ -0,0 +1,60 @@
+"""
+_ForceCloseLumi_
+
+SQLite implementation of LumiRunCloseout.ForceCloseLumi
+
+"""
+
+import time
+
+from T0.WMBS.Oracle.RunLumiCloseout.ForceCloseLumi import ForceCloseLumi as OracleForceCloseLumi
+
+class ForceCloseLumi(OracleForceCloseLumi):
+    """
+    _ForceCloseLumi_
+
+    No MERGE in SQLite, inserts the missing lumis
+    and then updates all of them.
+    """
+
+    insertSql = """INSERT OR IGNORE INTO lumi_section_closed
+                   (run_id, lumi_id, stream_id, filecount, insert_time, close_time)
+                   VALUES (:RUN_ID, :LUMI_ID, :STREAM_ID, 0, :CURRENT_TIME, :CURRENT_TIME)
+                   """
+
+    sql = """UPDATE lumi_section_closed
+             SET filecount = 0,
+                 close_time = :CURRENT_TIME
+             WHERE run_id = :RUN_ID
+             AND lumi_id = :LUMI_ID
+             AND stream_id = :STREAM_ID
+             """
+
+    def execute(self, run, streams, conn = None, transaction = False):
+        """
+        _execute_
+
+        Executes the queries, passes the current time
+        """
+        if not streams:
+            return
+
+        currentTime = int(time.time())
+
+        binds = []
+        for stream in streams:
+            for lumi in streams[stream]:
+                binds.append({"RUN_ID" : run,
+                              "STREAM_ID" : stream,
+                              "LUMI_ID" : lumi,
+                              "CURRENT_TIME" : currentTime})
+
+        self.dbi.processData(self.insertSql, binds = binds,
+                             conn = conn,
+                             transaction = transaction)
+
+        self.dbi.processData(self.sql, binds = binds,
+                             conn = conn,
+                             transaction = transaction)
+
+        return
@@ -0,0 +1,11 @@
+"""
+_GetClosedLumisForStream_
+
+SQLite implementation of GetClosedLumisForStream
+
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.GetClosedLumisForStream import GetClosedLumisForStream as OracleGetClosedLumisForStream
+
+class GetClosedLumisForStream(OracleGetClosedLumisForStream):
+    pass
@@ -0,0 +1,11 @@
+"""
+_GetCloseoutCandidates_
+
+SQLite implementation of GetCloseoutCandidates
+
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.GetCloseoutCandidates import GetCloseoutCandidates as OracleGetCloseoutCandidates
+
+class GetCloseoutCandidates(OracleGetCloseoutCandidates):
+    pass
@@ -0,0 +1,11 @@
+"""
+_GetFileCountOnOpenLumis_
+
+SQLite implementation of GetFileCountOnOpenLumis
+
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.GetFileCountOnOpenLumis import GetFileCountOnOpenLumis as OracleGetFileCountOnOpenLumis
+
+class GetFileCountOnOpenLumis(OracleGetFileCountOnOpenLumis):
+    pass
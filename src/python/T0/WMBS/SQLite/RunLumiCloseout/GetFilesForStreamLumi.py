@@ -0,0 +1,11 @@
+"""
+_GetFilesForStreamLumi_
+
+SQLite implementation of GetFilesForStreamLumi
+
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.GetFilesForStreamLumi import GetFilesForStreamLumi as OracleGetFilesForStreamLumi
+
+class GetFilesForStreamLumi(OracleGetFilesForStreamLumi):
+    pass
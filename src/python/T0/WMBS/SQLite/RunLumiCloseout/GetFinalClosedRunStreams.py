@@ -0,0 +1,11 @@
+"""
+_GetFinalClosedRunStreams_
+
+SQLite implementation of GetFinalClosedRunStreams
+
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.GetFinalClosedRunStreams import GetFinalClosedRunStreams as OracleGetFinalClosedRunStreams
+
+class GetFinalClosedRunStreams(OracleGetFinalClosedRunStreams):
+    pass
@@ -0,0 +1,11 @@
+"""
+_GetRunStreamCloseoutStatus_
+
+SQLite implementation of GetRunStreamCloseoutStatus
+
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.GetRunStreamCloseoutStatus import GetRunStreamCloseoutStatus as OracleGetRunStreamCloseoutStatus
+
+class GetRunStreamCloseoutStatus(OracleGetRunStreamCloseoutStatus):
+    pass
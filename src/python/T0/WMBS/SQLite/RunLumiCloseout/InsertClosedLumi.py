@@ -0,0 +1,11 @@
+"""
+_InsertClosedLumi_
+
+SQLite implementation of InsertClosedLumi
+
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.InsertClosedLumi import InsertClosedLumi as OracleInsertClosedLumi
+
+class InsertClosedLumi(OracleInsertClosedLumi):
+    pass
@@ -0,0 +1,11 @@
+"""
+_StopRuns_
+
+SQLite implementation of StopRuns
+
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.StopRuns import StopRuns as OracleStopRuns
+
+class StopRuns(OracleStopRuns):
+    pass
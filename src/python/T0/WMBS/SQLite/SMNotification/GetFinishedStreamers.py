@@ -0,0 +1,11 @@
+"""
+_GetFinishedStreamers_
+
+SQLite implementation of GetFinishedStreamers
+
+"""
+
+from T0.WMBS.Oracle.SMNotification.GetFinishedStreamers import GetFinishedStreamers as OracleGetFinishedStreamers
+
+class GetFinishedStreamers(OracleGetFinishedStreamers):
+    pass
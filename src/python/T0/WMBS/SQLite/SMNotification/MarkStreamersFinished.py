@@ -0,0 +1,11 @@
+"""
+_MarkStreamersFinished_
+
+SQLite implementation of MarkStreamersFinished
+
+"""
+
+from T0.WMBS.Oracle.SMNotification.MarkStreamersFinished import MarkStreamersFinished as OracleMarkStreamersFinished
+
+class MarkStreamersFinished(OracleMarkStreamersFinished):
+    pass
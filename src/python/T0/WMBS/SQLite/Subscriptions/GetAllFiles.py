@@ -0,0 +1,11 @@
+"""
+_GetAllFiles_
+
+SQLite implementation of GetAllFiles
+
+"""
+
+from T0.WMBS.Oracle.Subscriptions.GetAllFiles import GetAllFiles as OracleGetAllFiles
+
+class GetAllFiles(OracleGetAllFiles):
+    pass
@@ -0,0 +1,11 @@
+"""
+_GetAvailableConditionFiles_
+
+SQLite implementation of GetAvailableConditionFiles
+
+"""
+
+from T0.WMBS.Oracle.Subscriptions.GetAvailableConditionFiles import GetAvailableConditionFiles as OracleGetAvailableConditionFiles
+
+class GetAvailableConditionFiles(OracleGetAvailableConditionFiles):
+    pass
@@ -0,0 +1,11 @@
+"""
+_GetAvailableExpressFiles_
+
+SQLite implementation of GetAvailableExpressFiles
+
+"""
+
+from T0.WMBS.Oracle.Subscriptions.GetAvailableExpressFiles import GetAvailableExpressFiles as OracleGetAvailableExpressFiles
+
+class GetAvailableExpressFiles(OracleGetAvailableExpressFiles):
+    pass
@@ -0,0 +1,11 @@
+"""
+_GetAvailableExpressMergeFiles_
+
+SQLite implementation of GetAvailableExpressMergeFiles
+
+"""
+
+from T0.WMBS.Oracle.Subscriptions.GetAvailableExpressMergeFiles import GetAvailableExpressMergeFiles as OracleGetAvailableExpressMergeFiles
+
+class GetAvailableExpressMergeFiles(OracleGetAvailableExpressMergeFiles):
+    pass
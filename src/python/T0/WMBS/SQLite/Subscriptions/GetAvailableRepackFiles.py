@@ -0,0 +1,11 @@
+"""
+_GetAvailableRepackFiles_
+
+SQLite implementation of GetAvailableRepackFiles
+
+"""
+
+from T0.WMBS.Oracle.Subscriptions.GetAvailableRepackFiles import GetAvailableRepackFiles as OracleGetAvailableRepackFiles
+
+class GetAvailableRepackFiles(OracleGetAvailableRepackFiles):
+    pass
@@ -0,0 +1,11 @@
+"""
+_GetAvailableRepackMergeFiles_
+
+SQLite implementation of GetAvailableRepackMergeFiles
+
+"""
+
+from T0.WMBS.Oracle.Subscriptions.GetAvailableRepackMergeFiles import GetAvailableRepackMergeFiles as OracleGetAvailableRepackMergeFiles
+
+class GetAvailableRepackMergeFiles(OracleGetAvailableRepackMergeFiles):
+    pass
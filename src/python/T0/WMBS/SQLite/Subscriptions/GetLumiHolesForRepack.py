@@ -0,0 +1,11 @@
+"""
+_GetLumiHolesForRepack_
+
+SQLite implementation of GetLumiHolesForRepack
+
+"""
+
+from T0.WMBS.Oracle.Subscriptions.GetLumiHolesForRepack import GetLumiHolesForRepack as OracleGetLumiHolesForRepack
+
+class GetLumiHolesForRepack(OracleGetLumiHolesForRepack):
+    pass
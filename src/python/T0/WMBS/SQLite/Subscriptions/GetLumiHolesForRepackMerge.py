@@ -0,0 +1,11 @@
+"""
+_GetLumiHolesForRepackMerge_
+
+SQLite implementation of GetLumiHolesForRepackMerge
+
+"""
+
+from T0.WMBS.Oracle.Subscriptions.GetLumiHolesForRepackMerge import GetLumiHolesForRepackMerge as OracleGetLumiHolesForRepackMerge
+
+class GetLumiHolesForRepackMerge(OracleGetLumiHolesForRepackMerge):
+    pass
@@ -0,0 +1,11 @@
+"""
+_GetUsedLumis_
+
+SQLite implementation of GetUsedLumis
+
+"""
+
+from T0.WMBS.Oracle.Subscriptions.GetUsedLumis import GetUsedLumis as OracleGetUsedLumis
+
+class GetUsedLumis(OracleGetUsedLumis):
+    pass
@@ -0,0 +1,11 @@
+"""
+_GetDatasetLocked_
+
+SQLite implementation of GetDatasetLocked
+
+"""
+
+from T0.WMBS.Oracle.T0DataSvc.GetDatasetLocked import GetDatasetLocked as OracleGetDatasetLocked
+
+class GetDatasetLocked(OracleGetDatasetLocked):
+    pass
@@ -0,0 +1,11 @@
+"""
+_GetExpressConfigs_
+
+SQLite implementation of GetExpressConfigs
+
+"""
+
+from T0.WMBS.Oracle.T0DataSvc.GetExpressConfigs import GetExpressConfigs as OracleGetExpressConfigs
+
+class GetExpressConfigs(OracleGetExpressConfigs):
+    pass
@@ -0,0 +1,11 @@
+"""
+_GetRecoConfigs_
+
+SQLite implementation of GetRecoConfigs
+
+"""
+
+from T0.WMBS.Oracle.T0DataSvc.GetRecoConfigs import GetRecoConfigs as OracleGetRecoConfigs
+
+class GetRecoConfigs(OracleGetRecoConfigs):
+    pass
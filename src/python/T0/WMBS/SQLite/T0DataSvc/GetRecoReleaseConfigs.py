@@ -0,0 +1,11 @@
+"""
+_GetRecoReleaseConfigs_
+
+SQLite implementation of GetRecoReleaseConfigs
+
+"""
+
+from T0.WMBS.Oracle.T0DataSvc.GetRecoReleaseConfigs import GetRecoReleaseConfigs as OracleGetRecoReleaseConfigs
+
+class GetRecoReleaseConfigs(OracleGetRecoReleaseConfigs):
+    pass
@@ -0,0 +1,11 @@
+"""
+_GetRunStreamDone_
+
+SQLite implementation of GetRunStreamDone
+
+"""
+
+from T0.WMBS.Oracle.T0DataSvc.GetRunStreamDone import GetRunStreamDone as OracleGetRunStreamDone
+
+class GetRunStreamDone(OracleGetRunStreamDone):
+    pass
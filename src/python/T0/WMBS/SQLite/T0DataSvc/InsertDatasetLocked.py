@@ -0,0 +1,26 @@
+"""
+_InsertDatasetLocked_
+
+SQLite implementation of InsertDatasetLocked
+
+"""
+
+from T0.WMBS.Oracle.T0DataSvc.InsertDatasetLocked import InsertDatasetLocked as OracleInsertDatasetLocked
+
+class InsertDatasetLocked(OracleInsertDatasetLocked):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """INSERT INTO dataset_locked
+                 (path)
+                 SELECT :PATH
+                 WHERE NOT EXISTS (
+                   SELECT * FROM dataset_locked
+                   WHERE path = :PATH
+                 )
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
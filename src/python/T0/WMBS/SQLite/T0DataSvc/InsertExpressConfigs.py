@@ -0,0 +1,48 @@
+"""
+_InsertExpressConfigs_
+
+SQLite implementation of InsertExpressConfigs
+
+No MERGE in SQLite, update existing
+records and insert the missing ones.
+
+"""
+
+from T0.WMBS.Oracle.T0DataSvc.InsertExpressConfigs import InsertExpressConfigs as OracleInsertExpressConfigs
+
+class InsertExpressConfigs(OracleInsertExpressConfigs):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """UPDATE express_config
+                 SET cmssw = :CMSSW,
+                     scram_arch = :SCRAM_ARCH,
+                     reco_cmssw = :RECO_CMSSW,
+                     reco_scram_arch = :RECO_SCRAM_ARCH,
+                     alca_skim = :ALCA_SKIM,
+                     dqm_seq = :DQM_SEQ,
+                     global_tag = :GLOBAL_TAG,
+                     scenario = :SCENARIO
+                 WHERE run = :RUN
+                 AND stream = :STREAM
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        sql = """INSERT INTO express_config
+                 (run, stream, cmssw, scram_arch, reco_cmssw, reco_scram_arch,
+                  alca_skim, dqm_seq, global_tag, scenario)
+                 SELECT :RUN, :STREAM, :CMSSW, :SCRAM_ARCH, :RECO_CMSSW, :RECO_SCRAM_ARCH,
+                        :ALCA_SKIM, :DQM_SEQ, :GLOBAL_TAG, :SCENARIO
+                 WHERE NOT EXISTS (
+                   SELECT * FROM express_config
+                   WHERE run = :RUN
+                   AND stream = :STREAM
+                 )
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
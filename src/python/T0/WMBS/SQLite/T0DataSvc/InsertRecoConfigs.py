@@ -0,0 +1,49 @@
+"""
+_InsertRecoConfigs_
+
+SQLite implementation of InsertRecoConfigs
+
+No MERGE in SQLite, update existing
+records and insert the missing ones.
+
+"""
+
+from T0.WMBS.Oracle.T0DataSvc.InsertRecoConfigs import InsertRecoConfigs as OracleInsertRecoConfigs
+
+class InsertRecoConfigs(OracleInsertRecoConfigs):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """UPDATE reco_config
+                 SET cmssw = :CMSSW,
+                     scram_arch = :SCRAM_ARCH,
+                     alca_skim = :ALCA_SKIM,
+                     physics_skim = :PHYSICS_SKIM,
+                     dqm_seq = :DQM_SEQ,
+                     global_tag = :GLOBAL_TAG,
+                     scenario = :SCENARIO
+                 WHERE run = :RUN
+                 AND primds = :PRIMDS
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        sql = """INSERT INTO reco_config
+                 (run, primds, cmssw, scram_arch,
+                  alca_skim, physics_skim, dqm_seq,
+                  global_tag, scenario)
+                 SELECT :RUN, :PRIMDS, :CMSSW, :SCRAM_ARCH,
+                        :ALCA_SKIM, :PHYSICS_SKIM, :DQM_SEQ,
+                        :GLOBAL_TAG, :SCENARIO
+                 WHERE NOT EXISTS (
+                   SELECT * FROM reco_config
+                   WHERE run = :RUN
+                   AND primds = :PRIMDS
+                 )
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
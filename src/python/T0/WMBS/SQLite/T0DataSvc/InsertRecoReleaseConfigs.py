@@ -0,0 +1,37 @@
+"""
+_InsertRecoReleaseConfigs_
+
+SQLite implementation of InsertRecoReleaseConfigs
+
+No MERGE in SQLite, update existing
+records and insert the missing ones.
+
+"""
+
+from T0.WMBS.Oracle.T0DataSvc.InsertRecoReleaseConfigs import InsertRecoReleaseConfigs as OracleInsertRecoReleaseConfigs
+
+class InsertRecoReleaseConfigs(OracleInsertRecoReleaseConfigs):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """UPDATE reco_locked
+                 SET locked = :LOCKED
+                 WHERE run = :RUN
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        sql = """INSERT INTO reco_locked
+                 (run, locked)
+                 SELECT :RUN, :LOCKED
+                 WHERE NOT EXISTS (
+                   SELECT * FROM reco_locked
+                   WHERE run = :RUN
+                 )
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
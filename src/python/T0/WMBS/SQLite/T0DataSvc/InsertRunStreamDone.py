@@ -0,0 +1,27 @@
+"""
+_InsertRunStreamDone_
+
+SQLite implementation of InsertRunStreamDone
+
+"""
+
+from T0.WMBS.Oracle.T0DataSvc.InsertRunStreamDone import InsertRunStreamDone as OracleInsertRunStreamDone
+
+class InsertRunStreamDone(OracleInsertRunStreamDone):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """INSERT INTO run_stream_done
+                 (run, stream)
+                 SELECT :RUN, :STREAM
+                 WHERE NOT EXISTS (
+                   SELECT * FROM run_stream_done
+                   WHERE run = :RUN
+                   AND stream = :STREAM
+                 )
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
@@ -0,0 +1,22 @@
+"""
+_UpdateDatasetLocked_
+
+SQLite implementation of UpdateDatasetLocked
+
+"""
+
+from T0.WMBS.Oracle.T0DataSvc.UpdateDatasetLocked import UpdateDatasetLocked as OracleUpdateDatasetLocked
+
+class UpdateDatasetLocked(OracleUpdateDatasetLocked):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """INSERT OR IGNORE INTO dataset_locked
+                 (dataset_id)
+                 VALUES (:ID)
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
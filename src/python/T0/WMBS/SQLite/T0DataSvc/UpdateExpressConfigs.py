@@ -0,0 +1,11 @@
+"""
+_UpdateExpressConfigs_
+
+SQLite implementation of UpdateExpressConfigs
+
+"""
+
+from T0.WMBS.Oracle.T0DataSvc.UpdateExpressConfigs import UpdateExpressConfigs as OracleUpdateExpressConfigs
+
+class UpdateExpressConfigs(OracleUpdateExpressConfigs):
+    pass
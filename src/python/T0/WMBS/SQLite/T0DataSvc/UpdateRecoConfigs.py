@@ -0,0 +1,11 @@
+"""
+_UpdateRecoConfigs_
+
+SQLite implementation of UpdateRecoConfigs
+
+"""
+
+from T0.WMBS.Oracle.T0DataSvc.UpdateRecoConfigs import UpdateRecoConfigs as OracleUpdateRecoConfigs
+
+class UpdateRecoConfigs(OracleUpdateRecoConfigs):
+    pass
@@ -0,0 +1,11 @@
+"""
+_UpdateRecoReleaseConfigs_
+
+SQLite implementation of UpdateRecoReleaseConfigs
+
+"""
+
+from T0.WMBS.Oracle.T0DataSvc.UpdateRecoReleaseConfigs import UpdateRecoReleaseConfigs as OracleUpdateRecoReleaseConfigs
+
+class UpdateRecoReleaseConfigs(OracleUpdateRecoReleaseConfigs):
+    pass
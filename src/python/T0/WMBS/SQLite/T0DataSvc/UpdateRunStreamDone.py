@@ -0,0 +1,11 @@
+"""
+_UpdateRunStreamDone_
+
+SQLite implementation of UpdateRunStreamDone
+
+"""
+
+from T0.WMBS.Oracle.T0DataSvc.UpdateRunStreamDone import UpdateRunStreamDone as OracleUpdateRunStreamDone
+
+class UpdateRunStreamDone(OracleUpdateRunStreamDone):
+    pass
@@ -0,0 +1,11 @@
+"""
+_AcquireLeases_
+
+SQLite implementation of AcquireLeases
+
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.AcquireLeases import AcquireLeases as OracleAcquireLeases
+
+class AcquireLeases(OracleAcquireLeases):
+    pass
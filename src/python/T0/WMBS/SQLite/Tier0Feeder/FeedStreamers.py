@@ -0,0 +1,92 @@
+"""
+_FeedStreamers_
+
+SQLite implementation of FeedStreamers
+
+No INSERT ALL and MERGE in SQLite, the streamers are
+selected by the same query for the fileset and the
+subscription insert, then marked as used.
+
+"""
+
+import time
+
+from T0.WMBS.Oracle.Tier0Feeder.FeedStreamers import FeedStreamers as OracleFeedStreamers
+
+class FeedStreamers(OracleFeedStreamers):
+
+    def execute(self, runStreams = None, countFed = False, conn = None, transaction = False):
+
+        if runStreams != None:
+            if len(runStreams) == 0:
+                return 0
+            runStreamSql = self.runStreamSql
+        else:
+            runStreamSql = ""
+
+        unused = None
+        if countFed:
+            unused = self.countUnused(runStreams, runStreamSql, conn = conn,
+                                      transaction = transaction)
+            if unused == 0:
+                return 0
+
+        #
+        # query only works under the assumption that there
+        # is a single subscription on the run/stream fileset
+        #
+        selectSql = """SELECT streamer.id AS fileid,
+                              run_stream_fileset_assoc.fileset AS fileset,
+                              wmbs_subscription.id AS subscription
+                       FROM streamer
+                       INNER JOIN run_stream_fileset_assoc ON
+                         run_stream_fileset_assoc.run_id = streamer.run_id AND
+                         run_stream_fileset_assoc.stream_id = streamer.stream_id
+                       INNER JOIN wmbs_fileset ON
+                         wmbs_fileset.id = run_stream_fileset_assoc.fileset AND
+                         wmbs_fileset.open = 1
+                       INNER JOIN lumi_section_closed ON
+                         lumi_section_closed.run_id = streamer.run_id AND
+                         lumi_section_closed.stream_id = streamer.stream_id AND
+                         lumi_section_closed.lumi_id = streamer.lumi_id AND
+                         lumi_section_closed.close_time > 0
+                       INNER JOIN wmbs_subscription ON
+                         wmbs_subscription.fileset = run_stream_fileset_assoc.fileset
+                       WHERE checkForZeroState(streamer.used) = 0
+                       %s""" % runStreamSql
+
+        sql = """INSERT INTO wmbs_sub_files_available
+                 (SUBSCRIPTION, FILEID)
+                 SELECT subscription, fileid
+                 FROM (%s)
+                 """ % selectSql
+
+        self.dbi.processData(sql, self.getBinds(runStreams, {}), conn = conn,
+                             transaction = transaction)
+
+        sql = """INSERT INTO wmbs_fileset_files
+                 (FILEID, FILESET, INSERT_TIME)
+                 SELECT fileid, fileset, :TIME
+                 FROM (%s)
+                 """ % selectSql
+
+        binds = self.getBinds(runStreams, { 'TIME' : int(time.time()) })
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        sql = """UPDATE streamer
+                 SET used = 1
+                 WHERE checkForZeroState(used) = 0
+                 AND id IN (
+                   SELECT fileid FROM wmbs_fileset_files
+                 )
+                 %s""" % runStreamSql
+
+        self.dbi.processData(sql, self.getBinds(runStreams, {}), conn = conn,
+                             transaction = transaction)
+
+        if unused == None:
+            return
+
+        return max(unused - self.countUnused(runStreams, runStreamSql, conn = conn,
+                                             transaction = transaction), 0)
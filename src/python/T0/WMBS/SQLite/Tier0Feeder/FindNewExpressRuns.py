@@ -0,0 +1,11 @@
+"""
+_FindNewExpressRuns_
+
+SQLite implementation of FindNewExpressRuns
+
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.FindNewExpressRuns import FindNewExpressRuns as OracleFindNewExpressRuns
+
+class FindNewExpressRuns(OracleFindNewExpressRuns):
+    pass
@@ -0,0 +1,11 @@
+"""
+_FindNewRunStreams_
+
+SQLite implementation of FindNewRunStreams
+
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.FindNewRunStreams import FindNewRunStreams as OracleFindNewRunStreams
+
+class FindNewRunStreams(OracleFindNewRunStreams):
+    pass
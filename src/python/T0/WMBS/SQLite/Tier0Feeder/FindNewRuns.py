@@ -0,0 +1,11 @@
+"""
+_FindNewRuns_
+
+SQLite implementation of FindNewRuns
+
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.FindNewRuns import FindNewRuns as OracleFindNewRuns
+
+class FindNewRuns(OracleFindNewRuns):
+    pass
@@ -0,0 +1,11 @@
+"""
+_FindUnreleasedRunStreams_
+
+SQLite implementation of FindUnreleasedRunStreams
+
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.FindUnreleasedRunStreams import FindUnreleasedRunStreams as OracleFindUnreleasedRunStreams
+
+class FindUnreleasedRunStreams(OracleFindUnreleasedRunStreams):
+    pass
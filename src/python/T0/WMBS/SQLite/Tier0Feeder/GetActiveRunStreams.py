@@ -0,0 +1,11 @@
+"""
+_GetActiveRunStreams_
+
+SQLite implementation of GetActiveRunStreams
+
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.GetActiveRunStreams import GetActiveRunStreams as OracleGetActiveRunStreams
+
+class GetActiveRunStreams(OracleGetActiveRunStreams):
+    pass
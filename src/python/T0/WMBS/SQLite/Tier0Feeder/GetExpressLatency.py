@@ -0,0 +1,11 @@
+"""
+_GetExpressLatency_
+
+SQLite implementation of GetExpressLatency
+
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.GetExpressLatency import GetExpressLatency as OracleGetExpressLatency
+
+class GetExpressLatency(OracleGetExpressLatency):
+    pass
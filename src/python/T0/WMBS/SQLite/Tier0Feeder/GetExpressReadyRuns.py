@@ -0,0 +1,11 @@
+"""
+_GetExpressReadyRuns_
+
+SQLite implementation of GetExpressReadyRuns
+
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.GetExpressReadyRuns import GetExpressReadyRuns as OracleGetExpressReadyRuns
+
+class GetExpressReadyRuns(OracleGetExpressReadyRuns):
+    pass
@@ -0,0 +1,11 @@
+"""
+_GetInjectionCandidates_
+
+SQLite implementation of GetInjectionCandidates
+
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.GetInjectionCandidates import GetInjectionCandidates as OracleGetInjectionCandidates
+
+class GetInjectionCandidates(OracleGetInjectionCandidates):
+    pass
@@ -0,0 +1,11 @@
+"""
+_GetLeases_
+
+SQLite implementation of GetLeases
+
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.GetLeases import GetLeases as OracleGetLeases
+
+class GetLeases(OracleGetLeases):
+    pass
@@ -0,0 +1,11 @@
+"""
+_GetMaxStreamerId_
+
+SQLite implementation of GetMaxStreamerId
+
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.GetMaxStreamerId import GetMaxStreamerId as OracleGetMaxStreamerId
+
+class GetMaxStreamerId(OracleGetMaxStreamerId):
+    pass
@@ -0,0 +1,11 @@
+"""
+_GetNotClosedOutWorkflows_
+
+SQLite implementation of GetNotClosedOutWorkflows
+
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.GetNotClosedOutWorkflows import GetNotClosedOutWorkflows as OracleGetNotClosedOutWorkflows
+
+class GetNotClosedOutWorkflows(OracleGetNotClosedOutWorkflows):
+    pass
@@ -0,0 +1,11 @@
+"""
+_GetPromptRecoWorkflowsForMonitoring_
+
+SQLite implementation of GetPromptRecoWorkflowsForMonitoring
+
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.GetPromptRecoWorkflowsForMonitoring import GetPromptRecoWorkflowsForMonitoring as OracleGetPromptRecoWorkflowsForMonitoring
+
+class GetPromptRecoWorkflowsForMonitoring(OracleGetPromptRecoWorkflowsForMonitoring):
+    pass
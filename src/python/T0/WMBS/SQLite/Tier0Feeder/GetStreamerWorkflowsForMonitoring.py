@@ -0,0 +1,11 @@
+"""
+_GetStreamerWorkflowsForMonitoring_
+
+SQLite implementation of GetStreamerWorkflowsForMonitoring
+
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.GetStreamerWorkflowsForMonitoring import GetStreamerWorkflowsForMonitoring as OracleGetStreamerWorkflowsForMonitoring
+
+class GetStreamerWorkflowsForMonitoring(OracleGetStreamerWorkflowsForMonitoring):
+    pass
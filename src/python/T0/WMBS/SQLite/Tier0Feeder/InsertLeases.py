@@ -0,0 +1,29 @@
+"""
+_InsertLeases_
+
+SQLite implementation of InsertLeases
+
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.InsertLeases import InsertLeases as OracleInsertLeases
+
+class InsertLeases(OracleInsertLeases):
+
+    def execute(self, names, conn = None, transaction = False):
+
+        if len(names) == 0:
+            return
+
+        sql = """INSERT OR IGNORE INTO tier0_feeder_lease
+                 (name, owner, expire_time)
+                 VALUES (:NAME, NULL, 0)
+                 """
+
+        binds = []
+        for name in names:
+            binds.append( { 'NAME' : name } )
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
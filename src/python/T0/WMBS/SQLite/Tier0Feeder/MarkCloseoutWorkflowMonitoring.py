@@ -0,0 +1,11 @@
+"""
+_MarkCloseoutWorkflowMonitoring_
+
+SQLite implementation of MarkCloseoutWorkflowMonitoring
+
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.MarkCloseoutWorkflowMonitoring import MarkCloseoutWorkflowMonitoring as OracleMarkCloseoutWorkflowMonitoring
+
+class MarkCloseoutWorkflowMonitoring(OracleMarkCloseoutWorkflowMonitoring):
+    pass
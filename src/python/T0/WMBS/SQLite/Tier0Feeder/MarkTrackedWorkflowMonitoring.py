@@ -0,0 +1,11 @@
+"""
+_MarkTrackedWorkflowMonitoring_
+
+SQLite implementation of MarkTrackedWorkflowMonitoring
+
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.MarkTrackedWorkflowMonitoring import MarkTrackedWorkflowMonitoring as OracleMarkTrackedWorkflowMonitoring
+
+class MarkTrackedWorkflowMonitoring(OracleMarkTrackedWorkflowMonitoring):
+    pass
@@ -0,0 +1,11 @@
+"""
+_MarkWorkflowsInjected_
+
+SQLite implementation of MarkWorkflowsInjected
+
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.MarkWorkflowsInjected import MarkWorkflowsInjected as OracleMarkWorkflowsInjected
+
+class MarkWorkflowsInjected(OracleMarkWorkflowsInjected):
+    pass
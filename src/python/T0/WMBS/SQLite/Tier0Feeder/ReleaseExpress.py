@@ -0,0 +1,11 @@
+"""
+_ReleaseExpress_
+
+SQLite implementation of ReleaseExpress
+
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.ReleaseExpress import ReleaseExpress as OracleReleaseExpress
+
+class ReleaseExpress(OracleReleaseExpress):
+    pass
@@ -0,0 +1,11 @@
+"""
+_ReleaseLeases_
+
+SQLite implementation of ReleaseLeases
+
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.ReleaseLeases import ReleaseLeases as OracleReleaseLeases
+
+class ReleaseLeases(OracleReleaseLeases):
+    pass
@@ -0,0 +1,78 @@
+"""
+_SQLite_
+
+SQLite implementation of the T0 WMBS DAOs, used to run the
+Tier0Feeder and splitters against a local database file.
+
+Where the Oracle SQL is portable the DAOs are inherited
+unchanged, otherwise they are reimplemented
+
+  - MERGE and INSERT ALL are split into UPDATE/INSERT statements
+  - PL/SQL blocks become INSERT ... WHERE NOT EXISTS
+  - sequences are replaced by MAX(id) + 1
+  - ROWNUM is replaced by LIMIT
+
+The Oracle functions used by the DAOs (checkForZeroState,
+checkForZeroOneState and NVL) are provided as SQLite functions,
+which need to be registered on every connection. Call setupEngine
+on the SQLAlchemy engine before the first connection is made.
+
+"""
+
+from sqlalchemy import event
+
+def checkForZeroState(value):
+    """
+    _checkForZeroState_
+
+    """
+    if value == 0:
+        return 0
+
+    return None
+
+def checkForZeroOneState(value):
+    """
+    _checkForZeroOneState_
+
+    """
+    if value == 0:
+        return 0
+    elif value == 1:
+        return 1
+
+    return None
+
+def nvl(value, default):
+    """
+    _nvl_
+
+    """
+    if value == None:
+        return default
+
+    return value
+
+def registerFunctions(dbapiConnection, connectionRecord = None):
+    """
+    _registerFunctions_
+
+    Register the Oracle functions on a sqlite3 connection
+
+    """
+    dbapiConnection.create_function("checkForZeroState", 1, checkForZeroState)
+    dbapiConnection.create_function("checkForZeroOneState", 1, checkForZeroOneState)
+    dbapiConnection.create_function("NVL", 2, nvl)
+
+    return
+
+def setupEngine(engine):
+    """
+    _setupEngine_
+
+    Register the functions on all connections of the engine
+
+    """
+    event.listen(engine, "connect", registerFunctions)
+
+    return
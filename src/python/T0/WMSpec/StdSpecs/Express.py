@@ -335,6 +335,8 @@ class ExpressWorkloadFactory(StdBase):
         mySplitArgs['runNumber'] = self.runNumber
         mySplitArgs['alcapromptdataset'] = alcapromptdataset
         mySplitArgs['timeout'] = self.alcaHarvestTimeout
+        mySplitArgs['resources'] = self.alcaHarvestResources
+        mySplitArgs['lumisPerJob'] = self.alcaHarvestLumisPerJob
 
         harvestTask = parentTask.addTask("%sAlcaHarvest%s" % (parentTask.name(), parentOutputModuleName))
         self.addDashboardMonitoring(harvestTask)
@@ -460,6 +462,12 @@ class ExpressWorkloadFactory(StdBase):
         self.expressMergeSplitArgs['maxInputFiles'] = arguments['MaxInputFiles']
         self.expressMergeSplitArgs['maxLatency'] = arguments['MaxLatency']
 
+        # core and memory allocation policies (per job type)
+        jobResources = arguments.get('JobResources', {})
+        self.expressSplitArgs['resources'] = jobResources.get('Express', {})
+        self.expressMergeSplitArgs['resources'] = jobResources.get('ExpressMerge', {})
+        self.alcaHarvestResources = jobResources.get('AlcaHarvest', {})
+
         # fixed parameters that are used in various places
         self.alcaHarvestOutLabel = "Sqlite"
 
@@ -496,6 +504,8 @@ class ExpressWorkloadFactory(StdBase):
                     "BlockCloseDelay": {"type": int, "optional": False,
                                         "validate": lambda x : x > 0
                                         },
+                    "JobResources": {"default": {}, "type": dict},
+                    "AlcaHarvestLumisPerJob": {"default": None, "type": int, "null": True},
                     }
         baseArgs.update(specArgs)
         StdBase.setDefaultArgumentsProperty(baseArgs)
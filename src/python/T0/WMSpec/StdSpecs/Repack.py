@@ -182,6 +182,11 @@ class RepackWorkloadFactory(StdBase):
         self.repackMergeSplitArgs['maxInputFiles'] = arguments['MaxInputFiles']
         self.repackMergeSplitArgs['maxLatency'] = arguments['MaxLatency']
 
+        # core and memory allocation policies (per job type)
+        jobResources = arguments.get('JobResources', {})
+        self.repackSplitArgs['resources'] = jobResources.get('Repack', {})
+        self.repackMergeSplitArgs['resources'] = jobResources.get('RepackMerge', {})
+
         return self.buildWorkload()
 
     @staticmethod
@@ -204,6 +209,7 @@ class RepackWorkloadFactory(StdBase):
                     "BlockCloseDelay": {"type": int, "optional": False,
                                         "validate": lambda x : x > 0,
                                         },
+                    "JobResources": {"default": {}, "type": dict},
                     }
         baseArgs.update(specArgs)
         StdBase.setDefaultArgumentsProperty(baseArgs)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+#pylint: disable-msg=W0613, W6501
+"""
+_ConditionUploadPoller_
+
+Uploads PCL payloads queued by the Tier0FeederPoller
+to the Dropbox, independent of the Tier0Feeder cycle.
+
+"""
+import os
+import logging
+
+from WMCore.WorkerThreads.BaseWorkerThread import BaseWorkerThread
+
+from T0.ConditionUpload import ConditionUploadAPI
+from T0.ConditionUpload.UploadQueue import UploadQueue
+from T0.ConditionUpload.PayloadTransfer import getPayloadCache
+from T0.ConditionUpload.upload import defaultUrlTemplate
+
+
+class ConditionUploadPoller(BaseWorkerThread):
+
+    def __init__(self, config):
+        """
+        _init_
+
+        """
+        BaseWorkerThread.__init__(self)
+
+        self.dropboxuser = getattr(config.Tier0Feeder, "dropboxuser", None)
+        self.dropboxpass = getattr(config.Tier0Feeder, "dropboxpass", None)
+        self.serviceProxy = getattr(config.Tier0Feeder, "serviceProxy", None)
+        self.conditionUploadWorkers = getattr(config.Tier0Feeder, "conditionUploadWorkers", 4)
+        self.dropboxUrlTemplate = getattr(config.Tier0Feeder, "dropboxUrlTemplate", defaultUrlTemplate)
+
+        self.uploadQueue = UploadQueue(config.Tier0Feeder.conditionUploadQueue,
+                                       retryDelay = getattr(config.Tier0Feeder, "conditionUploadRetryDelay", 300),
+                                       maxRetryDelay = getattr(config.Tier0Feeder, "conditionUploadMaxRetryDelay", 4 * 3600))
+
+        self.payloadCache = getPayloadCache(getattr(config.Tier0Feeder, "conditionPayloadCache",
+                                                    os.path.join(config.Tier0Feeder.componentDir, "PayloadCache")),
+                                            serviceProxy = self.serviceProxy,
+                                            backend = getattr(config.Tier0Feeder, "conditionTransferBackend", "xrootd"),
+                                            localBaseDir = getattr(config.Tier0Feeder, "conditionTransferBaseDir", None))
+
+        return
+
+    def algorithm(self, parameters = None):
+        """
+        _algorithm_
+
+        """
+        logging.debug("Running ConditionUploadPoller algorithm...")
+
+        ConditionUploadAPI.processUploadQueue(self.uploadQueue, self.payloadCache,
+                                              self.dropboxuser, self.dropboxpass, self.serviceProxy,
+                                              maxWorkers = self.conditionUploadWorkers,
+                                              urlTemplate = self.dropboxUrlTemplate)
+
+        return
+
+    def terminate(self, params):
+        """
+        _terminate_
+
+        Kill the code after one final pass when called by the master thread.
+
+        """
+        logging.debug("terminating immediately")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+#pylint: disable-msg=W0613, W6501
+"""
+_SMNotificationPoller_
+
+Sends the repacked status notifications queued by the
+Tier0FeederPoller to the StorageManager, independent of
+the Tier0Feeder cycle.
+
+"""
+import logging
+
+from WMCore.WorkerThreads.BaseWorkerThread import BaseWorkerThread
+
+from T0.SMNotification import SMNotificationAPI
+from T0.SMNotification.NotificationOutbox import NotificationOutbox
+from T0.SMNotification.NotificationTransport import getNotificationTransport
+
+
+class SMNotificationPoller(BaseWorkerThread):
+
+    def __init__(self, config):
+        """
+        _init_
+
+        """
+        BaseWorkerThread.__init__(self)
+
+        self.chunkSize = getattr(config.Tier0Feeder, "smNotificationChunkSize", 50)
+        self.notificationWorkers = getattr(config.Tier0Feeder, "smNotificationWorkers", 2)
+
+        self.outbox = NotificationOutbox(config.Tier0Feeder.smNotificationOutbox,
+                                         retryDelay = getattr(config.Tier0Feeder, "smNotificationRetryDelay", 300),
+                                         maxRetryDelay = getattr(config.Tier0Feeder, "smNotificationMaxRetryDelay", 4 * 3600))
+
+        self.transport = getNotificationTransport(getattr(config.Tier0Feeder, "smNotificationTransport", "transfersystem"),
+                                                  transferSystemBaseDir = getattr(config.Tier0Feeder, "transferSystemBaseDir", None),
+                                                  command = getattr(config.Tier0Feeder, "smNotificationCommand", None))
+
+        return
+
+    def algorithm(self, parameters = None):
+        """
+        _algorithm_
+
+        """
+        logging.debug("Running SMNotificationPoller algorithm...")
+
+        SMNotificationAPI.processOutbox(self.outbox, self.transport,
+                                        chunkSize = self.chunkSize,
+                                        maxWorkers = self.notificationWorkers)
+
+        return
+
+    def terminate(self, params):
+        """
+        _terminate_
+
+        Kill the code after one final pass when called by the master thread.
+
+        """
+        logging.debug("terminating immediately")
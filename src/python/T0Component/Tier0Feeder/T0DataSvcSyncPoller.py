@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+#pylint: disable-msg=W0613, W6501
+"""
+_T0DataSvcSyncPoller_
+
+Syncs express and reco configurations, run/stream completion,
+PromptReco release and dataset information from T0AST to the
+Tier0 Data Service, independent of the Tier0Feeder cycle.
+
+"""
+import time
+import logging
+import threading
+
+from WMCore.WorkerThreads.BaseWorkerThread import BaseWorkerThread
+from WMCore.DAOFactory import DAOFactory
+
+from T0.Database.ConnectionManager import ConnectionManager
+from T0.T0DataSvc.T0DataSvcSync import T0DataSvcSync
+
+
+class T0DataSvcSyncPoller(BaseWorkerThread):
+
+    def __init__(self, config):
+        """
+        _init_
+
+        """
+        BaseWorkerThread.__init__(self)
+
+        myThread = threading.currentThread()
+
+        daoFactory = DAOFactory(package = "T0.WMBS",
+                                logger = logging,
+                                dbinterface = myThread.dbi)
+
+        # reconnect backoff and statement timeout for the Tier0 Data Service,
+        # with lazyConnections (the default) only connected on the first
+        # sync, a health check runs in the background and the first sync
+        # fails if the Tier0 Data Service can't be reached
+        lazyConnections = getattr(config.Tier0Feeder, "lazyConnections", True)
+        self.connectionManager = ConnectionManager(retryDelay = getattr(config.Tier0Feeder, "dbRetryDelay", 10),
+                                                   maxRetryDelay = getattr(config.Tier0Feeder, "dbMaxRetryDelay", 300))
+        dbInterfaceT0DataSvc = self.connectionManager.addDatabase("T0DataSvc", config.T0DataSvcDatabase.connectUrl,
+                                                                  poolSize = getattr(config.T0DataSvcDatabase, "poolSize", None),
+                                                                  maxOverflow = getattr(config.T0DataSvcDatabase, "maxOverflow", None),
+                                                                  statementTimeout = getattr(config.T0DataSvcDatabase, "statementTimeout", None),
+                                                                  lazy = lazyConnections)
+        daoFactoryT0DataSvc = DAOFactory(package = "T0.WMBS",
+                                         logger = logging,
+                                         dbinterface = dbInterfaceT0DataSvc)
+        if lazyConnections:
+            self.connectionManager.startHealthCheck()
+
+        self.t0DataSvcSync = T0DataSvcSync(daoFactory, daoFactoryT0DataSvc,
+                                           batchSize = getattr(config.Tier0Feeder, "t0DataSvcSyncBatchSize", 500))
+
+        # soft time budget per sync, the rest is synced next time
+        self.syncBudget = getattr(config.Tier0Feeder, "t0DataSvcSyncBudget", None)
+
+        return
+
+    def algorithm(self, parameters = None):
+        """
+        _algorithm_
+
+        """
+        logging.debug("Running T0DataSvcSyncPoller algorithm...")
+
+        failed = self.connectionManager.waitHealthCheck()
+        if len(failed) > 0:
+            raise RuntimeError("Can't connect to the %s database at startup" % ", ".join(failed))
+
+        deadline = None
+        if self.syncBudget != None:
+            deadline = time.time() + self.syncBudget
+
+        self.t0DataSvcSync.sync(deadline = deadline)
+
+        return
+
+    def terminate(self, params):
+        """
+        _terminate_
+
+        Kill the code after one final pass when called by the master thread.
+
+        """
+        logging.debug("terminating immediately")
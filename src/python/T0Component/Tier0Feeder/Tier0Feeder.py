@@ -14,6 +14,9 @@ import threading
 from WMCore.Agent.Harness import Harness
 
 from T0Component.Tier0Feeder.Tier0FeederPoller import Tier0FeederPoller
+from T0Component.Tier0Feeder.ConditionUploadPoller import ConditionUploadPoller
+from T0Component.Tier0Feeder.SMNotificationPoller import SMNotificationPoller
+from T0Component.Tier0Feeder.T0DataSvcSyncPoller import T0DataSvcSyncPoller
 
 
 
@@ -45,6 +48,49 @@ class Tier0Feeder(Harness):
         
         pollInterval = self.config.Tier0Feeder.pollInterval
         logging.info("Setting poll interval to %s seconds" % pollInterval)
+
+        # with adaptive polling the poller decides when to run
+        # a cycle, it is called every pollCheckInterval
+        workerIdleTime = pollInterval
+        if getattr(self.config.Tier0Feeder, "adaptivePolling", False):
+            workerIdleTime = getattr(self.config.Tier0Feeder, "pollCheckInterval", 2)
+            logging.info("Adaptive polling, checking every %s seconds for a due cycle" % workerIdleTime)
+
         myThread.workerThreadManager.addWorker(Tier0FeederPoller(self.config), \
-                                               pollInterval)
+                                               workerIdleTime)
+
+        # additional feeder workers of this component, sharing
+        # the run/stream work through leases in T0AST
+        feederThreads = getattr(self.config.Tier0Feeder, "feederThreads", 1)
+        if feederThreads > 1 and getattr(self.config.Tier0Feeder, "feederWorkers", None) == None:
+            logging.error("Running several Tier0Feeder workers needs feederWorkers, using one")
+        elif feederThreads > 1:
+            firstWorkerIndex = getattr(self.config.Tier0Feeder, "feederWorkerIndex", 0)
+            for workerIndex in range(firstWorkerIndex + 1, firstWorkerIndex + feederThreads):
+                logging.info("Adding Tier0Feeder worker %d" % workerIndex)
+                myThread.workerThreadManager.addWorker(Tier0FeederPoller(self.config, workerIndex = workerIndex), \
+                                                       workerIdleTime)
+
+        # condition uploads in their own worker thread if
+        # the persistent upload queue is configured
+        if getattr(self.config.Tier0Feeder, "conditionUploadQueue", None) != None:
+            uploadPollInterval = getattr(self.config.Tier0Feeder, "conditionUploadPollInterval", 60)
+            logging.info("Setting condition upload poll interval to %s seconds" % uploadPollInterval)
+            myThread.workerThreadManager.addWorker(ConditionUploadPoller(self.config), \
+                                                   uploadPollInterval)
+
+        # StorageManager notifications in their own worker
+        # thread if the persistent outbox is configured
+        if getattr(self.config.Tier0Feeder, "smNotificationOutbox", None) != None:
+            notificationPollInterval = getattr(self.config.Tier0Feeder, "smNotificationPollInterval", 60)
+            logging.info("Setting StorageManager notification poll interval to %s seconds" % notificationPollInterval)
+            myThread.workerThreadManager.addWorker(SMNotificationPoller(self.config), \
+                                                   notificationPollInterval)
+
+        # Tier0 Data Service sync in its own worker thread
+        if getattr(getattr(self.config, "T0DataSvcDatabase", None), "connectUrl", None) != None:
+            syncPollInterval = getattr(self.config.Tier0Feeder, "t0DataSvcSyncPollInterval", pollInterval)
+            logging.info("Setting Tier0 Data Service sync poll interval to %s seconds" % syncPollInterval)
+            myThread.workerThreadManager.addWorker(T0DataSvcSyncPoller(self.config), \
+                                                   syncPollInterval)
         return
@@ -12,28 +12,47 @@ Assigns new data to the correct subscriptions
 
 """
 import os
+import time
+import socket
 import logging
 import threading
-import subprocess
+
+from multiprocessing import TimeoutError
 
 from WMCore.WorkerThreads.BaseWorkerThread import BaseWorkerThread
 from WMCore.DAOFactory import DAOFactory
-from WMCore.Database.DBFactory import DBFactory
 from WMCore.WMException import WMException
 from WMCore.Configuration import loadConfigurationFile
-from WMCore.Services.RequestDB.RequestDBWriter import RequestDBWriter
 
 from T0.RunConfig import RunConfigAPI
+from T0.RunConfig.InjectionScheduler import InjectionScheduler
 from T0.RunLumiCloseout import RunLumiCloseoutAPI
+from T0.RunLumiCloseout.CloseoutScheduler import CloseoutScheduler
+from T0.RunLumiCloseout.RunLifecycleTracker import RunLifecycleTracker
 from T0.ConditionUpload import ConditionUploadAPI
+from T0.Database.ConnectionManager import ConnectionManager, DatabaseUnavailable, isConnectionError
+from T0.SMNotification import SMNotificationAPI
+from T0.ConditionUpload.UploadQueue import UploadQueue
+from T0.ConditionUpload.PayloadTransfer import getPayloadCache
+from T0.ConditionUpload.upload import defaultUrlTemplate
+from T0.SMNotification.NotificationOutbox import NotificationOutbox
+from T0.SMNotification.NotificationTransport import getNotificationTransport
+from T0.Simulator.CycleRecorder import CycleRecorder
+from T0.Sharding.FeederShards import FeederShards
+from T0.Polling.PollScheduler import PollScheduler
+from T0.Polling.WakeupTrigger import getWakeupTrigger
+from T0.Polling.CycleStages import CycleStages
 
 
 class Tier0FeederPoller(BaseWorkerThread):
 
-    def __init__(self, config):
+    def __init__(self, config, workerIndex = None):
         """
         _init_
 
+        workerIndex overrides the configured feederWorkerIndex,
+        used when one component runs several feeder workers
+
         """
         BaseWorkerThread.__init__(self)
 
@@ -53,62 +72,332 @@ class Tier0FeederPoller(BaseWorkerThread):
             if not os.path.exists(self.transferSystemBaseDir):
                 self.transferSystemBaseDir = None
 
+        # repacked status notifications go through the transfer system
+        # (if installed) or a configured command, with an outbox they
+        # are sent by the SMNotificationPoller worker thread
+        self.smNotificationTransport = None
+        smNotificationBackend = getattr(config.Tier0Feeder, "smNotificationTransport", "transfersystem")
+        if smNotificationBackend != "transfersystem" or self.transferSystemBaseDir != None:
+            self.smNotificationTransport = getNotificationTransport(smNotificationBackend,
+                                                                    transferSystemBaseDir = self.transferSystemBaseDir,
+                                                                    command = getattr(config.Tier0Feeder, "smNotificationCommand", None))
+        self.smNotificationChunkSize = getattr(config.Tier0Feeder, "smNotificationChunkSize", 50)
+        self.smNotificationWorkers = getattr(config.Tier0Feeder, "smNotificationWorkers", 2)
+
+        self.smNotificationOutbox = None
+        if getattr(config.Tier0Feeder, "smNotificationOutbox", None) != None:
+            self.smNotificationOutbox = NotificationOutbox(config.Tier0Feeder.smNotificationOutbox,
+                                                           retryDelay = getattr(config.Tier0Feeder, "smNotificationRetryDelay", 300),
+                                                           maxRetryDelay = getattr(config.Tier0Feeder, "smNotificationMaxRetryDelay", 4 * 3600))
+
         self.dqmUploadProxy = getattr(config.Tier0Feeder, "dqmUploadProxy", None)
         self.serviceProxy = getattr(config.Tier0Feeder, "serviceProxy", None)
-
-        self.localRequestCouchDB = RequestDBWriter(config.AnalyticsDataCollector.localT0RequestDBURL, 
-                                                   couchapp = config.AnalyticsDataCollector.RequestCouchApp)
-
-        hltConfConnectUrl = config.HLTConfDatabase.connectUrl
-        dbFactoryHltConf = DBFactory(logging, dburl = hltConfConnectUrl, options = {})
-        dbInterfaceHltConf = dbFactoryHltConf.connect()
-        daoFactoryHltConf = DAOFactory(package = "T0.WMBS",
-                                       logger = logging,
-                                       dbinterface = dbInterfaceHltConf)
-        self.getHLTConfigDAO = daoFactoryHltConf(classname = "RunConfig.GetHLTConfig")
-
-        storageManagerConnectUrl = config.StorageManagerDatabase.connectUrl
-        dbFactoryStorageManager = DBFactory(logging, dburl = storageManagerConnectUrl, options = {})
-        self.dbInterfaceStorageManager = dbFactoryStorageManager.connect()
-
-        self.getExpressReadyRunsDAO = None
+        self.conditionUploadWorkers = getattr(config.Tier0Feeder, "conditionUploadWorkers", 4)
+        self.dropboxUrlTemplate = getattr(config.Tier0Feeder, "dropboxUrlTemplate", defaultUrlTemplate)
+
+
+        # with several feeder workers run/stream level work is split
+        # into shards owned by the workers (through leases in T0AST),
+        # global work is only done by the elected leader, leases are
+        # renewed between the cycle stages, so they need to outlast
+        # the longest stage (the StorageManager stages, which can be
+        # waited for twice, or a budgeted stage)
+        self.feederShards = None
+        numWorkers = getattr(config.Tier0Feeder, "feederWorkers", None)
+        if numWorkers != None:
+            if workerIndex == None:
+                workerIndex = getattr(config.Tier0Feeder, "feederWorkerIndex", 0)
+            leaseDuration = getattr(config.Tier0Feeder, "feederLeaseDuration", 900)
+            minLeaseDuration = 2 * getattr(config.Tier0Feeder, "storageManagerStageTimeout", 300) + 60
+            if leaseDuration < minLeaseDuration:
+                raise RuntimeError("feederLeaseDuration of %d s is below %d s (twice the storageManagerStageTimeout plus 60 s)" %
+                                   (leaseDuration, minLeaseDuration))
+            owner = "%s:%d:%d" % (socket.gethostname(), os.getpid(), workerIndex)
+            self.feederShards = FeederShards(owner, workerIndex, numWorkers,
+                                             getattr(config.Tier0Feeder, "feederShards", 4 * numWorkers),
+                                             leaseDuration = leaseDuration,
+                                             renewInterval = getattr(config.Tier0Feeder, "feederLeaseRenewInterval", None))
+
+        # with adaptive polling the worker thread wakes up every
+        # pollCheckInterval and runs a cycle if the adaptive poll
+        # interval is over or the wakeup trigger fired
+        self.pollScheduler = None
+        if getattr(config.Tier0Feeder, "adaptivePolling", False):
+            wakeupTrigger = None
+            if getattr(config.Tier0Feeder, "wakeupTrigger", None) != None:
+                wakeupTrigger = getWakeupTrigger(config.Tier0Feeder.wakeupTrigger,
+                                                 path = getattr(config.Tier0Feeder, "wakeupTriggerPath", None))
+            self.pollScheduler = PollScheduler(config.Tier0Feeder.pollInterval,
+                                               minInterval = getattr(config.Tier0Feeder, "pollMinInterval", None),
+                                               maxInterval = getattr(config.Tier0Feeder, "pollMaxInterval", None),
+                                               speedupFactor = getattr(config.Tier0Feeder, "pollSpeedupFactor", 0.5),
+                                               slowdownFactor = getattr(config.Tier0Feeder, "pollSlowdownFactor", 1.5),
+                                               wakeupTrigger = wakeupTrigger)
+
+        # stages that can wait run after the latency critical ones in
+        # priority order, long stages stop after their (soft) time
+        # budget (if configured) and continue in the next cycle,
+        # sharded they have to stop in half the lease duration
+        self.tier0Config = None
+        stageBudgets = dict(getattr(config.Tier0Feeder, "stageBudgets", {}))
+        if self.feederShards != None:
+            for name in [ 'releasePromptReco', 'uploadConditions', 'feedCouchMonitoring' ]:
+                stageBudgets[name] = min(stageBudgets.get(name, self.feederShards.leaseDuration // 2),
+                                         self.feederShards.leaseDuration // 2)
+        self.cycleStages = CycleStages(budgets = stageBudgets,
+                                       cycleBudget = getattr(config.Tier0Feeder, "cycleBudget", None))
+        self.cycleStages.addStage("markWorkflowsInjected", 10, self.markWorkflowsInjected, leaderOnly = False)
+        self.cycleStages.addStage("releasePromptReco", 20, self.releasePromptReco, budgeted = True)
+        self.cycleStages.addStage("checkActiveSplitLumis", 30, RunLumiCloseoutAPI.checkActiveSplitLumis)
+        if self.smNotificationTransport != None:
+            self.cycleStages.addStage("notifyStorageManager", 40, self.notifyStorageManager)
+        self.cycleStages.addStage("uploadConditions", 50, self.uploadConditions, budgeted = True)
+        self.cycleStages.addStage("feedCouchMonitoring", 60, self.feedCouchMonitoring, budgeted = True)
+        self.cycleStages.addStage("closeOutRealTimeWorkflows", 70, self.closeOutRealTimeWorkflows)
+        self.couchMonitoringChunkSize = getattr(config.Tier0Feeder, "couchMonitoringChunkSize", 100)
+
+        # run/streams whose filesets could be closed, maintained
+        # from run stop/close and final lumi close events, sharded
+        # workers also look for events seen by other workers
+        closeoutResyncInterval = None
+        if self.feederShards != None:
+            closeoutResyncInterval = getattr(config.Tier0Feeder, "closeoutResyncInterval", 300)
+        self.closeoutScheduler = CloseoutScheduler(runStreamFilter = self.getRunStreamFilter(),
+                                                   resyncInterval = closeoutResyncInterval)
+
+        # run/streams whose workflows could be marked as injected,
+        # maintained from run/stream configuration, fileset closing
+        # and PromptReco release events
+        self.injectionScheduler = InjectionScheduler(streamerNotification = self.smNotificationTransport != None,
+                                                     runStreamFilter = self.getRunStreamFilter(),
+                                                     recheckInterval = getattr(config.Tier0Feeder, "injectionRecheckInterval", 600))
+
+        # online state of active runs, with a backoff factor long
+        # running runs are checked less often for stop/close, the
+        # check interval is capped at the poll interval by default
+        self.runTracker = RunLifecycleTracker(backoffFactor = getattr(config.Tier0Feeder, "runCheckBackoffFactor", 0),
+                                              maxCheckInterval = getattr(config.Tier0Feeder, "runCheckMaxInterval",
+                                                                         config.Tier0Feeder.pollInterval))
+
+        # insert time from which on to look for late arriving PCL
+        # payloads, all files are checked once after a restart
+        self.lateConditionsWatermark = None
+
+        # with a persistent upload queue the uploads are
+        # done by the ConditionUploadPoller worker thread
+        self.uploadQueue = None
+        self.payloadCache = None
+        if getattr(config.Tier0Feeder, "conditionUploadQueue", None) != None:
+            self.uploadQueue = UploadQueue(config.Tier0Feeder.conditionUploadQueue)
+        else:
+            self.payloadCache = getPayloadCache(getattr(config.Tier0Feeder, "conditionPayloadCache",
+                                                        os.path.join(config.Tier0Feeder.componentDir, "PayloadCache")),
+                                                serviceProxy = self.serviceProxy,
+                                                backend = getattr(config.Tier0Feeder, "conditionTransferBackend", "xrootd"),
+                                                localBaseDir = getattr(config.Tier0Feeder, "conditionTransferBaseDir", None))
+
+        # optionally record the database and service calls of every
+        # cycle, the recordings can be replayed offline for tests
+        self.cycleRecorder = None
+        if getattr(config.Tier0Feeder, "recordCyclesDir", None) != None:
+            self.cycleRecorder = CycleRecorder(config.Tier0Feeder.recordCyclesDir,
+                                               maxCycles = getattr(config.Tier0Feeder, "recordCyclesMax", 100),
+                                               minDuration = getattr(config.Tier0Feeder, "recordCyclesMinDuration", 0))
+
+        # with lazyConnections (the default) external databases and the
+        # RequestDB couch are only connected on first use, so a restart
+        # does not wait for them, a health check of all databases runs
+        # in the background and the first cycle fails if one of them
+        # can't be reached (like the startup does without)
+        self.lazyConnections = getattr(config.Tier0Feeder, "lazyConnections", True)
+
+        self.localRequestCouchDB = None
+        self.requestDBConfig = config
+        if not self.lazyConnections:
+            self.getRequestCouchDB()
+
+        # external databases with pool sizes, statement timeouts and
+        # reconnect backoff, StorageManager stages run in a worker
+        # thread and are waited for at most storageManagerStageTimeout,
+        # results of stages that took longer are used in a later cycle
+        dbiWrapper = None
+        if self.cycleRecorder != None:
+            dbiWrapper = lambda dbi: self.cycleRecorder.wrap("T0AST", dbi)
+        self.connectionManager = ConnectionManager(retryDelay = getattr(config.Tier0Feeder, "dbRetryDelay", 10),
+                                                   maxRetryDelay = getattr(config.Tier0Feeder, "dbMaxRetryDelay", 300),
+                                                   dbiWrapper = dbiWrapper)
+        self.storageManagerStageTimeout = getattr(config.Tier0Feeder, "storageManagerStageTimeout", 300)
+        self.storageManagerStage = None
+        self.lateStorageManagerStages = []
+
+        dbInterfaceHltConf = self.connectDatabase("HLTConf", config.HLTConfDatabase.connectUrl,
+                                                  config.HLTConfDatabase)
+        self.daoFactoryHltConf = DAOFactory(package = "T0.WMBS",
+                                            logger = logging,
+                                            dbinterface = dbInterfaceHltConf)
+
+        self.dbInterfaceStorageManager = self.connectDatabase("StorageManager", config.StorageManagerDatabase.connectUrl,
+                                                              config.StorageManagerDatabase)
+
+        self.daoFactoryPopConLog = None
         if hasattr(config, "PopConLogDatabase"):
             popConLogConnectUrl = getattr(config.PopConLogDatabase, "connectUrl", None)
             if popConLogConnectUrl != None:
-                dbFactoryPopConLog = DBFactory(logging, dburl = popConLogConnectUrl, options = {})
-                dbInterfacePopConLog = dbFactoryPopConLog.connect()
-                daoFactoryPopConLog = DAOFactory(package = "T0.WMBS",
-                                                 logger = logging,
-                                                 dbinterface = dbInterfacePopConLog)
-                self.getExpressReadyRunsDAO = daoFactoryPopConLog(classname = "Tier0Feeder.GetExpressReadyRuns")
-
-        self.haveT0DataSvc = False
-        if hasattr(config, "T0DataSvcDatabase"):
-            t0datasvcConnectUrl = getattr(config.T0DataSvcDatabase, "connectUrl", None)
-            if t0datasvcConnectUrl != None:
-                self.haveT0DataSvc = True
-                dbFactoryT0DataSvc = DBFactory(logging, dburl = t0datasvcConnectUrl, options = {})
-                dbInterfaceT0DataSvc = dbFactoryT0DataSvc.connect()
-                self.daoFactoryT0DataSvc = DAOFactory(package = "T0.WMBS",
+                dbInterfacePopConLog = self.connectDatabase("PopConLog", popConLogConnectUrl,
+                                                            config.PopConLogDatabase)
+                self.daoFactoryPopConLog = DAOFactory(package = "T0.WMBS",
                                                       logger = logging,
-                                                      dbinterface = dbInterfaceT0DataSvc)
+                                                      dbinterface = dbInterfacePopConLog)
+
+        if self.lazyConnections:
+            self.connectionManager.startHealthCheck()
 
         return
 
+    def connectDatabase(self, source, connectUrl, databaseConfig = None):
+        """
+        _connectDatabase_
+
+        Connect to one of the external databases through the
+        connection manager, pool size, statement timeout (in
+        seconds) and worker threads are set in the database
+        config section, recorded if cycle recording is enabled
+        (recording looks up the dialect, which connects)
+
+        """
+        dbInterface = self.connectionManager.addDatabase(source, connectUrl,
+                                                         poolSize = getattr(databaseConfig, "poolSize", None),
+                                                         maxOverflow = getattr(databaseConfig, "maxOverflow", None),
+                                                         statementTimeout = getattr(databaseConfig, "statementTimeout", None),
+                                                         workers = getattr(databaseConfig, "workers", 1),
+                                                         lazy = self.lazyConnections)
+
+        if self.cycleRecorder != None:
+            dbInterface = self.cycleRecorder.wrap(source, dbInterface)
+
+        return dbInterface
+
+    def connectRequestDB(self, config):
+        """
+        _connectRequestDB_
+
+        RequestDB couch used for workflow monitoring,
+        recorded if cycle recording is enabled
+
+        """
+        from T0.RequestDB.T0RequestDBWriter import T0RequestDBWriter
+
+        requestDB = T0RequestDBWriter(config.AnalyticsDataCollector.localT0RequestDBURL,
+                                      couchapp = config.AnalyticsDataCollector.RequestCouchApp)
+
+        if self.cycleRecorder != None:
+            requestDB = self.cycleRecorder.wrapService("CouchDB", requestDB)
+
+        return requestDB
+
+    def getRequestCouchDB(self):
+        """
+        _getRequestCouchDB_
+
+        RequestDB couch, connects on first use
+
+        """
+        if self.localRequestCouchDB == None:
+            self.localRequestCouchDB = self.connectRequestDB(self.requestDBConfig)
+
+        return self.localRequestCouchDB
+
     def algorithm(self, parameters = None):
         """
         _algorithm_
 
+        Run a feeder cycle, with adaptive polling only
+        if the scheduler says one is due
+
+        """
+        if self.pollScheduler == None:
+            self.runCycle()
+            return
+
+        if not self.pollScheduler.isDue():
+            return
+
+        self.pollScheduler.startCycle()
+        try:
+            self.runCycle()
+        finally:
+            self.pollScheduler.endCycle()
+
+        return
+
+    def runCycle(self):
+        """
+        _runCycle_
+
+        Run a feeder cycle, recording it if enabled
+
+        """
+        self.checkStartupConnections()
+
+        if self.cycleRecorder == None:
+            self.feederCycle()
+            return
+
+        # T0AST calls go through the worker thread dbi
+        myThread = threading.currentThread()
+        myThread.dbi = self.cycleRecorder.wrap("T0AST", myThread.dbi)
+        self.daoFactory = DAOFactory(package = "T0.WMBS",
+                                     logger = logging,
+                                     dbinterface = myThread.dbi)
+
+        error = None
+        self.cycleRecorder.startCycle()
+        try:
+            self.feederCycle()
+        except Exception as ex:
+            error = str(ex)
+            raise
+        finally:
+            filename = self.cycleRecorder.endCycle(error)
+            if filename != None:
+                logging.info("Recorded Tier0Feeder cycle in %s" % filename)
+
+        return
+
+    def checkStartupConnections(self):
+        """
+        _checkStartupConnections_
+
+        Wait for the startup health check (if there is one)
+        and fail if a database can't be used
+
+        """
+        failed = self.connectionManager.waitHealthCheck()
+        if len(failed) > 0:
+            raise RuntimeError("Can't connect to the %s database(s) at startup" % ", ".join(failed))
+
+        return
+
+    def feederCycle(self):
+        """
+        _feederCycle_
+
         """
         logging.debug("Running Tier0Feeder algorithm...")
         myThread = threading.currentThread()
+        cycleStart = time.time()
+
+        leader = self.renewLeases(force = True)
+
+        # results of StorageManager stages that
+        # finished after the previous cycle moved on
+        self.collectLateStorageManagerStages()
 
         findNewRunsDAO = self.daoFactory(classname = "Tier0Feeder.FindNewRuns")
         findNewRunStreamsDAO = self.daoFactory(classname = "Tier0Feeder.FindNewRunStreams")
         findNewExpressRunsDAO = self.daoFactory(classname = "Tier0Feeder.FindNewExpressRuns")
         releaseExpressDAO = self.daoFactory(classname = "Tier0Feeder.ReleaseExpress")
         feedStreamersDAO = self.daoFactory(classname = "Tier0Feeder.FeedStreamers")
-        markWorkflowsInjectedDAO = self.daoFactory(classname = "Tier0Feeder.MarkWorkflowsInjected")
 
         tier0Config = None
         try:
@@ -116,6 +405,7 @@ class Tier0FeederPoller(BaseWorkerThread):
         except:
             # usually happens when there are syntax errors in the configuration
             logging.exception("Cannot load Tier0 configuration file, not configuring new runs and run/streams")
+        self.tier0Config = tier0Config
 
         # only configure new runs and run/streams if we have a valid Tier0 configuration
         if tier0Config != None:
@@ -123,9 +413,14 @@ class Tier0FeederPoller(BaseWorkerThread):
             #
             # find new runs, setup global run settings and stream/dataset/trigger mapping
             #
-            runHltkeys = findNewRunsDAO.execute(transaction = False)
+            runHltkeys = {}
+            if leader:
+                runHltkeys = findNewRunsDAO.execute(transaction = False)
             for run, hltkey in sorted(runHltkeys.items()):
 
+                if not self.renewLeases():
+                    break
+
                 hltConfig = None
 
                 # local runs have no hltkey and are configured differently
@@ -133,7 +428,8 @@ class Tier0FeederPoller(BaseWorkerThread):
 
                     # retrieve HLT configuration and make sure it's usable
                     try:
-                        hltConfig = self.getHLTConfigDAO.execute(hltkey, transaction = False)
+                        getHLTConfigDAO = self.daoFactoryHltConf(classname = "RunConfig.GetHLTConfig")
+                        hltConfig = getHLTConfigDAO.execute(hltkey, transaction = False)
                         if hltConfig['process'] == None or len(hltConfig['mapping']) == 0:
                             raise RuntimeError("HLTConfDB query returned no process or mapping")
                     except:
@@ -144,6 +440,8 @@ class Tier0FeederPoller(BaseWorkerThread):
                     RunConfigAPI.configureRun(tier0Config, run, hltConfig)
                 except:
                     logging.exception("Can't configure for run %d" % (run))
+                else:
+                    self.recordActivity("new runs", 1)
 
             #
             # find unconfigured run/stream with data
@@ -152,6 +450,9 @@ class Tier0FeederPoller(BaseWorkerThread):
             runStreams = findNewRunStreamsDAO.execute(transaction = False)
             for run in sorted(runStreams.keys()):
                 for stream in sorted(runStreams[run]):
+                    self.renewLeases()
+                    if not self.ownsRunStream(run, stream):
+                        continue
                     try:
                         RunConfigAPI.configureRunStream(tier0Config,
                                                         run, stream,
@@ -159,17 +460,27 @@ class Tier0FeederPoller(BaseWorkerThread):
                                                         self.dqmUploadProxy)
                     except:
                         logging.exception("Can't configure for run %d and stream %s" % (run, stream))
+                    else:
+                        self.recordActivity("new run/streams", 1)
+                        # without streamer notifications workflows can
+                        # be marked as injected before the fileset closes
+                        if self.smNotificationTransport == None:
+                            self.injectionScheduler.addRunStreams([ (run, stream) ])
 
         #
         # stop and close runs based on RunSummary and StorageManager records
+        # (in the StorageManager worker thread, T0AST work continues meanwhile)
         #
-        RunLumiCloseoutAPI.stopRuns(self.dbInterfaceStorageManager)
-        RunLumiCloseoutAPI.closeRuns(self.dbInterfaceStorageManager)
+        runEndCheck = None
+        if self.renewLeases():
+            runEndCheck = self.submitStorageManagerStage(self.checkRunEnds)
 
         #
         # release runs for Express
         #
-        runs = findNewExpressRunsDAO.execute(transaction = False)
+        runs = []
+        if self.renewLeases():
+            runs = findNewExpressRunsDAO.execute(transaction = False)
 
         if len(runs) > 0:
 
@@ -177,8 +488,9 @@ class Tier0FeederPoller(BaseWorkerThread):
             for run in runs:
                 binds.append( { 'RUN' : run } )
 
-            if self.getExpressReadyRunsDAO != None:
-                runs = self.getExpressReadyRunsDAO.execute(binds = binds, transaction = False)
+            if self.daoFactoryPopConLog != None:
+                getExpressReadyRunsDAO = self.daoFactoryPopConLog(classname = "Tier0Feeder.GetExpressReadyRuns")
+                runs = getExpressReadyRunsDAO.execute(binds = binds, transaction = False)
 
             if len(runs) > 0:
 
@@ -188,368 +500,416 @@ class Tier0FeederPoller(BaseWorkerThread):
 
                 releaseExpressDAO.execute(binds = binds, transaction = False)
 
-        #
-        # release runs for PromptReco
-        #
-        RunConfigAPI.releasePromptReco(tier0Config,
-                                       self.specDirectory,
-                                       self.dqmUploadProxy)
-
-        #
-        # insert express and reco configs into Tier0 Data Service
-        #
-        if self.haveT0DataSvc:
-            self.updateRunStreamDoneT0DataSvc()
-            self.updateExpressConfigsT0DataSvc()
-            self.updateRecoConfigsT0DataSvc()
-            self.updateRecoReleaseConfigsT0DataSvc()
-            self.lockDatasetsT0DataSvc()
-
-        #
-        # mark express and repack workflows as injected if certain conditions are met
-        # (we don't do it immediately to prevent the TaskArchiver from cleaning up too early)
-        #
-        markWorkflowsInjectedDAO.execute(self.transferSystemBaseDir != None,
-                                         transaction = False)
+        self.waitStorageManagerStage(runEndCheck, self.closeoutScheduler.addRuns)
+        self.renewLeases()
 
         #
         # close stream/lumis for run/streams that are active (fileset exists and open)
+        # (in the StorageManager worker thread, while new data is feed)
         #
-        RunLumiCloseoutAPI.closeLumiSections(self.dbInterfaceStorageManager)
+        lumiCloseout = self.submitStorageManagerStage(RunLumiCloseoutAPI.closeLumiSections,
+                                                      self.dbInterfaceStorageManager,
+                                                      self.getRunStreamFilter())
 
         #
         # feed new data into exisiting filesets
         #
         try:
             myThread.transaction.begin()
-            feedStreamersDAO.execute(conn = myThread.transaction.conn, transaction = True)
+            fedStreamers = feedStreamersDAO.execute(runStreams = self.getOwnedActiveRunStreams(),
+                                                    countFed = self.pollScheduler != None,
+                                                    conn = myThread.transaction.conn, transaction = True)
         except:
             logging.exception("Can't feed data, bailing out...")
             raise
         else:
             myThread.transaction.commit()
+            self.recordActivity("streamers feed", fedStreamers)
+
+        self.waitStorageManagerStage(lumiCloseout, self.addClosedLumis)
+        self.renewLeases()
 
         #
-        # run ended and run/stream fileset open
+        # run ended and run/stream fileset open (closeout candidates)
         #    => check for complete lumi_closed record, all lumis finally closed and all data feed
         #          => if all conditions satisfied, close the run/stream fileset
         #
-        RunLumiCloseoutAPI.closeRunStreamFilesets()
-
-        #
-        # check and delete active split lumis
-        #
-        RunLumiCloseoutAPI.checkActiveSplitLumis()
+        closedRunStreams = self.closeoutScheduler.closeRunStreamFilesets()
+        self.injectionScheduler.addRunStreams(closedRunStreams)
 
         #
-        # insert workflows into CouchDB for monitoring
+        # stages that can wait, in priority order and with time budgets
+        # (marking workflows as injected, PromptReco release, split lumi
+        # check, StorageManager notification, PCL upload and couch monitoring)
         #
-        self.feedCouchMonitoring()
+        self.cycleStages.run(cycleStart, renewFunc = self.renewLeases)
 
-        #
-        # Update Couch when Repack and Express have closed input filesets (analog to old T0 closeout)
-        #
-        self.closeOutRealTimeWorkflows()
+        return
 
-        #
-        # send repacked notifications to StorageManager
-        #
-        if self.transferSystemBaseDir != None:
-            self.notifyStorageManager()
+    def getStageMetrics(self):
+        """
+        _getStageMetrics_
 
-        #
-        # upload PCL conditions to DropBox
-        #
-        ConditionUploadAPI.uploadConditions(self.dropboxuser, self.dropboxpass, self.serviceProxy)
+        Run time, deferrals and budget overruns per stage
 
-        return
+        """
+        return self.cycleStages.getMetrics()
 
-    def feedCouchMonitoring(self):
+    def releasePromptReco(self, deadline = None):
         """
-        _feedCouchMonitoring_
+        _releasePromptReco_
 
-        check for workflows that haven't been uploaded to Couch for monitoring yet
+        Release runs for PromptReco, needs a valid Tier0 configuration,
+        returns whether all runs were released before the deadline
 
         """
-        getStreamerWorkflowsForMonitoringDAO = self.daoFactory(classname = "Tier0Feeder.GetStreamerWorkflowsForMonitoring")
-        getPromptRecoWorkflowsForMonitoringDAO = self.daoFactory(classname = "Tier0Feeder.GetPromptRecoWorkflowsForMonitoring")
-        markTrackedWorkflowMonitoringDAO = self.daoFactory(classname = "Tier0Feeder.MarkTrackedWorkflowMonitoring")
-        workflows = getStreamerWorkflowsForMonitoringDAO.execute()
-        workflows += getPromptRecoWorkflowsForMonitoringDAO.execute()
+        if self.tier0Config == None:
+            return True
 
-        if len(workflows) == 0:
-            logging.debug("No workflows to publish to couch monitoring, doing nothing")
+        (complete, releasedRuns) = RunConfigAPI.releasePromptReco(self.tier0Config,
+                                                                  self.specDirectory,
+                                                                  self.dqmUploadProxy,
+                                                                  deadline = deadline)
 
-        if workflows:
-            logging.debug(" Going to publish %d workflows" % len(workflows))
-            for (workflowId, run, workflowName) in workflows:
-                logging.info(" Publishing workflow %s to monitoring" % workflowName)
-                #TODO: add more information about workflow if there need to be kept longer than 
-                # workflow life cycle.
-                doc = {}
-                doc["RequestName"] =   workflowName
-                doc["Run"]      =   run
-                response = self.localRequestCouchDB.insertGenericRequest(doc)
-                if response == "OK" or "EXISTS":
-                    logging.info(" Successfully uploaded request %s" % workflowName)
-                    # Here we have to trust the insert, if it doesn't happen will be easy to spot on the logs
-                    markTrackedWorkflowMonitoringDAO.execute(workflowId)
+        self.injectionScheduler.addReleasedRuns(releasedRuns)
 
-        return
+        return complete
 
-    def closeOutRealTimeWorkflows(self):
+    def uploadConditions(self, deadline = None):
         """
-        _closeOutRealTimeWorkflows_
+        _uploadConditions_
 
-        Updates couch with the closeout status of Repack and Express
-        PromptReco should be closed out automatically
+        Upload PCL conditions to DropBox, or queue them for
+        upload by the ConditionUploadPoller worker thread,
+        returns whether all runs were looked at before the deadline
 
         """
-        getNotClosedOutWorkflowsDAO = self.daoFactory(classname = "Tier0Feeder.GetNotClosedOutWorkflows")
-        workflows = getNotClosedOutWorkflowsDAO.execute()
+        if self.uploadQueue != None:
+            self.lateConditionsWatermark = ConditionUploadAPI.queueConditions(self.uploadQueue,
+                                                                              watermark = self.lateConditionsWatermark)
+            return True
 
-        if len(workflows) == 0:
-            logging.debug("No workflows to publish to couch monitoring, doing nothing")
+        (self.lateConditionsWatermark, complete) = ConditionUploadAPI.uploadConditions(self.dropboxuser, self.dropboxpass, self.serviceProxy,
+                                                                                       self.payloadCache, maxWorkers = self.conditionUploadWorkers,
+                                                                                       watermark = self.lateConditionsWatermark,
+                                                                                       urlTemplate = self.dropboxUrlTemplate,
+                                                                                       deadline = deadline)
 
-        if workflows:
-            for workflow in workflows:
-                (workflowId, filesetId, filesetOpen, workflowName) = workflow
-                # find returns -1 if the string is not found
-                if workflowName.find('PromptReco') >= 0:
-                    logging.debug("Closing out instantaneously PromptReco Workflow %s" % workflowName)
-                    self.updateClosedState(workflowName, workflowId)
-                else :
-                    # Check if fileset (which you already know) is closed or not
-                    # FIXME: No better way to do it? what comes from the DAO is a string, casting bool or int doesn't help much.
-                    # Works like that :
-                    if filesetOpen == '0':
-                        self.updateClosedState(workflowName, workflowId)
+        return complete
 
-        return
+    def checkRunEnds(self):
+        """
+        _checkRunEnds_
+
+        Stop and close runs, returns the runs that changed
 
-    def updateClosedState(self, workflowName, workflowId):
         """
-        _updateClosedState_
+        stoppedRuns = RunLumiCloseoutAPI.stopRuns(self.dbInterfaceStorageManager, runTracker = self.runTracker)
+        closedRuns = RunLumiCloseoutAPI.closeRuns(self.dbInterfaceStorageManager, runTracker = self.runTracker)
 
-        Mark a workflow as Closed
+        return stoppedRuns + closedRuns
 
+    def addClosedLumis(self, result):
         """
-        markCloseoutWorkflowMonitoringDAO = self.daoFactory(classname = "Tier0Feeder.MarkCloseoutWorkflowMonitoring")
+        _addClosedLumis_
 
-        response = self.localRequestCouchDB.updateRequestStatus(workflowName, 'Closed')
+        Result of closeLumiSections, run/streams with finally
+        closed lumis are closeout candidates
+
+        """
+        (finalClosedRunStreams, closedLumis) = result
 
-        if response == "OK" or "EXISTS":
-            logging.debug("Successfully closed workflow %s" % workflowName)
-            markCloseoutWorkflowMonitoringDAO.execute(workflowId)
+        self.recordActivity("closed lumis", closedLumis)
+        self.closeoutScheduler.addRunStreams(finalClosedRunStreams)
 
         return
 
-    def notifyStorageManager(self):
+    def recordActivity(self, name, count):
         """
-        _notifyStorageManager_
+        _recordActivity_
 
-        Find all finished streamers for closed all run/stream
-        Send the notification message to StorageManager
-        Update the streamer status to finished (deleted = 1)
+        Activity of the cycle, for the adaptive poll interval
 
         """
-        getFinishedStreamersDAO = self.daoFactory(classname = "SMNotification.GetFinishedStreamers")
-        markStreamersFinishedDAO = self.daoFactory(classname = "SMNotification.MarkStreamersFinished")
+        if self.pollScheduler != None:
+            self.pollScheduler.recordActivity(name, count)
 
-        allFinishedStreamers = getFinishedStreamersDAO.execute(transaction = False)
+        return
 
-        chunkSize = 50
-        for finishedStreamers in [ allFinishedStreamers[i:i+chunkSize] for i in range(0, len(allFinishedStreamers), chunkSize) ]:
+    def renewLeases(self, force = False):
+        """
+        _renewLeases_
 
-            streamers = []
-            filenameParams = ""
+        Renew the leases of a sharded worker, always at the start
+        of a cycle (force) and if due between its stages. The
+        schedulers start over if the owned shards or the leader
+        role changed. Returns whether this worker is the leader.
 
-            for (id, lfn) in finishedStreamers:
-                streamers.append(id)
-                filenameParams += "-FILENAME %s " % os.path.basename(lfn)
+        """
+        if self.feederShards != None:
+            if force:
+                changed = self.feederShards.renewLeases()
+            else:
+                changed = self.feederShards.renewLeasesIfDue()
+            if changed:
+                self.injectionScheduler.reset()
+                self.closeoutScheduler.reset()
 
-            logging.debug("Notifying transfer system about processed streamers")
-            p = subprocess.Popen("/bin/bash", stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            output, error = p.communicate("""
-            export T0_BASE_DIR=%s
-            export T0ROOT=${T0_BASE_DIR}/T0
-            export CONFIG=${T0_BASE_DIR}/Config/TransferSystem_CERN.cfg
- 
-            export PERL5LIB=${T0ROOT}/perl_lib
+        return self.isLeader()
 
-            unset LANGUAGE
-            unset LC_ALL
-            unset LC_CTYPE
-            export LANG=C
+    def isLeader(self):
+        """
+        _isLeader_
 
-            ${T0ROOT}/operations/sendRepackedStatus.pl --config $CONFIG %s
-            """ % (self.transferSystemBaseDir, filenameParams))
+        Whether this worker does the global stages,
+        always the case without sharding
 
-            if len(error) > 0:
-                logging.error("ERROR: Could not notify transfer system about processed streamers")
-                logging.error("ERROR: %s" % error)
-            else:
-                markStreamersFinishedDAO.execute(streamers, transaction = False)
+        """
+        return self.feederShards == None or self.feederShards.isLeader()
 
-        return
+    def ownsRunStream(self, run, stream):
+        """
+        _ownsRunStream_
+
+        """
+        return self.feederShards == None or self.feederShards.ownsRunStream(run, stream)
 
-    def updateRunStreamDoneT0DataSvc(self):
+    def getRunStreamFilter(self):
         """
-        _updateRunStreamDoneT0DataSvc_
+        _getRunStreamFilter_
 
-        Check if a run/stream workflow (express or repack) is finished and
-        cleaned up and push a completion record into the Tier0 Data Service.
+        Filter for run/stream lists, None without sharding
 
         """
-        getRunStreamDoneDAO = self.daoFactory(classname = "T0DataSvc.GetRunStreamDone")
-        runStreamDone = getRunStreamDoneDAO.execute(transaction = False)
+        if self.feederShards == None:
+            return None
 
-        if len(runStreamDone) > 0:
+        return self.feederShards.filterRunStreams
 
-            binds = []
-            for runStream in runStreamDone:
-                binds.append( { 'RUN' : runStream['run'],
-                                'STREAM' : runStream['stream'] } )
+    def getOwnedActiveRunStreams(self):
+        """
+        _getOwnedActiveRunStreams_
 
-            insertRunStreamDoneDAO = self.daoFactoryT0DataSvc(classname = "T0DataSvc.InsertRunStreamDone")
-            insertRunStreamDoneDAO.execute(binds = binds, transaction = False)
+        Run/streams with open fileset owned by this
+        worker, None (all of them) without sharding
 
-            updateRunStreamDoneDAO = self.daoFactory(classname = "T0DataSvc.UpdateRunStreamDone")
-            updateRunStreamDoneDAO.execute(binds = binds, transaction = False)
+        """
+        if self.feederShards == None:
+            return None
 
-        return
+        getActiveRunStreamsDAO = self.daoFactory(classname = "Tier0Feeder.GetActiveRunStreams")
+
+        return self.feederShards.filterRunStreams(getActiveRunStreamsDAO.execute(transaction = False))
 
-    def updateExpressConfigsT0DataSvc(self):
+    def submitStorageManagerStage(self, func, *args):
         """
-        _updateExpressConfigsT0DataSvc_
+        _submitStorageManagerStage_
 
-        Check which express_config rows are missing
-        in the Tier0 Data Service and insert them,
-        also record that fact in t0ast
+        Run a stage querying the StorageManager database in its
+        worker thread, the stage is skipped (returns None) while
+        an earlier stage is still hanging
 
         """
-        getExpressConfigsDAO = self.daoFactory(classname = "T0DataSvc.GetExpressConfigs")
-        expressConfigs = getExpressConfigsDAO.execute(transaction = False)
+        if self.storageManagerStage != None and not self.storageManagerStage.ready():
+            logging.error("Earlier StorageManager stage still running, skipping %s" % func.__name__)
+            return None
 
-        if len(expressConfigs) > 0:
+        self.storageManagerStage = self.connectionManager.submit("StorageManager", func, *args)
 
-            bindsInsert = []
-            bindsUpdate = []
-            for config in expressConfigs:
-                bindsInsert.append( { 'RUN' : config['run'],
-                                      'STREAM' : config['stream'],
-                                      'CMSSW' : config['cmssw'],
-                                      'SCRAM_ARCH' : config['scram_arch'],
-                                      'RECO_CMSSW' : config['reco_cmssw'],
-                                      'RECO_SCRAM_ARCH' : config['reco_scram_arch'],
-                                      'ALCA_SKIM' : config['alca_skim'],
-                                      'DQM_SEQ' : config['dqm_seq'],
-                                      'GLOBAL_TAG' : config['global_tag'][:50],
-                                      'SCENARIO' : config['scenario'] } )
-                bindsUpdate.append( { 'RUN' : config['run'],
-                                      'STREAM' : config['stream'] } )
+        return self.storageManagerStage
 
-            insertExpressConfigsDAO = self.daoFactoryT0DataSvc(classname = "T0DataSvc.InsertExpressConfigs")
-            insertExpressConfigsDAO.execute(binds = bindsInsert, transaction = False)
+    def waitStorageManagerStage(self, stage, handler):
+        """
+        _waitStorageManagerStage_
 
-            updateExpressConfigsDAO = self.daoFactory(classname = "T0DataSvc.UpdateExpressConfigs")
-            updateExpressConfigsDAO.execute(binds = bindsUpdate, transaction = False)
+        Pass the result of a StorageManager stage to handler, nothing
+        is passed if the stage was skipped or the database is
+        unavailable. A stage that times out keeps running, its
+        result is passed in a later cycle.
+
+        """
+        if stage == None:
+            return
+
+        try:
+            result = stage.get(self.storageManagerStageTimeout)
+        except TimeoutError:
+            logging.error("StorageManager stage did not finish in %d s, continuing without it" % self.storageManagerStageTimeout)
+            self.lateStorageManagerStages.append( (stage, handler) )
+            return
+        except DatabaseUnavailable as ex:
+            logging.error(str(ex))
+            return
+        except Exception as ex:
+            if not isConnectionError(ex):
+                raise
+            logging.exception("StorageManager stage failed, continuing without it")
+            return
+
+        handler(result)
 
         return
 
-    def updateRecoConfigsT0DataSvc(self):
+    def collectLateStorageManagerStages(self):
         """
-        _updateRecoConfigsT0DataSvc_
+        _collectLateStorageManagerStages_
 
-        Check which reco_config rows are missing
-        in the Tier0 Data Service and insert them,
-        also record that fact in t0ast
+        Pass the results of timed out StorageManager
+        stages that finished since to their handlers
 
         """
-        getRecoConfigsDAO = self.daoFactory(classname = "T0DataSvc.GetRecoConfigs")
-        recoConfigs = getRecoConfigsDAO.execute(transaction = False)
+        finishedStages = []
+        lateStages = []
+        for (stage, handler) in self.lateStorageManagerStages:
+            if stage.ready():
+                finishedStages.append( (stage, handler) )
+            else:
+                lateStages.append( (stage, handler) )
+        self.lateStorageManagerStages = lateStages
 
-        if len(recoConfigs) > 0:
+        for (stage, handler) in finishedStages:
+            logging.info("Late StorageManager stage finished, using its result")
+            self.waitStorageManagerStage(stage, handler)
 
-            bindsInsert = []
-            bindsUpdate = []
-            for config in recoConfigs:
-                bindsInsert.append( { 'RUN' : config['run'],
-                                      'PRIMDS' : config['primds'],
-                                      'CMSSW' : config['cmssw'],
-                                      'SCRAM_ARCH' : config['scram_arch'],
-                                      'ALCA_SKIM' : config['alca_skim'],
-                                      'PHYSICS_SKIM' : config['physics_skim'],
-                                      'DQM_SEQ' : config['dqm_seq'],
-                                      'GLOBAL_TAG' : config['global_tag'][:50],
-                                      'SCENARIO' : config['scenario'] } )
-                bindsUpdate.append( { 'RUN' : config['run'],
-                                      'PRIMDS' : config['primds'] } )
+        return
 
-            insertRecoConfigsDAO = self.daoFactoryT0DataSvc(classname = "T0DataSvc.InsertRecoConfigs")
-            insertRecoConfigsDAO.execute(binds = bindsInsert, transaction = False)
+    def markWorkflowsInjected(self):
+        """
+        _markWorkflowsInjected_
 
-            updateRecoConfigsDAO = self.daoFactory(classname = "T0DataSvc.UpdateRecoConfigs")
-            updateRecoConfigsDAO.execute(binds = bindsUpdate, transaction = False)
+        Check the injection candidates, candidates stay until all
+        their workflows are marked as injected, which also covers
+        streamers being deleted or PromptReco being released later
+
+        """
+        self.injectionScheduler.markWorkflowsInjected()
 
         return
 
-    def updateRecoReleaseConfigsT0DataSvc(self):
+    def feedCouchMonitoring(self, deadline = None):
         """
-        _updateRecoReleaseConfigsT0DataSvc_
+        _feedCouchMonitoring_
 
-        Insert information about PromptReco release into the Tier0 Data Service.
-        Already aggregate by run, if one primary dataset is released that means
-        the whole run is considered released.
+        check for workflows that haven't been uploaded to Couch for monitoring yet,
+        upload them in bulk and mark the ones that made it into Couch as tracked
+
+        Uploads are done in chunks, once the deadline is reached
+        the remaining workflows are left for the next cycle and
+        False is returned
 
         """
-        getRecoReleaseConfigsDAO = self.daoFactory(classname = "T0DataSvc.GetRecoReleaseConfigs")
-        recoReleaseConfigs = getRecoReleaseConfigsDAO.execute(transaction = False)
+        getStreamerWorkflowsForMonitoringDAO = self.daoFactory(classname = "Tier0Feeder.GetStreamerWorkflowsForMonitoring")
+        getPromptRecoWorkflowsForMonitoringDAO = self.daoFactory(classname = "Tier0Feeder.GetPromptRecoWorkflowsForMonitoring")
+        markTrackedWorkflowMonitoringDAO = self.daoFactory(classname = "Tier0Feeder.MarkTrackedWorkflowMonitoring")
+        workflows = getStreamerWorkflowsForMonitoringDAO.execute()
+        workflows += getPromptRecoWorkflowsForMonitoringDAO.execute()
 
-        if len(recoReleaseConfigs) > 0:
+        if len(workflows) == 0:
+            logging.debug("No workflows to publish to couch monitoring, doing nothing")
+            return
 
-            bindsInsert = []
-            bindsUpdate = []
-            for config in recoReleaseConfigs:
+        logging.debug(" Going to publish %d workflows" % len(workflows))
 
-                locked = int(config['released'] > 0)
+        chunkSize = max(self.couchMonitoringChunkSize, 1)
+        for i in range(0, len(workflows), chunkSize):
 
-                bindsInsert.append( { 'RUN' : config['run'],
-                                      'LOCKED' : locked } )
-                bindsUpdate.append( { 'RUN' : config['run'],
-                                      'IN_DATASVC' : locked + 1 } )
+            if deadline != None and i > 0 and time.time() > deadline:
+                logging.info("Deferring publishing of %d workflows to couch monitoring to the next cycle" % (len(workflows) - i))
+                return False
 
-            insertRecoReleaseConfigsDAO = self.daoFactoryT0DataSvc(classname = "T0DataSvc.InsertRecoReleaseConfigs")
-            insertRecoReleaseConfigsDAO.execute(binds = bindsInsert, transaction = False)
+            docs = []
+            workflowIds = {}
+            for (workflowId, run, workflowName) in workflows[i:i+chunkSize]:
+                docs.append( { "RequestName" : workflowName,
+                               "Run" : run } )
+                workflowIds[workflowName] = workflowId
 
-            updateRecoReleaseConfigsDAO = self.daoFactory(classname = "T0DataSvc.UpdateRecoReleaseConfigs")
-            updateRecoReleaseConfigsDAO.execute(binds = bindsUpdate, transaction = False)
+            try:
+                responses = self.getRequestCouchDB().insertGenericRequests(docs)
+            except:
+                logging.exception("Can't publish workflows to couch monitoring")
+                return
+
+            trackedIds = []
+            for workflowName, response in sorted(responses.items()):
+                if response in [ "OK", "EXISTS" ]:
+                    logging.info(" Published workflow %s to monitoring" % workflowName)
+                    trackedIds.append(workflowIds[workflowName])
+                else:
+                    logging.error("Can't publish workflow %s to monitoring: %s" % (workflowName, response))
+
+            markTrackedWorkflowMonitoringDAO.execute(trackedIds, transaction = False)
 
         return
 
-    def lockDatasetsT0DataSvc(self):
+    def closeOutRealTimeWorkflows(self):
         """
-        _lockDatasetsT0DataSvc_
+        _closeOutRealTimeWorkflows_
 
-        Publish dataset information into the Tier0 Data Service.
+        Updates couch with the closeout status of Repack and Express
+        PromptReco should be closed out automatically
 
         """
-        getDatasetLockedDAO = self.daoFactory(classname = "T0DataSvc.GetDatasetLocked")
-        datasetConfigs = getDatasetLockedDAO.execute(transaction = False)
+        getNotClosedOutWorkflowsDAO = self.daoFactory(classname = "Tier0Feeder.GetNotClosedOutWorkflows")
+        markCloseoutWorkflowMonitoringDAO = self.daoFactory(classname = "Tier0Feeder.MarkCloseoutWorkflowMonitoring")
+        workflows = getNotClosedOutWorkflowsDAO.execute()
+
+        if len(workflows) == 0:
+            logging.debug("No workflows to publish to couch monitoring, doing nothing")
+            return
+
+        workflowIds = {}
+        for workflow in workflows:
+            (workflowId, filesetId, filesetOpen, workflowName) = workflow
+            # find returns -1 if the string is not found
+            if workflowName.find('PromptReco') >= 0:
+                logging.debug("Closing out instantaneously PromptReco Workflow %s" % workflowName)
+                workflowIds[workflowName] = workflowId
+            else :
+                # Check if fileset (which you already know) is closed or not
+                # FIXME: No better way to do it? what comes from the DAO is a string, casting bool or int doesn't help much.
+                # Works like that :
+                if filesetOpen == '0':
+                    workflowIds[workflowName] = workflowId
+
+        if len(workflowIds) == 0:
+            return
+
+        try:
+            responses = self.getRequestCouchDB().updateRequestsStatus(workflowIds.keys(), 'Closed')
+        except:
+            logging.exception("Can't close out workflows in couch monitoring")
+            return
+
+        closedIds = []
+        for workflowName, response in sorted(responses.items()):
+            # NOCHANGE means the workflow is already closed (or beyond)
+            if response in [ "OK", "NOCHANGE" ]:
+                logging.debug("Successfully closed workflow %s" % workflowName)
+                closedIds.append(workflowIds[workflowName])
+            else:
+                logging.error("Can't close workflow %s: %s" % (workflowName, response))
 
-        if len(datasetConfigs) > 0:
+        markCloseoutWorkflowMonitoringDAO.execute(closedIds, transaction = False)
 
-            bindsInsert = []
-            bindsUpdate = []
-            for config in datasetConfigs:
-                bindsInsert.append( { 'PATH' : config['path'] } )
-                bindsUpdate.append( { 'ID' : config['id'] } )
+        return
 
-            insertDatasetLockedDAO = self.daoFactoryT0DataSvc(classname = "T0DataSvc.InsertDatasetLocked")
-            insertDatasetLockedDAO.execute(binds = bindsInsert, transaction = False)
+    def notifyStorageManager(self):
+        """
+        _notifyStorageManager_
 
-            updateDatasetLockedDAO = self.daoFactory(classname = "T0DataSvc.UpdateDatasetLocked")
-            updateDatasetLockedDAO.execute(binds = bindsUpdate, transaction = False)
+        Find all finished streamers for closed all run/stream
+        Send the notification message to StorageManager (or
+        queue it in the outbox for the SMNotificationPoller)
+        Update the streamer status to finished (deleted = 1)
+
+        """
+        if self.smNotificationOutbox != None:
+            SMNotificationAPI.queueNotifications(self.smNotificationOutbox)
+        else:
+            SMNotificationAPI.notifyStorageManager(self.smNotificationTransport,
+                                                   chunkSize = self.smNotificationChunkSize,
+                                                   maxWorkers = self.smNotificationWorkers)
 
         return
 
@@ -561,3 +921,13 @@ class Tier0FeederPoller(BaseWorkerThread):
 
         """
         logging.debug("terminating immediately")
+        self.connectionManager.close()
+
+        if self.pollScheduler != None:
+            self.pollScheduler.close()
+
+        if self.feederShards != None:
+            try:
+                self.feederShards.releaseLeases()
+            except:
+                logging.exception("Can't release Tier0Feeder leases")
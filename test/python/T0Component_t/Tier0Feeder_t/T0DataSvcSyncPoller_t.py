@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+"""
+_T0DataSvcSyncPoller_t_
+
+Testing the T0DataSvcSyncPoller
+
+"""
+import unittest
+import time
+
+from WMQuality.TestInit import TestInit
+from WMCore.Configuration import Configuration
+
+from T0Component.Tier0Feeder.T0DataSvcSyncPoller import T0DataSvcSyncPoller
+
+
+class RecordingSync(object):
+    """
+    _RecordingSync_
+
+    Records the deadlines it is called with
+
+    """
+    def __init__(self):
+        """
+        _init_
+
+        """
+        self.deadlines = []
+
+        return
+
+    def sync(self, deadline = None):
+        """
+        _sync_
+
+        """
+        self.deadlines.append(deadline)
+
+        return
+
+
+class T0DataSvcSyncPollerTest(unittest.TestCase):
+    """
+    _T0DataSvcSyncPollerTest_
+
+    Testing the T0DataSvcSyncPoller
+    """
+
+    def setUp(self):
+        """
+        _setUp_
+
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+        self.testInit.setDatabaseConnection()
+
+        self.testInit.setSchema(customModules = ["T0.WMBS"])
+
+        self.config = Configuration()
+        self.config.section_("Tier0Feeder")
+        self.config.Tier0Feeder.lazyConnections = True
+        self.config.Tier0Feeder.t0DataSvcSyncBatchSize = 100
+        self.config.section_("T0DataSvcDatabase")
+        self.config.T0DataSvcDatabase.connectUrl = "sqlite://"
+
+        return
+
+    def tearDown(self):
+        """
+        _tearDown_
+
+        """
+        self.testInit.clearDatabase()
+
+        return
+
+    def test00(self):
+        """
+        _test00_
+
+        With lazy connections the Tier0 Data Service is
+        not connected at startup, the configuration is
+        passed on to the sync
+
+        """
+        poller = T0DataSvcSyncPoller(self.config)
+
+        self.assertFalse(poller.connectionManager.getDBInterface("T0DataSvc").isConnected(),
+                         "ERROR: Tier0 Data Service should not be connected")
+
+        self.assertEqual(poller.t0DataSvcSync.batchSize, 100,
+                         "ERROR: batch size not configured")
+
+        self.assertEqual(poller.syncBudget, None,
+                         "ERROR: there should be no sync budget by default")
+
+        poller.connectionManager.close()
+
+        return
+
+    def test01(self):
+        """
+        _test01_
+
+        The sync runs without deadline by default
+        and with one from the configured budget
+
+        """
+        poller = T0DataSvcSyncPoller(self.config)
+        poller.t0DataSvcSync = RecordingSync()
+
+        poller.algorithm()
+
+        self.config.Tier0Feeder.t0DataSvcSyncBudget = 30
+        budgetPoller = T0DataSvcSyncPoller(self.config)
+        budgetPoller.t0DataSvcSync = RecordingSync()
+
+        startTime = time.time()
+        budgetPoller.algorithm()
+
+        self.assertEqual(poller.t0DataSvcSync.deadlines, [ None ],
+                         "ERROR: sync should not have a deadline")
+
+        deadline = budgetPoller.t0DataSvcSync.deadlines[0]
+        self.assertTrue(startTime + 30 <= deadline <= time.time() + 30,
+                        "ERROR: sync deadline should be the configured budget")
+
+        poller.connectionManager.close()
+        budgetPoller.connectionManager.close()
+
+        return
+
+    def test02(self):
+        """
+        _test02_
+
+        Connections are lazy by default, the first sync
+        fails if the startup health check could not reach
+        the Tier0 Data Service, without lazyConnections
+        it is connected at startup
+
+        """
+        del self.config.Tier0Feeder.lazyConnections
+        self.config.T0DataSvcDatabase.connectUrl = "sqlite:////nonexistent/T0DataSvc.db"
+
+        poller = T0DataSvcSyncPoller(self.config)
+        poller.t0DataSvcSync = RecordingSync()
+
+        self.assertRaises(RuntimeError, poller.algorithm)
+        self.assertEqual(poller.t0DataSvcSync.deadlines, [],
+                         "ERROR: sync should not run without the Tier0 Data Service")
+
+        poller.connectionManager.close()
+
+        self.config.Tier0Feeder.lazyConnections = False
+        self.config.T0DataSvcDatabase.connectUrl = "sqlite://"
+
+        poller = T0DataSvcSyncPoller(self.config)
+
+        self.assertTrue(poller.connectionManager.getDBInterface("T0DataSvc").isConnected(),
+                        "ERROR: Tier0 Data Service should be connected at startup without lazyConnections")
+
+        poller.connectionManager.close()
+
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+"""
+_Tier0FeederPoller_t_
+
+Testing the cycle handling of the Tier0FeederPoller
+
+"""
+import unittest
+import threading
+import time
+import os
+
+from WMQuality.TestInit import TestInit
+from WMCore.Configuration import Configuration
+
+from T0.Database.ConnectionManager import DatabaseUnavailable
+from T0Component.Tier0Feeder.Tier0FeederPoller import Tier0FeederPoller
+
+
+class Tier0FeederPollerTest(unittest.TestCase):
+    """
+    _Tier0FeederPollerTest_
+
+    Testing the cycle handling of the Tier0FeederPoller
+    """
+
+    def setUp(self):
+        """
+        _setUp_
+
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+        self.testInit.setDatabaseConnection()
+
+        self.testInit.setSchema(customModules = ["T0.WMBS"])
+
+        self.testDir = self.testInit.generateWorkDir()
+
+        self.config = Configuration()
+        self.config.section_("Tier0Feeder")
+        self.config.Tier0Feeder.componentDir = self.testDir
+        self.config.Tier0Feeder.tier0ConfigFile = os.path.join(self.testDir, "Tier0Config.py")
+        self.config.Tier0Feeder.specDirectory = self.testDir
+        self.config.Tier0Feeder.pollInterval = 60
+        self.config.Tier0Feeder.lazyConnections = True
+        self.config.section_("HLTConfDatabase")
+        self.config.HLTConfDatabase.connectUrl = "sqlite://"
+        self.config.section_("StorageManagerDatabase")
+        self.config.StorageManagerDatabase.connectUrl = "sqlite://"
+
+        self.pollers = []
+
+        return
+
+    def tearDown(self):
+        """
+        _tearDown_
+
+        """
+        for poller in self.pollers:
+            poller.connectionManager.close()
+
+        self.testInit.clearDatabase()
+        self.testInit.delWorkDir()
+
+        return
+
+    def getPoller(self):
+        """
+        _getPoller_
+
+        """
+        poller = Tier0FeederPoller(self.config)
+        self.pollers.append(poller)
+
+        return poller
+
+    def test00(self):
+        """
+        _test00_
+
+        A StorageManager stage that times out is left running,
+        later stages are skipped while it runs and its result
+        is passed on once it finished
+
+        """
+        poller = self.getPoller()
+        poller.storageManagerStageTimeout = 0.1
+
+        stageFinished = threading.Event()
+        def hangingStage():
+            stageFinished.wait(60)
+            return [ 1, 2 ]
+
+        def nextStage():
+            return [ 3 ]
+
+        results = []
+
+        stage = poller.submitStorageManagerStage(hangingStage)
+        poller.waitStorageManagerStage(stage, results.extend)
+
+        self.assertEqual(results, [],
+                         "ERROR: hanging stage should not have a result yet")
+        self.assertEqual(len(poller.lateStorageManagerStages), 1,
+                         "ERROR: hanging stage should be collected later")
+
+        self.assertEqual(poller.submitStorageManagerStage(nextStage), None,
+                         "ERROR: stage should be skipped while the earlier one hangs")
+
+        poller.collectLateStorageManagerStages()
+
+        self.assertEqual(results, [],
+                         "ERROR: hanging stage should still not have a result")
+
+        stageFinished.set()
+        stage.wait(60)
+
+        poller.collectLateStorageManagerStages()
+
+        self.assertEqual(results, [ 1, 2 ],
+                         "ERROR: result of the late stage should have been passed on")
+        self.assertEqual(poller.lateStorageManagerStages, [],
+                         "ERROR: late stage should have been collected")
+
+        poller.waitStorageManagerStage(poller.submitStorageManagerStage(nextStage), results.extend)
+
+        self.assertEqual(results, [ 1, 2, 3 ],
+                         "ERROR: result of the next stage should have been passed on")
+
+        return
+
+    def test01(self):
+        """
+        _test01_
+
+        A StorageManager stage failing on an unavailable database
+        passes nothing on, other errors fail the cycle
+
+        """
+        poller = self.getPoller()
+
+        def unavailableStage():
+            raise DatabaseUnavailable("StorageManager database unavailable")
+
+        def failingStage():
+            raise RuntimeError("Stage failed")
+
+        results = []
+
+        poller.waitStorageManagerStage(poller.submitStorageManagerStage(unavailableStage), results.extend)
+
+        self.assertEqual(results, [],
+                         "ERROR: nothing should have been passed on")
+        self.assertEqual(poller.lateStorageManagerStages, [],
+                         "ERROR: failed stage should not be collected later")
+
+        self.assertRaises(RuntimeError, poller.waitStorageManagerStage,
+                          poller.submitStorageManagerStage(failingStage), results.extend)
+
+        return
+
+    def test02(self):
+        """
+        _test02_
+
+        Sharded workers need leases outlasting two StorageManager
+        stage timeouts, budgeted stages stop in half the lease
+
+        """
+        self.config.Tier0Feeder.feederWorkers = 2
+        self.config.Tier0Feeder.feederLeaseDuration = 300
+
+        self.assertRaises(RuntimeError, Tier0FeederPoller, self.config)
+
+        self.config.Tier0Feeder.storageManagerStageTimeout = 100
+        self.config.Tier0Feeder.stageBudgets = { 'uploadConditions' : 60 }
+
+        poller = self.getPoller()
+
+        self.assertEqual(poller.cycleStages.budgets, { 'releasePromptReco' : 150,
+                                                       'uploadConditions' : 60,
+                                                       'feedCouchMonitoring' : 150 },
+                         "ERROR: budgeted stages should be limited to half the lease")
+
+        return
+
+    def test03(self):
+        """
+        _test03_
+
+        Expired leases stop the leader and shard work
+        within a cycle, they are renewed between stages
+
+        """
+        self.config.Tier0Feeder.feederWorkers = 1
+
+        poller = self.getPoller()
+
+        self.assertTrue(poller.renewLeases(force = True),
+                        "ERROR: single worker should be the leader")
+
+        poller.feederShards.renewLeases(int(time.time()) - 1000)
+
+        self.assertFalse(poller.isLeader(),
+                         "ERROR: worker with expired leases should not be the leader")
+        self.assertFalse(poller.ownsRunStream(1, "A"),
+                         "ERROR: worker with expired leases should not own run/streams")
+
+        self.assertTrue(poller.renewLeases(),
+                        "ERROR: due leases should be renewed between stages")
+        self.assertTrue(poller.ownsRunStream(1, "A"),
+                        "ERROR: worker should own all run/streams again")
+
+        renewals = []
+        def renewLeases(currentTime = None):
+            renewals.append(currentTime)
+            return False
+        poller.feederShards.renewLeases = renewLeases
+
+        self.assertTrue(poller.renewLeases(),
+                        "ERROR: worker should still be the leader")
+        self.assertEqual(renewals, [],
+                         "ERROR: leases should not be renewed before the renew interval")
+
+        return
+
+    def test04(self):
+        """
+        _test04_
+
+        Connections are lazy by default, the first cycle
+        fails if the startup health check could not reach
+        an external database, later cycles run
+
+        """
+        del self.config.Tier0Feeder.lazyConnections
+        self.config.StorageManagerDatabase.connectUrl = "sqlite:///%s" % os.path.join(self.testDir, "missing", "SM.db")
+
+        poller = self.getPoller()
+
+        self.assertTrue(poller.lazyConnections,
+                        "ERROR: connections should be lazy by default")
+
+        cycles = []
+        poller.feederCycle = lambda: cycles.append(time.time())
+
+        self.assertRaises(RuntimeError, poller.runCycle)
+        self.assertEqual(cycles, [],
+                         "ERROR: cycle should not run without the StorageManager database")
+
+        self.config.StorageManagerDatabase.connectUrl = "sqlite://"
+
+        poller = self.getPoller()
+        poller.feederCycle = lambda: cycles.append(time.time())
+
+        poller.runCycle()
+
+        self.assertEqual(len(cycles), 1,
+                         "ERROR: cycle should run after a successful health check")
+        self.assertTrue(poller.connectionManager.getDBInterface("HLTConf").isConnected(),
+                        "ERROR: health check should have connected the databases")
+
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -17,10 +17,13 @@ from WMCore.DAOFactory import DAOFactory
 from WMCore.Database.DBFactory import DBFactory
 from WMCore.Configuration import loadConfigurationFile
 from WMCore.Services.UUIDLib import makeUUID
-from WMCore.Services.RequestDB.RequestDBWriter import RequestDBWriter
 
 from T0.RunConfig import RunConfigAPI
+from T0.RunConfig.InjectionScheduler import InjectionScheduler
 from T0.RunLumiCloseout import RunLumiCloseoutAPI
+from T0.RunLumiCloseout.CloseoutScheduler import CloseoutScheduler
+from T0.Sharding.FeederShards import FeederShards
+from T0.RequestDB.T0RequestDBWriter import T0RequestDBWriter
 
 
 class Tier0FeederTest(unittest.TestCase):
@@ -55,8 +58,8 @@ class Tier0FeederTest(unittest.TestCase):
 
             self.dqmUploadProxy = getattr(wmAgentConfig.Tier0Feeder, "dqmUploadProxy", None)
 
-            self.localRequestCouchDB = RequestDBWriter(wmAgentConfig.AnalyticsDataCollector.localT0RequestDBURL,
-                                                       couchapp = wmAgentConfig.AnalyticsDataCollector.RequestCouchApp)
+            self.localRequestCouchDB = T0RequestDBWriter(wmAgentConfig.AnalyticsDataCollector.localT0RequestDBURL,
+                                                         couchapp = wmAgentConfig.AnalyticsDataCollector.RequestCouchApp)
 
             if hasattr(wmAgentConfig, "HLTConfDatabase"):
 
@@ -1184,15 +1187,19 @@ class Tier0FeederTest(unittest.TestCase):
 
         if workflows:
             logging.debug(" Going to publish %d workflows" % len(workflows))
+            docs = []
+            workflowIds = {}
             for (workflowId, run, workflowName) in workflows:
-                logging.info(" Publishing workflow %s to monitoring" % workflowName)
-                doc = {}
-                doc["RequestName"] = workflowName
-                doc["Run"] = run
-                response = self.localRequestCouchDB.insertGenericRequest(doc)
-                if response == "OK" or "EXISTS":
+                docs.append( { "RequestName" : workflowName,
+                               "Run" : run } )
+                workflowIds[workflowName] = workflowId
+            responses = self.localRequestCouchDB.insertGenericRequests(docs)
+            trackedIds = []
+            for workflowName, response in responses.items():
+                if response in [ "OK", "EXISTS" ]:
                     logging.info(" Successfully uploaded request %s" % workflowName)
-                    self.markTrackedWorkflowMonitoringDAO.execute(workflowId)
+                    trackedIds.append(workflowIds[workflowName])
+            self.markTrackedWorkflowMonitoringDAO.execute(trackedIds)
 
         return
 
@@ -1641,7 +1648,8 @@ class Tier0FeederTest(unittest.TestCase):
 
         self.feedStreamers()
 
-        RunLumiCloseoutAPI.closeRunStreamFilesets()
+        self.assertEqual(RunLumiCloseoutAPI.closeRunStreamFilesets(), [ (176161, 'A') ],
+                         "ERROR: run/stream fileset for run 176161 and stream A should have been closed")
         self.assertEqual(self.getClosedRunStreamFilesets(), { 176161 : 'A' },
                          "ERROR: there should be 1 closed run/stream filesets for run 176161 and stream A")
 
@@ -1781,6 +1789,248 @@ class Tier0FeederTest(unittest.TestCase):
 
         return
 
+    def test06(self):
+        """
+        _test06_
+
+        Test closeout candidates and diagnostics for run/stream filesets
+
+        """
+        if self.dbInterfaceStorageManager == None:
+            print("Your config is missing the StorageManagerDatabase section")
+            print("Skipping closeout scheduler test")
+            return
+
+        closeoutScheduler = CloseoutScheduler()
+
+        self.assertEqual(closeoutScheduler.closeRunStreamFilesets(), [],
+                         "ERROR: there should be no closed run/stream filesets")
+
+        self.insertRun(176161)
+        for lumi in range(1, 24):
+            for count in range(14):
+                self.insertRunStreamLumi(176161, "A", lumi)
+
+        RunConfigAPI.configureRun(self.tier0Config, 176161,
+                                  self.hltConfig,
+                                  { 'process' : "HLT",
+                                    'mapping' : self.referenceMapping })
+
+        RunConfigAPI.configureRunStream(self.tier0Config, 176161, "A", self.testDir, self.dqmUploadProxy)
+
+        RunLumiCloseoutAPI.closeLumiSections(self.dbInterfaceStorageManager)
+
+        self.assertEqual(closeoutScheduler.closeRunStreamFilesets(), [],
+                         "ERROR: there should be no closed run/stream filesets")
+        self.assertEqual(closeoutScheduler.getDiagnostics(), {},
+                         "ERROR: run 176161 has not ended, there should be no closeout candidates")
+
+        closeoutScheduler.addRuns(RunLumiCloseoutAPI.stopRuns(self.dbInterfaceStorageManager) +
+                                  RunLumiCloseoutAPI.closeRuns(self.dbInterfaceStorageManager))
+        closeoutScheduler.addRunStreams(RunLumiCloseoutAPI.closeLumiSections(self.dbInterfaceStorageManager)[0])
+
+        self.assertEqual(closeoutScheduler.closeRunStreamFilesets(), [],
+                         "ERROR: there should be no closed run/stream filesets")
+        self.assertEqual(closeoutScheduler.getDiagnostics().keys(), [ (176161, 'A') ],
+                         "ERROR: run 176161 stream A should be a closeout candidate")
+        self.assertTrue("streamers not feed" in closeoutScheduler.getDiagnostics()[(176161, 'A')][-1],
+                        "ERROR: run 176161 stream A should wait for its streamers to be feed")
+
+        self.feedStreamers()
+
+        self.assertEqual(closeoutScheduler.closeRunStreamFilesets(), [ (176161, 'A') ],
+                         "ERROR: run/stream fileset for run 176161 and stream A should have been closed")
+        self.assertEqual(self.getClosedRunStreamFilesets(), { 176161 : 'A' },
+                         "ERROR: there should be 1 closed run/stream filesets for run 176161 and stream A")
+        self.assertEqual(closeoutScheduler.getDiagnostics(), {},
+                         "ERROR: there should be no closeout candidates left")
+
+        return
+
+    def test07(self):
+        """
+        _test07_
+
+        Test the run/stream shards and leader election of feeder workers
+
+        """
+        currentTime = int(time.time())
+
+        worker0 = FeederShards("worker0", 0, 2, 8, leaseDuration = 100)
+        worker1 = FeederShards("worker1", 1, 2, 8, leaseDuration = 100)
+
+        worker0.renewLeases(currentTime)
+        worker1.renewLeases(currentTime)
+
+        self.assertTrue(worker0.isLeader(),
+                        "ERROR: the first worker should be the leader")
+        self.assertFalse(worker1.isLeader(),
+                         "ERROR: there should only be one leader")
+
+        # shards are handed to their preferred worker once it is alive
+        worker0.renewLeases(currentTime + 10)
+        worker1.renewLeases(currentTime + 10)
+
+        self.assertEqual(worker0.ownedShards, set([0, 2, 4, 6]),
+                         "ERROR: worker 0 should own the even shards")
+        self.assertEqual(worker1.ownedShards, set([1, 3, 5, 7]),
+                         "ERROR: worker 1 should own the odd shards")
+
+        runStreams = [ (176161, stream) for stream in [ "A", "B", "Express", "HLTMON", "Calibration" ] ]
+        self.assertEqual(sorted(worker0.filterRunStreams(runStreams) + worker1.filterRunStreams(runStreams)),
+                         sorted(runStreams),
+                         "ERROR: every run/stream should be owned by exactly one worker")
+
+        # leases of a dead worker are taken over after they expire
+        worker0.renewLeases(currentTime + 150)
+
+        self.assertEqual(worker0.ownedShards, set(range(8)),
+                         "ERROR: worker 0 should own all shards")
+
+        # a second worker with the same index does nothing
+        duplicate = FeederShards("duplicate", 0, 2, 8, leaseDuration = 100)
+        duplicate.renewLeases(currentTime + 160)
+
+        self.assertFalse(duplicate.isLeader(),
+                         "ERROR: duplicate worker should not be the leader")
+        self.assertEqual(duplicate.ownedShards, set(),
+                         "ERROR: duplicate worker should not own any shards")
+
+        worker0.releaseLeases()
+        worker1.renewLeases(currentTime + 170)
+
+        self.assertTrue(worker1.isLeader(),
+                        "ERROR: worker 1 should take over as leader")
+
+        # without renewal the leases stop working once they expire
+        self.assertFalse(worker1.isLeader(currentTime + 270),
+                         "ERROR: worker 1 should not be the leader after its lease expired")
+        self.assertFalse(worker1.ownsRunStream(176161, "A", currentTime + 270),
+                         "ERROR: worker 1 should not own shards after their leases expired")
+
+        # renewals between stages are only done every renewInterval
+        self.assertFalse(worker1.renewLeasesIfDue(currentTime + 175),
+                         "ERROR: leases should not be renewed before the renew interval")
+        self.assertEqual(worker1.lastRenewal, currentTime + 170,
+                         "ERROR: leases should not have been renewed")
+        worker1.renewLeasesIfDue(currentTime + 180)
+        self.assertEqual(worker1.lastRenewal, currentTime + 180,
+                         "ERROR: leases should have been renewed")
+
+        return
+
+
+    def test08(self):
+        """
+        _test08_
+
+        Test marking workflows as injected for injection candidates,
+        Bulk run/streams wait for PromptReco release outside of the
+        candidates evaluated every cycle
+
+        """
+        myThread = threading.currentThread()
+
+        daoFactory = DAOFactory(package = "T0.WMBS",
+                                logger = logging,
+                                dbinterface = myThread.dbi)
+
+        getInjectionCandidatesDAO = daoFactory(classname = "Tier0Feeder.GetInjectionCandidates")
+        markWorkflowsInjectedDAO = daoFactory(classname = "Tier0Feeder.MarkWorkflowsInjected")
+        findUnreleasedRunStreamsDAO = daoFactory(classname = "Tier0Feeder.FindUnreleasedRunStreams")
+
+        self.insertRun(176161)
+        self.insertRunStreamLumi(176161, "A", 1)
+        self.insertRunStreamLumi(176161, "Express", 1)
+
+        RunConfigAPI.configureRun(self.tier0Config, 176161,
+                                  self.hltConfig,
+                                  { 'process' : "HLT",
+                                    'mapping' : self.referenceMapping })
+
+        RunConfigAPI.configureRunStream(self.tier0Config, 176161, "A", self.testDir, self.dqmUploadProxy)
+        RunConfigAPI.configureRunStream(self.tier0Config, 176161, "Express", self.testDir, self.dqmUploadProxy)
+
+        self.assertEqual(getInjectionCandidatesDAO.execute(True, transaction = False), [],
+                         "ERROR: with streamer notifications open filesets are no candidates")
+
+        self.assertEqual(sorted(getInjectionCandidatesDAO.execute(False, transaction = False)),
+                         [ (176161, "A"), (176161, "Express") ],
+                         "ERROR: run 176161 stream A and Express should be candidates")
+
+        self.assertEqual(markWorkflowsInjectedDAO.execute(False, candidates = [], transaction = False), [],
+                         "ERROR: there should be nothing pending without candidates")
+
+        self.assertEqual(findUnreleasedRunStreamsDAO.execute([ (176161, "A"), (176161, "Express") ], transaction = False),
+                         [ (176161, "A") ],
+                         "ERROR: run 176161 stream A should wait for PromptReco release")
+
+        pending = markWorkflowsInjectedDAO.execute(False, candidates = [ (176161, "Express") ],
+                                                   transaction = False)
+
+        self.assertEqual(pending, [],
+                         "ERROR: run 176161 stream Express workflows should be marked injected")
+
+        self.assertEqual(getInjectionCandidatesDAO.execute(False, transaction = False), [ (176161, "A") ],
+                         "ERROR: only run 176161 stream A should be a candidate")
+
+        currentTime = time.time()
+        injectionScheduler = InjectionScheduler(recheckInterval = 3600)
+
+        self.assertEqual(injectionScheduler.markWorkflowsInjected(currentTime), [],
+                         "ERROR: no run/stream should be marked as injected")
+        self.assertEqual(injectionScheduler.candidates, set(),
+                         "ERROR: there should be no candidates left")
+        self.assertEqual(injectionScheduler.getWaitingForRelease(), [ (176161, "A") ],
+                         "ERROR: run 176161 stream A should wait for PromptReco release")
+
+        # release of another run does not change anything
+        injectionScheduler.addReleasedRuns([ 176162 ])
+
+        self.assertEqual(injectionScheduler.candidates, set(),
+                         "ERROR: there should be no candidates")
+
+        # release of the run makes it a candidate, but there is no reco config yet
+        injectionScheduler.addReleasedRuns([ 176161 ])
+
+        self.assertEqual(injectionScheduler.candidates, set([ (176161, "A") ]),
+                         "ERROR: run 176161 stream A should be a candidate")
+        self.assertEqual(injectionScheduler.markWorkflowsInjected(currentTime), [],
+                         "ERROR: no run/stream should be marked as injected")
+        self.assertEqual(injectionScheduler.getWaitingForRelease(), [ (176161, "A") ],
+                         "ERROR: run 176161 stream A should wait for PromptReco release again")
+
+        # PromptReco release done elsewhere, picked up by the recheck
+        myThread.dbi.processData("""INSERT INTO reco_config
+                                    (RUN_ID, PRIMDS_ID, DO_RECO, RECO_SPLIT, WRITE_RECO, WRITE_DQM,
+                                     WRITE_AOD, WRITE_MINIAOD, PROC_VERSION, BLOCK_DELAY, CMSSW_ID,
+                                     SCRAM_ARCH, GLOBAL_TAG)
+                                    SELECT run_id, primds_id, 1, 1, 1, 1, 1, 1, 1, 0,
+                                           (SELECT id FROM cmssw_version WHERE name = 'CMSSW_4_2_7'),
+                                           'slc5_amd64_gcc462', 'GlobalTag'
+                                    FROM run_primds_stream_assoc
+                                    WHERE run_id = 176161
+                                    AND stream_id = (SELECT id FROM stream WHERE name = 'A')
+                                    """, transaction = False)
+
+        self.assertEqual(injectionScheduler.markWorkflowsInjected(currentTime + 60), [],
+                         "ERROR: waiting run/streams should not be evaluated before the recheck")
+
+        self.assertEqual(injectionScheduler.markWorkflowsInjected(currentTime + 3600), [ (176161, "A") ],
+                         "ERROR: run 176161 stream A should be marked as injected")
+        self.assertEqual(injectionScheduler.getWaitingForRelease(), [],
+                         "ERROR: there should be no run/stream waiting for PromptReco release")
+
+        notInjected = myThread.dbi.processData("""SELECT COUNT(*)
+                                                  FROM wmbs_workflow
+                                                  WHERE injected = 0
+                                                  """, transaction = False)[0].fetchall()[0][0]
+
+        self.assertEqual(notInjected, 0,
+                         "ERROR: all workflows should be marked as injected")
+
+        return
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+"""
+_PayloadTransfer_t_
+
+Testing the local transfer backend and the payload cache
+
+"""
+import unittest
+import stat
+import time
+import os
+
+from WMQuality.TestInit import TestInit
+
+from T0.ConditionUpload.PayloadTransfer import LocalTransfer, PayloadCache
+from T0.ConditionUpload import ConditionUploadAPI
+
+
+class PayloadTransferTest(unittest.TestCase):
+    """
+    _PayloadTransferTest_
+
+    Testing the local transfer backend and the payload cache
+    """
+
+    def setUp(self):
+        """
+        _setUp_
+
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+
+        self.testDir = self.testInit.generateWorkDir()
+
+        self.storageDir = os.path.join(self.testDir, "storage")
+        self.cacheDir = os.path.join(self.testDir, "cache")
+        self.workDir = os.path.join(self.testDir, "work")
+        os.makedirs(self.workDir)
+
+        self.transfer = LocalTransfer(self.storageDir)
+
+        return
+
+    def tearDown(self):
+        """
+        _tearDown_
+
+        """
+        self.testInit.delWorkDir()
+
+        return
+
+    def createFile(self, lfn, content):
+        """
+        _createFile_
+
+        File in the storage stand-in, returns
+        it in the format of the condition files
+
+        """
+        path = self.storageDir + lfn
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        fout = open(path, 'w')
+        fout.write(content)
+        fout.close()
+
+        return { 'lfn' : lfn, 'filesize' : len(content) }
+
+    def test00(self):
+        """
+        _test00_
+
+        Files are staged by lfn basename, missing
+        ones are reported, put creates directories
+
+        """
+        self.createFile("/store/pcl/a.db", "payload")
+
+        failed = self.transfer.stage([ "/store/pcl/a.db", "/store/pcl/missing.db" ], self.workDir)
+
+        self.assertEqual(failed, [ "/store/pcl/missing.db" ],
+                         "ERROR: missing file should be reported")
+        self.assertEqual(open(os.path.join(self.workDir, "a.db")).read(), "payload",
+                         "ERROR: file not staged")
+
+        self.assertEqual(self.transfer.put(os.path.join(self.workDir, "a.db"), "/store/new/dir/a.db.uploaded"), None,
+                         "ERROR: put should work")
+        self.assertEqual(open(self.storageDir + "/store/new/dir/a.db.uploaded").read(), "payload",
+                         "ERROR: file not put to storage")
+
+        return
+
+    def test01(self):
+        """
+        _test01_
+
+        Cache entries are keyed by lfn and size, hits
+        are not staged again, misses are staged once
+
+        """
+        payloadCache = PayloadCache(self.cacheDir, self.transfer)
+
+        condFile = self.createFile("/store/pcl/a.db", "payload")
+
+        cachedFiles = payloadCache.stage([ condFile ])
+
+        self.assertEqual(cachedFiles, { "/store/pcl/a.db" : payloadCache.getPath(condFile) },
+                         "ERROR: file should be in the cache")
+        self.assertEqual(open(cachedFiles["/store/pcl/a.db"]).read(), "payload",
+                         "ERROR: wrong cache content")
+
+        # a hit does not touch the storage
+        os.remove(self.storageDir + "/store/pcl/a.db")
+
+        self.assertEqual(payloadCache.stage([ condFile ]), cachedFiles,
+                         "ERROR: cached file should be a hit")
+
+        # same lfn with a different size is a miss
+        newFile = self.createFile("/store/pcl/a.db", "new payload")
+
+        self.assertNotEqual(payloadCache.getPath(newFile), payloadCache.getPath(condFile),
+                            "ERROR: size should be part of the cache key")
+        self.assertFalse(payloadCache.isCached(newFile),
+                         "ERROR: file with new size should not be cached")
+
+        cachedFiles = payloadCache.stage([ newFile ])
+
+        self.assertEqual(open(cachedFiles["/store/pcl/a.db"]).read(), "new payload",
+                         "ERROR: new file should have been staged")
+
+        # files with the wrong size are not cached
+        wrongFile = self.createFile("/store/pcl/b.db", "payload")
+        wrongFile['filesize'] = 1
+
+        self.assertEqual(payloadCache.stage([ wrongFile ]), {},
+                         "ERROR: file with wrong size should not be cached")
+
+        return
+
+    def test02(self):
+        """
+        _test02_
+
+        Purge removes the entries older than maxAge
+
+        """
+        payloadCache = PayloadCache(self.cacheDir, self.transfer, maxAge = 3600)
+
+        oldFile = self.createFile("/store/pcl/old.db", "old")
+        newFile = self.createFile("/store/pcl/new.db", "new")
+
+        payloadCache.stage([ oldFile, newFile ])
+
+        oldTime = time.time() - 7200
+        os.utime(payloadCache.getPath(oldFile), (oldTime, oldTime))
+
+        payloadCache.purge()
+
+        self.assertFalse(payloadCache.isCached(oldFile),
+                         "ERROR: old entry should have been purged")
+        self.assertTrue(payloadCache.isCached(newFile),
+                        "ERROR: new entry should be kept")
+
+        return
+
+    def test03(self):
+        """
+        _test03_
+
+        The working copies of a payload are made
+        writable, the cache entries are not changed
+
+        """
+        payloadCache = PayloadCache(self.cacheDir, self.transfer)
+
+        sqliteFile = self.createFile("/store/pcl/a.db", "payload")
+        metaFile = self.createFile("/store/pcl/a.txt", "prodMetaData {}\nprepMetaData {}\n")
+
+        cachedFiles = payloadCache.stage([ sqliteFile, metaFile ])
+        for path in cachedFiles.values():
+            os.chmod(path, stat.S_IRUSR)
+
+        completeFiles = ConditionUploadAPI.uploadPayload(os.path.join(self.workDir, "a"), sqliteFile, metaFile,
+                                                         None, False, None, None, None, None, payloadCache)
+
+        self.assertEqual(completeFiles, [ sqliteFile, metaFile ],
+                         "ERROR: payload should be complete without upload credentials")
+
+        for path in cachedFiles.values():
+            self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), stat.S_IRUSR,
+                             "ERROR: cache entry permissions should not change")
+
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,359 @@
+#!/usr/bin/env python
+"""
+_UploadQueue_t_
+
+Testing the persistent PCL upload queue
+
+"""
+import unittest
+import threading
+import sqlite3
+import time
+import os
+
+from WMQuality.TestInit import TestInit
+
+from T0.ConditionUpload.UploadQueue import UploadQueue
+from T0.ConditionUpload.PayloadTransfer import LocalTransfer, PayloadCache
+from T0.ConditionUpload import ConditionUploadAPI
+
+
+class ConditionDAO(object):
+    """
+    _ConditionDAO_
+
+    Conditions out of the factory, records
+    the run/streams marked as finished
+
+    """
+    def __init__(self, factory, classname):
+        """
+        _init_
+
+        """
+        self.factory = factory
+        self.classname = classname
+
+        return
+
+    def execute(self, *args, **kwargs):
+        """
+        _execute_
+
+        """
+        if self.classname == "ConditionUpload.GetConditions":
+            if kwargs.get('finished'):
+                return {}
+            return self.factory.conditions
+
+        if self.classname == "ConditionUpload.MarkPromptCalibrationFinished":
+            self.factory.finished.append( (args[0], args[1]) )
+            return
+
+        if self.classname == "ConditionUpload.IsPromptCalibrationFinished":
+            return True
+
+        if self.classname == "ConditionUpload.CompleteFiles":
+            self.factory.completed.extend(args[0])
+            return
+
+        return None
+
+
+class ConditionDAOFactory(object):
+    """
+    _ConditionDAOFactory_
+
+    """
+    def __init__(self, *args, **kwargs):
+        """
+        _init_
+
+        """
+        self.conditions = {}
+        self.finished = []
+        self.completed = []
+
+        return
+
+    def __call__(self, classname):
+        """
+        _call_
+
+        """
+        return ConditionDAO(self, classname)
+
+
+class FakeTransaction(object):
+    """
+    _FakeTransaction_
+
+    """
+    conn = None
+
+    def begin(self):
+        """
+        _begin_
+
+        """
+        return
+
+    def commit(self):
+        """
+        _commit_
+
+        """
+        return
+
+    def rollback(self):
+        """
+        _rollback_
+
+        """
+        return
+
+
+class UploadQueueTest(unittest.TestCase):
+    """
+    _UploadQueueTest_
+
+    Testing the persistent PCL upload queue
+    """
+
+    def setUp(self):
+        """
+        _setUp_
+
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+
+        self.testDir = self.testInit.generateWorkDir()
+
+        self.path = os.path.join(self.testDir, "UploadQueue.db")
+        self.uploadQueue = UploadQueue(self.path, retryDelay = 10, maxRetryDelay = 35)
+
+        # condition upload DAOs are replaced by fakes
+        self.daoFactory = ConditionDAOFactory()
+
+        myThread = threading.currentThread()
+        self.oldDAOFactory = ConditionUploadAPI.DAOFactory
+        self.oldThreadAttributes = dict([ (x, getattr(myThread, x, None)) for x in [ "dbi", "transaction" ] ])
+
+        ConditionUploadAPI.DAOFactory = lambda *args, **kwargs: self.daoFactory
+        myThread.dbi = None
+        myThread.transaction = FakeTransaction()
+
+        return
+
+    def tearDown(self):
+        """
+        _tearDown_
+
+        """
+        ConditionUploadAPI.DAOFactory = self.oldDAOFactory
+
+        myThread = threading.currentThread()
+        for name, value in self.oldThreadAttributes.items():
+            setattr(myThread, name, value)
+
+        self.testInit.delWorkDir()
+
+        return
+
+    def getPayloads(self, prefixes):
+        """
+        _getPayloads_
+
+        Payloads in the format of the queue, sqlite
+        and metadata file per payload name
+
+        """
+        payloads = {}
+        for prefix in prefixes:
+            payloads[prefix] = [ { 'lfn' : "/store/pcl/%s.db" % prefix, 'fileid' : 1, 'subscription' : 1 },
+                                 { 'lfn' : "/store/pcl/%s.txt" % prefix, 'fileid' : 2, 'subscription' : 1 } ]
+
+        return payloads
+
+    def execute(self, sql, binds = ()):
+        """
+        _execute_
+
+        Direct access to the queue database
+
+        """
+        conn = sqlite3.connect(self.path)
+        try:
+            results = conn.execute(sql, binds).fetchall()
+            conn.commit()
+        finally:
+            conn.close()
+
+        return results
+
+    def test00(self):
+        """
+        _test00_
+
+        Enqueuing is idempotent, payloads already
+        in the queue are not changed
+
+        """
+        self.uploadQueue.enqueue(1, 1, "host", False, self.getPayloads([ "a", "b" ]))
+        self.uploadQueue.enqueue(1, 1, "otherhost", True, self.getPayloads([ "a" ]))
+
+        self.assertEqual(self.execute("SELECT COUNT(*) FROM payload")[0][0], 2,
+                         "ERROR: payloads should only be queued once")
+
+        payloads = self.uploadQueue.getDuePayloads()
+
+        self.assertEqual(sorted([ x['name'] for x in payloads ]), [ "a", "b" ],
+                         "ERROR: both payloads should be due")
+        self.assertEqual(set([ (x['dropboxHost'], x['validationMode']) for x in payloads ]), set([ ("host", False) ]),
+                         "ERROR: queued payloads should not be changed")
+        self.assertEqual(payloads[0]['files'], self.getPayloads([ payloads[0]['name'] ])[payloads[0]['name']],
+                         "ERROR: files not stored")
+
+        return
+
+    def test01(self):
+        """
+        _test01_
+
+        Failed payloads are retried with an exponential
+        (capped) backoff and are not due meanwhile
+
+        """
+        self.uploadQueue.enqueue(1, 1, "host", False, self.getPayloads([ "a" ]))
+
+        delays = []
+        for i in range(4):
+            payload = self.uploadQueue.getDuePayloads()[0]
+            self.assertEqual(payload['attempts'], i,
+                             "ERROR: attempts not counted")
+
+            startTime = int(time.time())
+            delays.append(self.uploadQueue.markFailed(payload, "upload failed"))
+
+            nextAttempt = self.execute("SELECT next_attempt FROM payload")[0][0]
+            self.assertTrue(startTime + delays[-1] <= nextAttempt <= int(time.time()) + delays[-1],
+                            "ERROR: next attempt should be after the delay")
+            self.assertEqual(self.uploadQueue.getDuePayloads(), [],
+                             "ERROR: failed payload should not be due before the next attempt")
+
+            self.execute("UPDATE payload SET next_attempt = 0")
+
+        self.assertEqual(delays, [ 10, 20, 35, 35 ],
+                         "ERROR: retry delay should double up to the maximum")
+
+        return
+
+    def test02(self):
+        """
+        _test02_
+
+        Pending payloads are counted per run/stream,
+        uploaded ones are removed once they are old
+
+        """
+        self.uploadQueue.enqueue(1, 1, "host", False, self.getPayloads([ "a", "b" ]))
+        self.uploadQueue.enqueue(1, 2, "host", False, self.getPayloads([ "c" ]))
+        self.uploadQueue.enqueue(2, 1, "host", False, self.getPayloads([ "d" ]))
+
+        payloads = dict([ (x['name'], x) for x in self.uploadQueue.getDuePayloads() ])
+        self.uploadQueue.markFailed(payloads['a'])
+        self.uploadQueue.markDone(payloads['d'])
+
+        self.assertEqual(self.uploadQueue.getPendingRunStreams(),
+                         { 1 : { 1 : { 'pending' : 2, 'failed' : 1 },
+                                 2 : { 'pending' : 1, 'failed' : 0 } } },
+                         "ERROR: wrong pending run/streams")
+
+        self.uploadQueue.purge()
+
+        self.assertEqual(self.execute("SELECT COUNT(*) FROM payload")[0][0], 4,
+                         "ERROR: recently uploaded payload should be kept")
+
+        self.execute("UPDATE payload SET done_time = 0 WHERE name = 'd'")
+        self.uploadQueue.purge()
+
+        self.assertEqual(sorted([ x[0] for x in self.execute("SELECT name FROM payload") ]), [ "a", "b", "c" ],
+                         "ERROR: only the old uploaded payload should be removed")
+
+        return
+
+    def test03(self):
+        """
+        _test03_
+
+        queueConditions only marks a run/stream PCL
+        as finished once it has no queued payloads
+
+        """
+        daoFactory = self.daoFactory
+
+        runConditions = { 'condUploadTimeout' : 3600,
+                          'dropboxHost' : "host",
+                          'validationMode' : False }
+
+        daoFactory.conditions = { 1 : dict(runConditions, streams = { 1 : self.getPayloads([ "a" ])['a'] }) }
+        ConditionUploadAPI.queueConditions(self.uploadQueue)
+
+        self.assertEqual(self.uploadQueue.getPendingRunStreams(), { 1 : { 1 : { 'pending' : 1, 'failed' : 0 } } },
+                         "ERROR: payload should have been queued")
+        self.assertEqual(daoFactory.finished, [],
+                         "ERROR: run/stream with new payloads should not be finished")
+
+        # files stay acquired until uploaded
+        daoFactory.conditions = { 1 : dict(runConditions, streams = { 1 : [] }) }
+        ConditionUploadAPI.queueConditions(self.uploadQueue)
+
+        self.assertEqual(daoFactory.finished, [],
+                         "ERROR: run/stream with queued payloads should not be finished")
+
+        self.uploadQueue.markDone(self.uploadQueue.getDuePayloads()[0])
+        ConditionUploadAPI.queueConditions(self.uploadQueue)
+
+        self.assertEqual(daoFactory.finished, [ (1, 1) ],
+                         "ERROR: run/stream should be finished after the upload")
+
+        return
+
+    def test04(self):
+        """
+        _test04_
+
+        processUploadQueue completes the files of uploaded
+        payloads and reschedules the failed ones
+
+        """
+        storageDir = os.path.join(self.testDir, "storage")
+        os.makedirs(storageDir + "/store/pcl")
+
+        # only the files of payload a exist
+        payloads = self.getPayloads([ "a", "b" ])
+        for condFile in payloads['a']:
+            fout = open(storageDir + condFile['lfn'], 'w')
+            fout.write("payload")
+            fout.close()
+
+        payloadCache = PayloadCache(os.path.join(self.testDir, "cache"), LocalTransfer(storageDir))
+
+        self.uploadQueue.enqueue(1, 1, "host", False, payloads)
+
+        # without credentials the upload is skipped and counts as done
+        ConditionUploadAPI.processUploadQueue(self.uploadQueue, payloadCache, None, None, None, maxWorkers = 2)
+
+        self.assertEqual(self.daoFactory.completed, [ { 'FILEID' : 1, 'SUBSCRIPTION' : 1 },
+                                                      { 'FILEID' : 2, 'SUBSCRIPTION' : 1 } ],
+                         "ERROR: files of the uploaded payload should be completed")
+        self.assertEqual(self.uploadQueue.getPendingRunStreams(), { 1 : { 1 : { 'pending' : 1, 'failed' : 1 } } },
+                         "ERROR: only the payload that can't be staged should be pending")
+        self.assertEqual(self.uploadQueue.getDuePayloads(), [],
+                         "ERROR: failed payload should wait for its next attempt")
+
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+"""
+_Upload_t_
+
+Testing the Dropbox upload client against a local stand-in
+
+"""
+import unittest
+import threading
+import tempfile
+import tarfile
+import hashlib
+import base64
+import json
+import time
+import cgi
+import os
+
+import BaseHTTPServer
+import SocketServer
+
+from multiprocessing.pool import ThreadPool
+
+from WMQuality.TestInit import TestInit
+
+from T0.ConditionUpload import upload
+
+
+class DropboxHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """
+    _DropboxHandler_
+
+    Hands out a token and accepts uploads made with it,
+    keeps the uploaded files and counts how many
+    uploads run concurrently
+
+    """
+    def log_message(self, format, *args):
+        """
+        _log_message_
+
+        """
+        return
+
+    def reply(self, data):
+        """
+        _reply_
+
+        """
+        body = json.dumps(data)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+        return
+
+    def do_GET(self):
+        """
+        _do_GET_
+
+        """
+        self.server.dropbox.tokens += 1
+        self.reply( { 'token' : "testtoken" } )
+
+        return
+
+    def do_POST(self):
+        """
+        _do_POST_
+
+        """
+        dropbox = self.server.dropbox
+
+        form = cgi.FieldStorage(fp = self.rfile, headers = self.headers,
+                                environ = { 'REQUEST_METHOD' : "POST",
+                                            'CONTENT_TYPE' : self.headers.getheader("Content-Type") })
+
+        credentials = base64.b64decode(self.headers.getheader("Authorization", "Basic ").split(" ", 1)[1])
+        if not credentials.startswith("testtoken:"):
+            self.send_error(401)
+            return
+
+        with dropbox.lock:
+            dropbox.active += 1
+            dropbox.maxActive = max(dropbox.maxActive, dropbox.active)
+        time.sleep(0.5)
+        with dropbox.lock:
+            dropbox.active -= 1
+            dropbox.uploads += 1
+            dropbox.files[form['uploadedFile'].filename] = form['uploadedFile'].value
+
+        self.reply( { 'upload' : { 'itemStatus' : { 'tag' : { 'status' : "ok", 'info' : "" } } } } )
+
+        return
+
+
+class DropboxServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """
+    _DropboxServer_
+
+    """
+    daemon_threads = True
+
+
+class StandInDropbox(object):
+    """
+    _StandInDropbox_
+
+    Local Dropbox stand-in served from a thread
+
+    """
+    def __init__(self):
+        """
+        _init_
+
+        """
+        self.lock = threading.Lock()
+        self.tokens = 0
+        self.uploads = 0
+        self.active = 0
+        self.maxActive = 0
+        self.files = {}
+
+        self.server = DropboxServer(("127.0.0.1", 0), DropboxHandler)
+        self.server.dropbox = self
+        self.thread = threading.Thread(target = self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+        return
+
+    def getUrlTemplate(self):
+        """
+        _getUrlTemplate_
+
+        """
+        return "http://%%s:%d/" % self.server.server_address[1]
+
+    def stop(self):
+        """
+        _stop_
+
+        """
+        self.server.shutdown()
+        self.server.server_close()
+
+        return
+
+
+class UploadTest(unittest.TestCase):
+    """
+    _UploadTest_
+
+    Testing the Dropbox upload client against a local stand-in
+    """
+
+    def setUp(self):
+        """
+        _setUp_
+
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+
+        self.testDir = self.testInit.generateWorkDir()
+
+        self.dropbox = StandInDropbox()
+
+        return
+
+    def tearDown(self):
+        """
+        _tearDown_
+
+        """
+        self.dropbox.stop()
+        self.testInit.delWorkDir()
+
+        return
+
+    def createPayload(self, name, data):
+        """
+        _createPayload_
+
+        sqlite and metadata file of a payload,
+        returns the path without extension
+
+        """
+        basepath = os.path.join(self.testDir, name)
+
+        fout = open(basepath + ".db", 'wb')
+        fout.write(data)
+        fout.close()
+
+        fout = open(basepath + ".txt", 'w')
+        json.dump( { 'destinationDatabase' : "oracle://cms_orcon_prod/CMS_CONDITIONS",
+                     'destinationTags' : { 'tag' : {} },
+                     'inputTag' : name,
+                     'since' : None,
+                     'userText' : "" }, fout)
+        fout.close()
+
+        return basepath
+
+    def createTarball(self, basepath, temporaryFile):
+        """
+        _createTarball_
+
+        Payload tarball written to disk and hashed
+        afterwards like the uploader used to do it
+
+        """
+        tarFile = tarfile.open(temporaryFile, 'w:bz2')
+
+        with open('%s.db' % basepath, 'rb') as data:
+            upload.addToTarFile(tarFile, data, 'data.db')
+
+        with tempfile.NamedTemporaryFile() as metadata:
+            with open('%s.txt' % basepath, 'rb') as originalMetadata:
+                json.dump(json.load(originalMetadata), metadata, sort_keys = True, indent = 4)
+            metadata.seek(0)
+            upload.addToTarFile(tarFile, metadata, 'metadata.txt')
+
+        tarFile.close()
+
+        fin = open(temporaryFile, 'rb')
+        tarball = fin.read()
+        fin.close()
+
+        return tarball
+
+    def test00(self):
+        """
+        _test00_
+
+        Uploads of several threads through one signed
+        in uploader run concurrently with one sign in
+
+        """
+        dropBox = upload.ConditionsUploader(hostname = "127.0.0.1", urlTemplate = self.dropbox.getUrlTemplate())
+
+        self.assertTrue(dropBox.signIn("user", "password"),
+                        "ERROR: sign in should work")
+
+        payloads = [ self.createPayload("payload%d" % x, os.urandom(1024)) for x in range(4) ]
+
+        def uploadPayload(basepath):
+            return dropBox.uploadFile(basepath + ".db", temporaryFile = basepath + ".tar.bz2")
+
+        uploadPool = ThreadPool(4)
+        try:
+            results = uploadPool.map(uploadPayload, payloads)
+        finally:
+            uploadPool.close()
+            uploadPool.join()
+
+        self.assertEqual(results, [ True ] * 4,
+                         "ERROR: all uploads should have worked")
+        self.assertEqual(self.dropbox.uploads, 4,
+                         "ERROR: dropbox should have received four uploads")
+        self.assertEqual(self.dropbox.tokens, 1,
+                         "ERROR: uploader should only sign in once")
+        self.assertTrue(self.dropbox.maxActive > 1,
+                        "ERROR: uploads should run concurrently")
+
+        return
+
+    def test01(self):
+        """
+        _test01_
+
+        The streamed tarball kept in memory and the one
+        spooled to disk have the same bytes and sha1 as
+        the tarball written to disk and hashed afterwards
+
+        """
+        dropBox = upload.ConditionsUploader(hostname = "127.0.0.1", urlTemplate = self.dropbox.getUrlTemplate())
+        dropBox.signIn("user", "password")
+
+        basepath = self.createPayload("payload", os.urandom(256 * 1024))
+        tarball = self.createTarball(basepath, os.path.join(self.testDir, "old.tar.bz2"))
+        fileHash = hashlib.sha1(tarball).hexdigest()
+
+        for spoolThreshold in [ 10 * len(tarball), len(tarball) // 10 ]:
+
+            self.dropbox.files = {}
+
+            temporaryFile = os.path.join(self.testDir, "new.tar.bz2")
+            self.assertTrue(dropBox.uploadFile(basepath + ".db", temporaryFile = temporaryFile,
+                                               spoolThreshold = spoolThreshold),
+                            "ERROR: upload should have worked")
+
+            self.assertEqual(list(self.dropbox.files.keys()), [ fileHash ],
+                             "ERROR: tarball should be uploaded under the sha1 of the old tarball")
+            self.assertEqual(self.dropbox.files[fileHash], tarball,
+                             "ERROR: tarball should have the bytes of the old tarball")
+            self.assertFalse(os.path.exists(temporaryFile) or os.path.exists(fileHash),
+                             "ERROR: spooled tarball not removed")
+
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python
+"""
+_ConnectionManager_t_
+
+Testing the connection manager for the external databases
+
+"""
+import unittest
+import threading
+import logging
+import time
+import os
+
+from WMQuality.TestInit import TestInit
+from WMCore.Database.DBFactory import DBFactory
+
+from T0.Database.ConnectionManager import ConnectionManager, ManagedDBInterface, DatabaseUnavailable
+
+
+class FailingDBInterface(object):
+    """
+    _FailingDBInterface_
+
+    Raises the given errors on processData,
+    then returns the number of calls
+
+    """
+    def __init__(self, errors):
+        """
+        _init_
+
+        """
+        self.errors = list(errors)
+        self.calls = 0
+
+        return
+
+    def processData(self, sqlstmt, binds = {}, conn = None,
+                    transaction = False, returnCursor = False):
+        """
+        _processData_
+
+        """
+        self.calls += 1
+        if len(self.errors) > 0:
+            raise self.errors.pop(0)
+
+        return self.calls
+
+
+class ConnectionManagerTest(unittest.TestCase):
+    """
+    _ConnectionManagerTest_
+
+    Testing the connection manager for the external databases
+    """
+
+    def setUp(self):
+        """
+        _setUp_
+
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+
+        self.testDir = self.testInit.generateWorkDir()
+
+        self.connectionManager = ConnectionManager(retryDelay = 10, maxRetryDelay = 25)
+
+        return
+
+    def tearDown(self):
+        """
+        _tearDown_
+
+        """
+        self.connectionManager.close()
+        self.testInit.delWorkDir()
+
+        return
+
+    def test00(self):
+        """
+        _test00_
+
+        Connection errors make the database unavailable for
+        an exponentially growing (capped) retry delay, other
+        errors don't, a successful call resets the backoff
+
+        """
+        dbInterface = FailingDBInterface([ RuntimeError("ORA-00942: table or view does not exist"),
+                                           RuntimeError("ORA-03113: end-of-file on communication channel"),
+                                           RuntimeError("ORA-12170: TNS:Connect timeout occurred"),
+                                           RuntimeError("ORA-12170: TNS:Connect timeout occurred") ])
+        managedDBInterface = ManagedDBInterface("Test", dbInterface, retryDelay = 10, maxRetryDelay = 25)
+
+        self.assertRaises(RuntimeError, managedDBInterface.processData, "SELECT 1")
+        self.assertTrue(managedDBInterface.isAvailable(),
+                        "ERROR: database should be available after a query error")
+
+        delays = []
+        for i in range(3):
+            managedDBInterface.nextAttempt = 0
+            startTime = time.time()
+            self.assertRaises(RuntimeError, managedDBInterface.processData, "SELECT 1")
+            self.assertFalse(managedDBInterface.isAvailable(),
+                             "ERROR: database should be unavailable after a connection error")
+            self.assertRaises(DatabaseUnavailable, managedDBInterface.processData, "SELECT 1")
+            delays.append(managedDBInterface.nextAttempt - startTime)
+
+        self.assertEqual([ round(x) for x in delays ], [ 10, 20, 25 ],
+                         "ERROR: retry delay should double up to the maximum")
+        self.assertEqual(dbInterface.calls, 4,
+                         "ERROR: calls while unavailable should not reach the database")
+
+        managedDBInterface.nextAttempt = 0
+        self.assertEqual(managedDBInterface.processData("SELECT 1"), 5,
+                         "ERROR: query should go through after the retry delay")
+        self.assertEqual(managedDBInterface.failures, 0,
+                         "ERROR: failures should be reset after a successful call")
+
+        return
+
+    def test01(self):
+        """
+        _test01_
+
+        Databases are connected on first use with
+        lazy and at startup without, a pool size
+        is applied to the database only
+
+        """
+        connectUrl = "sqlite:///%s" % os.path.join(self.testDir, "Test.db")
+
+        lazyDBInterface = self.connectionManager.addDatabase("Lazy", connectUrl, lazy = True)
+        eagerDBInterface = self.connectionManager.addDatabase("Eager", connectUrl, lazy = False)
+
+        self.assertFalse(lazyDBInterface.isConnected(),
+                         "ERROR: lazy database should not be connected")
+        self.assertTrue(eagerDBInterface.isConnected(),
+                        "ERROR: eager database should be connected")
+
+        self.assertEqual(self.connectionManager.checkHealth(), { 'Lazy' : True, 'Eager' : True },
+                         "ERROR: both databases should be healthy")
+        self.assertTrue(lazyDBInterface.isConnected(),
+                        "ERROR: lazy database should be connected after first use")
+
+        return
+
+    def test02(self):
+        """
+        _test02_
+
+        Calls in a worker thread get their own T0AST
+        DBInterface from the DBFactory of the caller,
+        wrapped with the dbiWrapper
+
+        """
+        dbFactory = DBFactory(logging, dburl = "sqlite:///%s" % os.path.join(self.testDir, "T0AST.db"), options = {})
+
+        wrapped = []
+        def dbiWrapper(dbi):
+            wrapped.append(dbi)
+            return dbi
+        self.connectionManager.dbiWrapper = dbiWrapper
+
+        def getWorkerDBInterface():
+            myThread = threading.currentThread()
+            return (myThread.dbi, myThread.transaction.dbi)
+
+        myThread = threading.currentThread()
+        oldDBFactory = getattr(myThread, "dbFactory", None)
+        oldDBInterface = getattr(myThread, "dbi", None)
+        try:
+            myThread.dbFactory = dbFactory
+            myThread.dbi = dbFactory.connect()
+
+            (workerDBInterface, transactionDBInterface) = self.connectionManager.submit("Test", getWorkerDBInterface).get(60)
+
+            self.assertFalse(workerDBInterface is myThread.dbi,
+                             "ERROR: worker should not share the T0AST DBInterface")
+            self.assertTrue(workerDBInterface.engine is myThread.dbi.engine,
+                            "ERROR: worker should share the T0AST engine")
+
+        finally:
+            myThread.dbFactory = oldDBFactory
+            myThread.dbi = oldDBInterface
+
+        self.assertTrue(transactionDBInterface is workerDBInterface,
+                        "ERROR: worker transaction should use the worker DBInterface")
+        self.assertEqual(wrapped, [ workerDBInterface ],
+                         "ERROR: worker DBInterface should have been wrapped")
+
+        return
+
+    def test03(self):
+        """
+        _test03_
+
+        A lazy database only connects on access to
+        DBInterface attributes, other attribute
+        lookups fail without connecting
+
+        """
+        connections = []
+        def connector():
+            connections.append(FailingDBInterface([]))
+            return connections[-1]
+
+        managedDBInterface = ManagedDBInterface("Test", None, connector = connector)
+
+        self.assertFalse(hasattr(managedDBInterface, "__deepcopy__"),
+                         "ERROR: private attributes should not be passed through")
+        self.assertFalse(hasattr(managedDBInterface, "someAttribute"),
+                         "ERROR: unknown attributes should not be passed through")
+        self.assertFalse(managedDBInterface.isConnected(),
+                         "ERROR: attribute lookups should not connect")
+        self.assertEqual(connections, [],
+                         "ERROR: connector should not have been called")
+
+        self.assertEqual(managedDBInterface.processData("SELECT 1"), 1,
+                         "ERROR: query should go to the connected DBInterface")
+        self.assertTrue(managedDBInterface.isConnected(),
+                        "ERROR: database should be connected after first use")
+
+        managedDBInterface.processData("SELECT 1")
+        self.assertEqual(len(connections), 1,
+                         "ERROR: database should be connected once")
+
+        return
+
+    def test04(self):
+        """
+        _test04_
+
+        The startup health check connects the lazy databases
+        in the background, waiting for it returns the ones
+        that can't be used, once
+
+        """
+        self.assertEqual(self.connectionManager.waitHealthCheck(), [],
+                         "ERROR: there should be nothing to wait for without a health check")
+
+        goodDBInterface = self.connectionManager.addDatabase("Good", "sqlite:///%s" % os.path.join(self.testDir, "Test.db"),
+                                                             lazy = True)
+        self.connectionManager.addDatabase("Bad", "sqlite:///%s" % os.path.join(self.testDir, "missing", "Test.db"),
+                                           lazy = True)
+
+        self.connectionManager.startHealthCheck()
+
+        self.assertEqual(self.connectionManager.waitHealthCheck(), [ "Bad" ],
+                         "ERROR: only the unreachable database should have failed")
+        self.assertTrue(goodDBInterface.isConnected(),
+                        "ERROR: health check should have connected the database")
+        self.assertFalse(self.connectionManager.getDBInterface("Bad").isAvailable(),
+                         "ERROR: unreachable database should be backing off")
+
+        self.assertEqual(self.connectionManager.waitHealthCheck(), [],
+                         "ERROR: health check result should only be returned once")
+
+        return
+
+if __name__ == '__main__':
+    unittest.main()
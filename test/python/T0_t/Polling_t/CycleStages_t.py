@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+"""
+_CycleStages_t_
+
+Testing the stages of a Tier0Feeder cycle that can wait
+
+"""
+import unittest
+import time
+
+from WMQuality.TestInit import TestInit
+
+from T0.Polling.CycleStages import CycleStages
+
+
+class CycleStagesTest(unittest.TestCase):
+    """
+    _CycleStagesTest_
+
+    Testing the stages of a Tier0Feeder cycle that can wait
+    """
+
+    def setUp(self):
+        """
+        _setUp_
+
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+
+        self.calls = []
+        self.deadlines = {}
+
+        return
+
+    def makeStage(self, name, complete = True, duration = 0, failing = False):
+        """
+        _makeStage_
+
+        Stage function that records its call and deadline
+
+        """
+        def stage(deadline = None):
+            self.calls.append(name)
+            self.deadlines[name] = deadline
+            if duration > 0:
+                time.sleep(duration)
+            if failing:
+                raise RuntimeError("Stage %s failed" % name)
+            return complete
+
+        return stage
+
+    def test00(self):
+        """
+        _test00_
+
+        Stages run in priority order, leader only
+        stages are skipped on a non leader
+
+        """
+        cycleStages = CycleStages()
+        cycleStages.addStage("third", 30, self.makeStage("third"))
+        cycleStages.addStage("first", 10, self.makeStage("first"), leaderOnly = False)
+        cycleStages.addStage("second", 20, self.makeStage("second"))
+
+        cycleStages.run(time.time())
+
+        self.assertEqual(self.calls, [ "first", "second", "third" ],
+                         "ERROR: stages not run in priority order")
+
+        self.calls = []
+        cycleStages.run(time.time(), leader = False)
+
+        self.assertEqual(self.calls, [ "first" ],
+                         "ERROR: leader only stages run on a non leader")
+
+        self.assertEqual(cycleStages.getMetrics()['first']['runs'], 2,
+                         "ERROR: stage runs not counted")
+
+        return
+
+    def test01(self):
+        """
+        _test01_
+
+        Without budgets budgeted stages get no deadline, with budgets
+        the deadline is limited by the stage and the cycle budget
+
+        """
+        cycleStages = CycleStages()
+        cycleStages.addStage("stage", 10, self.makeStage("stage"), budgeted = True)
+
+        cycleStages.run(time.time())
+
+        self.assertEqual(self.deadlines['stage'], None,
+                         "ERROR: stage without budget should get no deadline")
+
+        cycleStages = CycleStages(budgets = { 'stage' : 100 })
+        cycleStages.addStage("stage", 10, self.makeStage("stage"), budgeted = True)
+
+        startTime = time.time()
+        cycleStages.run(startTime)
+
+        self.assertTrue(startTime + 100 <= self.deadlines['stage'] <= time.time() + 100,
+                        "ERROR: deadline should be the stage budget after the stage start")
+
+        cycleStages = CycleStages(budgets = { 'stage' : 100 }, cycleBudget = 50)
+        cycleStages.addStage("stage", 10, self.makeStage("stage"), budgeted = True)
+        cycleStages.addStage("other", 20, self.makeStage("other"), budgeted = True)
+
+        cycleStart = time.time() - 10
+        cycleStages.run(cycleStart)
+
+        self.assertEqual(self.deadlines['stage'], cycleStart + 50,
+                         "ERROR: deadline should be limited by the cycle budget")
+        self.assertEqual(self.deadlines['other'], cycleStart + 50,
+                         "ERROR: stage without budget should get the cycle deadline")
+
+        return
+
+    def test02(self):
+        """
+        _test02_
+
+        Only stages that return False count as deferred,
+        stages running longer than their budget as overrun
+
+        """
+        cycleStages = CycleStages(budgets = { 'done' : 0, 'deferred' : 0, 'plain' : 100 })
+        cycleStages.addStage("done", 10, self.makeStage("done", duration = 0.01), budgeted = True)
+        cycleStages.addStage("deferred", 20, self.makeStage("deferred", complete = False), budgeted = True)
+        cycleStages.addStage("plain", 30, self.makeStage("plain", complete = None), budgeted = True)
+
+        cycleStages.run(time.time())
+
+        metrics = cycleStages.getMetrics()
+
+        self.assertEqual(metrics['done']['deferred'], 0,
+                         "ERROR: completed stage past its deadline counted as deferred")
+        self.assertEqual(metrics['done']['overruns'], 1,
+                         "ERROR: stage over its budget not counted as overrun")
+        self.assertTrue(metrics['done']['overrunSeconds'] > 0,
+                        "ERROR: overrun time not recorded")
+
+        self.assertEqual(metrics['deferred']['deferred'], 1,
+                         "ERROR: stage with work left not counted as deferred")
+
+        self.assertEqual(metrics['plain']['deferred'], 0,
+                         "ERROR: stage without return value counted as deferred")
+        self.assertEqual(metrics['plain']['overruns'], 0,
+                         "ERROR: stage within its budget counted as overrun")
+
+        return
+
+    def test03(self):
+        """
+        _test03_
+
+        A failing stage is counted, fails the
+        cycle and the later stages are not run
+
+        """
+        cycleStages = CycleStages()
+        cycleStages.addStage("failing", 10, self.makeStage("failing", failing = True))
+        cycleStages.addStage("later", 20, self.makeStage("later"))
+
+        self.assertRaises(RuntimeError, cycleStages.run, time.time())
+
+        self.assertEqual(self.calls, [ "failing" ],
+                         "ERROR: stages after a failing one should not run")
+
+        metrics = cycleStages.getMetrics()
+
+        self.assertEqual(metrics['failing']['failures'], 1,
+                         "ERROR: stage failure not counted")
+        self.assertEqual(metrics['failing']['runs'], 1,
+                         "ERROR: failing stage run not counted")
+        self.assertEqual(metrics['later']['runs'], 0,
+                         "ERROR: later stage counted as run")
+
+        return
+
+    def test04(self):
+        """
+        _test04_
+
+        The renew function is called before every stage
+        and decides whether leader only stages run
+
+        """
+        leaderStates = [ True, False, True ]
+        def renewFunc():
+            return leaderStates.pop(0)
+
+        cycleStages = CycleStages()
+        cycleStages.addStage("first", 10, self.makeStage("first"))
+        cycleStages.addStage("second", 20, self.makeStage("second"))
+        cycleStages.addStage("third", 30, self.makeStage("third"))
+
+        cycleStages.run(time.time(), leader = False, renewFunc = renewFunc)
+
+        self.assertEqual(self.calls, [ "first", "third" ],
+                         "ERROR: leader only stage should be skipped after losing the leader role")
+        self.assertEqual(leaderStates, [],
+                         "ERROR: renew function should be called before every stage")
+
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+"""
+_PollScheduler_t_
+
+Testing the adaptive poll interval of the Tier0Feeder
+
+"""
+import unittest
+
+from WMQuality.TestInit import TestInit
+
+from T0.Polling.PollScheduler import PollScheduler
+
+
+class CountingTrigger(object):
+    """
+    _CountingTrigger_
+
+    Fires as often as told, fails if told so
+
+    """
+    name = "counting"
+
+    def __init__(self):
+        """
+        _init_
+
+        """
+        self.pending = 0
+        self.failing = False
+        self.closed = False
+
+        return
+
+    def check(self):
+        """
+        _check_
+
+        """
+        if self.failing:
+            raise RuntimeError("Trigger failed")
+
+        fired = self.pending > 0
+        self.pending = 0
+
+        return fired
+
+    def close(self):
+        """
+        _close_
+
+        """
+        self.closed = True
+
+        return
+
+
+class PollSchedulerTest(unittest.TestCase):
+    """
+    _PollSchedulerTest_
+
+    Testing the adaptive poll interval of the Tier0Feeder
+    """
+
+    def setUp(self):
+        """
+        _setUp_
+
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+
+        return
+
+    def test00(self):
+        """
+        _test00_
+
+        The interval shrinks after cycles with activity and
+        grows after idle ones, within the configured bounds
+
+        """
+        pollScheduler = PollScheduler(60, minInterval = 10, maxInterval = 120,
+                                      speedupFactor = 0.5, slowdownFactor = 1.5)
+
+        self.assertTrue(pollScheduler.isDue(currentTime = 1000),
+                        "ERROR: first cycle should be due right away")
+
+        pollScheduler.startCycle(currentTime = 1000)
+        pollScheduler.recordActivity("streamers feed", 10)
+        self.assertEqual(pollScheduler.endCycle(), 30,
+                         "ERROR: interval should be halved after activity")
+
+        self.assertFalse(pollScheduler.isDue(currentTime = 1029),
+                         "ERROR: cycle should not be due before the interval")
+        self.assertTrue(pollScheduler.isDue(currentTime = 1030),
+                        "ERROR: cycle should be due after the interval")
+
+        intervals = []
+        for cycle in range(3):
+            pollScheduler.startCycle(currentTime = 2000 + cycle)
+            pollScheduler.recordActivity("closed lumis", 1)
+            intervals.append(pollScheduler.endCycle())
+
+        self.assertEqual(intervals, [ 15, 10, 10 ],
+                         "ERROR: interval should shrink down to the minimum")
+
+        intervals = []
+        for cycle in range(6):
+            pollScheduler.startCycle(currentTime = 3000 + cycle)
+            pollScheduler.recordActivity("closed lumis", 0)
+            intervals.append(pollScheduler.endCycle())
+
+        self.assertEqual(intervals, [ 15, 22.5, 33.75, 50.625, 75.9375, 113.90625 ],
+                         "ERROR: interval should grow after idle cycles")
+
+        pollScheduler.startCycle(currentTime = 4000)
+        self.assertEqual(pollScheduler.endCycle(), 120,
+                         "ERROR: interval should be capped at the maximum")
+
+        return
+
+    def test01(self):
+        """
+        _test01_
+
+        A fired wakeup trigger makes a cycle due right
+        away, a failing trigger is ignored
+
+        """
+        wakeupTrigger = CountingTrigger()
+        pollScheduler = PollScheduler(60, wakeupTrigger = wakeupTrigger)
+
+        pollScheduler.startCycle(currentTime = 1000)
+        pollScheduler.endCycle()
+
+        self.assertFalse(pollScheduler.isDue(currentTime = 1001),
+                         "ERROR: cycle should not be due")
+
+        wakeupTrigger.pending = 1
+        self.assertTrue(pollScheduler.isDue(currentTime = 1002),
+                        "ERROR: cycle should be due after the trigger fired")
+        self.assertFalse(pollScheduler.isDue(currentTime = 1003),
+                         "ERROR: trigger should only fire once")
+
+        wakeupTrigger.failing = True
+        self.assertFalse(pollScheduler.isDue(currentTime = 1004),
+                         "ERROR: failing trigger should not make a cycle due")
+        self.assertTrue(pollScheduler.isDue(currentTime = 1060),
+                        "ERROR: cycle should be due after the interval")
+
+        pollScheduler.close()
+        self.assertTrue(wakeupTrigger.closed,
+                        "ERROR: trigger should have been closed")
+
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+"""
+_WakeupTrigger_t_
+
+Testing the Tier0Feeder wakeup triggers
+
+"""
+import unittest
+import socket
+import os
+
+from WMQuality.TestInit import TestInit
+
+from T0.Polling.WakeupTrigger import getWakeupTrigger, socketTriggers
+
+
+class WakeupTriggerTest(unittest.TestCase):
+    """
+    _WakeupTriggerTest_
+
+    Testing the Tier0Feeder wakeup triggers
+    """
+
+    def setUp(self):
+        """
+        _setUp_
+
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+
+        self.testDir = self.testInit.generateWorkDir()
+
+        return
+
+    def tearDown(self):
+        """
+        _tearDown_
+
+        """
+        self.testInit.delWorkDir()
+
+        return
+
+    def test00(self):
+        """
+        _test00_
+
+        File trigger fires once per change
+        of the modification time
+
+        """
+        path = os.path.join(self.testDir, "wakeup")
+
+        wakeupTrigger = getWakeupTrigger("file", path = path)
+
+        self.assertFalse(wakeupTrigger.check(),
+                         "ERROR: missing file should not fire")
+
+        open(path, "w").close()
+        os.utime(path, (1000, 1000))
+
+        self.assertTrue(wakeupTrigger.check(),
+                        "ERROR: new file should fire")
+        self.assertFalse(wakeupTrigger.check(),
+                         "ERROR: unchanged file should not fire")
+
+        os.utime(path, (2000, 2000))
+
+        self.assertTrue(wakeupTrigger.check(),
+                        "ERROR: touched file should fire")
+
+        wakeupTrigger.close()
+
+        return
+
+    def test01(self):
+        """
+        _test01_
+
+        Socket trigger is shared by all workers, each of
+        them sees every wakeup, the socket is removed
+        with the last worker
+
+        """
+        path = os.path.join(self.testDir, "wakeup.sock")
+
+        wakeupTrigger1 = getWakeupTrigger("socket", path = path)
+        wakeupTrigger2 = getWakeupTrigger("socket", path = path)
+
+        self.assertTrue(wakeupTrigger1.trigger is wakeupTrigger2.trigger,
+                        "ERROR: workers should share the socket")
+
+        self.assertFalse(wakeupTrigger1.check(),
+                         "ERROR: trigger should not have fired")
+
+        sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            sender.sendto(b"new", path)
+            sender.sendto(b"new", path)
+        finally:
+            sender.close()
+
+        self.assertTrue(wakeupTrigger1.check(),
+                        "ERROR: first worker should have been woken up")
+        self.assertFalse(wakeupTrigger1.check(),
+                         "ERROR: first worker should only be woken up once")
+        self.assertTrue(wakeupTrigger2.check(),
+                        "ERROR: second worker should have been woken up")
+        self.assertFalse(wakeupTrigger2.check(),
+                         "ERROR: second worker should only be woken up once")
+
+        wakeupTrigger1.close()
+
+        self.assertTrue(os.path.exists(path),
+                        "ERROR: socket should stay while a worker uses it")
+
+        wakeupTrigger2.close()
+
+        self.assertFalse(os.path.exists(path),
+                         "ERROR: socket should have been removed")
+        self.assertEqual(socketTriggers, {},
+                         "ERROR: no socket trigger should be left")
+
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+"""
+_T0RequestDBWriter_t_
+
+Testing the bulk operations of the T0RequestDBWriter
+
+"""
+import unittest
+import copy
+
+from WMQuality.TestInit import TestInit
+
+from T0.RequestDB.T0RequestDBWriter import T0RequestDBWriter, isAllowedTransition
+
+
+class FakeCouchDB(object):
+    """
+    _FakeCouchDB_
+
+    Keeps the documents in memory and answers _all_docs
+    and _bulk_docs requests like couch does, documents
+    in changed are modified between read and write
+
+    """
+    name = "t0_request"
+
+    def __init__(self):
+        """
+        _init_
+
+        """
+        self.docs = {}
+        self.deleted = set()
+        self.errors = {}
+        self.changed = set()
+        self.requests = 0
+
+        return
+
+    def allDocs(self, options = {}, keys = []):
+        """
+        _allDocs_
+
+        """
+        self.requests += 1
+
+        rows = []
+        for key in keys:
+            if key in self.deleted:
+                rows.append( { 'id' : key, 'key' : key, 'value' : { 'rev' : "2-x", 'deleted' : True }, 'doc' : None } )
+            elif key not in self.docs:
+                rows.append( { 'key' : key, 'error' : "not_found" } )
+            else:
+                doc = self.docs[key]
+                rows.append( { 'id' : key, 'key' : key, 'value' : { 'rev' : doc['_rev'] }, 'doc' : copy.deepcopy(doc) } )
+
+        for key in self.changed:
+            self.docs[key]['_rev'] = "%d-changed" % (int(self.docs[key]['_rev'].split("-")[0]) + 1)
+
+        return { 'rows' : rows }
+
+    def post(self, uri, data):
+        """
+        _post_
+
+        """
+        self.requests += 1
+
+        results = []
+        for doc in data['docs']:
+            docId = doc['_id']
+            if docId in self.errors:
+                results.append( { 'id' : docId, 'error' : self.errors[docId], 'reason' : "not allowed" } )
+            elif doc.get('_rev') != self.docs.get(docId, {}).get('_rev'):
+                results.append( { 'id' : docId, 'error' : "conflict", 'reason' : "Document update conflict." } )
+            else:
+                doc = copy.deepcopy(dict(doc))
+                doc['_rev'] = "%d-x" % (int(doc.get('_rev', "0-x").split("-")[0]) + 1)
+                self.docs[docId] = doc
+                results.append( { 'id' : docId, 'ok' : True, 'rev' : doc['_rev'] } )
+
+        return results
+
+
+class T0RequestDBWriterTest(unittest.TestCase):
+    """
+    _T0RequestDBWriterTest_
+
+    Testing the bulk operations of the T0RequestDBWriter
+    """
+
+    def setUp(self):
+        """
+        _setUp_
+
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+
+        self.requestDB = T0RequestDBWriter("http://localhost:5984/t0_request", couchapp = "T0Request")
+        self.couchDB = FakeCouchDB()
+        self.requestDB.couchDB = self.couchDB
+
+        return
+
+    def test00(self):
+        """
+        _test00_
+
+        Transitions follow the rules of the
+        updaterequest update handler
+
+        """
+        self.assertTrue(isAllowedTransition(None, "new"),
+                        "ERROR: document without status can get any status")
+        self.assertTrue(isAllowedTransition("new", "Closed"),
+                        "ERROR: status change should be allowed")
+        self.assertTrue(isAllowedTransition("Merge", "Closed"),
+                        "ERROR: status change should be allowed in any order")
+        self.assertFalse(isAllowedTransition("Closed", "Closed"),
+                         "ERROR: same status should not be set again")
+        self.assertTrue(isAllowedTransition("completed", "normal-archived"),
+                        "ERROR: completed requests can be archived")
+        self.assertFalse(isAllowedTransition("completed", "Closed"),
+                         "ERROR: completed requests can only be archived")
+        self.assertFalse(isAllowedTransition("normal-archived", "completed"),
+                         "ERROR: archived requests can't change")
+
+        return
+
+    def test01(self):
+        """
+        _test01_
+
+        Inserted documents are OK, existing ones
+        EXISTS, other couch errors are passed on
+
+        """
+        self.assertEqual(self.requestDB.insertGenericRequests([]), {},
+                         "ERROR: nothing should be inserted")
+        self.assertEqual(self.couchDB.requests, 0,
+                         "ERROR: no request should be made without documents")
+
+        self.couchDB.docs['existing'] = { '_id' : "existing", '_rev' : "1-x", 'RequestStatus' : "Closed" }
+        self.couchDB.errors['forbidden'] = "forbidden"
+
+        results = self.requestDB.insertGenericRequests([ { 'RequestName' : x } for x in [ "new", "existing", "forbidden" ] ])
+
+        self.assertEqual(results, { 'new' : "OK",
+                                    'existing' : "EXISTS",
+                                    'forbidden' : "forbidden: not allowed" },
+                         "ERROR: wrong insert results")
+        self.assertEqual(self.couchDB.requests, 1,
+                         "ERROR: documents should be inserted with one request")
+
+        doc = self.couchDB.docs['new']
+        self.assertEqual(doc['RequestStatus'], "new",
+                         "ERROR: inserted document should have status new")
+        self.assertEqual([ x['Status'] for x in doc['RequestTransition'] ], [ "new" ],
+                         "ERROR: inserted document should have the new transition")
+        self.assertEqual(self.couchDB.docs['existing']['RequestStatus'], "Closed",
+                         "ERROR: existing document should not be changed")
+
+        return
+
+    def test02(self):
+        """
+        _test02_
+
+        Updated documents are OK, not allowed transitions
+        NOCHANGE, missing and deleted documents and update
+        conflicts are reported, unknown states are refused
+
+        """
+        for name, status in [ ("updated", "new"), ("unchanged", "Closed"),
+                              ("archived", "normal-archived"), ("conflict", "new") ]:
+            self.couchDB.docs[name] = { '_id' : name, '_rev' : "1-x", 'RequestStatus' : status,
+                                        'RequestTransition' : [ { 'Status' : status, 'UpdateTime' : 0 } ] }
+        self.couchDB.deleted.add("deleted")
+        self.couchDB.changed.add("conflict")
+
+        self.assertRaises(RuntimeError, self.requestDB.updateRequestsStatus, [ "updated" ], "Unknown")
+
+        self.assertEqual(self.requestDB.updateRequestsStatus([], "Closed"), {},
+                         "ERROR: nothing should be updated")
+        self.assertEqual(self.couchDB.requests, 0,
+                         "ERROR: no request should be made without requests")
+
+        results = self.requestDB.updateRequestsStatus([ "updated", "unchanged", "archived", "conflict", "deleted", "missing" ],
+                                                      "Closed")
+
+        self.assertEqual(results, { 'updated' : "OK",
+                                    'unchanged' : "NOCHANGE",
+                                    'archived' : "NOCHANGE",
+                                    'conflict' : "conflict",
+                                    'deleted' : "deleted",
+                                    'missing' : "not_found" },
+                         "ERROR: wrong update results")
+        self.assertEqual(self.couchDB.requests, 2,
+                         "ERROR: documents should be read and written with one request each")
+
+        doc = self.couchDB.docs['updated']
+        self.assertEqual(doc['RequestStatus'], "Closed",
+                         "ERROR: status not updated")
+        self.assertEqual([ x['Status'] for x in doc['RequestTransition'] ], [ "new", "Closed" ],
+                         "ERROR: transition not appended")
+
+        for name, status in [ ("unchanged", "Closed"), ("archived", "normal-archived"), ("conflict", "new") ]:
+            self.assertEqual(self.couchDB.docs[name]['RequestStatus'], status,
+                             "ERROR: document %s should not be changed" % name)
+
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+"""
+_CloseoutScheduler_t_
+
+Testing the candidate handling of the closeout scheduler
+
+"""
+import unittest
+
+from WMQuality.TestInit import TestInit
+
+from T0.RunLumiCloseout.CloseoutScheduler import CloseoutScheduler
+
+
+class CloseoutDAO(object):
+    """
+    _CloseoutDAO_
+
+    Candidates and closeout status out of the
+    factory, none of the run/streams can be closed
+
+    """
+    def __init__(self, factory, classname):
+        """
+        _init_
+
+        """
+        self.factory = factory
+        self.classname = classname
+
+        return
+
+    def execute(self, *args, **kwargs):
+        """
+        _execute_
+
+        """
+        if self.classname == "RunLumiCloseout.GetCloseoutCandidates":
+            self.factory.lookups += 1
+            return list(self.factory.candidates)
+
+        if self.classname == "RunLumiCloseout.GetRunStreamCloseoutStatus":
+            return [ { 'run' : run,
+                       'stream' : stream,
+                       'open' : True,
+                       'fileset' : None,
+                       'stop_time' : 0,
+                       'close_time' : 0 } for (run, stream) in args[0] ]
+
+        return
+
+
+class CloseoutDAOFactory(object):
+    """
+    _CloseoutDAOFactory_
+
+    """
+    def __init__(self, candidates):
+        """
+        _init_
+
+        """
+        self.candidates = candidates
+        self.lookups = 0
+
+        return
+
+    def __call__(self, classname):
+        """
+        _call_
+
+        """
+        return CloseoutDAO(self, classname)
+
+
+class CloseoutSchedulerTest(unittest.TestCase):
+    """
+    _CloseoutSchedulerTest_
+
+    Testing the candidate handling of the closeout scheduler
+    """
+
+    def setUp(self):
+        """
+        _setUp_
+
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+
+        self.daoFactory = CloseoutDAOFactory([ (1, "A"), (1, "B") ])
+
+        return
+
+    def getScheduler(self, **kwargs):
+        """
+        _getScheduler_
+
+        """
+        closeoutScheduler = CloseoutScheduler(**kwargs)
+        closeoutScheduler.getDAOFactory = lambda: self.daoFactory
+
+        return closeoutScheduler
+
+    def test00(self):
+        """
+        _test00_
+
+        Candidates are seeded once and then only
+        maintained from events, until a reset
+
+        """
+        closeoutScheduler = self.getScheduler()
+
+        closeoutScheduler.closeRunStreamFilesets(currentTime = 1000)
+
+        self.daoFactory.candidates.append( (2, "A") )
+        closeoutScheduler.closeRunStreamFilesets(currentTime = 100000)
+
+        self.assertEqual(sorted(closeoutScheduler.getDiagnostics().keys()), [ (1, "A"), (1, "B") ],
+                         "ERROR: candidates should only be seeded once")
+        self.assertEqual(self.daoFactory.lookups, 1,
+                         "ERROR: candidates should only be looked up once")
+
+        closeoutScheduler.addRunStreams([ (2, "A") ])
+        closeoutScheduler.closeRunStreamFilesets(currentTime = 100001)
+
+        self.assertEqual(sorted(closeoutScheduler.getDiagnostics().keys()), [ (1, "A"), (1, "B"), (2, "A") ],
+                         "ERROR: run 2 stream A should be a candidate")
+
+        closeoutScheduler.reset()
+        closeoutScheduler.closeRunStreamFilesets(currentTime = 100002)
+
+        self.assertEqual(self.daoFactory.lookups, 2,
+                         "ERROR: candidates should be seeded again after a reset")
+
+        return
+
+    def test01(self):
+        """
+        _test01_
+
+        With a resync interval candidates seen by others
+        are picked up after the interval, filtered by
+        the run/stream filter
+
+        """
+        def runStreamFilter(runStreams):
+            return [ x for x in runStreams if x[1] == "A" ]
+
+        closeoutScheduler = self.getScheduler(runStreamFilter = runStreamFilter,
+                                              resyncInterval = 300)
+
+        closeoutScheduler.closeRunStreamFilesets(currentTime = 1000)
+
+        self.assertEqual(sorted(closeoutScheduler.getDiagnostics().keys()), [ (1, "A") ],
+                         "ERROR: only run 1 stream A should be a candidate")
+
+        self.daoFactory.candidates.extend([ (2, "A"), (2, "B") ])
+        closeoutScheduler.closeRunStreamFilesets(currentTime = 1299)
+
+        self.assertEqual(sorted(closeoutScheduler.getDiagnostics().keys()), [ (1, "A") ],
+                         "ERROR: run 2 should not be a candidate before the resync")
+
+        closeoutScheduler.closeRunStreamFilesets(currentTime = 1300)
+
+        self.assertEqual(sorted(closeoutScheduler.getDiagnostics().keys()), [ (1, "A"), (2, "A") ],
+                         "ERROR: run 2 stream A should be a candidate after the resync")
+        self.assertEqual(self.daoFactory.lookups, 2,
+                         "ERROR: candidates should have been looked up twice")
+
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+"""
+_RunLifecycleTracker_t_
+
+Testing the run lifecycle tracker used by stopRuns and closeRuns
+
+"""
+import unittest
+
+from WMQuality.TestInit import TestInit
+
+from T0.RunLumiCloseout.RunLifecycleTracker import RunLifecycleTracker
+
+
+class RunLifecycleTrackerTest(unittest.TestCase):
+    """
+    _RunLifecycleTrackerTest_
+
+    Testing the run lifecycle tracker used by stopRuns and closeRuns
+    """
+
+    def setUp(self):
+        """
+        _setUp_
+
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+
+        self.tracker = RunLifecycleTracker(backoffFactor = 0.1, maxCheckInterval = 300)
+
+        return
+
+    def test00(self):
+        """
+        _test00_
+
+        Check interval grows with the age since the T0AST start
+        time (not since first seen) and is capped
+
+        """
+        self.tracker.updateRuns( { 1 : (1000, 0),
+                                   2 : (9000, 0) }, currentTime = 10000)
+
+        self.assertEqual(self.tracker.getRunsToCheck([ 1, 2 ], 'stop', currentTime = 10000), [ 1, 2 ],
+                         "ERROR: new runs should be checked")
+
+        self.tracker.markChecked([ 1, 2 ], 'stop', currentTime = 10000)
+
+        self.assertEqual(self.tracker.getRunsToCheck([ 1, 2 ], 'stop', currentTime = 10099), [],
+                         "ERROR: no run should be due yet")
+        self.assertEqual(self.tracker.getRunsToCheck([ 1, 2 ], 'stop', currentTime = 10100), [ 2 ],
+                         "ERROR: run 2 should be due after 10% of its age")
+        self.assertEqual(self.tracker.getRunsToCheck([ 1, 2 ], 'stop', currentTime = 10299), [ 2 ],
+                         "ERROR: run 1 should not be due before the maximum interval")
+        self.assertEqual(self.tracker.getRunsToCheck([ 1, 2 ], 'stop', currentTime = 10300), [ 1, 2 ],
+                         "ERROR: run 1 should be due after the maximum interval")
+
+        return
+
+    def test01(self):
+        """
+        _test01_
+
+        Close check interval is based on the T0AST stop time,
+        a stopped run is checked for closing every cycle
+
+        """
+        self.tracker.updateRuns( { 1 : (1000, 9900) }, currentTime = 10000)
+
+        self.tracker.markChecked([ 1 ], 'close', currentTime = 10000)
+
+        self.assertEqual(self.tracker.getRunsToCheck([ 1 ], 'close', currentTime = 10009), [],
+                         "ERROR: run should not be due yet")
+        self.assertEqual(self.tracker.getRunsToCheck([ 1 ], 'close', currentTime = 10010), [ 1 ],
+                         "ERROR: run should be due after 10% of the time since stop")
+
+        self.tracker.markChecked([ 1 ], 'close', currentTime = 10010)
+        self.tracker.markStopped(1, 9900, currentTime = 10010)
+
+        self.assertEqual(self.tracker.getRunsToCheck([ 1 ], 'close', currentTime = 10011), [ 1 ],
+                         "ERROR: stopped run should be checked every cycle")
+
+        return
+
+    def test02(self):
+        """
+        _test02_
+
+        The check schedule survives a restart, a new tracker
+        uses the same T0AST times
+
+        """
+        self.tracker.updateRuns( { 1 : (1000, 0) }, currentTime = 2000)
+        self.tracker.markChecked([ 1 ], 'stop', currentTime = 2000)
+
+        newTracker = RunLifecycleTracker(backoffFactor = 0.1, maxCheckInterval = 300)
+        newTracker.updateRuns( { 1 : (1000, 0) }, currentTime = 2000)
+        newTracker.markChecked([ 1 ], 'stop', currentTime = 2000)
+
+        self.assertEqual(newTracker.runs[1]['nextCheck']['stop'], self.tracker.runs[1]['nextCheck']['stop'],
+                         "ERROR: check schedule should not depend on when the run was first seen")
+        self.assertEqual(newTracker.runs[1]['nextCheck']['stop'], 2100,
+                         "ERROR: next check should be after 10% of the run age")
+
+        return
+
+    def test03(self):
+        """
+        _test03_
+
+        Runs no longer unfinished in T0AST are dropped
+
+        """
+        self.tracker.updateRuns( { 1 : (1000, 0),
+                                   2 : (1000, 0),
+                                   3 : (1000, 0) }, currentTime = 2000)
+
+        self.tracker.markStopped(1, 1500, currentTime = 2000)
+        self.tracker.markClosed(1, 10, currentTime = 2000)
+        self.tracker.markStopped(2, 1500, currentTime = 2000)
+
+        self.assertEqual(sorted(self.tracker.getTransitions().keys()), [ 1, 2, 3 ],
+                         "ERROR: all runs should be tracked")
+
+        self.tracker.updateRuns( { 2 : (1000, 1500),
+                                   3 : (1000, 0) }, currentTime = 2100)
+
+        self.assertEqual(sorted(self.tracker.runs.keys()), [ 2, 3 ],
+                         "ERROR: finished run should have been dropped")
+        self.assertEqual(self.tracker.runs[2]['stopTime'], 1500,
+                         "ERROR: T0AST stop time not recorded")
+
+        self.tracker.updateRuns( {}, currentTime = 2200)
+
+        self.assertEqual(len(self.tracker.runs), 0,
+                         "ERROR: all runs should have been dropped")
+
+        return
+
+    def test04(self):
+        """
+        _test04_
+
+        Without a backoff factor runs are checked for every cycle
+
+        """
+        tracker = RunLifecycleTracker()
+
+        tracker.updateRuns( { 1 : (1000, 0) }, currentTime = 10000)
+
+        for currentTime in [ 10000, 10001, 10002 ]:
+            self.assertEqual(tracker.getRunsToCheck([ 1 ], 'stop', currentTime = currentTime), [ 1 ],
+                             "ERROR: run should be checked for every cycle")
+            self.assertEqual(tracker.getRunsToCheck([ 1 ], 'close', currentTime = currentTime), [ 1 ],
+                             "ERROR: run should be checked for every cycle")
+            tracker.markChecked([ 1 ], 'stop', currentTime = currentTime)
+            tracker.markChecked([ 1 ], 'close', currentTime = currentTime)
+
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+"""
+_NotificationOutbox_t_
+
+Testing the StorageManager notification outbox
+
+"""
+import unittest
+import os
+
+from WMQuality.TestInit import TestInit
+
+from T0.SMNotification.NotificationOutbox import NotificationOutbox
+
+
+class NotificationOutboxTest(unittest.TestCase):
+    """
+    _NotificationOutboxTest_
+
+    Testing the StorageManager notification outbox
+    """
+
+    def setUp(self):
+        """
+        _setUp_
+
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+
+        self.testDir = self.testInit.generateWorkDir()
+
+        self.outbox = NotificationOutbox(os.path.join(self.testDir, "NotificationOutbox.db"),
+                                         retryDelay = 10, maxRetryDelay = 25)
+
+        return
+
+    def tearDown(self):
+        """
+        _tearDown_
+
+        """
+        self.testInit.delWorkDir()
+
+        return
+
+    def makeDue(self):
+        """
+        _makeDue_
+
+        Move all scheduled attempts into the past
+
+        """
+        conn = self.outbox.connect()
+        try:
+            conn.execute("UPDATE streamer SET next_attempt = 0")
+            conn.commit()
+        finally:
+            conn.close()
+
+        return
+
+    def test00(self):
+        """
+        _test00_
+
+        Enqueuing is idempotent, streamers already
+        in the outbox are not added again
+
+        """
+        self.outbox.enqueue([ (1, "/store/t0streamer/1.dat"),
+                              (2, "/store/t0streamer/2.dat") ])
+        self.outbox.enqueue([ (1, "/store/t0streamer/1.dat"),
+                              (2, "/store/t0streamer/2.dat") ])
+
+        self.assertEqual(self.outbox.getPendingCount(), (2, 0),
+                         "ERROR: there should be two pending streamers")
+
+        self.outbox.enqueue([ (2, "/store/t0streamer/2.dat"),
+                              (3, "/store/t0streamer/3.dat") ])
+
+        self.assertEqual(self.outbox.getPendingCount(), (3, 0),
+                         "ERROR: there should be three pending streamers")
+
+        self.assertEqual([ x['id'] for x in self.outbox.getDueStreamers() ], [ 1, 2, 3 ],
+                         "ERROR: all streamers should be due")
+
+        self.assertEqual([ x['id'] for x in self.outbox.getDueStreamers(limit = 2) ], [ 1, 2 ],
+                         "ERROR: limit not respected")
+
+        return
+
+    def test01(self):
+        """
+        _test01_
+
+        Failed streamers are retried with exponential
+        backoff, up to the maximum retry delay
+
+        """
+        self.outbox.enqueue([ (1, "/store/t0streamer/1.dat"),
+                              (2, "/store/t0streamer/2.dat") ])
+
+        delays = []
+        for i in range(3):
+            streamers = self.outbox.getDueStreamers()
+            self.assertEqual(len(streamers), 2,
+                             "ERROR: both streamers should be due")
+            delays.append(self.outbox.markFailed(streamers, "some error"))
+
+            self.assertEqual(len(self.outbox.getDueStreamers()), 0,
+                             "ERROR: failed streamers should not be due")
+
+            self.makeDue()
+
+        self.assertEqual(delays, [ 10, 20, 25 ],
+                         "ERROR: wrong retry delays")
+
+        self.assertEqual([ x['attempts'] for x in self.outbox.getDueStreamers() ], [ 3, 3 ],
+                         "ERROR: attempts not counted")
+
+        self.assertEqual(self.outbox.getPendingCount(), (2, 2),
+                         "ERROR: there should be two failed streamers")
+
+        return
+
+    def test02(self):
+        """
+        _test02_
+
+        Sent streamers are removed from the outbox
+
+        """
+        self.outbox.enqueue([ (1, "/store/t0streamer/1.dat"),
+                              (2, "/store/t0streamer/2.dat") ])
+
+        streamers = self.outbox.getDueStreamers()
+        self.outbox.markSent(streamers[:1])
+
+        self.assertEqual([ x['id'] for x in self.outbox.getDueStreamers() ], [ 2 ],
+                         "ERROR: only the unsent streamer should be left")
+
+        # survives reopening
+        outbox = NotificationOutbox(self.outbox.path)
+
+        self.assertEqual(outbox.getPendingCount(), (1, 0),
+                         "ERROR: there should be one pending streamer")
+
+        return
+
+if __name__ == '__main__':
+    unittest.main()
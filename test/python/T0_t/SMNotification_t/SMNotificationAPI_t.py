@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+"""
+_SMNotificationAPI_t_
+
+Testing the StorageManager notification API
+
+"""
+import unittest
+import threading
+import logging
+import time
+import os
+
+from WMCore.WMBS.Fileset import Fileset
+from WMCore.WMBS.Subscription import Subscription
+from WMCore.WMBS.Workflow import Workflow
+
+from WMCore.DAOFactory import DAOFactory
+from WMQuality.TestInit import TestInit
+
+from T0.SMNotification import SMNotificationAPI
+from T0.SMNotification.NotificationOutbox import NotificationOutbox
+
+
+class RecordingTransport(object):
+    """
+    _RecordingTransport_
+
+    Records the notified filenames, fails if told so
+
+    """
+    def __init__(self, error = None):
+        """
+        _init_
+
+        """
+        self.error = error
+        self.calls = []
+
+        return
+
+    def notify(self, filenames):
+        """
+        _notify_
+
+        """
+        self.calls.append(sorted(filenames))
+
+        return self.error
+
+
+class SMNotificationAPITest(unittest.TestCase):
+    """
+    _SMNotificationAPITest_
+
+    Testing the StorageManager notification API
+    """
+
+    def setUp(self):
+        """
+        _setUp_
+
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+        self.testInit.setDatabaseConnection()
+
+        self.testInit.setSchema(customModules = ["T0.WMBS"])
+
+        self.testDir = self.testInit.generateWorkDir()
+
+        myThread = threading.currentThread()
+        daoFactory = DAOFactory(package = "T0.WMBS",
+                                logger = logging,
+                                dbinterface = myThread.dbi)
+
+        insertRunDAO = daoFactory(classname = "RunConfig.InsertRun")
+        insertRunDAO.execute(binds = { 'RUN' : 1,
+                                       'TIME' : int(time.time()),
+                                       'HLTKEY' : "someHLTKey" },
+                             transaction = False)
+
+        insertLumiDAO = daoFactory(classname = "RunConfig.InsertLumiSection")
+        insertLumiDAO.execute(binds = { 'RUN' : 1,
+                                        'LUMI' : 1 },
+                              transaction = False)
+
+        insertStreamDAO = daoFactory(classname = "RunConfig.InsertStream")
+        insertStreamDAO.execute(binds = { 'STREAM' : "A" },
+                                transaction = False)
+
+        insertStreamerDAO = daoFactory(classname = "RunConfig.InsertStreamer")
+        for i in range(3):
+            insertStreamerDAO.execute(binds = { 'RUN' : 1,
+                                                'LUMI' : 1,
+                                                'STREAM' : "A",
+                                                'TIME' : int(time.time()),
+                                                'LFN' : "/store/t0streamer/%d.dat" % i,
+                                                'FILESIZE' : 0,
+                                                'EVENTS' : 0 },
+                                      transaction = False)
+
+        fileset = Fileset(name = "TestFileset1")
+        fileset.create()
+
+        workflow = Workflow(spec = "spec.xml", owner = "hufnagel", name = "TestWorkflow1", task="Test")
+        workflow.create()
+
+        subscription = Subscription(fileset = fileset,
+                                    workflow = workflow,
+                                    split_algo = "Repack",
+                                    type = "Repack")
+        subscription.create()
+
+        # first two streamers are completely processed
+        myThread.dbi.processData("""INSERT INTO wmbs_sub_files_complete
+                                    (subscription, fileid)
+                                    SELECT :SUBSCRIPTION, streamer.id
+                                    FROM streamer
+                                    INNER JOIN wmbs_file_details ON
+                                      wmbs_file_details.id = streamer.id
+                                    WHERE wmbs_file_details.lfn != '/store/t0streamer/2.dat'
+                                    """, { 'SUBSCRIPTION' : subscription['id'] },
+                                 transaction = False)
+
+        self.outbox = NotificationOutbox(os.path.join(self.testDir, "NotificationOutbox.db"))
+
+        return
+
+    def tearDown(self):
+        """
+        _tearDown_
+
+        """
+        self.testInit.clearDatabase()
+        self.testInit.delWorkDir()
+
+        return
+
+    def getFinishedLFNs(self):
+        """
+        _getFinishedLFNs_
+
+        """
+        myThread = threading.currentThread()
+
+        results = myThread.dbi.processData("""SELECT wmbs_file_details.lfn
+                                              FROM streamer
+                                              INNER JOIN wmbs_file_details ON
+                                                wmbs_file_details.id = streamer.id
+                                              WHERE streamer.deleted = 1
+                                              """,
+                                           transaction = False)[0].fetchall()
+
+        return sorted([ result[0] for result in results ])
+
+    def test00(self):
+        """
+        _test00_
+
+        Chunks are split by size and sent in parallel,
+        one error or None per chunk
+
+        """
+        streamers = [ { 'id' : i, 'lfn' : "/store/t0streamer/%d.dat" % i } for i in range(5) ]
+
+        chunks = SMNotificationAPI.splitChunks(streamers, 2)
+
+        self.assertEqual([ len(chunk) for chunk in chunks ], [ 2, 2, 1 ],
+                         "ERROR: wrong chunk sizes")
+
+        transport = RecordingTransport()
+        errors = SMNotificationAPI.sendChunks(chunks, transport, maxWorkers = 2)
+
+        self.assertEqual(errors, [ None, None, None ],
+                         "ERROR: all chunks should be sent")
+
+        self.assertEqual(sorted(transport.calls), [ [ "0.dat", "1.dat" ], [ "2.dat", "3.dat" ], [ "4.dat" ] ],
+                         "ERROR: transport should get the file basenames per chunk")
+
+        self.assertEqual(SMNotificationAPI.sendChunks([], transport), [],
+                         "ERROR: no chunks should not send anything")
+
+        return
+
+    def test01(self):
+        """
+        _test01_
+
+        Finished streamers are queued, notified
+        in chunks and then marked finished
+
+        """
+        SMNotificationAPI.queueNotifications(self.outbox)
+        SMNotificationAPI.queueNotifications(self.outbox)
+
+        self.assertEqual(self.outbox.getPendingCount(), (2, 0),
+                         "ERROR: there should be two queued streamers")
+
+        self.assertEqual(self.getFinishedLFNs(), [],
+                         "ERROR: no streamer should be finished before notification")
+
+        transport = RecordingTransport()
+        SMNotificationAPI.processOutbox(self.outbox, transport, chunkSize = 1, maxWorkers = 2)
+
+        self.assertEqual(sorted(transport.calls), [ [ "0.dat" ], [ "1.dat" ] ],
+                         "ERROR: each streamer should be notified in its own chunk")
+
+        self.assertEqual(self.outbox.getPendingCount(), (0, 0),
+                         "ERROR: the outbox should be empty")
+
+        self.assertEqual(self.getFinishedLFNs(), [ "/store/t0streamer/0.dat", "/store/t0streamer/1.dat" ],
+                         "ERROR: notified streamers should be finished")
+
+        # finished streamers are not queued again
+        SMNotificationAPI.queueNotifications(self.outbox)
+
+        self.assertEqual(self.outbox.getPendingCount(), (0, 0),
+                         "ERROR: finished streamers should not be queued")
+
+        return
+
+    def test02(self):
+        """
+        _test02_
+
+        Failed notifications stay in the outbox and
+        the streamers are not marked finished
+
+        """
+        SMNotificationAPI.queueNotifications(self.outbox)
+
+        transport = RecordingTransport(error = "some error")
+        SMNotificationAPI.processOutbox(self.outbox, transport, chunkSize = 50)
+
+        self.assertEqual(len(transport.calls), 1,
+                         "ERROR: both streamers should be notified in one chunk")
+
+        self.assertEqual(self.outbox.getPendingCount(), (2, 2),
+                         "ERROR: failed streamers should stay in the outbox")
+
+        self.assertEqual(len(self.outbox.getDueStreamers()), 0,
+                         "ERROR: failed streamers should not be due right away")
+
+        self.assertEqual(self.getFinishedLFNs(), [],
+                         "ERROR: no streamer should be finished")
+
+        return
+
+    def test03(self):
+        """
+        _test03_
+
+        Without outbox finished streamers are
+        notified and marked finished directly
+
+        """
+        transport = RecordingTransport()
+        SMNotificationAPI.notifyStorageManager(transport, chunkSize = 50)
+
+        self.assertEqual(transport.calls, [ [ "0.dat", "1.dat" ] ],
+                         "ERROR: both streamers should be notified in one chunk")
+
+        self.assertEqual(self.getFinishedLFNs(), [ "/store/t0streamer/0.dat", "/store/t0streamer/1.dat" ],
+                         "ERROR: notified streamers should be finished")
+
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+"""
+_CycleRecorder_t_
+
+Testing the round trip of a cycle recorded against a SQLite
+T0AST through the CycleRecorder and the CycleReplay
+
+"""
+import unittest
+import logging
+import os
+
+from WMQuality.TestInit import TestInit
+from WMCore.Database.DBFactory import DBFactory
+
+from T0.WMBS.SQLite import setupEngine
+from T0.WMBS.SQLite.Create import Create
+from T0.WMBS.SQLite.RunConfig.InsertRun import InsertRun
+from T0.WMBS.SQLite.RunConfig.InsertLumiSection import InsertLumiSection
+from T0.WMBS.SQLite.RunConfig.InsertStream import InsertStream
+from T0.WMBS.SQLite.RunConfig.GetRunInfo import GetRunInfo
+
+from T0.Simulator.CycleRecorder import CycleRecorder
+from T0.Simulator.CycleReplay import CycleReplay, loadRecording
+
+
+class CycleRecorderTest(unittest.TestCase):
+    """
+    _CycleRecorderTest_
+
+    Testing the round trip of a cycle recorded against a SQLite
+    T0AST through the CycleRecorder and the CycleReplay
+    """
+
+    def setUp(self):
+        """
+        _setUp_
+
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+
+        self.testDir = self.testInit.generateWorkDir()
+
+        dbFactory = DBFactory(logging, dburl = "sqlite:///%s" % os.path.join(self.testDir, "T0AST.db"))
+        setupEngine(dbFactory.engine)
+        self.dbi = dbFactory.connect()
+
+        # WMCore ships no SQLite WMBS schema, the
+        # T0AST schema only needs the subscription types
+        self.dbi.processData("""CREATE TABLE wmbs_sub_types (
+                                  id     int           not null,
+                                  name   varchar(255)  not null,
+                                  primary key(id)
+                                )""", transaction = False)
+
+        create = Create(logger = logging, dbi = self.dbi)
+        create.execute()
+
+        self.recorder = CycleRecorder(os.path.join(self.testDir, "recordings"))
+
+        return
+
+    def tearDown(self):
+        """
+        _tearDown_
+
+        """
+        self.dbi.engine.dispose()
+        self.testInit.delWorkDir()
+
+        return
+
+    def runCycle(self, dbi, lumis = [ 1, 2 ], streams = [ "Express", "A" ]):
+        """
+        _runCycle_
+
+        Small feeder like cycle, inserts a run with its
+        lumis and streams and reads back the run info
+
+        """
+        InsertRun(logging, dbi).execute(binds = { 'RUN' : 1,
+                                                  'TIME' : 1000,
+                                                  'HLTKEY' : "someHLTKey" },
+                                        transaction = False)
+        InsertLumiSection(logging, dbi).execute(binds = [ { 'RUN' : 1, 'LUMI' : x } for x in lumis ],
+                                                transaction = False)
+        for stream in streams:
+            InsertStream(logging, dbi).execute(binds = { 'STREAM' : stream },
+                                               transaction = False)
+
+        return GetRunInfo(logging, dbi).execute(1, transaction = False)
+
+    def recordCycle(self):
+        """
+        _recordCycle_
+
+        Runs the cycle against the SQLite T0AST
+        and returns its results and recording
+
+        """
+        self.recorder.startCycle()
+        runInfo = self.runCycle(self.recorder.wrap("T0AST", self.dbi))
+        filename = self.recorder.endCycle()
+
+        self.assertNotEqual(filename, None,
+                            "ERROR: recording should have been written")
+
+        return (runInfo, loadRecording(filename))
+
+    def test00(self):
+        """
+        _test00_
+
+        Replaying the recorded cycle matches every call
+        with its binds and returns the recorded results
+
+        """
+        (runInfo, recording) = self.recordCycle()
+
+        self.assertEqual(recording['sources'], { 'T0AST' : "SQLite" },
+                         "ERROR: SQLite source not recorded")
+        self.assertEqual(len(recording['calls']), 5,
+                         "ERROR: all database calls should have been recorded")
+
+        cycleReplay = CycleReplay(recording)
+
+        self.assertEqual(self.runCycle(cycleReplay.getDBInterface("T0AST")), runInfo,
+                         "ERROR: replayed cycle should return the recorded results")
+
+        report = cycleReplay.getSource("T0AST").getReport()
+
+        self.assertEqual(report['recorded'], 5,
+                         "ERROR: wrong number of recorded calls")
+        self.assertEqual(report['matched'], 5,
+                         "ERROR: all calls should have been matched")
+        self.assertEqual(report['bindMismatches'], 0,
+                         "ERROR: binds of the replayed calls should match")
+        self.assertEqual(report['missing'], 0,
+                         "ERROR: no call should be missing from the recording")
+        self.assertEqual(report['unused'], 0,
+                         "ERROR: all recorded calls should have been used")
+
+        return
+
+    def test01(self):
+        """
+        _test01_
+
+        Changed binds, calls that were not recorded
+        and calls that are no longer made are reported
+
+        """
+        (runInfo, recording) = self.recordCycle()
+
+        cycleReplay = CycleReplay(recording)
+        self.runCycle(cycleReplay.getDBInterface("T0AST"), lumis = [ 1, 2, 3 ], streams = [ "Express" ])
+        cycleReplay.getDBInterface("T0AST").processData("SELECT COUNT(*) FROM run")
+
+        report = cycleReplay.getSource("T0AST").getReport()
+
+        self.assertEqual(report['matched'], 4,
+                         "ERROR: wrong number of matched calls")
+        self.assertEqual(report['bindMismatches'], 1,
+                         "ERROR: changed lumi binds should be reported")
+        self.assertEqual(report['missing'], 1,
+                         "ERROR: call that was not recorded should be reported")
+        self.assertEqual(report['unused'], 1,
+                         "ERROR: call that was not replayed should be reported")
+
+        return
+
+if __name__ == '__main__':
+    unittest.main()
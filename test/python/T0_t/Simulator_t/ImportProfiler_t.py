@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+"""
+_ImportProfiler_t_
+
+Testing the import time profile used by the startup benchmark
+
+"""
+import unittest
+import sys
+
+from WMQuality.TestInit import TestInit
+
+from T0.Simulator.ImportProfiler import ImportProfiler, getCandidateNames
+from T0.Simulator.ImportProfiler import parseImportTime, summarizeImportTime, profileImport
+
+
+class ImportProfilerTest(unittest.TestCase):
+    """
+    _ImportProfilerTest_
+
+    Testing the import time profile used by the startup benchmark
+    """
+
+    def setUp(self):
+        """
+        _setUp_
+
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+
+        return
+
+    def test00(self):
+        """
+        _test00_
+
+        python -X importtime output is parsed into entries,
+        other lines are skipped, the summary adds up the
+        top level imports and the self time per package
+
+        """
+        output = "\n".join([ "import time: self [us] | cumulative | imported package",
+                             "import time:       100 |        100 |   WMCore.Algorithms",
+                             "import time:       200 |        300 | WMCore",
+                             "some warning",
+                             "import time:       400 |        400 |   T0.RunConfig",
+                             "import time:        50 |        450 | T0" ])
+
+        entries = parseImportTime(output)
+
+        self.assertEqual([ (x['module'], x['depth']) for x in entries ],
+                         [ ("WMCore.Algorithms", 1), ("WMCore", 0), ("T0.RunConfig", 1), ("T0", 0) ],
+                         "ERROR: entries not parsed")
+
+        summary = summarizeImportTime(entries, top = 2)
+
+        self.assertAlmostEqual(summary['total'], 0.00075,
+                               msg = "ERROR: total should add up the top level imports")
+        self.assertEqual(summary['modules'], 4,
+                         "ERROR: wrong number of modules")
+        self.assertEqual([ x[0] for x in summary['cumulative'] ], [ "T0", "T0.RunConfig" ],
+                         "ERROR: wrong slowest cumulative imports")
+        self.assertEqual([ x[0] for x in summary['self'] ], [ "T0.RunConfig", "WMCore" ],
+                         "ERROR: wrong slowest self imports")
+        self.assertEqual([ x[0] for x in summary['packages'] ], [ "T0", "WMCore" ],
+                         "ERROR: wrong import time by package")
+
+        return
+
+    def test01(self):
+        """
+        _test01_
+
+        Candidate names of relative and
+        from imports, packages first
+
+        """
+        self.assertEqual(getCandidateNames("Tier0Config", { '__package__' : "T0.RunConfig" }, 1, None),
+                         [ "T0.RunConfig.Tier0Config", "Tier0Config" ],
+                         "ERROR: wrong candidates for a relative import")
+
+        self.assertEqual(getCandidateNames("T0.RunConfig", None, 0, [ "RunConfigAPI", "*" ]),
+                         [ "T0.RunConfig", "T0.RunConfig.RunConfigAPI" ],
+                         "ERROR: wrong candidates for a from import")
+
+        return
+
+    def test02(self):
+        """
+        _test02_
+
+        The __import__ wrapper records newly loaded modules
+        only and restores the builtin import when stopped
+
+        """
+        sys.modules.pop("colorsys", None)
+
+        profiler = ImportProfiler()
+        profiler.start()
+        try:
+            __import__("colorsys")
+            __import__("os")
+        finally:
+            profiler.stop()
+
+        self.assertEqual([ x['module'] for x in profiler.entries ], [ "colorsys" ],
+                         "ERROR: only the newly loaded module should be recorded")
+        self.assertEqual(profiler.originalImport, None,
+                         "ERROR: builtin import not restored")
+
+        self.assertEqual(len(parseImportTime("\n".join(profiler.formatEntries()))), 1,
+                         "ERROR: formatted entries should parse like python -X importtime")
+
+        return
+
+    def test03(self):
+        """
+        _test03_
+
+        A module is profiled in a fresh interpreter,
+        a failing import is reported
+
+        """
+        (entries, imported) = profileImport("colorsys")
+
+        self.assertTrue(imported,
+                        "ERROR: import should have worked")
+        self.assertTrue("colorsys" in [ x['module'] for x in entries ],
+                        "ERROR: module not in the profile")
+
+        (entries, imported) = profileImport("T0.NoSuchModule")
+
+        self.assertFalse(imported,
+                         "ERROR: failing import not reported")
+
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,298 @@
+#!/usr/bin/env python
+"""
+_T0DataSvcSync_t_
+
+Testing the Tier0 Data Service sync
+
+"""
+import unittest
+import time
+
+from WMQuality.TestInit import TestInit
+
+from T0.T0DataSvc.T0DataSvcSync import T0DataSvcSync, SyncTable
+from T0.T0DataSvc.T0DataSvcSync import RunStreamDoneSync, ExpressConfigSync, RecoConfigSync
+from T0.T0DataSvc.T0DataSvcSync import RecoReleaseConfigSync, DatasetLockedSync
+
+
+class RecordingDAO(object):
+    """
+    _RecordingDAO_
+
+    Returns the records of its classname or records
+    the binds it is called with, fails if told so
+
+    """
+    def __init__(self, factory, classname):
+        """
+        _init_
+
+        """
+        self.factory = factory
+        self.classname = classname
+
+        return
+
+    def execute(self, binds = None, transaction = False):
+        """
+        _execute_
+
+        """
+        if self.classname in self.factory.failing:
+            raise RuntimeError("%s failed" % self.classname)
+
+        if binds == None:
+            return list(self.factory.records.get(self.classname, []))
+
+        self.factory.calls.append( (self.classname, binds) )
+
+        return
+
+
+class RecordingDAOFactory(object):
+    """
+    _RecordingDAOFactory_
+
+    """
+    def __init__(self, records = None, failing = None):
+        """
+        _init_
+
+        """
+        self.records = records or {}
+        self.failing = failing or []
+        self.calls = []
+
+        return
+
+    def __call__(self, classname):
+        """
+        _call_
+
+        """
+        return RecordingDAO(self, classname)
+
+
+class TestSync(SyncTable):
+
+    name = "test"
+    getClassname = "Test.Get"
+    writeClassname = "Test.Write"
+    markClassname = "Test.Mark"
+
+    writeBinds = { 'ID' : 'id',
+                   'VALUE' : 'value' }
+    markBinds = { 'ID' : 'id' }
+
+
+class OtherSync(TestSync):
+
+    name = "other"
+    getClassname = "Other.Get"
+    writeClassname = "Other.Write"
+    markClassname = "Other.Mark"
+
+
+class T0DataSvcSyncTest(unittest.TestCase):
+    """
+    _T0DataSvcSyncTest_
+
+    Testing the Tier0 Data Service sync
+    """
+
+    def setUp(self):
+        """
+        _setUp_
+
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+
+        self.daoFactory = RecordingDAOFactory()
+        self.daoFactoryT0DataSvc = RecordingDAOFactory()
+
+        return
+
+    def tearDown(self):
+        """
+        _tearDown_
+
+        """
+        return
+
+    def makeRecords(self, num):
+        """
+        _makeRecords_
+
+        """
+        return [ { 'id' : i, 'value' : "value%d" % i } for i in range(num) ]
+
+    def getCalls(self, daoFactory, classname):
+        """
+        _getCalls_
+
+        """
+        return [ binds for (name, binds) in daoFactory.calls if name == classname ]
+
+    def test00(self):
+        """
+        _test00_
+
+        Binds of the default sync tables
+
+        """
+        record = { 'run' : 1,
+                   'stream' : "Express",
+                   'primds' : "MinimumBias",
+                   'cmssw' : "CMSSW_8_0_0",
+                   'scram_arch' : "slc6_amd64_gcc530",
+                   'reco_cmssw' : "CMSSW_8_0_1",
+                   'reco_scram_arch' : "slc6_amd64_gcc530",
+                   'alca_skim' : "TkAlMinBias",
+                   'physics_skim' : "LogError",
+                   'dqm_seq' : "@common",
+                   'global_tag' : "G" * 60,
+                   'scenario' : "pp",
+                   'released' : 2,
+                   'path' : "/MinimumBias/Run2016A-v1/RAW",
+                   'id' : 3 }
+
+        self.assertEqual(RunStreamDoneSync().getBinds(record),
+                         ( { 'RUN' : 1, 'STREAM' : "Express" },
+                           { 'RUN' : 1, 'STREAM' : "Express" } ),
+                         "ERROR: wrong run_stream_done binds")
+
+        (bindWrite, bindMark) = ExpressConfigSync().getBinds(record)
+        self.assertEqual(bindWrite['GLOBAL_TAG'], "G" * 50,
+                         "ERROR: global tag should be truncated")
+        self.assertEqual(bindWrite['RECO_CMSSW'], "CMSSW_8_0_1",
+                         "ERROR: wrong express_config binds")
+        self.assertEqual(bindMark, { 'RUN' : 1, 'STREAM' : "Express" },
+                         "ERROR: wrong express_config marker binds")
+        self.assertEqual(record['global_tag'], "G" * 60,
+                         "ERROR: record should not be modified")
+
+        (bindWrite, bindMark) = RecoConfigSync().getBinds(record)
+        self.assertEqual(bindWrite['GLOBAL_TAG'], "G" * 50,
+                         "ERROR: global tag should be truncated")
+        self.assertEqual(bindWrite['PHYSICS_SKIM'], "LogError",
+                         "ERROR: wrong reco_config binds")
+        self.assertEqual(bindMark, { 'RUN' : 1, 'PRIMDS' : "MinimumBias" },
+                         "ERROR: wrong reco_config marker binds")
+
+        self.assertEqual(RecoReleaseConfigSync().getBinds(record),
+                         ( { 'RUN' : 1, 'LOCKED' : 1 },
+                           { 'RUN' : 1, 'IN_DATASVC' : 2 } ),
+                         "ERROR: wrong reco_release_config binds")
+
+        self.assertEqual(DatasetLockedSync().getBinds(record),
+                         ( { 'PATH' : "/MinimumBias/Run2016A-v1/RAW" },
+                           { 'ID' : 3 } ),
+                         "ERROR: wrong dataset_locked binds")
+
+        return
+
+    def test01(self):
+        """
+        _test01_
+
+        Records are synced in batches, each batch
+        is written before it is marked synced
+
+        """
+        self.daoFactory.records["Test.Get"] = self.makeRecords(5)
+
+        t0DataSvcSync = T0DataSvcSync(self.daoFactory, self.daoFactoryT0DataSvc,
+                                      tables = [ TestSync() ], batchSize = 2)
+        t0DataSvcSync.sync()
+
+        writes = self.getCalls(self.daoFactoryT0DataSvc, "Test.Write")
+        marks = self.getCalls(self.daoFactory, "Test.Mark")
+
+        self.assertEqual([ len(binds) for binds in writes ], [ 2, 2, 1 ],
+                         "ERROR: records should be written in batches of two")
+
+        self.assertEqual(marks, [ [ { 'ID' : 0 }, { 'ID' : 1 } ],
+                                  [ { 'ID' : 2 }, { 'ID' : 3 } ],
+                                  [ { 'ID' : 4 } ] ],
+                         "ERROR: records should be marked in batches of two")
+
+        metrics = t0DataSvcSync.getMetrics()['test']
+
+        self.assertEqual((metrics['records'], metrics['batches'], metrics['failures']), (5, 3, 0),
+                         "ERROR: wrong metrics")
+
+        return
+
+    def test02(self):
+        """
+        _test02_
+
+        A failing table does not hold up the others
+        and is not marked synced
+
+        """
+        self.daoFactory.records["Test.Get"] = self.makeRecords(2)
+        self.daoFactory.records["Other.Get"] = self.makeRecords(2)
+        self.daoFactoryT0DataSvc.failing.append("Test.Write")
+
+        t0DataSvcSync = T0DataSvcSync(self.daoFactory, self.daoFactoryT0DataSvc,
+                                      tables = [ TestSync(), OtherSync() ])
+        t0DataSvcSync.sync()
+
+        self.assertEqual(self.getCalls(self.daoFactory, "Test.Mark"), [],
+                         "ERROR: failed records should not be marked synced")
+
+        self.assertEqual(len(self.getCalls(self.daoFactory, "Other.Mark")), 1,
+                         "ERROR: other table should be synced")
+
+        metrics = t0DataSvcSync.getMetrics()
+
+        self.assertEqual(metrics['test']['failures'], 1,
+                         "ERROR: failure not counted")
+
+        self.assertEqual(metrics['other']['records'], 2,
+                         "ERROR: other table records not counted")
+
+        return
+
+    def test03(self):
+        """
+        _test03_
+
+        Once the deadline is reached the sync stops
+        and the next sync continues where it stopped
+
+        """
+        self.daoFactory.records["Test.Get"] = self.makeRecords(4)
+        self.daoFactory.records["Other.Get"] = self.makeRecords(1)
+
+        t0DataSvcSync = T0DataSvcSync(self.daoFactory, self.daoFactoryT0DataSvc,
+                                      tables = [ TestSync(), OtherSync() ], batchSize = 2)
+        t0DataSvcSync.sync(deadline = time.time() - 1)
+
+        self.assertEqual(len(self.getCalls(self.daoFactory, "Test.Mark")), 1,
+                         "ERROR: only the first batch should be synced")
+
+        self.assertEqual(self.getCalls(self.daoFactory, "Other.Mark"), [],
+                         "ERROR: other table should not be synced")
+
+        self.assertEqual(t0DataSvcSync.getMetrics()['test']['deferred'], 1,
+                         "ERROR: deferral not counted")
+
+        # records not marked by the recording DAOs, all four are synced again
+        t0DataSvcSync.sync()
+
+        self.assertEqual(len(self.getCalls(self.daoFactory, "Test.Mark")), 3,
+                         "ERROR: the rest of the table should be synced")
+
+        self.assertEqual(len(self.getCalls(self.daoFactory, "Other.Mark")), 1,
+                         "ERROR: other table should be synced")
+
+        self.assertEqual(t0DataSvcSync.nextTable, 0,
+                         "ERROR: next sync should start with the first table")
+
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+"""
+_AlcaHarvest_t_
+
+AlcaHarvest job splitting test
+
+"""
+
+import unittest
+import threading
+import logging
+import time
+
+from WMCore.WMBS.File import File
+from WMCore.WMBS.Fileset import Fileset
+from WMCore.WMBS.Subscription import Subscription
+from WMCore.WMBS.Workflow import Workflow
+from WMCore.DataStructs.Run import Run
+
+from WMCore.DAOFactory import DAOFactory
+from WMCore.JobSplitting.SplitterFactory import SplitterFactory
+from WMCore.Services.UUIDLib import makeUUID
+from WMQuality.TestInit import TestInit
+
+
+class AlcaHarvestTest(unittest.TestCase):
+    """
+    _AlcaHarvestTest_
+
+    Test for AlcaHarvest job splitter
+    """
+
+    def setUp(self):
+        """
+        _setUp_
+
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+        self.testInit.setDatabaseConnection()
+
+        self.testInit.setSchema(customModules = ["T0.WMBS"])
+
+        self.splitterFactory = SplitterFactory(package = "T0.JobSplitting")
+
+        myThread = threading.currentThread()
+        daoFactory = DAOFactory(package = "T0.WMBS",
+                                logger = logging,
+                                dbinterface = myThread.dbi)
+
+        myThread.dbi.processData("""INSERT INTO wmbs_location
+                                    (id, site_name, state)
+                                    VALUES (1, 'SomeSite', 1)
+                                    """, transaction = False)
+        myThread.dbi.processData("""INSERT INTO wmbs_location_pnn
+                                    (location, pnn)
+                                    VALUES (1, 'SomePNN')
+                                    """, transaction = False)
+        myThread.dbi.processData("""INSERT INTO wmbs_location
+                                    (id, site_name, state)
+                                    VALUES (2, 'SomeSite2', 1)
+                                    """, transaction = False)
+        myThread.dbi.processData("""INSERT INTO wmbs_location_pnn
+                                    (location, pnn)
+                                    VALUES (2, 'SomePNN2')
+                                    """, transaction = False)
+
+        insertRunDAO = daoFactory(classname = "RunConfig.InsertRun")
+        insertRunDAO.execute(binds = { 'RUN' : 1,
+                                       'TIME' : int(time.time()),
+                                       'HLTKEY' : "someHLTKey" },
+                             transaction = False)
+
+        self.fileset1 = Fileset(name = "TestFileset1")
+        self.fileset1.create()
+
+        workflow1 = Workflow(spec = "spec.xml", owner = "hufnagel", name = "TestWorkflow1", task="Test")
+        workflow1.create()
+
+        self.subscription1  = Subscription(fileset = self.fileset1,
+                                           workflow = workflow1,
+                                           split_algo = "AlcaHarvest",
+                                           type = "Harvesting")
+        self.subscription1.create()
+
+        # default split parameters
+        self.splitArgs = {}
+        self.splitArgs['runNumber'] = 1
+        self.splitArgs['timeout'] = None
+        self.splitArgs['alcapromptdataset'] = "PromptCalibProd"
+
+        return
+
+    def tearDown(self):
+        """
+        _tearDown_
+
+        """
+        self.testInit.clearDatabase()
+
+        return
+
+    def addFiles(self, lumis, locations = [ "SomePNN" ]):
+        """
+        _addFiles_
+
+        One file per lumi (None for a file without lumis),
+        the fileset is closed afterwards
+
+        """
+        for lumi in lumis:
+            newFile = File(makeUUID(), size = 1000, events = 100)
+            if lumi != None:
+                newFile.addRun(Run(1, *[lumi]))
+            for location in locations:
+                newFile.setLocation(location, immediateSave = False)
+            newFile.create()
+            self.fileset1.addFile(newFile)
+        self.fileset1.commit()
+
+        self.fileset1.markOpen(False)
+
+        return
+
+    def test00(self):
+        """
+        _test00_
+
+        Closed fileset, no lumi ranges,
+        one job for all files
+
+        """
+        mySplitArgs = self.splitArgs.copy()
+
+        self.addFiles([ 1, 2, 3, 4, 5 ])
+
+        jobFactory = self.splitterFactory(package = "WMCore.WMBS",
+                                          subscription = self.subscription1)
+
+        jobGroups = jobFactory(**mySplitArgs)
+
+        self.assertEqual(len(jobGroups), 1,
+                         "ERROR: JobFactory didn't return one JobGroup")
+
+        self.assertEqual(len(jobGroups[0].jobs), 1,
+                         "ERROR: JobFactory didn't create one job")
+
+        self.assertEqual(len(jobGroups[0].jobs[0].getFiles()), 5,
+                         "ERROR: Job does not process 5 files")
+
+        return
+
+    def test01(self):
+        """
+        _test01_
+
+        Closed fileset, lumisPerJob set,
+        one job per lumi range
+
+        """
+        mySplitArgs = self.splitArgs.copy()
+        mySplitArgs['lumisPerJob'] = 2
+
+        self.addFiles([ 1, 2, 3, 4, 5 ])
+
+        jobFactory = self.splitterFactory(package = "WMCore.WMBS",
+                                          subscription = self.subscription1)
+
+        jobGroups = jobFactory(**mySplitArgs)
+
+        self.assertEqual(len(jobGroups), 1,
+                         "ERROR: JobFactory didn't return one JobGroup")
+
+        self.assertEqual(len(jobGroups[0].jobs), 3,
+                         "ERROR: JobFactory didn't create three jobs")
+
+        self.assertEqual(sorted([ len(job.getFiles()) for job in jobGroups[0].jobs ]), [ 1, 2, 2 ],
+                         "ERROR: Jobs do not cover lumi ranges of two lumis")
+
+        return
+
+    def test02(self):
+        """
+        _test02_
+
+        Closed fileset, lumisPerJob set, files
+        without lumis are all put into one job
+
+        """
+        mySplitArgs = self.splitArgs.copy()
+        mySplitArgs['lumisPerJob'] = 2
+
+        self.addFiles([ None, 1, None, 2, None, 3 ])
+
+        jobFactory = self.splitterFactory(package = "WMCore.WMBS",
+                                          subscription = self.subscription1)
+
+        jobGroups = jobFactory(**mySplitArgs)
+
+        self.assertEqual(len(jobGroups), 1,
+                         "ERROR: JobFactory didn't return one JobGroup")
+
+        self.assertEqual(len(jobGroups[0].jobs), 3,
+                         "ERROR: JobFactory didn't create three jobs")
+
+        self.assertEqual(sorted([ len(job.getFiles()) for job in jobGroups[0].jobs ]), [ 1, 2, 3 ],
+                         "ERROR: Files without lumis not in a single job")
+
+        return
+
+    def test03(self):
+        """
+        _test03_
+
+        Closed fileset, files at several locations
+        streamed in chunks smaller than the files
+        locations, all locations are kept
+
+        """
+        mySplitArgs = self.splitArgs.copy()
+        mySplitArgs['chunkSize'] = 1
+
+        self.addFiles([ 1, 2, 3 ], locations = [ "SomePNN", "SomePNN2" ])
+
+        jobFactory = self.splitterFactory(package = "WMCore.WMBS",
+                                          subscription = self.subscription1)
+
+        jobGroups = jobFactory(**mySplitArgs)
+
+        self.assertEqual(len(jobGroups), 1,
+                         "ERROR: JobFactory didn't return one JobGroup")
+
+        self.assertEqual(len(jobGroups[0].jobs), 1,
+                         "ERROR: JobFactory didn't create one job")
+
+        jobFiles = jobGroups[0].jobs[0].getFiles()
+
+        self.assertEqual(len(jobFiles), 3,
+                         "ERROR: Job does not process 3 files")
+
+        for jobFile in jobFiles:
+            self.assertEqual(set(jobFile["locations"]), set([ "SomePNN", "SomePNN2" ]),
+                             "ERROR: File locations not merged")
+
+        return
+
+    def test04(self):
+        """
+        _test04_
+
+        Open fileset, no timeout, no job
+
+        """
+        mySplitArgs = self.splitArgs.copy()
+
+        self.addFiles([ 1, 2 ])
+        self.fileset1.markOpen(True)
+
+        jobFactory = self.splitterFactory(package = "WMCore.WMBS",
+                                          subscription = self.subscription1)
+
+        jobGroups = jobFactory(**mySplitArgs)
+
+        self.assertEqual(len(jobGroups), 0,
+                         "ERROR: JobFactory should have returned no JobGroup")
+
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -21,6 +21,8 @@ from WMCore.DAOFactory import DAOFactory
 from WMCore.JobSplitting.SplitterFactory import SplitterFactory
 from WMQuality.TestInit import TestInit
 
+from T0.ConditionUpload.ConditionUploadAPI import getLateConditionsWatermark
+
 
 class ConditionTest(unittest.TestCase):
     """
@@ -223,5 +225,111 @@ class ConditionTest(unittest.TestCase):
 
         return
 
+    def test01(self):
+        """
+        _test01_
+
+        Make sure files already in prompt_calib_file are not
+        inserted again if they show up as available, but are
+        just marked as acquired.
+
+        """
+        myThread = threading.currentThread()
+
+        mySplitArgs = self.splitArgs.copy()
+        mySplitArgs['chunkSize'] = 1
+
+        jobFactory = self.splitterFactory(package = "WMCore.WMBS",
+                                          subscription = self.subscription1)
+
+        jobGroups = jobFactory(**mySplitArgs)
+
+        self.assertEqual(self.countPromptCalibFiles(), 1,
+                         "ERROR: there should be one prompt_calib_file")
+
+        # put the file back into available state
+        myThread.dbi.processData("""DELETE FROM wmbs_sub_files_acquired
+                                    """, transaction = False)
+        myThread.dbi.processData("""INSERT INTO wmbs_sub_files_available
+                                    (subscription, fileid)
+                                    SELECT subscription, fileid
+                                    FROM prompt_calib_file
+                                    """, transaction = False)
+
+        jobGroups = jobFactory(**mySplitArgs)
+
+        self.assertEqual(self.countPromptCalibFiles(), 1,
+                         "ERROR: there should be one prompt_calib_file")
+
+        self.assertEqual(len(self.subscription1.filesOfStatus("Available")), 0,
+                         "ERROR: there should be no available file")
+
+        self.assertEqual(len(self.subscription1.filesOfStatus("Acquired")), 1,
+                         "ERROR: there should be one acquired file")
+
+        return
+
+    def test02(self):
+        """
+        _test02_
+
+        Make sure a file acquired while its run was not
+        finished yet still is picked up as late payload
+        once the run finished, no matter how much later.
+
+        """
+        myThread = threading.currentThread()
+
+        daoFactory = DAOFactory(package = "T0.WMBS",
+                                logger = logging,
+                                dbinterface = myThread.dbi)
+
+        getConditionsDAO = daoFactory(classname = "ConditionUpload.GetConditions")
+
+        mySplitArgs = self.splitArgs.copy()
+
+        jobFactory = self.splitterFactory(package = "WMCore.WMBS",
+                                          subscription = self.subscription1)
+
+        jobGroups = jobFactory(**mySplitArgs)
+
+        self.assertEqual(self.countPromptCalibFiles(), 1,
+                         "ERROR: there should be one prompt_calib_file")
+
+        insertTime = myThread.dbi.processData("""SELECT insert_time
+                                                 FROM prompt_calib_file
+                                                 """,
+                                              transaction = False)[0].fetchall()[0][0]
+
+        # run finishes long after the file was acquired
+        myThread.dbi.processData("""UPDATE prompt_calib
+                                    SET finished = 1
+                                    """, transaction = False)
+
+        watermark = getLateConditionsWatermark(insertTime + 86400)
+
+        self.assertTrue(watermark <= insertTime,
+                        "ERROR: watermark should not pass the acquired file")
+
+        conditions = getConditionsDAO.execute(finished = True, insertTime = watermark,
+                                              transaction = False)
+
+        self.assertEqual(list(conditions.keys()), [ 1 ],
+                         "ERROR: late payload query should return the run")
+
+        self.assertEqual(sum([ len(x) for x in conditions[1]['streams'].values() ]), 1,
+                         "ERROR: late payload query should return the acquired file")
+
+        # once uploaded the file does not hold back the watermark
+        myThread.dbi.processData("""DELETE FROM wmbs_sub_files_acquired
+                                    """, transaction = False)
+
+        watermark = getLateConditionsWatermark(insertTime + 86400)
+
+        self.assertTrue(watermark > insertTime,
+                        "ERROR: watermark should pass the uploaded file")
+
+        return
+
 if __name__ == '__main__':
     unittest.main()
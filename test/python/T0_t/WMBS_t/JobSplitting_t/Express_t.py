@@ -292,5 +292,72 @@ class ExpressTest(unittest.TestCase):
 
         return
 
+    def test03(self):
+        """
+        _test03_
+
+        Test max input rate, over-rate lumis are failed
+        in bulk and counted in the subscription metrics
+
+        """
+        insertClosedLumiBinds = []
+        for lumi in [1, 2]:
+            filecount = 2
+            for i in range(filecount):
+                if lumi == 1:
+                    nevents = 500
+                else:
+                    nevents = 100
+                newFile = File(makeUUID(), size = 1000, events = nevents)
+                newFile.addRun(Run(1, *[lumi]))
+                newFile.setLocation("SomePNN", immediateSave = False)
+                newFile.create()
+                self.fileset1.addFile(newFile)
+                insertClosedLumiBinds.append( { 'RUN' : 1,
+                                                'LUMI' : lumi,
+                                                'STREAM' : "Express",
+                                                'FILECOUNT' : filecount,
+                                                'INSERT_TIME' : self.currentTime,
+                                                'CLOSE_TIME' : self.currentTime } )
+        self.fileset1.commit()
+
+        jobFactory = self.splitterFactory(package = "WMCore.WMBS",
+                                          subscription = self.subscription1)
+
+        self.insertClosedLumiDAO.execute(binds = insertClosedLumiBinds,
+                                         transaction = False)
+
+        self.releaseExpressDAO.execute(binds = { 'RUN' : 1 }, transaction = False)
+
+        jobGroups = jobFactory(maxInputRate = 500, maxInputEvents = 200)
+
+        self.assertEqual(len(jobGroups), 1,
+                         "ERROR: JobFactory didn't return one JobGroup")
+
+        self.assertEqual(len(jobGroups[0].jobs), 1,
+                         "ERROR: JobFactory didn't create a single job")
+
+        self.assertEqual(len(self.subscription1.filesOfStatus("Failed")), 2,
+                         "ERROR: over-rate lumi didn't fail 2 files")
+
+        myThread = threading.currentThread()
+        results = myThread.dbi.processData("""SELECT overrate_lumis, overrate_files, overrate_events
+                                              FROM subscription_metrics
+                                              WHERE subscription = :SUB
+                                              """, { 'SUB' : self.subscription1['id'] },
+                                           transaction = False)[0].fetchall()
+
+        self.assertEqual(results, [ (1, 2, 1000) ],
+                         "ERROR: subscription metrics not updated correctly")
+
+        results = myThread.dbi.processData("""SELECT lumi_id
+                                              FROM lumi_section_express_job
+                                              """, transaction = False)[0].fetchall()
+
+        self.assertEqual(results, [ (2,) ],
+                         "ERROR: job creation time should only be recorded for lumi 2")
+
+        return
+
 if __name__ == '__main__':
     unittest.main()
@@ -579,5 +579,117 @@ class RepackTest(unittest.TestCase):
 
         return
 
+    def test07(self):
+        """
+        _test07_
+
+        Test the core and memory allocation policy
+        Multicore job needing 5 cores, packed into the
+        largest slot shape within the core cap
+
+        """
+        mySplitArgs = self.splitArgs.copy()
+
+        insertClosedLumiBinds = []
+        for lumi in [1]:
+            filecount = 3
+            for i in range(filecount):
+                newFile = File(makeUUID(), size = 1000, events = 100)
+                newFile.addRun(Run(1, *[lumi]))
+                newFile.setLocation("SomePNN", immediateSave = False)
+                newFile.create()
+                self.fileset1.addFile(newFile)
+                insertClosedLumiBinds.append( { 'RUN' : 1,
+                                                'LUMI' : lumi,
+                                                'STREAM' : "A",
+                                                'FILECOUNT' : filecount,
+                                                'INSERT_TIME' : self.currentTime,
+                                                'CLOSE_TIME' : self.currentTime } )
+        self.fileset1.commit()
+
+        jobFactory = self.splitterFactory(package = "WMCore.WMBS",
+                                          subscription = self.subscription1)
+
+        self.insertClosedLumiDAO.execute(binds = insertClosedLumiBinds,
+                                         transaction = False)
+
+        self.fileset1.markOpen(False)
+
+        mySplitArgs['resources'] = { 'sizePerCore' : 1000,
+                                     'slotShapes' : [ 4, 8 ],
+                                     'maxCores' : 6,
+                                     'memory' : 2000,
+                                     'memoryPerCore' : 500 }
+        jobGroups = jobFactory(**mySplitArgs)
+
+        self.assertEqual(len(jobGroups), 1,
+                         "ERROR: JobFactory didn't return one JobGroup")
+
+        self.assertEqual(len(jobGroups[0].jobs), 1,
+                         "ERROR: JobFactory didn't create one job")
+
+        job = jobGroups[0].jobs[0]
+
+        self.assertEqual(getattr(job.getBaggage(), "numberOfCores", 1), 4,
+                         "ERROR: job does not use 4 cores")
+
+        self.assertEqual(job['estimatedMemoryUsage'], 3500,
+                         "ERROR: job does not request 3500 MB memory")
+
+        return
+
+    def test08(self):
+        """
+        _test08_
+
+        Test the core and memory allocation policy
+        Multicore job needing more cores than the
+        largest slot shape gets the largest shape
+
+        """
+        mySplitArgs = self.splitArgs.copy()
+
+        insertClosedLumiBinds = []
+        for lumi in [1]:
+            filecount = 3
+            for i in range(filecount):
+                newFile = File(makeUUID(), size = 1000, events = 100)
+                newFile.addRun(Run(1, *[lumi]))
+                newFile.setLocation("SomePNN", immediateSave = False)
+                newFile.create()
+                self.fileset1.addFile(newFile)
+                insertClosedLumiBinds.append( { 'RUN' : 1,
+                                                'LUMI' : lumi,
+                                                'STREAM' : "A",
+                                                'FILECOUNT' : filecount,
+                                                'INSERT_TIME' : self.currentTime,
+                                                'CLOSE_TIME' : self.currentTime } )
+        self.fileset1.commit()
+
+        jobFactory = self.splitterFactory(package = "WMCore.WMBS",
+                                          subscription = self.subscription1)
+
+        self.insertClosedLumiDAO.execute(binds = insertClosedLumiBinds,
+                                         transaction = False)
+
+        self.fileset1.markOpen(False)
+
+        mySplitArgs['resources'] = { 'sizePerCore' : 1000,
+                                     'slotShapes' : [ 2, 3 ] }
+        jobGroups = jobFactory(**mySplitArgs)
+
+        self.assertEqual(len(jobGroups), 1,
+                         "ERROR: JobFactory didn't return one JobGroup")
+
+        self.assertEqual(len(jobGroups[0].jobs), 1,
+                         "ERROR: JobFactory didn't create one job")
+
+        job = jobGroups[0].jobs[0]
+
+        self.assertEqual(getattr(job.getBaggage(), "numberOfCores", 1), 3,
+                         "ERROR: job does not use 3 cores")
+
+        return
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+_FindRuns_t_
+
+Testing FindStoppedRuns and FindClosedRuns against
+the stand-in RunSummary and StorageManager databases
+
+"""
+import unittest
+import logging
+
+from WMQuality.TestInit import TestInit
+from WMCore.DAOFactory import DAOFactory
+from WMCore.Database.DBFactory import DBFactory
+
+from T0.Simulator.StandInDatabases import StandInDatabases, setupStandInEngine
+
+
+class FindRunsTest(unittest.TestCase):
+    """
+    _FindRunsTest_
+
+    Testing FindStoppedRuns and FindClosedRuns
+    """
+
+    def setUp(self):
+        """
+        _setUp_
+
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+
+        self.testDir = self.testInit.generateWorkDir()
+
+        self.standIn = StandInDatabases(self.testDir)
+
+        dbFactory = DBFactory(logging, dburl = self.standIn.getConnectUrl(), options = {})
+        setupStandInEngine(dbFactory.engine, self.testDir)
+
+        self.daoFactory = DAOFactory(package = "T0.WMBS",
+                                     logger = logging,
+                                     dbinterface = dbFactory.connect())
+
+        return
+
+    def tearDown(self):
+        """
+        _tearDown_
+
+        """
+        self.testInit.delWorkDir()
+
+        return
+
+    def test00(self):
+        """
+        _test00_
+
+        FindStoppedRuns with more runs than fit into
+        one IN list, only stopped runs are returned
+
+        """
+        for run in range(1, 8):
+            self.standIn.startRun(run, 1000 + run, instances = 1)
+        for run in [ 1, 2, 5, 7 ]:
+            self.standIn.stopRun(run, 2000 + run)
+
+        findStoppedRunsDAO = self.daoFactory(classname = "RunLumiCloseout.FindStoppedRuns")
+        findStoppedRunsDAO.maxInList = 2
+
+        stoppedRuns = findStoppedRunsDAO.execute(runs = range(1, 9), transaction = False)
+
+        self.assertEqual(sorted(stoppedRuns.keys()), [ 1, 2, 5, 7 ],
+                         "ERROR: wrong stopped runs")
+
+        for run in stoppedRuns:
+            self.assertEqual(stoppedRuns[run], (1000 + run, 2000 + run),
+                             "ERROR: wrong start or stop time for run %d" % run)
+
+        self.assertEqual(findStoppedRunsDAO.execute(runs = [], transaction = False), {},
+                         "ERROR: no runs should be stopped")
+
+        return
+
+    def test01(self):
+        """
+        _test01_
+
+        FindClosedRuns with more runs than fit into one IN list,
+        only runs with EoR records from all instances are returned
+
+        """
+        for run in range(1, 8):
+            self.standIn.startRun(run, 1000, instances = 2)
+        for run in [ 1, 3, 4, 7 ]:
+            self.standIn.endOfRun(run, 0, 10 + run)
+            self.standIn.endOfRun(run, 1, 10 + run)
+        self.standIn.endOfRun(2, 0, 12)
+
+        findClosedRunsDAO = self.daoFactory(classname = "RunLumiCloseout.FindClosedRuns")
+        findClosedRunsDAO.maxInList = 2
+
+        closedRuns = findClosedRunsDAO.execute(runs = range(1, 9), transaction = False)
+
+        self.assertEqual(closedRuns, { 1 : 11, 3 : 13, 4 : 14, 7 : 17 },
+                         "ERROR: wrong closed runs or lumi counts")
+
+        return
+
+if __name__ == '__main__':
+    unittest.main()
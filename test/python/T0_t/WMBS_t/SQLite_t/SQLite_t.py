@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+"""
+_SQLite_t_
+
+Testing the SQLite implementation of the T0 WMBS DAOs
+
+"""
+import unittest
+import logging
+import time
+import os
+
+from WMQuality.TestInit import TestInit
+from WMCore.Database.DBFactory import DBFactory
+
+from T0.WMBS.SQLite import setupEngine
+from T0.WMBS.SQLite.Create import Create
+from T0.WMBS.SQLite.RunConfig.InsertRun import InsertRun
+from T0.WMBS.SQLite.RunConfig.InsertLumiSection import InsertLumiSection
+from T0.WMBS.SQLite.RunConfig.InsertStream import InsertStream
+from T0.WMBS.SQLite.RunConfig.InsertCMSSWVersion import InsertCMSSWVersion
+from T0.WMBS.SQLite.Tier0Feeder.GetExpressLatency import GetExpressLatency
+
+
+class SQLiteTest(unittest.TestCase):
+    """
+    _SQLiteTest_
+
+    Loads the T0AST schema into a SQLite database
+    file and runs the DAOs against it
+    """
+
+    def setUp(self):
+        """
+        _setUp_
+
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+
+        self.testDir = self.testInit.generateWorkDir()
+
+        dbFactory = DBFactory(logging, dburl = "sqlite:///%s" % os.path.join(self.testDir, "T0AST.db"))
+        setupEngine(dbFactory.engine)
+        self.dbi = dbFactory.connect()
+
+        # WMCore ships no SQLite WMBS schema, the
+        # T0AST schema only needs the subscription types
+        self.dbi.processData("""CREATE TABLE wmbs_sub_types (
+                                  id     int           not null,
+                                  name   varchar(255)  not null,
+                                  primary key(id)
+                                )""", transaction = False)
+
+        create = Create(logger = logging, dbi = self.dbi)
+        create.execute()
+
+        return
+
+    def tearDown(self):
+        """
+        _tearDown_
+
+        """
+        self.dbi.engine.dispose()
+        self.testInit.delWorkDir()
+
+        return
+
+    def fetchAll(self, sql):
+        """
+        _fetchAll_
+
+        """
+        return self.dbi.processData(sql, transaction = False)[0].fetchall()
+
+    def test00(self):
+        """
+        _test00_
+
+        Schema is created with the static data
+        and the Oracle functions are registered
+
+        """
+        self.assertEqual(self.fetchAll("SELECT dummy FROM dual"), [ ("X",) ],
+                         "ERROR: DUAL should have a single row")
+
+        self.assertTrue(len(self.fetchAll("SELECT id FROM run_status")) > 0,
+                        "ERROR: run_status should be populated")
+
+        self.assertEqual(self.fetchAll("""SELECT checkForZeroState(0), checkForZeroState(1),
+                                                 checkForZeroOneState(1), NVL(NULL, 5)
+                                          FROM dual"""),
+                         [ (0, None, 1, 5) ],
+                         "ERROR: Oracle functions not registered")
+
+        return
+
+    def test01(self):
+        """
+        _test01_
+
+        Sequence replacement, ids are assigned
+        in order and names are not duplicated
+
+        """
+        insertStreamDAO = InsertStream(logging, self.dbi)
+        insertCMSSWVersionDAO = InsertCMSSWVersion(logging, self.dbi)
+
+        for stream in [ "Express", "A", "Express" ]:
+            insertStreamDAO.execute(binds = { 'STREAM' : stream },
+                                    transaction = False)
+
+        for version in [ "CMSSW_8_0_0", "CMSSW_8_0_1", "CMSSW_8_0_0" ]:
+            insertCMSSWVersionDAO.execute(binds = { 'VERSION' : version },
+                                          transaction = False)
+
+        self.assertEqual(self.fetchAll("SELECT id, name FROM stream ORDER BY id"),
+                         [ (1, "Express"), (2, "A") ],
+                         "ERROR: streams not inserted correctly")
+
+        self.assertEqual(self.fetchAll("SELECT id, name FROM cmssw_version ORDER BY id"),
+                         [ (1, "CMSSW_8_0_0"), (2, "CMSSW_8_0_1") ],
+                         "ERROR: CMSSW versions not inserted correctly")
+
+        return
+
+    def test02(self):
+        """
+        _test02_
+
+        Runs and lumis are inserted only once
+
+        """
+        insertRunDAO = InsertRun(logging, self.dbi)
+        insertLumiDAO = InsertLumiSection(logging, self.dbi)
+
+        for i in range(2):
+            insertRunDAO.execute(binds = { 'RUN' : 1,
+                                           'TIME' : int(time.time()),
+                                           'HLTKEY' : "someHLTKey" },
+                                 transaction = False)
+            insertLumiDAO.execute(binds = [ { 'RUN' : 1, 'LUMI' : 1 },
+                                            { 'RUN' : 1, 'LUMI' : 2 } ],
+                                  transaction = False)
+
+        self.assertEqual(self.fetchAll("SELECT run_id, status FROM run"), [ (1, 1) ],
+                         "ERROR: there should be one run in status 1")
+
+        self.assertEqual(self.fetchAll("SELECT run_id, lumi_id FROM lumi_section ORDER BY lumi_id"),
+                         [ (1, 1), (1, 2) ],
+                         "ERROR: there should be two lumis")
+
+        return
+
+    def test03(self):
+        """
+        _test03_
+
+        Express latency percentiles per stage from seeded
+        streamer, fileset, lumi closing, release and job rows
+
+        """
+        # WMBS fileset files table, only what the DAO uses
+        self.dbi.processData("""CREATE TABLE wmbs_fileset_files (
+                                  fileid       int  not null,
+                                  fileset      int  not null,
+                                  insert_time  int  not null
+                                )""", transaction = False)
+
+        self.dbi.processData("""INSERT INTO run (run_id, last_updated, express_release_time, hltkey, start_time)
+                                VALUES (1, 0, 1100, 'someHLTKey', 900)""", transaction = False)
+        self.dbi.processData("""INSERT INTO stream (id, name)
+                                VALUES (:ID, :NAME)""",
+                             [ { 'ID' : 1, 'NAME' : "Express" },
+                               { 'ID' : 2, 'NAME' : "A" } ], transaction = False)
+
+        # only stream 1 is an express stream
+        self.dbi.processData("""INSERT INTO express_config (run_id, stream_id, proc_version, write_tiers, write_dqm,
+                                                            global_tag, max_rate, max_events, max_size, max_files,
+                                                            max_latency, dqm_interval, block_delay, cmssw_id, scram_arch)
+                                VALUES (1, 1, 1, 'FEVT', 1, 'GT', 1, 1, 1, 1, 1, 1, 1, 1, 'arch')""", transaction = False)
+
+        # lumi 1 has two streamers, the last one counts
+        self.dbi.processData("""INSERT INTO streamer (id, run_id, stream_id, lumi_id, insert_time)
+                                VALUES (:ID, 1, :STREAM, :LUMI, :TIME)""",
+                             [ { 'ID' : 1, 'STREAM' : 1, 'LUMI' : 1, 'TIME' : 1000 },
+                               { 'ID' : 2, 'STREAM' : 1, 'LUMI' : 1, 'TIME' : 1010 },
+                               { 'ID' : 3, 'STREAM' : 1, 'LUMI' : 2, 'TIME' : 1020 },
+                               { 'ID' : 4, 'STREAM' : 1, 'LUMI' : 3, 'TIME' : 1030 },
+                               { 'ID' : 5, 'STREAM' : 1, 'LUMI' : 4, 'TIME' : 1200 },
+                               { 'ID' : 6, 'STREAM' : 2, 'LUMI' : 1, 'TIME' : 1000 } ], transaction = False)
+
+        # lumi 4 is not fed yet
+        self.dbi.processData("""INSERT INTO wmbs_fileset_files (fileid, fileset, insert_time)
+                                VALUES (:ID, 1, :TIME)""",
+                             [ { 'ID' : 1, 'TIME' : 1012 },
+                               { 'ID' : 2, 'TIME' : 1015 },
+                               { 'ID' : 3, 'TIME' : 1040 },
+                               { 'ID' : 4, 'TIME' : 1031 },
+                               { 'ID' : 6, 'TIME' : 1001 } ], transaction = False)
+
+        # lumi 4 is not closed yet
+        self.dbi.processData("""INSERT INTO lumi_section_closed (run_id, stream_id, lumi_id, filecount, insert_time, close_time)
+                                VALUES (1, :STREAM, :LUMI, 1, 0, :TIME)""",
+                             [ { 'STREAM' : 1, 'LUMI' : 1, 'TIME' : 1030 },
+                               { 'STREAM' : 1, 'LUMI' : 2, 'TIME' : 1030 },
+                               { 'STREAM' : 1, 'LUMI' : 3, 'TIME' : 1060 },
+                               { 'STREAM' : 1, 'LUMI' : 4, 'TIME' : 0 },
+                               { 'STREAM' : 2, 'LUMI' : 1, 'TIME' : 1002 } ], transaction = False)
+
+        self.dbi.processData("""INSERT INTO lumi_section_express_job (run_id, stream_id, lumi_id, job_time)
+                                VALUES (1, 1, :LUMI, :TIME)""",
+                             [ { 'LUMI' : 1, 'TIME' : 1050 },
+                               { 'LUMI' : 2, 'TIME' : 1025 } ], transaction = False)
+
+        latency = GetExpressLatency(logging, self.dbi).execute(1, transaction = False)
+
+        self.assertEqual(list(latency.keys()), [ "Express" ],
+                         "ERROR: only the express stream should be reported")
+
+        # release before the last streamer arrived counts as zero
+        self.assertEqual(latency['Express'],
+                         { 'feed' : { 'lumis' : 3, 'p50' : 5, 'p90' : 20, 'p99' : 20, 'max' : 20 },
+                           'close' : { 'lumis' : 3, 'p50' : 20, 'p90' : 30, 'p99' : 30, 'max' : 30 },
+                           'release' : { 'lumis' : 4, 'p50' : 70, 'p90' : 90, 'p99' : 90, 'max' : 90 },
+                           'job' : { 'lumis' : 2, 'p50' : 5, 'p90' : 40, 'p99' : 40, 'max' : 40 } },
+                         "ERROR: wrong express latency percentiles")
+
+        return
+
+if __name__ == '__main__':
+    unittest.main()